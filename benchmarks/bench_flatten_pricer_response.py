@@ -0,0 +1,160 @@
+"""
+Benchmark of Pricer.flatten_pricer_response against the former row by row loop.
+
+Usage (from src/, with the libapi environment variables set):
+
+    PYTHONPATH=. python ../benchmarks/bench_flatten_pricer_response.py --instruments 5000 --codes 40
+"""
+from __future__ import annotations
+
+import time
+import random
+import argparse
+import polars as pl
+
+from typing import Dict, List
+
+from libapi.pricers.pricer import Pricer
+
+
+def generate_response (n_instruments : int, n_codes : int, n_asset_codes : int = 5) -> tuple[Dict, List[Dict]] :
+    """
+    Random pricer response and the matching instruments.
+    """
+    currencies = ["EUR", "USD", "GBP"]
+
+    response = {
+
+        "instruments" : [
+
+            {
+                "id" : i,
+                "results" : [
+
+                    { "code" : f"CODE{c}", "value" : random.random(), "currency" : random.choice(currencies) }
+                    for c in range(n_codes)
+
+                ],
+                "assets" : [
+
+                    {
+                        "name" : f"ASSET{i % 50}",
+                        "results" : [{ "code" : f"ASSET_CODE{c}", "value" : random.random() } for c in range(n_asset_codes)]
+                    }
+
+                ]
+            }
+
+            for i in range(n_instruments)
+
+        ]
+
+    }
+
+    instruments = [
+
+        { "ID" : i, "direction" : "Buy", "opt_type" : "Call", "strike" : 100 + i % 10, "notional" : 1_000_000 }
+        for i in range(n_instruments)
+
+    ]
+
+    return response, instruments
+
+
+def flatten_pricer_response_loop (response : Dict, instruments : List[Dict]) -> pl.DataFrame :
+    """
+    Former implementation : one Python dict per instrument.
+    """
+    base = pl.DataFrame(response.get("instruments", []))
+    base = base.select(["id"] + [c for c in base.columns if c in ("results", "assets")])
+
+    flattened_rows = []
+
+    for row in base.iter_rows(named=True) :
+
+        flat_row = { "id" : row["id"] }
+
+        for result_dict in row.get("results") or [] :
+
+            code = result_dict.get("code")
+            value = result_dict.get("value")
+
+            if code is not None and value is not None :
+                flat_row[code] = value
+
+            if "currency" in result_dict and code is not None :
+                flat_row[f"{code}_currency"] = result_dict["currency"]
+
+        assets = row.get("assets")
+
+        if isinstance(assets, list) and len(assets) > 0 and isinstance(assets[0], dict) :
+
+            flat_row["asset"] = assets[0].get("name")
+
+            for result_dict in assets[0].get("results", []) :
+
+                code = result_dict.get("code")
+                value = result_dict.get("value")
+
+                if code is not None and value is not None :
+                    flat_row[code] = value
+
+                if "currency" in result_dict and code is not None :
+                    flat_row[f"{code}_currency"] = result_dict["currency"]
+
+        flattened_rows.append(flat_row)
+
+    data = pl.DataFrame(flattened_rows)
+
+    instruments_df = pl.DataFrame(instruments).rename({ "ID" : "id" })
+    join_cols = [c for c in ["direction", "pair", "opt_type", "strike", "notional", "notional_currency", "expiry", "BBGTicker", "stratid"] if c in instruments_df.columns]
+
+    return data.join(instruments_df.select(["id"] + join_cols), on="id", how="left", maintain_order="left")
+
+
+def timeit (function, *args, repeat : int = 3) -> float :
+
+    best = float("inf")
+
+    for _ in range(repeat) :
+
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def main () -> None :
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    parser.add_argument("--instruments", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--codes", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=3)
+
+    args = parser.parse_args()
+
+    pricer = Pricer(trade_manager=object()) # No API call needed
+
+    print(f"{'instruments':>12} {'cells':>10} {'loop (s)':>10} {'columnar (s)':>13} {'speedup':>8}")
+
+    for n_instruments in args.instruments :
+
+        response, instruments = generate_response(n_instruments, args.codes)
+
+        expected = flatten_pricer_response_loop(response, instruments)
+        result = pricer.flatten_pricer_response(response, instruments)
+
+        assert result.select(expected.columns).equals(expected), "Flatteners disagree"
+
+        loop = timeit(flatten_pricer_response_loop, response, instruments, repeat=args.repeat)
+        columnar = timeit(pricer.flatten_pricer_response, response, instruments, repeat=args.repeat)
+
+        cells = n_instruments * (args.codes + 5)
+
+        print(f"{n_instruments:>12} {cells:>10} {loop:>10.3f} {columnar:>13.3f} {loop / columnar:>7.1f}x")
+
+
+if __name__ == "__main__" :
+    main()
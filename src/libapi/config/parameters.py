@@ -21,6 +21,44 @@ ICE_USERNAME=os.getenv("ICE_USERNAME")
 ICE_PASSWORD=os.getenv("ICE_PASSWORD")
 
 
+# ----------- HTTP transport -----------
+
+LIBAPI_HTTP_POOL_CONNECTIONS=int(os.getenv("LIBAPI_HTTP_POOL_CONNECTIONS", 10)) # Host pools kept
+LIBAPI_HTTP_POOL_MAXSIZE=int(os.getenv("LIBAPI_HTTP_POOL_MAXSIZE", 32)) # Connections kept per host
+LIBAPI_HTTP_MAX_RETRIES=int(os.getenv("LIBAPI_HTTP_MAX_RETRIES", 3))
+LIBAPI_HTTP_BACKOFF_FACTOR=float(os.getenv("LIBAPI_HTTP_BACKOFF_FACTOR", 0.5))
+LIBAPI_HTTP2=os.getenv("LIBAPI_HTTP2", "0") == "1" # Only for the async client (needs the h2 package)
+LIBAPI_HTTP_STREAM_CHUNK_SIZE=int(os.getenv("LIBAPI_HTTP_STREAM_CHUNK_SIZE", 64 * 1024)) # Bytes read at a time from streamed responses
+
+# Calculation results polling (seconds, except the number of failures)
+LIBAPI_POLL_INITIAL_DELAY=float(os.getenv("LIBAPI_POLL_INITIAL_DELAY", 1.0))
+LIBAPI_POLL_MAX_DELAY=float(os.getenv("LIBAPI_POLL_MAX_DELAY", 30.0))
+LIBAPI_POLL_TIMEOUT=float(os.getenv("LIBAPI_POLL_TIMEOUT", 1800.0))
+LIBAPI_POLL_MAX_FAILURES=int(os.getenv("LIBAPI_POLL_MAX_FAILURES", 5))
+
+# Trade searches fan-out : books and values (dates, trade IDs) per search, trade leg IDs
+# per info request, and number of requests in flight
+ICE_SEARCH_BOOKS_PER_REQUEST=int(os.getenv("ICE_SEARCH_BOOKS_PER_REQUEST", 10))
+ICE_SEARCH_VALUES_PER_REQUEST=int(os.getenv("ICE_SEARCH_VALUES_PER_REQUEST", 500))
+ICE_TRADE_IDS_PER_REQUEST=int(os.getenv("ICE_TRADE_IDS_PER_REQUEST", 500))
+ICE_SEARCH_MAX_IN_FLIGHT=int(os.getenv("ICE_SEARCH_MAX_IN_FLIGHT", 4))
+
+# Incremental audit trail sync : hours per request, days fetched by the first sync, and
+# key of the events list in the audit trail responses
+ICE_AUDIT_WINDOW_HOURS=float(os.getenv("ICE_AUDIT_WINDOW_HOURS", 6))
+ICE_AUDIT_INITIAL_LOOKBACK_DAYS=float(os.getenv("ICE_AUDIT_INITIAL_LOOKBACK_DAYS", 1))
+ICE_AUDIT_EVENTS_KEY=os.getenv("ICE_AUDIT_EVENTS_KEY", "auditTrail")
+
+# Seconds the portfolios list is kept before it is downloaded again
+ICE_PORTFOLIOS_TTL=float(os.getenv("ICE_PORTFOLIOS_TTL", 300))
+
+# Bulk booking : units per request, requests in flight, and SQLite ledger of the idempotency
+# keys shared by the processes (kept in memory for the process, with a warning, if unset)
+ICE_BOOKING_BATCH_SIZE=int(os.getenv("ICE_BOOKING_BATCH_SIZE", 50))
+ICE_BOOKING_MAX_IN_FLIGHT=int(os.getenv("ICE_BOOKING_MAX_IN_FLIGHT", 4))
+ICE_BOOKING_LEDGER_DB_ABS_PATH=os.getenv("ICE_BOOKING_LEDGER_DB_ABS_PATH")
+
+
 # ----------- API Endpoints -----------
 
 ICE_URL_SEARCH_TRADES=os.getenv("ICE_URL_SEARCH_TRADES")
@@ -71,7 +109,29 @@ FX_PRICER_SOLVE_PATH=os.getenv("FX_PRICER_SOLVE_PATH")
 EQ_PRICER_CALC_PATH=os.getenv("EQ_PRICER_CALC_PATH")
 EQ_PRICER_SOLVE_PATH=os.getenv("EQ_PRICER_SOLVE_PATH")
 
-# Columns in the pricer
+# Batch pricing (chunk size, number of chunks in flight, retries per chunk)
+PRICER_BATCH_SIZE=int(os.getenv("PRICER_BATCH_SIZE", 50))
+PRICER_MAX_IN_FLIGHT=int(os.getenv("PRICER_MAX_IN_FLIGHT", 4))
+PRICER_MAX_RETRIES=int(os.getenv("PRICER_MAX_RETRIES", 2))
+
+# Valuation dates of a curve priced at the same time (one request per date)
+PRICER_CURVE_MAX_IN_FLIGHT=int(os.getenv("PRICER_CURVE_MAX_IN_FLIGHT", 4))
+
+# Pricing results cache : entries kept in memory, optional SQLite file shared by the processes,
+# and lifetime in seconds by valuation type (None = forever, types missing are never cached).
+# An EOD request without a date prices the last EOD, which moves once a day : it is only kept
+# PRICER_CACHE_UNDATED_EOD_TTL seconds, dated EOD prices never change
+PRICER_CACHE_SIZE=int(os.getenv("PRICER_CACHE_SIZE", 100_000))
+PRICER_CACHE_DB_ABS_PATH=os.getenv("PRICER_CACHE_DB_ABS_PATH")
+PRICER_CACHE_INTRADAY_TTL=float(os.getenv("PRICER_CACHE_INTRADAY_TTL", 10))
+PRICER_CACHE_UNDATED_EOD_TTL=float(os.getenv("PRICER_CACHE_UNDATED_EOD_TTL", 3600))
+PRICER_CACHE_TTL={
+    "EOD" : None,
+    "RealTime" : PRICER_CACHE_INTRADAY_TTL,
+    "Cut" : PRICER_CACHE_INTRADAY_TTL
+}
+
+# Columns in the pricer and their aggregation by strategy ("sum", "first" or "join", see libapi.pricers.aggregation)
 COLUMNS_IN_PRICER={
 
     "price" : "sum",
@@ -142,15 +202,15 @@ COLUMNS_IN_PRICER={
     "VegaTerm":"sum",
     "VegaTerm_currency":"first",
     "VolatilitySpread":"first",
-    "direction":" ".join,
+    "direction":"join",
     "pair" : "first",
     "opt_type" : "first",
     "strike" : "first",
     "notional" : "first",
     "notional_currency" : "first",
     "expiry" : "first",
-    "strike" : " ".join,
-    "CurrentNotional": " ".join,
+    "strike" : "join",
+    "CurrentNotional": "join",
     "CurrentNotional_currency":"first",
     "MarketValueAsk":"sum",
     "MarketValueAsk_currency":"first",
@@ -177,6 +237,12 @@ LIBAPI_LOGS_REQUESTS_BASENAME=os.getenv("LIBAPI_LOGS_REQUESTS_BASENAME")
 LIBAPI_LOGS_PRICING_BASENAME=os.getenv("LIBAPI_LOGS_PRICING_BASENAME")
 LIBAPI_LOGS_CALCULATIONS_BASENAME=os.getenv("LIBAPI_LOGS_CALCULATIONS_BASENAME")
 
+# Requests logs are written in background (seconds between flushes, rows per write, rotation)
+LIBAPI_LOGS_FLUSH_INTERVAL=float(os.getenv("LIBAPI_LOGS_FLUSH_INTERVAL", 1.0))
+LIBAPI_LOGS_BATCH_SIZE=int(os.getenv("LIBAPI_LOGS_BATCH_SIZE", 500))
+LIBAPI_LOGS_MAX_BYTES=int(os.getenv("LIBAPI_LOGS_MAX_BYTES", 50 * 1024 * 1024))
+LIBAPI_LOGS_ROTATE_DAILY=os.getenv("LIBAPI_LOGS_ROTATE_DAILY", "1") == "1"
+
 LIBAPI_LOGS_PRICER_COLUMNS = {
 
     'date' : pl.Datetime,
@@ -186,8 +252,23 @@ LIBAPI_LOGS_PRICER_COLUMNS = {
 
 LIBAPI_CACHE_DIR_ABS_PATH=os.getenv("LIBAPI_CACHE_DIR_ABS_PATH")
 LIBAPI_CACHE_RESULTS_DIR_PATH=os.getenv("LIBAPI_CACHE_RESULTS_DIR_PATH")
+LIBAPI_CACHE_CURVES_DIR_PATH=os.getenv("LIBAPI_CACHE_CURVES_DIR_PATH")
+LIBAPI_CACHE_CURVES_FORMAT=os.getenv("LIBAPI_CACHE_CURVES_FORMAT", "ipc") # "ipc" (Arrow IPC, memory mapped) or "parquet"
+LIBAPI_CACHE_AUDIT_DIR_PATH=os.getenv("LIBAPI_CACHE_AUDIT_DIR_PATH")
 LIBAPI_CACHE_TOKEN_BASENAME=os.getenv("LIBAPI_CACHE_TOKEN_BASENAME")
 
+# Token lifecycle : lifetime of the tokens without expiry claim, refresh before the expiry,
+# seconds waited for the login of another process, and before trying a failed login again (seconds)
+LIBAPI_TOKEN_TTL=float(os.getenv("LIBAPI_TOKEN_TTL", 3600))
+LIBAPI_TOKEN_REFRESH_MARGIN=float(os.getenv("LIBAPI_TOKEN_REFRESH_MARGIN", 120))
+LIBAPI_TOKEN_LOCK_TIMEOUT=float(os.getenv("LIBAPI_TOKEN_LOCK_TIMEOUT", 30))
+LIBAPI_TOKEN_LOGIN_BACKOFF=float(os.getenv("LIBAPI_TOKEN_LOGIN_BACKOFF", 10))
+
+# Calculation results cache eviction (0 disables a limit, interval in seconds)
+LIBAPI_CACHE_RESULTS_MAX_BYTES=int(os.getenv("LIBAPI_CACHE_RESULTS_MAX_BYTES", 2 * 1024 * 1024 * 1024))
+LIBAPI_CACHE_RESULTS_MAX_AGE_DAYS=float(os.getenv("LIBAPI_CACHE_RESULTS_MAX_AGE_DAYS", 90))
+LIBAPI_CACHE_RESULTS_EVICT_INTERVAL=float(os.getenv("LIBAPI_CACHE_RESULTS_EVICT_INTERVAL", 3600))
+
 LIBAPI_LOGS_REQUESTS_COLUMNS = {
 
     "Date" : pl.Datetime,
@@ -1,5 +1,8 @@
 from .trade_manager import TradeManager
 from .calculator import IceCalculator
 from .data import IceData
+from .async_client import AsyncClient
+from .async_trade_manager import AsyncTradeManager
+from .async_calculator import AsyncIceCalculator
 
-__all__ = ["TradeManager", "IceCalculator", "IceData"]
\ No newline at end of file
+__all__ = ["TradeManager", "IceCalculator", "IceData", "AsyncClient", "AsyncTradeManager", "AsyncIceCalculator"]
\ No newline at end of file
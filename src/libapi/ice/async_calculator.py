@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import time
+import datetime as dt
+
+from typing import Dict, Optional, List, AsyncIterator, Tuple
+
+from libapi.ice.async_client import AsyncClient
+from libapi.ice.polling import PollingSchedule, is_calculation_results
+from libapi.ice.calculator import IceCalculator
+from libapi.config.parameters import (
+    ICE_AUTH, ICE_HOST, ICE_USERNAME, ICE_PASSWORD, ICE_CTPY_NAME_MS,
+    ICE_URL_BIL_IM_CALC, ICE_URL_INVOKE_CALC
+)
+from libapi.utils.calculations import read_id_from_file, write_to_file
+from libapi.utils.results import load_cache_results_from_id, save_cache_results
+from libapi.utils.formatter import date_to_str
+
+
+class AsyncIceCalculator (AsyncClient) :
+    """
+    Asyncio version of `IceCalculator` : launches calculations and fetches their results
+    on one event loop. Build it with `await AsyncIceCalculator.connect()`.
+    """
+
+    def __init__ (
+
+            self,
+            ice_host : Optional[str] = None,
+            ice_auth : Optional[str] = None,
+            **client_kwargs
+
+        ) -> None :
+        """
+        Initialize the async ICE calculator (no network call, see `connect`).
+
+        Args:
+            client_kwargs: Options of the AsyncClient (pool limits, token_manager, transport...).
+        """
+        ice_host = ICE_HOST if ice_host is None else ice_host
+        ice_auth = ICE_AUTH if ice_auth is None else ice_auth
+
+        super().__init__(ice_host, ice_auth, **client_kwargs)
+
+
+    @classmethod
+    async def connect (
+
+            cls,
+            ice_host : Optional[str] = None,
+            ice_auth : Optional[str] = None,
+            ice_username : Optional[str] = None,
+            ice_password : Optional[str] = None,
+            **client_kwargs
+
+        ) -> AsyncIceCalculator :
+        """
+        Build an AsyncIceCalculator and authenticate against the ICE API.
+        """
+        calculator = cls(ice_host, ice_auth, **client_kwargs)
+        await calculator.authenticate(ice_username, ice_password)
+
+        return calculator
+
+
+    async def authenticate (self, username : Optional[str] = None, password : Optional[str] = None) -> bool :
+        """
+        Proxy for the base AsyncClient.authenticate method.
+
+        Args:
+            username (str): ICE username.
+            password (str): ICE password.
+
+        Returns:
+            bool: True if authentication was successful.
+        """
+        username = ICE_USERNAME if username is None else username
+        password = ICE_PASSWORD if password is None else password
+
+        return await super().authenticate(username, password)
+
+
+    # -------------------------------------------------- IM Bilateral -------------------------------------------------- #
+
+
+    async def run_bilateral_im_calculation (
+
+            self,
+            date : Optional[str | dt.datetime] = None,
+            fund : Optional[str] = None,
+            ctptys : bool = True,
+            ctpy_name : Optional[List[str]] = None,
+            endpoint : Optional[str] = None
+
+        ) -> Optional[Dict] :
+        """
+        Launch a bilateral IM calculation (see IceCalculator.run_bilateral_im_calculation).
+        """
+        endpoint = ICE_URL_BIL_IM_CALC if endpoint is None else endpoint
+        body = self.generate_bilateral_im_payload(date, fund, ctptys, ctpy_name)
+
+        return await self.post(endpoint=endpoint, json=body)
+
+
+    async def get_bilateral_im_calculation_all_ctpy (
+
+            self,
+            date : Optional[str | dt.datetime | dt.date] = None,
+            fund : Optional[str] = None,
+            type : Optional[str] = None,
+
+        ) -> Optional[List[Dict]] :
+        """
+        Get bilateral IM calculation results for all counterparties, running the calculation if needed.
+
+        Args:
+            date (datetime): The date for which to run/retrieve the calculation.
+            fund (str): The fund name.
+            type (str): Calculation type label.
+
+        Returns:
+            list[dict] | None: List of result dictionaries for each counterparty.
+        """
+        date = date_to_str(date)
+
+        fund = "HV" if fund is None else fund
+        type = "IM" if type is None else type
+
+        start = time.time()
+
+        calculation_id = read_id_from_file(date, fund, type)
+
+        if not calculation_id :
+
+            print(f"[*] Run calculation in ICE for date {date} \n")
+
+            calculation_dict = await self.run_bilateral_im_calculation(date, fund=fund)
+            calculation_id = calculation_dict.get("calculationId") if calculation_dict is not None else None
+
+            write_to_file(calculation_id, date, fund, type)
+
+        calculation = load_cache_results_from_id(calculation_id)
+
+        if calculation is None :
+
+            print(f"\n[*] Requesting ICE for calculations results {date}")
+
+            calculation = await self.get_calculation_results(calculation_id)
+
+            # Only final results are cached : a cached file is never replaced
+            if is_calculation_results(calculation) :
+                save_cache_results(calculation_id, calculation)
+
+        calc_res = calculation.get('results') if calculation is not None else None
+
+        if calc_res is None :
+
+            print("[-] Error during fetching, calculation is None...")
+            return None
+
+        print(f"[+] Get Bilateral IM ctpy information in {time.time() - start} seconds")
+
+        return calc_res
+
+
+    async def get_post_im_by_ctpy (
+
+            self,
+            date : Optional[str | dt.date | dt.datetime] = None,
+            fund : Optional[str] = None,
+            type : Optional[str] = None,
+            ctpy_name : Optional[str] = None,
+
+        ) -> Optional[str] :
+        """
+        Get the posted IM of one counterparty (see IceCalculator.get_post_im_by_ctpy).
+        """
+        calc_res = await self.get_bilateral_im_calculation_all_ctpy(date, fund, type)
+
+        if calc_res is None :
+
+            print("[-] Error during fetching, calculation is None...")
+            return None
+
+        ctpy_name = ICE_CTPY_NAME_MS if ctpy_name is None else ctpy_name
+
+        im = None
+        for result in calc_res :
+
+            if result["group"] == ctpy_name :
+                im = result["postIm"]
+
+        print(f"\n[+] Find value for IM: {im}")
+
+        return im
+
+
+    async def get_portfolio_bilateral_im (
+
+            self,
+            date : Optional[str | dt.datetime | dt.date] = None,
+            fund : Optional[str] = None,
+            type : Optional[str] = None
+
+        ) -> Optional[List[Dict]] :
+        """
+        Get bilateral IM calculation at the portfolio level (no ctptys split).
+        """
+        type = "IM-ptf" if type is None else type
+
+        return await self.get_bilateral_im_calculation_all_ctpy(date, fund, type)
+
+
+    # -------------------------------------------------- MV and Greeks -------------------------------------------------- #
+
+
+    async def get_bilateral_im_calculations (
+
+            self,
+            date : Optional[str | dt.datetime | dt.date] = None,
+            funds : Optional[List[str]] = None,
+            type : Optional[str] = None
+
+        ) -> Dict[str, Optional[List[Dict]]] :
+        """
+        Get bilateral IM results for several funds, launched together and polled concurrently
+        (see IceCalculator.get_bilateral_im_calculations).
+        """
+        date = date_to_str(date)
+
+        funds = ["HV", "WR"] if funds is None else funds
+        type = "IM" if type is None else type
+
+        ids_by_fund = { fund : read_id_from_file(date, fund, type) for fund in funds }
+        missing = [fund for fund, calculation_id in ids_by_fund.items() if not calculation_id]
+
+        launched = await self.gather(*(self.run_bilateral_im_calculation(date, fund=fund) for fund in missing))
+
+        for fund, calculation_dict in zip(missing, launched) :
+
+            calculation_id = calculation_dict.get("calculationId") if calculation_dict is not None else None
+            ids_by_fund[fund] = calculation_id
+
+            if calculation_id is not None :
+                write_to_file(calculation_id, date, fund, type)
+
+        calculation_ids = [calculation_id for calculation_id in ids_by_fund.values() if calculation_id]
+        calculations = { calculation_id : calculation async for calculation_id, calculation in self.wait_for_calculations(calculation_ids) }
+
+        results = {}
+
+        for fund in funds :
+
+            calculation = calculations.get(ids_by_fund.get(fund))
+            results[fund] = calculation.get("results") if calculation is not None else None
+
+        return results
+
+
+    async def wait_for_calculations (
+
+            self,
+            calculation_ids : List[str | int],
+            use_cache : bool = True,
+            schedule : Optional[PollingSchedule] = None
+
+        ) -> AsyncIterator[Tuple[str | int, Optional[Dict]]] :
+        """
+        Async generator yielding (calculation ID, results) as each calculation completes
+        (see IceCalculator.wait_for_calculations).
+        """
+        pending = []
+
+        for calculation_id in dict.fromkeys(calculation_ids) :
+
+            calculation = load_cache_results_from_id(calculation_id) if use_cache else None
+
+            if calculation is None :
+
+                pending.append(calculation_id)
+                continue
+
+            yield calculation_id, calculation
+
+        if not pending :
+            return
+
+        print(f"\n[*] Waiting for {len(pending)} calculations results...")
+
+        async for calculation_id, calculation in self.iter_calculation_results(pending, schedule=schedule) :
+
+            if use_cache and is_calculation_results(calculation) :
+                save_cache_results(calculation_id, calculation)
+
+            yield calculation_id, calculation
+
+
+    async def run_mv_n_greeks (
+
+            self,
+            date : Optional[str | dt.datetime | dt.date] = None,
+            book_names : Optional[List[str]] = None,
+            endpoint : Optional[str] = None
+
+        ) -> Optional[Dict] :
+        """
+        Trigger Market Value and Greeks calculation (RealTime if no date, EOD otherwise).
+        """
+        endpoint = ICE_URL_INVOKE_CALC if endpoint is None else endpoint
+        payload = self.generate_mv_n_greeks_payload(date, book_names)
+
+        return await self.post(endpoint=endpoint, data=payload)
+
+
+    async def get_total_mv_data (self, date : str | dt.datetime, type : str = "MV") -> Optional[Dict] :
+        """
+        Retrieve total Market Value calculation for a given date, running it if needed.
+        """
+        verified_date = date_to_str(date)
+        calculation_id = read_id_from_file(verified_date, type=type)
+
+        if not calculation_id :
+
+            print(f"[*] Running ICE MV calculation for date {verified_date}")
+
+            calculation_dict = await self.run_mv_n_greeks(verified_date)
+            calculation_id = calculation_dict.get("calculationId") if calculation_dict is not None else None
+
+            write_to_file(calculation_id, verified_date, type=type)
+
+        return await self.get_calculation_results(calculation_id)
+
+
+    # -------------------------------------------------- Payload Generators -------------------------------------------------- #
+
+    # Pure payload builders, shared with the sync IceCalculator
+    generate_bilateral_im_payload = IceCalculator.generate_bilateral_im_payload
+    generate_mv_n_greeks_payload = IceCalculator.generate_mv_n_greeks_payload
@@ -0,0 +1,559 @@
+from __future__ import annotations
+
+import os
+import time
+import httpx
+import asyncio
+
+from typing import Dict, Any, Optional, List, AsyncIterator, Tuple
+
+from libapi.ice.client import Client, is_success_status
+from libapi.ice.tokens import TokenManager, get_token_manager
+from libapi.ice.polling import PollingSchedule, apoll_calculation, apoll_calculations, aiter_poll_calculations
+from libapi.config.parameters import (
+    LIBAPI_CACHE_DIR_ABS_PATH, LIBAPI_CACHE_TOKEN_BASENAME, ICE_URL_GET_CALC_RES,
+    LIBAPI_HTTP_POOL_MAXSIZE, LIBAPI_HTTP_MAX_RETRIES, LIBAPI_HTTP2
+)
+
+from urllib.parse import urljoin
+
+
+class AsyncClient :
+    """
+    Asyncio version of `Client`, backed by a pooled `httpx.AsyncClient`.
+
+    Same surface as `Client` (authenticate / get / post / get_calculation_results),
+    every network call being a coroutine. Use it as an async context manager,
+    or call `aclose()` to release the connection pool.
+    """
+
+    def __init__ (
+
+            self,
+            api_host : str,
+            auth_url : str,
+            token : Optional[str] = None,
+            is_auth : bool = False,
+            verify_ssl : bool = False,
+            timeout : int = 30,
+            token_cache_path : Optional[str] = None,
+            max_connections : Optional[int] = None,
+            max_keepalive_connections : Optional[int] = None,
+            max_retries : Optional[int] = None,
+            http2 : Optional[bool] = None,
+            token_manager : Optional[TokenManager] = None,
+            transport : Optional[httpx.AsyncBaseTransport] = None
+
+        ) -> None :
+        """
+        Initialize the async API client.
+
+        Args:
+            api_host (str): Base API URL (e.g., "https://example.com").
+            auth_url (str): Authentication endpoint path.
+            token (str, optional): Existing authentication token.
+            is_auth (bool, optional): Force authentication state.
+            verify_ssl (bool, optional): Verify TLS certificates (True in production).
+            timeout (int, optional): Default timeout for requests in seconds.
+            max_connections (int, optional): Maximum number of connections of the pool (LIBAPI_HTTP_POOL_MAXSIZE).
+            max_keepalive_connections (int, optional): Idle connections kept open for reuse (all by default).
+            max_retries (int, optional): Retries on connection errors (LIBAPI_HTTP_MAX_RETRIES).
+            http2 (bool, optional): Negotiate HTTP/2 when the server supports it (LIBAPI_HTTP2, needs `h2`).
+            token_manager (TokenManager, optional): Token lifecycle (set by `authenticate` if None).
+            transport (httpx.AsyncBaseTransport, optional): Transport replacing the pooled one (e.g.
+                httpx.MockTransport). Also used by the logins if it serves sync requests too.
+        """
+        self.api_host = api_host.rstrip("/")
+        self.auth_url = auth_url.lstrip("/")
+
+        self.full_auth_url = urljoin(self.api_host + "/", self.auth_url)
+
+        self.token = token
+        self.is_auth = bool(is_auth or token)
+
+        self.headers = {
+
+            "Content-Type" : "application/json",
+            "AuthenticationToken" : token or None
+
+        }
+
+        self.verify_ssl = verify_ssl
+        self.timeout = timeout
+
+        max_connections = LIBAPI_HTTP_POOL_MAXSIZE if max_connections is None else max_connections
+        max_keepalive_connections = max_connections if max_keepalive_connections is None else max_keepalive_connections
+        max_retries = LIBAPI_HTTP_MAX_RETRIES if max_retries is None else max_retries
+        http2 = LIBAPI_HTTP2 if http2 is None else http2
+
+        if http2 :
+
+            try :
+                import h2 # noqa: F401 (only checks the optional dependency)
+
+            except ImportError :
+
+                print("[!] HTTP/2 requested but the `h2` package is not installed. Using HTTP/1.1")
+                http2 = False
+
+        limits = httpx.Limits(
+
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+
+        )
+
+        # The logins are sync (see `_login`) : they only share a transport able to serve sync requests
+        self._login_transport = transport if isinstance(transport, httpx.BaseTransport) else None
+
+        if transport is None :
+
+            # Retries of the transport only cover connection errors (safe for every method)
+            transport = httpx.AsyncHTTPTransport(verify=verify_ssl, limits=limits, http2=http2, retries=max_retries)
+
+        self.http2 = http2
+        self.session = httpx.AsyncClient(verify=verify_ssl, timeout=timeout, limits=limits, http2=http2, transport=transport)
+
+        TOKEN_CACHE_ABS_PATH = os.path.join(LIBAPI_CACHE_DIR_ABS_PATH, LIBAPI_CACHE_TOKEN_BASENAME)
+        self.token_cache_path = TOKEN_CACHE_ABS_PATH if token_cache_path is None else token_cache_path
+        self.token_manager = token_manager
+
+
+    async def __aenter__ (self) -> AsyncClient :
+        return self
+
+
+    async def __aexit__ (self, *exc_info) -> None :
+        await self.aclose()
+
+
+    async def aclose (self) -> None :
+        """
+        Close the underlying connection pool.
+        """
+        await self.session.aclose()
+
+
+    async def authenticate (self, username : str, password : str, endpoint : Optional[str] = None) -> bool :
+        """
+        Authenticate with the API using username and password.
+
+        The token is shared with the sync clients of the same user (see
+        libapi.ice.tokens.TokenManager) : a login only happens when none of them holds a
+        valid token, and it runs in a worker thread so the event loop is never blocked.
+
+        Args:
+            username (str): API username.
+            password (str): API password.
+            endpoint (str, optional): Alternative authentication endpoint.
+
+        Returns:
+            bool: True if authentication succeeds and a token is received, else False.
+        """
+        credentials = {
+
+            "username" : username,
+            "password" : password
+
+        }
+
+        full_endpoint = endpoint or self.full_auth_url
+
+        if self.token_manager is None :
+            self.token_manager = get_token_manager(full_endpoint, username, self.token_cache_path)
+
+        login = lambda : self._login(full_endpoint, credentials)
+
+        # The manager keeps the login of the last client whose credentials were accepted
+        self.token_manager.set_login(login)
+        self._use_token(await asyncio.to_thread(self.token_manager.get, login))
+
+        return self.is_auth
+
+
+    def _login (self, full_endpoint : str, credentials : Dict) -> Optional[str] :
+        """
+        Log in against the authentication endpoint.
+
+        Sync on purpose : the token manager may call it from any thread (background
+        refresh, sync clients of the same user), outside of the event loop of this client.
+
+        Returns:
+            str | None: New token, None on failure.
+        """
+        status = None
+        response = None
+        token = None
+
+        start = time.perf_counter()
+
+        try :
+
+            with httpx.Client(verify=self.verify_ssl, timeout=self.timeout, transport=self._login_transport) as session :
+
+                response = session.post(
+
+                    url=full_endpoint,
+                    json=credentials,
+                    headers={k: v for k, v in self.headers.items() if v is not None and k != "AuthenticationToken"},
+
+                )
+
+            status = response.status_code
+
+            response.raise_for_status()
+            token = response.json().get('token')
+
+            if not token :
+                print("[-] Auth succeeded but no token in the response...")
+
+            else :
+                print("[+] API authentication successfully")
+
+        except httpx.HTTPStatusError as e :
+
+            print(f"[-] Authentication Error: {e.response.status_code} - {e.response.text}\n")
+
+        except httpx.HTTPError as e :
+
+            print(f"[-] Error during authentication: {e}\n")
+
+        finally :
+
+            # Log at the end
+            self.log_request(
+
+                    method="POST",
+                    endpoint=full_endpoint,
+                    status_code=status,
+                    success=bool(token),
+                    latency_ms=(time.perf_counter() - start) * 1000,
+                    response_bytes=len(response.content) if response is not None else None
+
+                )
+
+        return token or None
+
+
+    async def _send_authenticated (self, method : str, url : str, headers : Dict, **kwargs) -> httpx.Response :
+        """
+        Send a request with the current token of the user. On a 401 the token is renewed
+        (one login for all the clients which got it) and the request sent again once.
+        """
+        if self.token_manager is not None :
+
+            # Token refreshed in background or by another client
+            token = self.token_manager.token
+
+            if token and token != self.token :
+                self._use_token(token)
+
+        headers = {**headers, "AuthenticationToken" : self.token} if self.token else headers
+        response = await self.session.request(method=method, url=url, headers=headers, **kwargs)
+
+        if response.status_code == 401 and self.token_manager is not None :
+
+            token = await asyncio.to_thread(self.token_manager.refresh, self.token)
+
+            if token :
+
+                self._use_token(token)
+                response = await self.session.request(method=method, url=url, headers={**headers, "AuthenticationToken" : token}, **kwargs)
+
+        return response
+
+
+    async def get (self, endpoint : str, params : Dict = None, json : Dict = None) -> Optional[Dict[str, Any]] :
+        """
+        Send a GET request.
+
+        Args:
+            endpoint (str): API endpoint (relative path).
+            params (dict, optional): Query parameters.
+
+        Returns:
+            dict | None: Parsed JSON response if successful, else None.
+        """
+        return await self._make_request("GET", endpoint, params=params, json=json)
+
+
+    async def get_with_status (self, endpoint : str, params : Dict = None, json : Dict = None) -> Tuple[Optional[int], Optional[Dict]] :
+        """
+        Send a GET request, keeping the HTTP status of the answer (see Client.get_with_status).
+        """
+        return await self._request_with_status("GET", endpoint, params=params, json=json)
+
+
+    async def post (self, endpoint : str, data : Dict = None, json : Dict = None) -> Optional[Dict] :
+        """
+        Send a POST request.
+
+        Args:
+            endpoint (str): API endpoint (relative path).
+            data (dict, optional): Form-encoded body data.
+            json (dict, optional): JSON body.
+
+        Returns:
+            dict | None: Parsed JSON response if successful, else None.
+        """
+        return await self._make_request("POST", endpoint, data=data, json=json)
+
+
+    async def post_with_status (self, endpoint : str, data : Dict = None, json : Dict = None) -> Tuple[Optional[int], Optional[Dict]] :
+        """
+        Send a POST request, keeping the HTTP status of the answer (see Client.post_with_status).
+        """
+        return await self._request_with_status("POST", endpoint, data=data, json=json)
+
+
+    async def _make_request (
+
+            self,
+            method : str,
+            endpoint : str,
+            params : Optional[Dict] = None,
+            data : Optional[Dict] = None,
+            json : Optional[Dict] = None,
+            headers : Optional[Dict] = None,
+            timeout : int = 10
+
+        ) -> Optional[Dict[str, Any]] :
+        """
+        Internal coroutine sending HTTP requests (same contract as Client._make_request).
+
+        Args:
+            method (str): HTTP method (GET, POST, etc.).
+            endpoint (str): API endpoint (relative path).
+            params (dict, optional): Query parameters.
+            data (dict, optional): Form-encoded data.
+            json (dict, optional): JSON payload.
+            headers (dict, optional): Extra headers.
+            timeout (int): Request timeout in seconds.
+
+        Returns:
+            dict | None: Parsed JSON if successful, else None.
+        """
+        return (await self._request_with_status(method, endpoint, params, data, json, headers, timeout))[1]
+
+
+    async def _request_with_status (
+
+            self,
+            method : str,
+            endpoint : str,
+            params : Optional[Dict] = None,
+            data : Optional[Dict] = None,
+            json : Optional[Dict] = None,
+            headers : Optional[Dict] = None,
+            timeout : int = 10
+
+        ) -> Tuple[Optional[int], Optional[Dict[str, Any]]] :
+        """
+        Send an HTTP request, returning its status with the parsed JSON body (same contract
+        as Client._request_with_status).
+        """
+        if self.is_auth and not self.token :
+
+            print("[-] Auth state is True but no token is set.")
+            return None, None
+
+        # Normalize the endpoint/url
+        endpoint_path = endpoint.lstrip("/")
+        url = urljoin(self.api_host + "/", endpoint_path)
+
+        # Effective headers (filter out None and merge extras)
+        base_headers = {k: v for k, v in self.headers.items() if v is not None}
+
+        if headers :
+            base_headers.update({k: v for k, v in headers.items() if v is not None})
+
+        success = False
+        status = None
+        response = None
+
+        start = time.perf_counter()
+
+        try :
+
+            response = await self._send_authenticated(
+
+                method.upper(),
+                url,
+                base_headers,
+
+                params=params,
+                data=data,
+                json=json,
+
+                timeout=(timeout or self.timeout)
+
+            )
+
+            status = response.status_code
+            response.raise_for_status()
+
+            success = True
+
+        except httpx.HTTPError as e :
+
+            print(f"[-] {method.upper()} request to {url} failed: {e}")
+
+        finally :
+
+            # Log at the end
+            self.log_request(
+
+                    method=method,
+                    endpoint=url,
+                    status_code=status,
+                    success=success,
+                    latency_ms=(time.perf_counter() - start) * 1000,
+                    response_bytes=len(response.content) if response is not None else None
+
+                )
+
+        if response is None :
+            return status, None
+
+        try :
+            return response.status_code, response.json()
+
+        except ValueError :
+
+            print(f"[-] Non JSON response from {url}")
+            return response.status_code, None
+
+
+    # -------------------------------------------------- Logic functions --------------------------------------------------
+
+
+    async def get_calculation_results (
+
+            self,
+            calculation_id : str | int,
+            calculation_details : str = "Yes",
+            results_home_ccy : str = "Yes",
+            results_portf_ccy : str = "No",
+            endpoint : Optional[str] = None,
+
+            loopback : Optional[int] = None,
+            schedule : Optional[PollingSchedule] = None
+
+        ) -> Optional[Dict] :
+        """
+        Get calculation results by calculation ID, polling without blocking the event loop.
+
+        Args:
+            calculation_id (str | int): ID of the calculation.
+            endpoint (str, optional): API endpoint for calculation results.
+            loopback (int, optional): Missing (non 2xx) answers tolerated (overrides `schedule.max_failures`).
+            schedule (PollingSchedule, optional): Backoff and deadline (LIBAPI_POLL_* by default).
+
+        Returns:
+            dict | None: Calculation results if available.
+        """
+        fetch = self._calculation_results_fetcher(calculation_details, results_home_ccy, results_portf_ccy, endpoint)
+
+        return await apoll_calculation(fetch, calculation_id, self._polling_schedule(loopback, schedule))
+
+
+    async def get_many_calculation_results (
+
+            self,
+            calculation_ids : List[str | int],
+            calculation_details : str = "Yes",
+            results_home_ccy : str = "Yes",
+            results_portf_ccy : str = "No",
+            endpoint : Optional[str] = None,
+
+            loopback : Optional[int] = None,
+            schedule : Optional[PollingSchedule] = None
+
+        ) -> Dict[str | int, Optional[Dict]] :
+        """
+        Get the results of several calculations, polled concurrently with one shared deadline.
+
+        Returns:
+            dict: Calculation results by ID (None for the ones not available).
+        """
+        fetch = self._calculation_results_fetcher(calculation_details, results_home_ccy, results_portf_ccy, endpoint)
+
+        return await apoll_calculations(fetch, calculation_ids, self._polling_schedule(loopback, schedule))
+
+
+    async def iter_calculation_results (
+
+            self,
+            calculation_ids : List[str | int],
+            calculation_details : str = "Yes",
+            results_home_ccy : str = "Yes",
+            results_portf_ccy : str = "No",
+            endpoint : Optional[str] = None,
+
+            loopback : Optional[int] = None,
+            schedule : Optional[PollingSchedule] = None
+
+        ) -> AsyncIterator[Tuple[str | int, Optional[Dict]]] :
+        """
+        Async generator yielding (calculation ID, results) as soon as each calculation is over.
+        """
+        fetch = self._calculation_results_fetcher(calculation_details, results_home_ccy, results_portf_ccy, endpoint)
+
+        async for calculation_id, result in aiter_poll_calculations(fetch, calculation_ids, self._polling_schedule(loopback, schedule)) :
+            yield calculation_id, result
+
+
+    def _calculation_results_fetcher (
+
+            self,
+            calculation_details : str = "Yes",
+            results_home_ccy : str = "Yes",
+            results_portf_ccy : str = "No",
+            endpoint : Optional[str] = None
+
+        ) :
+        """
+        Build the coroutine function sending one calculation results query for an ID.
+        """
+        endpoint = ICE_URL_GET_CALC_RES if endpoint is None else endpoint
+
+        async def fetch (calculation_id : str | int) -> Optional[Dict] :
+
+            payload = {
+
+                "calculationId" : str(calculation_id), # Send always in string format, even for integers
+                "IncludeCalculationDetails" : calculation_details,
+                "includeResultsInHomeCurrency" : results_home_ccy,
+                "includeResultsInPortfolioCurrency" : results_portf_ccy
+
+            }
+
+            status, response = await self.get_with_status(endpoint=endpoint, json=payload)
+
+            # The error body of a non 2xx answer is a missing answer, counted against max_failures
+            return response if is_success_status(status) else None
+
+        return fetch
+
+
+    async def gather (self, *coroutines, limit : int = 20) -> List :
+        """
+        Run coroutines concurrently with at most `limit` of them in flight, results in input order.
+        """
+        semaphore = asyncio.Semaphore(limit)
+
+        async def bounded (coroutine) :
+
+            async with semaphore :
+                return await coroutine
+
+        return await asyncio.gather(*(bounded(coroutine) for coroutine in coroutines))
+
+
+    # -------------------------------------------------- Shared helpers --------------------------------------------------
+
+    # File based helpers, identical for the sync and async clients
+    log_request = Client.log_request
+    _use_token = Client._use_token
+    _polling_schedule = staticmethod(Client._polling_schedule)
+    generate_dates = Client.generate_dates
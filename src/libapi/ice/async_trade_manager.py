@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from typing import Optional, Dict, List
+
+from libapi.config.parameters import (
+    ICE_HOST, ICE_AUTH, ICE_USERNAME, ICE_PASSWORD, # ICE credentials
+    ICE_URL_SEARCH_TRADES, ICE_URL_GET_TRADES, ICE_URL_TRADES_ADD, ICE_URL_GET_PORTFOLIOS, ICE_URL_GET_AUDIT_TRAIL, # Endpoints
+    BANK_COUNTERPARTY_NAME # Names (banks, books, etc)
+)
+from libapi.ice.async_client import AsyncClient
+from libapi.ice.trade_manager import TradeManager
+from libapi.utils.formatter import date_to_str
+
+
+class AsyncTradeManager (AsyncClient) :
+    """
+    Asyncio version of `TradeManager`.
+
+    Payloads are built by the same generators as the sync TradeManager, only the
+    network calls differ. Build it with `await AsyncTradeManager.connect()`.
+    """
+
+    def __init__ (
+
+            self,
+            ice_host : Optional[str] = None,
+            ice_auth : Optional[str] = None,
+            **client_kwargs
+
+        ) -> None :
+        """
+        Initialize the async Trade Manager (no network call, see `connect`).
+
+        Args:
+            client_kwargs: Options of the AsyncClient (pool limits, token_manager, transport...).
+        """
+        ice_host = ICE_HOST if ice_host is None else ice_host
+        ice_auth = ICE_AUTH if ice_auth is None else ice_auth
+
+        super().__init__(ice_host, ice_auth, **client_kwargs)
+
+
+    @classmethod
+    async def connect (
+
+            cls,
+            ice_host : Optional[str] = None,
+            ice_auth : Optional[str] = None,
+            ice_username : Optional[str] = None,
+            ice_password : Optional[str] = None,
+            **client_kwargs
+
+        ) -> AsyncTradeManager :
+        """
+        Build an AsyncTradeManager and authenticate against the ICE API.
+        """
+        manager = cls(ice_host, ice_auth, **client_kwargs)
+        await manager.authenticate(ice_username, ice_password)
+
+        return manager
+
+
+    async def authenticate (self, username : Optional[str] = None, password : Optional[str] = None) -> bool :
+        """
+        Proxy for the base AsyncClient.authenticate method.
+
+        Args:
+            username (str): ICE username.
+            password (str): ICE password.
+
+        Returns:
+            bool: True if authentication was successful.
+        """
+        username = ICE_USERNAME if username is None else username
+        password = ICE_PASSWORD if password is None else password
+
+        return await super().authenticate(username, password)
+
+
+    # -------------------------------------------- Get request operations  --------------------------------------------
+
+
+    async def get_trades_from_books (
+
+            self,
+            books : List[str] | str,
+            type : str = "In",
+            field : str = "Book",
+            endpoint : Optional[str] = None,
+
+        ) -> Optional[Dict] :
+        """
+        Returns all trades from selected books / Portfolios (see TradeManager.get_trades_from_books).
+        """
+        if books is None :
+
+            print("\n[-] None or void name for the book.")
+            return None
+
+        endpoint = ICE_URL_SEARCH_TRADES if endpoint is None else endpoint
+        payload = self.generate_books_query_payload(books, type, field)
+
+        return await self.post(endpoint=endpoint, json=payload)
+
+
+    async def get_trades_from_books_by_date (
+
+            self,
+            books : List[str] | str,
+            dates : Optional[List[str | dt.datetime]] = None,
+            query_type : str = "And",
+            type : str = "In",
+            field_trade : str = "TradeDate",
+            field_book : str = "Book",
+            endpoint : Optional[str] = None
+
+        ) -> Optional[Dict] :
+        """
+        Returns the trades of the books matching the given trade dates.
+        """
+        dates = [date_to_str(date) for date in dates] if isinstance(dates, list) else [date_to_str(dates)]
+        endpoint = ICE_URL_SEARCH_TRADES if endpoint is None else endpoint
+
+        payload = self.generate_books_and_field_query_payload(books, dates, field_trade, query_type, type, field_book)
+
+        return await self.post(endpoint=endpoint, json=payload)
+
+
+    async def get_info_trades_from_ids (
+
+            self,
+            trade_ids : List,
+            include_trade_fields : bool = True,
+            endpoint : Optional[str] = None,
+
+        ) -> Optional[Dict] :
+        """
+        Get information about specific trades (see TradeManager.get_info_trades_from_ids).
+        """
+        endpoint = ICE_URL_GET_TRADES if endpoint is None else endpoint
+
+        payload = {
+
+            "includeTradeFields": include_trade_fields,
+            "tradeLegIds": trade_ids
+
+        }
+
+        return await self.post(endpoint=endpoint, json=payload)
+
+
+    async def get_info_trades_from_books (
+
+            self,
+            books : List[str] | str,
+            type : str = "In",
+            field : str = "Book",
+            endpoint : Optional[str] = None
+
+        ) -> Optional[Dict] :
+        """
+        Return the detailed trades of the given books (search, then fetch by trade leg IDs).
+        """
+        response = await self.get_trades_from_books(books, type, field, endpoint)
+
+        if response is None :
+            raise RuntimeError("[-] Error during the GET request for trades")
+
+        trade_legs : List[Dict] = response.get("tradeLegs", [])
+        trade_ids : List = [trade['tradeLegId'] for trade in trade_legs]
+
+        return await self.get_info_trades_from_ids(trade_ids)
+
+
+    async def get_all_existing_portfolios_raw (self, endpoint : Optional[str] = None) -> Optional[List[Dict]] :
+        """
+        Retrieve all existing portfolios in raw dictionary format.
+        """
+        endpoint = ICE_URL_GET_PORTFOLIOS if endpoint is None else endpoint
+
+        response = await self.get(endpoint=endpoint, json={})
+
+        return response.get("portfolios", []) if response is not None else []
+
+
+    async def get_all_specific_portfolios_names (self, prefix : Optional[str] = "HV", endpoint : Optional[str] = None) -> List[str] :
+        """
+        Retrieve all existing portfolios whose names start with a given prefix.
+        """
+        portfolios = await self.get_all_existing_portfolios_raw(endpoint)
+
+        return self.filter_portfolios_names(portfolios, prefix)
+
+
+    async def get_all_existing_hv_portfolios (self, endpoint : Optional[str] = None) -> List[str] :
+        return await self.get_all_specific_portfolios_names("HV", endpoint=endpoint)
+
+
+    async def get_all_existing_wr_portfolios (self, endpoint : Optional[str] = None) -> List[str] :
+        return await self.get_all_specific_portfolios_names("WR", endpoint=endpoint)
+
+
+    async def get_audit_trails (
+
+            self,
+
+            from_date : Optional[str | dt.date | dt.datetime] = None,
+            to_date : Optional[str | dt.date | dt.datetime] = None,
+
+            actions : Optional[List[str]] = None,
+            books : Optional[List[str]] = None,
+
+            show_changes_from_inception : bool = False,
+            endpoint : Optional[str] = None
+
+        ) -> Optional[Dict] :
+        """
+        Retrieve the audit trail of the given books over a time window.
+        """
+        endpoint = ICE_URL_GET_AUDIT_TRAIL if endpoint is None else endpoint
+        payload = self.generate_audit_trail_payload(from_date, to_date, actions, books, show_changes_from_inception)
+
+        return await self.post(endpoint=endpoint, json=payload)
+
+
+    # -------------------------------------------- Booking operations --------------------------------------------
+
+
+    async def post_cash_leg (
+
+            self,
+            currency : str,
+            date : str | dt.datetime,
+            notional : float,
+            counterparty : str,
+            pay_rec : str = "Pay",
+            endpoint : Optional[str] = None
+
+        ) -> Optional[Dict] :
+        """
+        Book a single cash leg.
+        """
+        endpoint = ICE_URL_TRADES_ADD if endpoint is None else endpoint
+        payload = self.generate_cash_trade_payload(currency, date, counterparty, notional, pay_recv=pay_rec)
+
+        return await self.post(endpoint=endpoint, json={"trades" : [payload]})
+
+
+    async def post_margin_call (
+
+            self,
+            currency : str,
+            date : Optional[str | dt.datetime | dt.date],
+            notional : float | int,
+            book : str,
+            counterparty : str,
+            direction : str = "Pay",
+            bank : Optional[str] = None,
+            endpoint : Optional[str] = None
+
+        ) -> Optional[Dict] :
+        """
+        Book a margin call (one leg for the bank and one for the counterparty).
+        """
+        date = date_to_str(date)
+        bank = BANK_COUNTERPARTY_NAME if bank is None else bank
+        endpoint = ICE_URL_TRADES_ADD if endpoint is None else endpoint
+
+        payload_bn = self.generate_cash_trade_payload(currency, date, bank if direction == "Pay" else counterparty, notional, book, pay_recv="Pay")
+        payload_cp = self.generate_cash_trade_payload(currency, date, counterparty if direction == "Pay" else bank, notional, book)
+
+        return await self.post(endpoint=endpoint, json={"trades" : [payload_bn, payload_cp]})
+
+
+    async def post_trade (self, trades : List, creation_trade_function : callable, endpoint : str = ICE_URL_TRADES_ADD) -> Optional[Dict] :
+        """
+        Build a payload for every trade and post them in one request.
+        """
+        trades_list = [creation_trade_function(trade) for trade in trades]
+
+        return await self.post(endpoint=endpoint, json=trades_list)
+
+
+    # -------------------------------------------- Payload Generators --------------------------------------------
+
+    # Pure payload builders, shared with the sync TradeManager
+    generate_books_query_payload = TradeManager.generate_books_query_payload
+    generate_books_and_field_query_payload = TradeManager.generate_books_and_field_query_payload
+    generate_audit_trail_payload = TradeManager.generate_audit_trail_payload
+    generate_cash_trade_payload = TradeManager.generate_cash_trade_payload
+    filter_portfolios_names = TradeManager.filter_portfolios_names
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import os
+import glob
+import json
+import hashlib
+import tempfile
+import polars as pl
+import datetime as dt
+
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from libapi.config.parameters import (
+    LIBAPI_CACHE_DIR_ABS_PATH, LIBAPI_CACHE_AUDIT_DIR_PATH, ICE_AUDIT_WINDOW_HOURS, ICE_AUDIT_INITIAL_LOOKBACK_DAYS,
+    ICE_AUDIT_EVENTS_KEY, BOOK_NAMES_HV_LIST_ALL
+)
+from libapi.utils.formatter import datetime_to_str, str_to_datetime
+from libapi.ice.client import is_success_status
+
+if TYPE_CHECKING :
+    from libapi.ice.trade_manager import TradeManager
+
+# The audit trail of a query (books, actions) is synced window after window from a
+# high-water mark : the end of the last window synced. Each window with new events is
+# appended to the local log as its own Parquet part, then the mark moves forward, so an
+# interrupted sync starts again from the last window completed. Events of the previous
+# window are remembered by key to drop the ones returned again at the boundary.
+
+AUDIT_STATE_BASENAME = "_state.json"
+AUDIT_PART_PREFIX = "audit_"
+AUDIT_PART_SUFFIX = ".parquet"
+AUDIT_PART_TIME_FORMAT = "%Y%m%dT%H%M%S"
+
+EVENT_KEY_COLUMN = "_event_key"
+WINDOW_FROM_COLUMN = "_window_from"
+WINDOW_TO_COLUMN = "_window_to"
+
+DEFAULT_AUDIT_ACTIONS = ["Insert", "Update", "Delete", "LTAs"]
+
+
+def audit_events (response : Optional[Mapping[str, Any]], key : Optional[str] = None) -> Optional[List[Dict]] :
+    """
+    Events of an audit trail response : its `key` list (defaults to ICE_AUDIT_EVENTS_KEY).
+
+    Returns:
+        List[Dict] | None: Events, None if the response has no such list (invalid response).
+    """
+    key = ICE_AUDIT_EVENTS_KEY if key is None else key
+    events = response.get(key) if isinstance(response, Mapping) else None
+
+    return events if isinstance(events, list) else None
+
+
+def audit_datetime (value : Optional[str | dt.date | dt.datetime] = None) -> dt.datetime :
+    """
+    UTC datetime of a sync bound : a datetime, a date (midnight) or an ISO string
+    ("2024-01-01", "2024-01-01 12:00:00", "2024-01-01T12:00:00"). Defaults to now.
+
+    Raises:
+        ValueError: If the string is not an ISO date or datetime.
+    """
+    if isinstance(value, str) :
+
+        try :
+            value = dt.datetime.fromisoformat(value.strip())
+
+        except ValueError :
+            raise ValueError(f"Invalid audit datetime '{value}'. Expected YYYY-MM-DD or YYYY-MM-DD HH:MM:SS") from None
+
+    return str_to_datetime(value).astimezone(dt.timezone.utc)
+
+
+def audit_event_key (event : Mapping[str, Any]) -> str :
+    """
+    Key of an event : hash of its canonical JSON.
+    """
+    encoded = json.dumps(event, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def iter_audit_windows (start : dt.datetime, end : dt.datetime, window : dt.timedelta) -> Iterator[Tuple[dt.datetime, dt.datetime]] :
+    """
+    Consecutive (from, to) windows of at most `window` covering [start, end].
+    """
+    if window <= dt.timedelta(0) :
+        raise ValueError("[-] The audit window must be strictly positive")
+
+    while start < end :
+
+        stop = min(start + window, end)
+        yield start, stop
+
+        start = stop
+
+
+class AuditTrailSync :
+    """
+    Incremental sync of the audit trail of some books into a local columnar log.
+    """
+
+    def __init__ (
+
+            self,
+            trade_manager : TradeManager,
+            books : Optional[List[str]] = None,
+            actions : Optional[List[str]] = None,
+            dir_abs_path : Optional[str] = None,
+            window_hours : Optional[float] = None,
+            show_changes_from_inception : bool = False
+
+        ) -> None :
+        """
+        Args:
+            trade_manager (TradeManager): Client sending the audit trail requests.
+            books (List[str], optional): Books audited. Defaults to BOOK_NAMES_HV_LIST_ALL.
+            actions (List[str], optional): Audited actions. Defaults to Insert, Update, Delete and LTAs.
+            dir_abs_path (str, optional): Root of the logs. Defaults to LIBAPI_CACHE_AUDIT_DIR_PATH,
+                else the "audit" directory of LIBAPI_CACHE_DIR_ABS_PATH.
+            window_hours (float, optional): Hours per request. Defaults to ICE_AUDIT_WINDOW_HOURS.
+            show_changes_from_inception (bool): Whether ICE returns the full history of each trade.
+        """
+        if dir_abs_path is None :
+            dir_abs_path = LIBAPI_CACHE_AUDIT_DIR_PATH if LIBAPI_CACHE_AUDIT_DIR_PATH else os.path.join(LIBAPI_CACHE_DIR_ABS_PATH or "", "audit")
+
+        self.trade_manager = trade_manager
+        self.books = list(BOOK_NAMES_HV_LIST_ALL if books is None else ([books] if isinstance(books, str) else books))
+        self.actions = list(DEFAULT_AUDIT_ACTIONS if actions is None else actions)
+        self.show_changes_from_inception = show_changes_from_inception
+        self.window = dt.timedelta(hours=ICE_AUDIT_WINDOW_HOURS if window_hours is None else window_hours)
+
+        # One log per query : a different set of books or actions never shares a high-water mark
+        query = { "books" : sorted(self.books), "actions" : sorted(self.actions), "inception" : show_changes_from_inception }
+        self.dir_abs_path = os.path.join(dir_abs_path, audit_event_key(query)[:16])
+
+
+    @property
+    def state_path (self) -> str :
+        return os.path.join(self.dir_abs_path, AUDIT_STATE_BASENAME)
+
+
+    def load_state (self) -> Dict[str, Any] :
+        """
+        High-water mark of the log : end of the last window synced ("to_datetime"), key of
+        the last event ("last_event_key") and keys of the events of the last window.
+        """
+        state = { "to_datetime" : None, "last_event_key" : None, "boundary_keys" : [] }
+
+        if os.path.isfile(self.state_path) :
+
+            with open(self.state_path, "r", encoding="utf-8") as file :
+                state.update(json.load(file))
+
+        return state
+
+
+    def sync (
+
+            self,
+            until : Optional[str | dt.date | dt.datetime] = None,
+            since : Optional[str | dt.date | dt.datetime] = None
+
+        ) -> pl.DataFrame :
+        """
+        Fetch the events after the high-water mark and append them to the log.
+
+        Args:
+            until (str | date | datetime, optional): End of the sync (UTC). Defaults to now.
+            since (str | date | datetime, optional): Start of the first sync (ignored once a mark
+                exists). Defaults to ICE_AUDIT_INITIAL_LOOKBACK_DAYS ago.
+
+        Returns:
+            pl.DataFrame: New events (flattened, "parent.child" columns), empty if there is none.
+
+        Raises:
+            RuntimeError: If a request failed (non 2xx answer or no events list) : the windows
+                synced before are kept, the mark stays at the start of the failed window.
+            ValueError: If `until` or `since` is not an ISO date or datetime.
+        """
+        state = self.load_state()
+        end = audit_datetime(until)
+
+        if state["to_datetime"] is not None :
+            start = audit_datetime(state["to_datetime"])
+
+        elif since is not None :
+            start = audit_datetime(since)
+
+        else :
+            start = end - dt.timedelta(days=ICE_AUDIT_INITIAL_LOOKBACK_DAYS)
+
+        boundary_keys = set(state["boundary_keys"])
+        new_parts = []
+
+        for window_from, window_to in iter_audit_windows(start, end, self.window) :
+
+            status, response = self.trade_manager.get_audit_trails_with_status(window_from, window_to, self.actions, self.books, self.show_changes_from_inception)
+            window_events = audit_events(response)
+
+            # The mark only moves past a window whose answer is valid
+            if not is_success_status(status) or window_events is None :
+                raise RuntimeError(f"[-] Error during the audit trail request from {window_from} to {window_to} (status {status})")
+
+            events, keys = [], []
+
+            for event in window_events :
+
+                key = audit_event_key(event)
+
+                if key not in boundary_keys :
+
+                    events.append(event)
+                    keys.append(key)
+
+            if events :
+                new_parts.append(self._append(events, keys, window_from, window_to))
+
+            boundary_keys = set(keys) if keys else boundary_keys
+
+            state = {
+
+                "to_datetime" : datetime_to_str(window_to),
+                "last_event_key" : keys[-1] if keys else state["last_event_key"],
+                "boundary_keys" : sorted(boundary_keys)
+
+            }
+
+            self._save_state(state)
+
+        if not new_parts :
+            return pl.DataFrame()
+
+        new_events = pl.concat(new_parts, how="diagonal_relaxed")
+        print(f"[+] {new_events.height} new audit events synced up to {datetime_to_str(end)}")
+
+        return new_events
+
+
+    def parts (self) -> List[str] :
+        """
+        Parquet parts of the log, in time order.
+        """
+        return sorted(glob.glob(os.path.join(self.dir_abs_path, f"{AUDIT_PART_PREFIX}*{AUDIT_PART_SUFFIX}")))
+
+
+    def scan (self, since : Optional[str | dt.date | dt.datetime] = None) -> Optional[pl.LazyFrame] :
+        """
+        Lazily scan the log, only the parts of the windows ending after `since` if given.
+
+        Returns:
+            pl.LazyFrame | None: Events of the log, None if nothing was synced.
+        """
+        parts = self.parts()
+
+        if since is not None :
+
+            since = audit_datetime(since).strftime(AUDIT_PART_TIME_FORMAT)
+            parts = [part for part in parts if os.path.basename(part)[:-len(AUDIT_PART_SUFFIX)].rsplit("_", 1)[-1] > since]
+
+        if not parts :
+            return None
+
+        return pl.concat([pl.scan_parquet(part) for part in parts], how="diagonal_relaxed")
+
+
+    def _append (self, events : List[Dict], keys : List[str], window_from : dt.datetime, window_to : dt.datetime) -> pl.DataFrame :
+        """
+        Write the new events of a window as a part of the log (atomic write).
+        """
+        table = pl.json_normalize(events, separator=".", infer_schema_length=None).with_columns(
+
+            pl.Series(EVENT_KEY_COLUMN, keys, dtype=pl.String),
+            pl.lit(datetime_to_str(window_from)).alias(WINDOW_FROM_COLUMN),
+            pl.lit(datetime_to_str(window_to)).alias(WINDOW_TO_COLUMN),
+
+        )
+
+        basename = f"{AUDIT_PART_PREFIX}{window_from.strftime(AUDIT_PART_TIME_FORMAT)}_{window_to.strftime(AUDIT_PART_TIME_FORMAT)}{AUDIT_PART_SUFFIX}"
+
+        os.makedirs(self.dir_abs_path, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.dir_abs_path, prefix=".tmp-", suffix=AUDIT_PART_SUFFIX)
+        os.close(fd)
+
+        try :
+
+            table.write_parquet(tmp_path, compression="zstd", statistics=True)
+            os.replace(tmp_path, os.path.join(self.dir_abs_path, basename))
+
+        except BaseException :
+
+            try :
+                os.remove(tmp_path)
+
+            except OSError :
+                pass
+
+            raise
+
+        return table
+
+
+    def _save_state (self, state : Dict[str, Any]) -> None :
+
+        os.makedirs(self.dir_abs_path, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.dir_abs_path, prefix=".tmp-", suffix=".json")
+
+        with os.fdopen(fd, "w", encoding="utf-8") as file :
+            json.dump(state, file)
+
+        os.replace(tmp_path, self.state_path)
@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import polars as pl
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from libapi.config.parameters import ICE_BOOKING_BATCH_SIZE, ICE_BOOKING_MAX_IN_FLIGHT, ICE_BOOKING_LEDGER_DB_ABS_PATH
+from libapi.utils.concurrency import split_in_chunks, run_batches
+from libapi.ice.client import is_success_status
+
+# Bulk booking : trades are sent by batches, several batches at a time. Each booking unit
+# (a trade, or trades booked together like both legs of a margin call) gets an idempotency
+# key, hash of its payload, recorded in a ledger before its batch is sent. A unit already
+# booked, or whose outcome is unknown (no answer, server error or unexpected answer from
+# the API), is never sent again : an unknown unit has to be checked in ICE and released by
+# hand before it can be booked again.
+
+BOOKING_LEDGER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS booking_ledger (
+    key TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    message TEXT
+);
+"""
+
+# Statuses of the ledger, and of the status table for the units not sent (or rejected,
+# which are removed from the ledger to be booked again once fixed)
+PENDING, BOOKED, UNKNOWN = "pending", "booked", "unknown"
+SKIPPED, DUPLICATE, REJECTED = "skipped", "duplicate", "rejected"
+
+SUCCESS_RESPONSE_STATUSES = ("success",)
+REJECTED_RESPONSE_STATUSES = ("failure", "failed", "error")
+
+IN_MEMORY_LEDGER = ":memory:"
+
+BOOKING_STATUS_SCHEMA = {
+
+    "index" : pl.Int64,
+    "key" : pl.String,
+    "batch" : pl.Int64,
+    "n_trades" : pl.Int64,
+    "status" : pl.String,
+    "message" : pl.String
+
+}
+
+
+def booking_key (unit : Sequence[Dict]) -> str :
+    """
+    Idempotency key of a booking unit : hash of its canonical payload.
+    """
+    encoded = json.dumps(list(unit), sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class BookingLedger :
+    """
+    Idempotency keys of the booking units sent, and their outcome.
+
+    Backed by a SQLite file shared by the processes of the machine, or held in memory
+    (for the process only) if the file is ":memory:" or not set.
+    """
+
+    def __init__ (self, db_abs_path : Optional[str] = None, timeout : float = 30.0) -> None :
+        """
+        Args:
+            db_abs_path (str, optional): SQLite file, ":memory:" for a ledger of the process only.
+                Defaults to ICE_BOOKING_LEDGER_DB_ABS_PATH (in memory, with a warning, if unset).
+            timeout (float): Seconds waited for a lock held by another process.
+        """
+        db_abs_path = ICE_BOOKING_LEDGER_DB_ABS_PATH if db_abs_path is None else db_abs_path
+
+        if not db_abs_path :
+
+            print(
+
+                "[!] ICE_BOOKING_LEDGER_DB_ABS_PATH is not set : the booking ledger is kept in memory. "
+                "A restarted job, or another process, may book the same trades twice"
+
+            )
+
+            db_abs_path = IN_MEMORY_LEDGER
+
+        self.in_memory = db_abs_path == IN_MEMORY_LEDGER
+
+        if not self.in_memory :
+            Path(db_abs_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_abs_path, timeout=timeout, isolation_level=None, check_same_thread=False)
+
+        with self._lock :
+
+            if not self.in_memory :
+                self._connection.execute("PRAGMA journal_mode=WAL")
+
+            self._connection.executescript(BOOKING_LEDGER_SCHEMA)
+
+
+    def claim (self, keys : Sequence[str]) -> Tuple[List[str], Dict[str, str]] :
+        """
+        Mark the keys never sent as pending (atomically, between processes too).
+
+        Returns:
+            (List[str], Dict): Keys claimed by the caller, status of the keys already in the ledger.
+        """
+        with self._lock :
+
+            self._connection.execute("BEGIN IMMEDIATE")
+
+            try :
+
+                known = self._statuses(keys)
+                claimed = [key for key in dict.fromkeys(keys) if key not in known]
+
+                self._connection.executemany(
+
+                    "INSERT INTO booking_ledger (key, status, updated_at) VALUES (?, ?, ?)",
+                    [(key, PENDING, time.time()) for key in claimed]
+
+                )
+
+                self._connection.execute("COMMIT")
+
+            except Exception :
+
+                self._connection.execute("ROLLBACK")
+                raise
+
+        return claimed, known
+
+
+    def mark (self, keys : Sequence[str], status : str, message : Optional[str] = None) -> None :
+
+        with self._lock :
+
+            self._connection.executemany(
+
+                "UPDATE booking_ledger SET status = ?, updated_at = ?, message = ? WHERE key = ?",
+                [(status, time.time(), message, key) for key in keys]
+
+            )
+
+
+    def release (self, keys : Sequence[str]) -> int :
+        """
+        Forget keys (e.g. unknown bookings checked as missing in ICE) so they can be booked again.
+
+        Returns:
+            int: Number of keys removed.
+        """
+        with self._lock :
+            return self._connection.executemany("DELETE FROM booking_ledger WHERE key = ?", [(key,) for key in keys]).rowcount
+
+
+    def statuses (self, keys : Sequence[str]) -> Dict[str, str] :
+
+        with self._lock :
+            return self._statuses(keys)
+
+
+    def close (self) -> None :
+
+        with self._lock :
+            self._connection.close()
+
+
+    def _statuses (self, keys : Sequence[str]) -> Dict[str, str] :
+
+        statuses = {}
+        keys = list(dict.fromkeys(keys))
+
+        # SQLite limits the number of parameters of a query
+        for chunk in split_in_chunks(keys, 500) :
+
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._connection.execute(f"SELECT key, status FROM booking_ledger WHERE key IN ({placeholders})", list(chunk)).fetchall()
+
+            statuses.update(dict(rows))
+
+        return statuses
+
+
+_BOOKING_LEDGER : Optional[BookingLedger] = None
+_BOOKING_LEDGER_LOCK = threading.Lock()
+
+
+def get_booking_ledger () -> BookingLedger :
+    """
+    Return the process wide booking ledger (created on first use).
+    """
+    global _BOOKING_LEDGER
+
+    with _BOOKING_LEDGER_LOCK :
+
+        if _BOOKING_LEDGER is None :
+            _BOOKING_LEDGER = BookingLedger()
+
+    return _BOOKING_LEDGER
+
+
+def classify_booking_response (http_status : Optional[int], response : Optional[Dict]) -> Tuple[str, str] :
+    """
+    Outcome of a booking request : BOOKED only for a 2xx answer with a success status,
+    REJECTED when the API refused the batch (4xx answer or failure status), else UNKNOWN
+    (no answer, 5xx answer or unexpected body : the trades may have been booked).
+
+    Returns:
+        (str, str): Status and message.
+    """
+    response_status = str(response.get("status")) if isinstance(response, dict) and response.get("status") is not None else None
+    normalized = response_status.strip().lower() if response_status is not None else None
+
+    if http_status is None :
+        return UNKNOWN, "No answer from the API, check the booking in ICE then release the key"
+
+    refused = (400 <= http_status < 500) or (is_success_status(http_status) and normalized in REJECTED_RESPONSE_STATUSES)
+
+    if refused :
+        return REJECTED, str((response or {}).get("message") or response_status or f"HTTP {http_status}")
+
+    if is_success_status(http_status) and normalized in SUCCESS_RESPONSE_STATUSES :
+        return BOOKED, response_status
+
+    return UNKNOWN, f"Unexpected answer (HTTP {http_status}, status {response_status}), check the booking in ICE then release the key"
+
+
+def book_units (
+
+        units : Sequence[Sequence[Dict]],
+        post_batch : Callable[[List[Dict]], Tuple[Optional[int], Optional[Dict]]],
+        batch_size : Optional[int] = None,
+        max_in_flight : Optional[int] = None,
+        ledger : Optional[BookingLedger] = None
+
+    ) -> pl.DataFrame :
+    """
+    Book units of trades by batches, sent at the same time, each unit at most once.
+
+    Args:
+        units (Sequence[Sequence[Dict]]): Trade payloads of each booking unit (never split between batches).
+        post_batch (Callable): Sends the trades of a batch, returns the HTTP status (None if no answer)
+            and the response.
+        batch_size (int, optional): Units per batch. Defaults to ICE_BOOKING_BATCH_SIZE.
+        max_in_flight (int, optional): Batches sent at the same time. Defaults to ICE_BOOKING_MAX_IN_FLIGHT.
+        ledger (BookingLedger, optional): Defaults to the process wide ledger.
+
+    Returns:
+        pl.DataFrame: One row per unit : index, key, batch (null if not sent), n_trades, status, message.
+            Status is "booked", "rejected" (refused by the API), "unknown" (no answer or ambiguous one, check in ICE),
+            "skipped" (key already in the ledger) or "duplicate" (same payload earlier in `units`).
+    """
+    batch_size = ICE_BOOKING_BATCH_SIZE if batch_size is None else batch_size
+    max_in_flight = ICE_BOOKING_MAX_IN_FLIGHT if max_in_flight is None else max_in_flight
+    ledger = get_booking_ledger() if ledger is None else ledger
+
+    keys = [booking_key(unit) for unit in units]
+    _, known = ledger.claim(keys)
+
+    rows : List[Dict[str, Any]] = [
+
+        { "index" : i, "key" : key, "batch" : None, "n_trades" : len(unit), "status" : None, "message" : None }
+        for i, (key, unit) in enumerate(zip(keys, units))
+
+    ]
+
+    to_send, first_index = [], {}
+
+    for i, key in enumerate(keys) :
+
+        if key in first_index :
+
+            rows[i].update(status=DUPLICATE, message=f"Same trades as the unit {first_index[key]}")
+            continue
+
+        first_index[key] = i
+
+        if key in known :
+            rows[i].update(status=SKIPPED, message=f"Already {known[key]} in the booking ledger")
+
+        else :
+            to_send.append(i)
+
+    batches = split_in_chunks(to_send, batch_size)
+
+    def send (batch : List[int]) -> Tuple[Tuple[Optional[int], Optional[Dict]], Optional[str]] :
+
+        try :
+            return post_batch([trade for i in batch for trade in units[i]]), None
+
+        except Exception as e :
+            return (None, None), str(e)
+
+    # No retry : a batch without answer may have been booked anyway
+    outcomes = run_batches(batches, send, max_in_flight, max_retries=0)
+
+    for number, (batch, ((http_status, response), error)) in enumerate(zip(batches, outcomes)) :
+
+        batch_keys = [keys[i] for i in batch]
+        status, message = classify_booking_response(http_status, response)
+
+        if error is not None :
+            message = error
+
+        # Rejected units can be fixed and booked again, the others stay in the ledger
+        if status == REJECTED :
+            ledger.release(batch_keys)
+
+        else :
+            ledger.mark(batch_keys, status, message)
+
+        for i in batch :
+            rows[i].update(batch=number, status=status, message=message)
+
+    table = pl.DataFrame(rows, schema=BOOKING_STATUS_SCHEMA)
+    counts = dict(table.group_by("status").len().iter_rows())
+
+    print(f"[*] Booking of {len(units)} units : " + ", ".join(f"{count} {name}" for name, count in sorted(counts.items())))
+
+    return table
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import time
+import polars as pl
 import datetime as dt
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Iterator, Tuple
 from functools import lru_cache
 
 from libapi.ice.client import Client
+from libapi.ice.transport import get_shared_session
+from libapi.ice.polling import PollingSchedule, is_calculation_results
 from libapi.config.parameters import (
     ICE_AUTH, ICE_HOST, ICE_USERNAME, ICE_PASSWORD, ICE_ALL_CTPY_NAMES, ICE_CTPY_NAME_MS,
     BOOK_NAMES_HV_LIST_SUBSET_N1, BOOK_NAMES_WR_LIST_ALL, BOOK_NAMES_HV_LIST_ALL,
@@ -43,7 +46,8 @@ class IceCalculator (Client) :
         ice_username = ICE_USERNAME if ice_username is None else ice_username
         ice_password = ICE_PASSWORD if ice_password is None else ice_password
 
-        super().__init__(ice_host, ice_auth)
+        # Clients of the same host and user share the connection pool (and the token)
+        super().__init__(ice_host, ice_auth, session=get_shared_session(ice_host, ice_username))
         self.authenticate(ice_username, ice_password)
 
 
@@ -93,29 +97,8 @@ class IceCalculator (Client) :
         Returns:
             dict: API response (usually includes "calculationId").
         """
-        verified_date = date_to_str(date)
-        fund = "HV" if fund is None else fund
-
         endpoint = ICE_URL_BIL_IM_CALC if endpoint is None else endpoint
-
-        body = {
-
-            "valuation" : {
-            
-                "type": "EOD",
-                "date": verified_date  # Format YYYY-MM-DD (in string)
-            
-            },
-            
-            "bookNames" : BOOK_NAMES_HV_LIST_SUBSET_N1 if (fund == "HV" or ctptys) else BOOK_NAMES_WR_LIST_ALL,
-            "model" : "SIMM",
-
-        }
-
-        if ctptys :
-
-            ctpy_name = ICE_ALL_CTPY_NAMES if ctpy_name is None else ctpy_name
-            body["counterPartyNames"] = ctpy_name
+        body = self.generate_bilateral_im_payload(date, fund, ctptys, ctpy_name)
 
         # Try with post (default GET)
         response = self.post(
@@ -175,7 +158,10 @@ class IceCalculator (Client) :
             print(f"\n[*] Requesting ICE for calculations results {date}")
 
             calculation = self.get_calculation_results(calculation_id)
-            save_cache_results(calculation_id, calculation)
+
+            # Only final results are cached : a cached file is never replaced
+            if is_calculation_results(calculation) :
+                save_cache_results(calculation_id, calculation)
         
         calc_res = calculation.get('results') if calculation is not None else None
 
@@ -274,6 +260,157 @@ class IceCalculator (Client) :
         return calc_res
 
 
+    # Calc and Get several funds at once (external)
+    def get_bilateral_im_calculations (
+            
+            self,
+            
+            date : Optional[str | dt.datetime | dt.date] = None,
+            funds : Optional[List[str]] = None,
+            type : Optional[str] = None
+        
+        ) -> Dict[str, Optional[List[Dict]]] :
+        """
+        Get bilateral IM calculation results for several funds, waiting for all of them at once.
+
+        Every missing calculation is launched first, then all of them are polled in one loop.
+
+        Args:
+            date (datetime): The date for which to run/retrieve the calculations.
+            funds (List[str], optional): Funds names. Defaults to ["HV", "WR"].
+            type (str): Calculation type label.
+
+        Returns:
+            dict: Results by fund (None if the calculation failed).
+        """
+        date = date_to_str(date)
+
+        funds = ["HV", "WR"] if funds is None else funds
+        type = "IM" if type is None else type
+
+        start = time.time()
+        ids_by_fund = {}
+
+        for fund in funds :
+
+            calculation_id = read_id_from_file(date, fund, type)
+
+            if not calculation_id :
+
+                print(f"[*] Run calculation in ICE for date {date} and fund {fund}\n")
+
+                calculation_dict = self.run_bilateral_im_calculation(date, fund=fund)
+                calculation_id = calculation_dict.get("calculationId") if calculation_dict is not None else None
+
+                if calculation_id is None :
+                    continue
+
+                write_to_file(calculation_id, date, fund, type)
+
+            ids_by_fund[fund] = calculation_id
+
+        calculations = dict(self.wait_for_calculations(list(ids_by_fund.values())))
+
+        results = {}
+
+        for fund in funds :
+
+            calculation = calculations.get(ids_by_fund.get(fund))
+            results[fund] = calculation.get("results") if calculation is not None else None
+
+        print(f"[+] Get Bilateral IM for {len(funds)} funds in {time.time() - start} seconds")
+
+        return results
+
+
+    def wait_for_calculations (
+            
+            self,
+            calculation_ids : List[str | int],
+            use_cache : bool = True,
+            schedule : Optional[PollingSchedule] = None
+        
+        ) -> Iterator[Tuple[str | int, Optional[Dict]]] :
+        """
+        Yield (calculation ID, results) for several calculations as each one completes.
+
+        Cached results are yielded first, the other calculations share one polling
+        loop (and the session connection pool), so a batch finishes in about the time
+        of the slowest calculation. Retrieved results are saved into the cache.
+
+        Args:
+            calculation_ids (List[str | int]): IDs of the calculations.
+            use_cache (bool): Read and write the results cache.
+            schedule (PollingSchedule, optional): Backoff and deadline of the polling.
+
+        Yields:
+            tuple: (calculation ID, results or None if not available), in completion order.
+        """
+        pending = []
+
+        for calculation_id in dict.fromkeys(calculation_ids) :
+
+            calculation = load_cache_results_from_id(calculation_id) if use_cache else None
+
+            if calculation is None :
+
+                pending.append(calculation_id)
+                continue
+
+            yield calculation_id, calculation
+
+        if not pending :
+            return
+
+        print(f"\n[*] Waiting for {len(pending)} calculations results...")
+
+        for calculation_id, calculation in self.iter_calculation_results(pending, schedule=schedule) :
+
+            if use_cache and is_calculation_results(calculation) :
+                save_cache_results(calculation_id, calculation)
+
+            yield calculation_id, calculation
+
+
+    def get_calculation_table (
+            
+            self,
+            calculation_id : str | int,
+            key : str = "tradeLegs",
+            columns : Optional[List[str]] = None,
+            predicate : Optional[pl.Expr] = None
+        
+        ) -> Optional[pl.DataFrame] :
+        """
+        Load a results key of a calculation as a polars DataFrame from its Parquet table.
+
+        The results are fetched (and cached) first if needed. Only the requested columns
+        and rows are read, e.g. MV and Delta of some books:
+
+            calculator.get_calculation_table(id, "tradeLegs", ["bookName", "marketValue", "delta"], pl.col("bookName").is_in(books))
+
+        Args:
+            calculation_id (str | int): Calculation ID.
+            key (str): Results key ("tradeLegs" for MV and Greeks, "results" for bilateral IM).
+            columns (List[str], optional): Columns to load (nested fields as "parent.child").
+            predicate (pl.Expr, optional): Rows filter.
+
+        Returns:
+            pl.DataFrame | None: Table, None if the results are not available.
+        """
+        table = load_cache_table(calculation_id, key, columns, predicate)
+
+        if table is None :
+
+            # Not cached yet : fetch (and cache, tables included) then read the table
+            for _ in self.wait_for_calculations([calculation_id]) :
+                pass
+
+            table = load_cache_table(calculation_id, key, columns, predicate)
+
+        return table
+
+
     # -------------------------------------------------- MV and Greeks -------------------------------------------------- #
 
 
@@ -295,17 +432,7 @@ class IceCalculator (Client) :
             dict: Response from the API.
         """
         endpoint = ICE_URL_INVOKE_CALC if endpoint is None else endpoint
-        book_names = BOOK_NAMES_HV_LIST_ALL if book_names is None else book_names
-
-        valuation = { "type" : "RealTime" } if date is None else { "type" : "EOD", "date" : date_to_str(date) } # In this case, date type (Null or Not) matters
-
-        payload = {
-
-            "valuation" : valuation,
-            "bookNames" : book_names,
-            "includeSubBooks" : "true"
-
-        }
+        payload = self.generate_mv_n_greeks_payload(date, book_names)
 
         response = self.post(
 
@@ -493,6 +620,87 @@ class IceCalculator (Client) :
         return calculation
     
 
+    # -------------------------------------------------- Payload Generators -------------------------------------------------- #
+
+
+    def generate_bilateral_im_payload (
+            
+            self,
+            date : Optional[str | dt.datetime | dt.date] = None,
+            fund : Optional[str] = None,
+            ctptys : bool = True,
+            ctpy_name : Optional[List[str]] = None
+        
+        ) -> Dict :
+        """
+        Build the body of a bilateral IM (SIMM) calculation.
+
+        Args:
+            date (str | datetime): Calculation date.
+            fund (str): Fund type ("HV" or "WR").
+            ctptys (bool): Whether to split the calculation by counterparty.
+            ctpy_name (List[str], optional): Counterparties names. Defaults to ICE_ALL_CTPY_NAMES.
+
+        Returns:
+            dict: Calculation body.
+        """
+        verified_date = date_to_str(date)
+        fund = "HV" if fund is None else fund
+
+        body = {
+
+            "valuation" : {
+            
+                "type": "EOD",
+                "date": verified_date  # Format YYYY-MM-DD (in string)
+            
+            },
+            
+            "bookNames" : BOOK_NAMES_HV_LIST_SUBSET_N1 if (fund == "HV" or ctptys) else BOOK_NAMES_WR_LIST_ALL,
+            "model" : "SIMM",
+
+        }
+
+        if ctptys :
+
+            ctpy_name = ICE_ALL_CTPY_NAMES if ctpy_name is None else ctpy_name
+            body["counterPartyNames"] = ctpy_name
+
+        return body
+
+
+    def generate_mv_n_greeks_payload (
+            
+            self,
+            date : Optional[str | dt.datetime | dt.date] = None,
+            book_names : Optional[List[str]] = None
+        
+        ) -> Dict :
+        """
+        Build the body of a Market Value and Greeks calculation.
+
+        Args:
+            date (str | datetime, optional): EOD date. RealTime valuation if None.
+            book_names (List[str], optional): Books to value. Defaults to BOOK_NAMES_HV_LIST_ALL.
+
+        Returns:
+            dict: Calculation body.
+        """
+        book_names = BOOK_NAMES_HV_LIST_ALL if book_names is None else book_names
+
+        valuation = { "type" : "RealTime" } if date is None else { "type" : "EOD", "date" : date_to_str(date) } # In this case, date type (Null or Not) matters
+
+        payload = {
+
+            "valuation" : valuation,
+            "bookNames" : book_names,
+            "includeSubBooks" : "true"
+
+        }
+
+        return payload
+
+
     # -------------------------------------------------- Cache -------------------------------------------------- #
 
     @lru_cache(maxsize=128)
@@ -1,29 +1,41 @@
 from __future__ import annotations
 
 import os
-import csv
 import json
+import dataclasses
+import time
 import requests
 import polars as pl
 import datetime as dt
 
-from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator, Tuple
 
 from libapi.config.parameters import (
     LIBAPI_LOGS_DIR_ABS_PATH, LIBAPI_CACHE_DIR_ABS_PATH,
     LIBAPI_CACHE_TOKEN_BASENAME, LIBAPI_LOGS_REQUESTS_BASENAME,
-    ICE_URL_GET_CALC_RES, FREQUENCY_DATE_MAP
+    ICE_URL_GET_CALC_RES, FREQUENCY_DATE_MAP, LIBAPI_HTTP_STREAM_CHUNK_SIZE
 )
 from libapi.utils.formatter import date_to_str
+from libapi.utils.jsonstream import iter_json_items
+from libapi.utils.logger import get_request_logger
+from libapi.ice.transport import build_session, get_connection_stats
+from libapi.ice.tokens import TokenManager, get_token_manager
+from libapi.ice.polling import PollingSchedule, poll_calculation, poll_calculations, iter_poll_calculations
 
 from urllib.parse import urljoin
 from urllib3.exceptions import InsecureRequestWarning
-from urllib3.util.retry import Retry
 
 # Suppress only the InsecureRequestWarning from urllib3 needed for insecure connections
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
 
+
+def is_success_status (status : Optional[int]) -> bool :
+    """
+    Whether an HTTP status is a success (2xx), None (no answer) being a failure.
+    """
+    return status is not None and 200 <= status < 300
+
+
 class Client :
 
     def __init__ (
@@ -35,7 +47,13 @@ class Client :
             is_auth : bool = False,
             verify_ssl : bool = False,
             timeout : int = 30,
-            token_cache_path : Optional[str] = None
+            token_cache_path : Optional[str] = None,
+            pool_connections : Optional[int] = None,
+            pool_maxsize : Optional[int] = None,
+            max_retries : Optional[int] = None,
+            keep_alive : bool = True,
+            token_manager : Optional[TokenManager] = None,
+            session : Optional[requests.Session] = None
 
         ) -> None :
         """
@@ -48,6 +66,13 @@ class Client :
             is_auth (bool, optional): Force authentication state.
             verify_ssl (bool, optional): Verify TLS certificates (True in production).
             timeout (int, optional): Default timeout for requests in seconds.
+            pool_connections (int, optional): Host pools kept by the session (LIBAPI_HTTP_POOL_CONNECTIONS).
+            pool_maxsize (int, optional): Connections kept per host (LIBAPI_HTTP_POOL_MAXSIZE).
+            max_retries (int, optional): Transport retries on connection errors / gateway statuses (LIBAPI_HTTP_MAX_RETRIES).
+            keep_alive (bool, optional): Reuse connections between requests.
+            token_manager (TokenManager, optional): Token lifecycle (set by `authenticate` if None).
+            session (requests.Session, optional): Session shared with other clients (see
+                libapi.ice.transport.get_shared_session). A new one is built if None.
         """
         self.api_host = api_host.rstrip("/")
         self.auth_url = auth_url.lstrip("/")
@@ -67,16 +92,32 @@ class Client :
         self.verify_ssl = verify_ssl
         self.timeout = timeout
 
-        self.session = requests.Session()
+        if session is None :
+
+            session = build_session(
+
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                max_retries=max_retries,
+                keep_alive=keep_alive
+
+            )
+
+        self.session = session
 
         TOKEN_CACHE_ABS_PATH = os.path.join(LIBAPI_CACHE_DIR_ABS_PATH, LIBAPI_CACHE_TOKEN_BASENAME)
         self.token_cache_path = TOKEN_CACHE_ABS_PATH if token_cache_path is None else token_cache_path
+        self.token_manager = token_manager
 
 
     def authenticate (self, username : str, password : str, endpoint : Optional[str] = None) -> bool :
         """
         Authenticate with the API using username and password.
 
+        The token is shared by every client of the same user in the process, and by the
+        processes through the token cache file : a login only happens when none of them
+        holds a valid token (see libapi.ice.tokens.TokenManager).
+
         Args:
             username (str): API username.
             password (str): API password.
@@ -94,17 +135,30 @@ class Client :
 
         full_endpoint = endpoint or self.full_auth_url
 
-        self.token = self._load_cached_token()
+        if self.token_manager is None :
+            self.token_manager = get_token_manager(full_endpoint, username, self.token_cache_path)
+
+        login = lambda : self._login(full_endpoint, credentials)
 
-        if self.token :
+        # The manager keeps the login of the last client whose credentials were accepted
+        self.token_manager.set_login(login)
+        self._use_token(self.token_manager.get(login))
+
+        return self.is_auth
 
-            # We have a token here
-            self.headers["AuthenticationToken"] = self.token
-            self.is_auth = True
 
-            print("\n[+] Token and authentification loaded from cache")
+    def _login (self, full_endpoint : str, credentials : Dict) -> Optional[str] :
+        """
+        Log in against the authentication endpoint.
+
+        Returns:
+            str | None: New token, None on failure.
+        """
+        response = None
+        status = None
+        token = None
 
-            return self.is_auth
+        start = time.perf_counter()
 
         try :
 
@@ -114,40 +168,31 @@ class Client :
                 json=credentials,
                 
                 timeout=self.timeout,
-                headers={k: v for k, v in self.headers.items() if v is not None},
+                headers={k: v for k, v in self.headers.items() if v is not None and k != "AuthenticationToken"},
                 
                 verify=self.verify_ssl,
 
             )
 
+            status = response.status_code
+
             response.raise_for_status()
             json_response = response.json()
 
-            status = response.status_code
-
-            self.token = json_response.get('token')
-            
-            if not self.token :
+            token = json_response.get('token')
             
+            if not token :
                 print("[-] Auth succeeded but no token in the response...")
-                return False
 
-            self._save_token_to_cache(self.token)
-
-            # We have a non None token here
-            self.headers["AuthenticationToken"] = self.token
-            self.is_auth = True
-
-            print("[+] API authentication successfully")
+            else :
+                print("[+] API authentication successfully")
 
         except requests.exceptions.HTTPError as e :
             
-            status = e.status_code
             print(f"[-] Authentication Error: {e.response.status_code} - {e.response.text}\n")
 
         except requests.exceptions.RequestException as e :
 
-            status = e.status_code
             print(f"[-] Error during authentication: {e}\n")
 
         finally :
@@ -158,11 +203,51 @@ class Client :
                     method="POST",
                     endpoint=full_endpoint,
                     status_code=status,
-                    success=self.is_auth
+                    success=bool(token),
+                    latency_ms=(time.perf_counter() - start) * 1000,
+                    response_bytes=len(response.content) if response is not None else None
 
                 )
 
-        return self.is_auth
+        return token or None
+
+
+    def _use_token (self, token : Optional[str]) -> None :
+        """
+        Put a token in the headers of the client.
+        """
+        self.token = token
+        self.headers["AuthenticationToken"] = token
+        self.is_auth = bool(token)
+
+
+    def _send_authenticated (self, method : str, url : str, headers : Dict, **kwargs) -> requests.Response :
+        """
+        Send a request with the current token of the user. On a 401 the token is renewed
+        (one login for all the clients which got it) and the request sent again once.
+        """
+        if self.token_manager is not None :
+
+            token = self.token_manager.get()
+
+            if token and token != self.token :
+                self._use_token(token)
+
+        headers = {**headers, "AuthenticationToken" : self.token} if self.token else headers
+        response = self.session.request(method=method, url=url, headers=headers, **kwargs)
+
+        if response.status_code == 401 and self.token_manager is not None :
+
+            token = self.token_manager.refresh(stale=self.token)
+
+            if token :
+
+                response.close()
+                self._use_token(token)
+
+                response = self.session.request(method=method, url=url, headers={**headers, "AuthenticationToken" : token}, **kwargs)
+
+        return response
 
 
     def get (self, endpoint : str, params : Dict = None, json : Dict = None) -> Optional[Dict[str, Any]] :
@@ -178,6 +263,17 @@ class Client :
         """
         return self._make_request("GET", endpoint, params=params, json=json)
 
+
+    def get_with_status (self, endpoint : str, params : Dict = None, json : Dict = None) -> Tuple[Optional[int], Optional[Dict]] :
+        """
+        Send a GET request, keeping the HTTP status of the answer.
+
+        Returns:
+            Tuple[int | None, dict | None]: HTTP status (None if no answer) and parsed JSON body
+            (the error body for a 4xx / 5xx answer, None if there is none).
+        """
+        return self._request_with_status("GET", endpoint, params=params, json=json)
+
     
     def post (self, endpoint : str, data : Dict = None, json : Dict = None) -> Optional[Dict] :
         """
@@ -194,6 +290,57 @@ class Client :
         return self._make_request("POST", endpoint, data=data, json=json)
 
 
+    def post_with_status (self, endpoint : str, data : Dict = None, json : Dict = None) -> Tuple[Optional[int], Optional[Dict]] :
+        """
+        Send a POST request, keeping the HTTP status of the answer.
+
+        Returns:
+            Tuple[int | None, dict | None]: HTTP status (None if no answer) and parsed JSON body
+            (the error body for a 4xx / 5xx answer, None if there is none).
+        """
+        return self._request_with_status("POST", endpoint, data=data, json=json)
+
+
+    def iter_post_items (
+
+            self,
+            endpoint : str,
+            key : str,
+            json : Dict = None,
+            chunk_size : Optional[int] = None
+
+        ) -> Iterator[Any] :
+        """
+        Send a POST request and stream the items of the list `key` of its JSON response.
+
+        Items are decoded while the body is received (see libapi.utils.jsonstream) : the
+        full response is never held in memory.
+
+        Args:
+            endpoint (str): API endpoint (relative path).
+            key (str): Top level field of the response holding the list (e.g. "tradeLegs").
+            json (dict, optional): JSON body.
+            chunk_size (int, optional): Bytes read at a time. Defaults to LIBAPI_HTTP_STREAM_CHUNK_SIZE.
+
+        Returns:
+            Iterator[Any]: Items of the list, in order.
+
+        Raises:
+            RuntimeError: If the request failed.
+        """
+        yield from self._stream_request("POST", endpoint, key, json=json, chunk_size=chunk_size)
+
+
+    def connection_stats (self) -> Dict[str, int] :
+        """
+        Connection reuse counters of the session (see libapi.ice.transport.get_connection_stats).
+
+        Returns:
+            dict: `pools`, `requests`, `connections` (handshakes done) and `reused`.
+        """
+        return get_connection_stats(self.session)
+
+
     def log_request (
             
             self,
@@ -201,45 +348,45 @@ class Client :
             endpoint : str,
             status_code : int = 404,
             success : bool = False,
-            log_abs_path : Optional[str] = None
+            log_abs_path : Optional[str] = None,
+            latency_ms : Optional[float] = None,
+            response_bytes : Optional[int] = None
         
         ) -> None :
         """
         Log a request to a CSV file for tracking.
 
+        The row is only queued here, the file is written in background by the
+        shared RequestLogger of this path (see libapi.utils.logger).
+
         Args:
             method (str): HTTP method.
             endpoint (str): API endpoint.
             status_code (int): HTTP status code.
             success (bool): Whether the request succeeded.
             log_abs_path (str): Absolute path to CSV log file.
+            latency_ms (float, optional): Request duration in milliseconds.
+            response_bytes (int, optional): Size of the response body.
         """
         REQUEST_ABS_PATH = os.path.join(LIBAPI_LOGS_DIR_ABS_PATH, LIBAPI_LOGS_REQUESTS_BASENAME)
         log_abs_path = REQUEST_ABS_PATH if log_abs_path is None else log_abs_path
 
-        try:
-            
-            # Check if directory and file exists.
-            path = Path(log_abs_path)
-            path.parent.mkdir(parents=True, exist_ok=True)
+        try :
             
-            new_file = not path.exists()
+            get_request_logger(log_abs_path).log(
 
-            with path.open(mode="a", newline="", encoding="utf-8") as csv_log_file :
-                
-                writer = csv.writer(csv_log_file)
-                
-                if new_file:
-                    writer.writerow(["timestamp", "method", "endpoint", "status", "success"])
+                method,
+                endpoint,
+                status_code=status_code,
+                success=success,
+                latency_ms=latency_ms,
+                response_bytes=response_bytes
 
-                timestamp = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                writer.writerow([timestamp, method.upper(), endpoint, status_code or "", bool(success)])
-                
-                print(f"[*] [{timestamp}] {method} request to {endpoint}")
+            )
             
         except Exception as e :
 
-            print("[-] Error while writing logs into the selected file.")
+            print(f"[-] Error while logging the request: {e}")
 
 
     def _make_request (
@@ -269,34 +416,59 @@ class Client :
         Returns:
             dict | None: Parsed JSON if successful, else None.
         """
+        return self._request_with_status(method, endpoint, params, data, json, headers, timeout)[1]
+
+
+    def _request_with_status (
+            
+            self,
+            method : str,
+            endpoint : str,
+            params : Optional[Dict] = None,
+            data : Optional[Dict] = None,
+            json : Optional[Dict] = None,
+            headers : Optional[Dict] = None,
+            timeout : int = 10
+        
+        ) -> Tuple[Optional[int], Optional[Dict[str, Any]]] :
+        """
+        Send an HTTP request, returning its status with the parsed JSON body.
+
+        Args:
+            method (str): HTTP method (GET, POST, etc.).
+            endpoint (str): API endpoint (relative path).
+            params (dict, optional): Query parameters.
+            data (dict, optional): Form-encoded data.
+            json (dict, optional): JSON payload.
+            headers (dict, optional): Extra headers.
+            timeout (int): Request timeout in seconds.
+
+        Returns:
+            Tuple[int | None, dict | None]: HTTP status (None if no answer) and parsed JSON body
+            (the error body for a 4xx / 5xx answer, None if there is none).
+        """
         # Cas incohérent: on pense être authentifié mais pas de token
         if self.is_auth and not self.token :
 
             print("[-] Auth state is True but no token is set.")
-            return None
+            return None, None
         
-        # Normalize the endpoint/url
-        endpoint_path = endpoint.lstrip("/")
-        url = urljoin(self.api_host + "/", endpoint_path)
-
-        # Effective headers (filter out None and merge extras)
-        base_headers = {k: v for k, v in self.headers.items() if v is not None}
-
-        if headers :
-            base_headers.update({k: v for k, v in headers.items() if v is not None})
+        url, base_headers = self._url_and_headers(endpoint, headers)
 
         success = False
         status = None
         response = None
 
+        start = time.perf_counter()
+
         try :
 
-            response = self.session.request(
+            response = self._send_authenticated(
 
-                method=method.upper(),
-                url=url,
+                method.upper(),
+                url,
+                base_headers,
 
-                headers=base_headers,
                 params=params,
                 data=data,
                 json=json,
@@ -324,11 +496,118 @@ class Client :
                     method=method,
                     endpoint=url,
                     status_code=status,
-                    success=success
+                    success=success,
+                    latency_ms=(time.perf_counter() - start) * 1000,
+                    response_bytes=len(response.content) if response is not None else None
 
                 )
 
-        return response.json() if response is not None else None
+        if response is None :
+            return status, None
+
+        try :
+            return response.status_code, response.json()
+
+        except ValueError :
+            return response.status_code, None
+
+
+    def _url_and_headers (self, endpoint : str, headers : Optional[Dict] = None) -> Tuple[str, Dict] :
+        """
+        Full URL of an endpoint and effective headers of a request.
+        """
+        # Normalize the endpoint/url
+        endpoint_path = endpoint.lstrip("/")
+        url = urljoin(self.api_host + "/", endpoint_path)
+
+        # Effective headers (filter out None and merge extras)
+        base_headers = {k: v for k, v in self.headers.items() if v is not None}
+
+        if headers :
+            base_headers.update({k: v for k, v in headers.items() if v is not None})
+
+        return url, base_headers
+
+
+    def _stream_request (
+            
+            self,
+            method : str,
+            endpoint : str,
+            key : str,
+            params : Optional[Dict] = None,
+            json : Optional[Dict] = None,
+            headers : Optional[Dict] = None,
+            timeout : int = 10,
+            chunk_size : Optional[int] = None
+        
+        ) -> Iterator[Any] :
+        """
+        Streaming counterpart of `_make_request` : yield the items of the list `key` of
+        the JSON response as they are received. The request is logged once the stream is closed.
+        """
+        if self.is_auth and not self.token :
+            raise RuntimeError("[-] Auth state is True but no token is set.")
+
+        url, base_headers = self._url_and_headers(endpoint, headers)
+        chunk_size = LIBAPI_HTTP_STREAM_CHUNK_SIZE if chunk_size is None else chunk_size
+
+        success = False
+        status = None
+        received = 0
+
+        start = time.perf_counter()
+
+        def iter_body (response : requests.Response) -> Iterator[bytes] :
+
+            nonlocal received
+
+            for chunk in response.iter_content(chunk_size=chunk_size) :
+
+                received += len(chunk)
+                yield chunk
+
+        try :
+
+            with self._send_authenticated(
+
+                method.upper(),
+                url,
+                base_headers,
+
+                params=params,
+                json=json,
+
+                verify=self.verify_ssl,
+                timeout=(timeout or self.timeout),
+                stream=True
+
+            ) as response :
+
+                status = response.status_code
+                response.raise_for_status()
+
+                yield from iter_json_items(iter_body(response), key)
+
+                success = True
+
+        except requests.exceptions.RequestException as e :
+
+            status = getattr(getattr(e, "response", None), "status_code", status)
+            raise RuntimeError(f"[-] Error during the {method.upper()} request on {url}: {e}") from e
+
+        finally :
+
+            self.log_request(
+
+                method=method,
+                endpoint=url,
+                status_code=status,
+                success=success,
+                latency_ms=(time.perf_counter() - start) * 1000,
+                response_bytes=received
+
+            )
 
 
     # -------------------------------------------------- Logic functions --------------------------------------------------
@@ -343,57 +622,136 @@ class Client :
             results_portf_ccy : str = "No",
             endpoint : Optional[str] = None,
 
-            loopback : int = 5,
+            loopback : Optional[int] = None,
+            schedule : Optional[PollingSchedule] = None
 
         ) -> Optional[Dict] :
         """
         Get calculation results by calculation ID.
 
+        Polls with a jittered exponential backoff until the calculation is done, failed
+        (terminal status such as "Error"), got no 2xx answer `loopback` times or past the
+        deadline of the schedule. "Failure" answers mean that the calculation is still
+        running : they are not counted as failures.
+
         Args:
             calculation_id (str | int): ID of the calculation.
-            endpoint_calc (str, optional): API endpoint for calculation results.
+            endpoint (str, optional): API endpoint for calculation results.
+            loopback (int, optional): Missing (non 2xx) answers tolerated (overrides `schedule.max_failures`).
+            schedule (PollingSchedule, optional): Backoff and deadline (LIBAPI_POLL_* by default).
 
         Returns:
             dict | None: Calculation results if available.
         """
-        if loopback <= 0 :
+        fetch = self._calculation_results_fetcher(calculation_details, results_home_ccy, results_portf_ccy, endpoint)
+
+        return poll_calculation(fetch, calculation_id, self._polling_schedule(loopback, schedule))
+
+
+    def get_many_calculation_results (
+        
+            self,
+            calculation_ids : List[str | int],
+            calculation_details : str = "Yes",
+            results_home_ccy : str = "Yes",
+            results_portf_ccy : str = "No",
+            endpoint : Optional[str] = None,
+
+            loopback : Optional[int] = None,
+            schedule : Optional[PollingSchedule] = None
+
+        ) -> Dict[str | int, Optional[Dict]] :
+        """
+        Get the results of several calculations, polled in a single loop sharing one schedule.
+
+        Args:
+            calculation_ids (list): IDs of the calculations.
+            endpoint (str, optional): API endpoint for calculation results.
+            loopback (int, optional): Missing (non 2xx) answers tolerated per calculation.
+            schedule (PollingSchedule, optional): Backoff and deadline (LIBAPI_POLL_* by default).
+
+        Returns:
+            dict: Calculation results by ID (None for the ones not available).
+        """
+        fetch = self._calculation_results_fetcher(calculation_details, results_home_ccy, results_portf_ccy, endpoint)
+
+        return poll_calculations(fetch, calculation_ids, self._polling_schedule(loopback, schedule))
+
+
+    def iter_calculation_results (
+        
+            self,
+            calculation_ids : List[str | int],
+            calculation_details : str = "Yes",
+            results_home_ccy : str = "Yes",
+            results_portf_ccy : str = "No",
+            endpoint : Optional[str] = None,
+
+            loopback : Optional[int] = None,
+            schedule : Optional[PollingSchedule] = None
+
+        ) -> Iterator[Tuple[str | int, Optional[Dict]]] :
+        """
+        Yield (calculation ID, results) for several calculations as soon as each one is over.
+
+        All the calculations share one polling loop and the connection pool of the session.
+
+        Args:
+            calculation_ids (list): IDs of the calculations.
+            endpoint (str, optional): API endpoint for calculation results.
+            loopback (int, optional): Missing (non 2xx) answers tolerated per calculation.
+            schedule (PollingSchedule, optional): Backoff and deadline (LIBAPI_POLL_* by default).
+
+        Yields:
+            tuple: (calculation ID, results or None if not available), in completion order.
+        """
+        fetch = self._calculation_results_fetcher(calculation_details, results_home_ccy, results_portf_ccy, endpoint)
+
+        yield from iter_poll_calculations(fetch, calculation_ids, self._polling_schedule(loopback, schedule))
+
+
+    def _calculation_results_fetcher (
             
-            print(f"\n[-] get_calcultion_results failed after all retries | id = {calculation_id}")
-            return None
+            self,
+            calculation_details : str = "Yes",
+            results_home_ccy : str = "Yes",
+            results_portf_ccy : str = "No",
+            endpoint : Optional[str] = None
 
+        ) :
+        """
+        Build the function sending one calculation results query for an ID.
+        """
         endpoint = ICE_URL_GET_CALC_RES if endpoint is None else endpoint
 
-        payload = {
+        def fetch (calculation_id : str | int) -> Optional[Dict] :
 
-            "calculationId" : str(calculation_id), # Send always in string format, even for integers
-            "IncludeCalculationDetails" : calculation_details,
-            "includeResultsInHomeCurrency" : results_home_ccy,
-            "includeResultsInPortfolioCurrency" : results_portf_ccy
+            payload = {
 
-        }
+                "calculationId" : str(calculation_id), # Send always in string format, even for integers
+                "IncludeCalculationDetails" : calculation_details,
+                "includeResultsInHomeCurrency" : results_home_ccy,
+                "includeResultsInPortfolioCurrency" : results_portf_ccy
 
-        try :
-            
-            print(f"\n[*] Querying calculation results... | id = {calculation_id} | loopback = {loopback}")
+            }
 
-            response = self.get(
+            status, response = self.get_with_status(endpoint=endpoint, json=payload)
 
-                endpoint=endpoint,
-                json=payload
+            # The error body of a non 2xx answer is a missing answer, counted against max_failures
+            return response if is_success_status(status) else None
 
-            )
+        return fetch
 
-            if response is None or response.get("status") == "Failure" :
 
-                print(f"\n[!] Retrying query for results calculations...Null result")
-                return self.get_calculation_results(calculation_id, calculation_details, results_home_ccy, results_portf_ccy, endpoint, loopback - 1)
+    @staticmethod
+    def _polling_schedule (loopback : Optional[int] = None, schedule : Optional[PollingSchedule] = None) -> PollingSchedule :
 
-        except Exception as e :
+        schedule = PollingSchedule() if schedule is None else schedule
 
-            print(f"\n[!] Retrying query for results calculations after a exception...")
-            return self.get_calculation_results(calculation_id, calculation_details, results_home_ccy, results_portf_ccy, endpoint, loopback - 1)
+        if loopback is not None :
+            schedule = dataclasses.replace(schedule, max_failures=loopback)
 
-        return response
+        return schedule
     
 
     # -------------------------------------------------- Auxiliar functions --------------------------------------------------
@@ -5,6 +5,7 @@ import datetime as dt
 from typing import Optional, Dict
 
 from libapi.ice.client import Client
+from libapi.ice.transport import get_shared_session
 from libapi.config.parameters import (
     ICE_AUTH, ICE_HOST, ICE_USERNAME, ICE_PASSWORD,
     ICE_DATA_EQ_TICKER_TENOR, ICE_URL_QUERY_RESULTS, ICE_URL_INVOKE_DQUERY
@@ -36,7 +37,8 @@ class IceData (Client) :
         ice_username = ICE_USERNAME if ice_username is None else ice_username
         ice_password = ICE_PASSWORD if ice_password is None else ice_password
 
-        super().__init__(ice_host, ice_auth)
+        # Clients of the same host and user share the connection pool (and the token)
+        super().__init__(ice_host, ice_auth, session=get_shared_session(ice_host, ice_username))
         self.authenticate(ice_username, ice_password)
 
 
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from libapi.utils.concurrency import split_in_chunks
+from libapi.ice.client import is_success_status
+
+# A search over many books (or many dates / trade IDs) is split into pieces small enough
+# for the API : one piece per (books chunk, values chunk). The pieces are sent at the same
+# time and their trade legs merged back, a leg found by two pieces being kept once.
+
+# (books, values) of a piece : values is None for a search on the books only
+SearchPiece = Tuple[List[str], Optional[List[Any]]]
+
+
+def plan_trade_search (
+
+        books : Sequence[str] | str,
+        values : Optional[Sequence[Any]] = None,
+        books_per_request : int = 10,
+        values_per_request : int = 500
+
+    ) -> List[SearchPiece] :
+    """
+    Split a trade search into the pieces sent to the API.
+
+    Args:
+        books (Sequence[str] | str): Name of books / portfolios.
+        values (Sequence, optional): Values of the second filter (dates, trade IDs...), None if there is none.
+        books_per_request (int): Maximum number of books per piece.
+        values_per_request (int): Maximum number of values per piece.
+
+    Returns:
+        List[SearchPiece]: (books, values) of each piece, books chunks first.
+    """
+    books = [books] if isinstance(books, str) else list(books)
+    books_chunks = [list(chunk) for chunk in split_in_chunks(books, books_per_request)]
+
+    if values is None :
+        return [(chunk, None) for chunk in books_chunks]
+
+    values_chunks = [list(chunk) for chunk in split_in_chunks(list(values), values_per_request)]
+
+    return [(books_chunk, values_chunk) for books_chunk in books_chunks for values_chunk in values_chunks]
+
+
+def iter_unique_trade_legs (
+
+        responses : Iterable[Optional[Dict]],
+        key : str = "tradeLegId",
+        seen : Optional[Set[Any]] = None
+
+    ) -> Iterator[Dict] :
+    """
+    Stream the trade legs of several responses, each `key` being yielded once.
+
+    Legs without the key are always yielded.
+
+    Args:
+        responses (Iterable[Dict | None]): Responses holding a "tradeLegs" list (None are skipped).
+        key (str): Field identifying a trade leg.
+        seen (Set, optional): Keys already yielded, shared between calls.
+
+    Returns:
+        Iterator[Dict]: Trade legs, in the order of the responses.
+    """
+    seen = set() if seen is None else seen
+
+    for response in responses :
+
+        for trade_leg in (response or {}).get("tradeLegs") or [] :
+
+            leg_id = trade_leg.get(key)
+
+            if leg_id is not None :
+
+                if leg_id in seen :
+                    continue
+
+                seen.add(leg_id)
+
+            yield trade_leg
+
+
+def checked_trade_legs_response (status : Optional[int], response : Optional[Dict]) -> Optional[Dict] :
+    """
+    Response of a piece if it is a 2xx answer holding a "tradeLegs" list, else None (failed piece).
+    """
+    if not is_success_status(status) or not isinstance(response, dict) or not isinstance(response.get("tradeLegs"), list) :
+        return None
+
+    return response
+
+
+def merge_trade_legs_responses (responses : Sequence[Dict], key : str = "tradeLegId") -> Dict :
+    """
+    Merge the responses of the pieces of a search into one response.
+
+    The other fields ("status", "RequestId"...) are taken from the first response.
+    A search without any piece (no books or no values) matches no trade leg.
+    """
+    if not responses :
+        return { "tradeLegs" : [] }
+
+    if len(responses) == 1 :
+        return responses[0]
+
+    return { **responses[0], "tradeLegs" : list(iter_unique_trade_legs(responses, key)) }
@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import time
+import heapq
+import random
+import asyncio
+
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from libapi.config.parameters import (
+    LIBAPI_POLL_INITIAL_DELAY, LIBAPI_POLL_MAX_DELAY, LIBAPI_POLL_TIMEOUT, LIBAPI_POLL_MAX_FAILURES
+)
+
+
+# States of a calculation, as seen from its results endpoint
+DONE = "done"
+RUNNING = "running"
+FAILED = "failed"
+
+RUNNING_STATUSES = {
+
+    "running", "pending", "inprogress", "in progress", "queued",
+    "submitted", "processing", "started", "notstarted", "waiting"
+
+}
+
+# Statuses of a calculation which will never give results
+TERMINAL_FAILURE_STATUSES = { "error", "failed", "cancelled", "canceled", "aborted", "rejected" }
+
+# Lists holding the results of a calculation (IM by counterparty, trade legs)
+RESULTS_PAYLOAD_KEYS = ("results", "tradeLegs")
+
+
+def classify_calculation_response (response : Optional[Dict]) -> str :
+    """
+    Tell whether a calculation results answer is final, still running or failed.
+
+    As the API answers "Failure" until the results are ready, a "Failure" answer means
+    running. A missing answer (non 2xx, exception) or a terminal status ("Error",
+    "Failed", "Cancelled"...) is a failure.
+
+    Args:
+        response (dict | None): JSON answer of the results endpoint (None on HTTP error).
+
+    Returns:
+        str: DONE, RUNNING or FAILED.
+    """
+    if response is None :
+        return FAILED
+
+    status = str(response.get("status", "")).strip().lower()
+    calculation_status = str(response.get("calculationStatus", "")).strip().lower()
+
+    if status in TERMINAL_FAILURE_STATUSES or calculation_status in TERMINAL_FAILURE_STATUSES :
+        return FAILED
+
+    if status in RUNNING_STATUSES or calculation_status in RUNNING_STATUSES or status == "failure" :
+        return RUNNING
+
+    return DONE
+
+
+def is_calculation_results (response : Optional[Dict]) -> bool :
+    """
+    Whether an answer holds the final results of a calculation (safe to cache) : done,
+    with a results or trade legs list.
+    """
+    if classify_calculation_response(response) != DONE :
+        return False
+
+    return any(isinstance(response.get(key), list) for key in RESULTS_PAYLOAD_KEYS)
+
+
+@dataclass
+class PollingSchedule :
+    """
+    Jittered exponential backoff with a wall-clock deadline.
+
+    Attributes:
+        initial_delay (float): Seconds before the second attempt.
+        max_delay (float): Upper bound of the delay between two attempts.
+        multiplier (float): Growth factor of the delay.
+        jitter (float): Relative random spread of each delay (0.2 = +/- 20%).
+        timeout (float): Seconds after which a calculation is given up.
+        max_failures (int): Missing answers (non 2xx, exception) tolerated per calculation.
+            "Failure" answers mean still running and are polled until the deadline, a
+            terminal status ("Error", "Failed"...) stops the polling at once.
+    """
+
+    initial_delay : float = LIBAPI_POLL_INITIAL_DELAY
+    max_delay : float = LIBAPI_POLL_MAX_DELAY
+    multiplier : float = 2.0
+    jitter : float = 0.2
+    timeout : float = LIBAPI_POLL_TIMEOUT
+    max_failures : int = LIBAPI_POLL_MAX_FAILURES
+
+
+    def delay (self, attempt : int) -> float :
+        """
+        Delay before the attempt following the `attempt`-th one (0 based).
+        """
+        base = min(self.max_delay, self.initial_delay * (self.multiplier ** attempt))
+
+        return max(0.0, base * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+
+class PollState :
+    """
+    Progress of one polled calculation.
+    """
+
+    def __init__ (self, calculation_id : Any, deadline : float) -> None :
+
+        self.calculation_id = calculation_id
+        self.deadline = deadline
+
+        self.attempts = 0
+        self.failures = 0
+
+        self.result : Optional[Dict] = None
+        self.state = RUNNING
+
+
+    def update (self, response : Optional[Dict], schedule : PollingSchedule) -> bool :
+        """
+        Record an answer.
+
+        Returns:
+            bool: True if the polling of this calculation is over.
+        """
+        self.attempts += 1
+        state = classify_calculation_response(response)
+
+        if state == DONE :
+
+            self.result = response
+            self.state = DONE
+
+            return True
+
+        if state == FAILED and response is not None :
+
+            print(f"\n[-] Calculation failed with the status {response.get('status')} | id = {self.calculation_id}")
+            self.state = FAILED
+
+            return True
+
+        if state == FAILED :
+            self.failures += 1
+
+        if self.failures >= schedule.max_failures :
+
+            print(f"\n[-] Calculation results failed after {self.failures} failures | id = {self.calculation_id}")
+            self.state = FAILED
+
+            return True
+
+        if time.monotonic() >= self.deadline :
+
+            print(f"\n[-] Calculation results not ready before the deadline | id = {self.calculation_id}")
+            self.state = FAILED
+
+            return True
+
+        return False
+
+
+def _safe_fetch (fetch : Callable[[Any], Optional[Dict]], calculation_id : Any) -> Optional[Dict] :
+
+    try :
+        return fetch(calculation_id)
+
+    except Exception as e :
+
+        print(f"\n[!] Error while querying calculation results | id = {calculation_id} : {e}")
+        return None
+
+
+def poll_calculation (
+
+        fetch : Callable[[Any], Optional[Dict]],
+        calculation_id : Any,
+        schedule : Optional[PollingSchedule] = None
+
+    ) -> Optional[Dict] :
+    """
+    Poll one calculation until it is done, failed or past its deadline.
+
+    Args:
+        fetch (Callable): Sends one results query for an ID, returns the JSON answer (None if not 2xx).
+        calculation_id (Any): Calculation ID.
+        schedule (PollingSchedule, optional): Backoff and deadline.
+
+    Returns:
+        dict | None: Calculation results, None if they could not be retrieved.
+    """
+    results = poll_calculations(fetch, [calculation_id], schedule)
+
+    return results.get(calculation_id)
+
+
+def poll_calculations (
+
+        fetch : Callable[[Any], Optional[Dict]],
+        calculation_ids : Iterable[Any],
+        schedule : Optional[PollingSchedule] = None
+
+    ) -> Dict[Any, Optional[Dict]] :
+    """
+    Poll several calculations in a single loop sharing one schedule.
+
+    Args:
+        fetch (Callable): Sends one results query for an ID, returns the JSON answer (None if not 2xx).
+        calculation_ids (Iterable): Calculation IDs (duplicates are polled once).
+        schedule (PollingSchedule, optional): Backoff and deadline.
+
+    Returns:
+        dict: Results by calculation ID, in input order (None for the failed ones).
+    """
+    calculation_ids = list(dict.fromkeys(calculation_ids))
+    results = dict(iter_poll_calculations(fetch, calculation_ids, schedule))
+
+    return { calculation_id : results.get(calculation_id) for calculation_id in calculation_ids }
+
+
+def iter_poll_calculations (
+
+        fetch : Callable[[Any], Optional[Dict]],
+        calculation_ids : Iterable[Any],
+        schedule : Optional[PollingSchedule] = None
+
+    ) -> Iterator[Tuple[Any, Optional[Dict]]] :
+    """
+    Poll several calculations in a single loop and yield each one as soon as it is over.
+
+    Each calculation keeps its own backoff, the loop always sleeps until the next
+    calculation due, so N calculations cost about the time of the slowest one.
+
+    Args:
+        fetch (Callable): Sends one results query for an ID, returns the JSON answer (None if not 2xx).
+        calculation_ids (Iterable): Calculation IDs (duplicates are polled once).
+        schedule (PollingSchedule, optional): Backoff and deadline.
+
+    Yields:
+        tuple: (calculation ID, results or None if they could not be retrieved), in completion order.
+    """
+    schedule = PollingSchedule() if schedule is None else schedule
+
+    deadline = time.monotonic() + schedule.timeout
+    states = { calculation_id : PollState(calculation_id, deadline) for calculation_id in dict.fromkeys(calculation_ids) }
+
+    # (due time, insertion order, id)
+    queue = [(time.monotonic(), i, calculation_id) for i, calculation_id in enumerate(states)]
+    heapq.heapify(queue)
+
+    while queue :
+
+        due, order, calculation_id = heapq.heappop(queue)
+        wait = due - time.monotonic()
+
+        if wait > 0 :
+            time.sleep(wait)
+
+        state = states[calculation_id]
+
+        print(f"\n[*] Querying calculation results... | id = {calculation_id} | attempt = {state.attempts + 1}")
+
+        if state.update(_safe_fetch(fetch, calculation_id), schedule) :
+
+            yield calculation_id, state.result
+            continue
+
+        heapq.heappush(queue, (time.monotonic() + schedule.delay(state.attempts - 1), order, calculation_id))
+
+
+async def apoll_calculation (
+
+        fetch : Callable[[Any], Awaitable[Optional[Dict]]],
+        calculation_id : Any,
+        schedule : Optional[PollingSchedule] = None,
+        deadline : Optional[float] = None
+
+    ) -> Optional[Dict] :
+    """
+    Asyncio version of `poll_calculation` (the event loop is never blocked between attempts).
+    """
+    schedule = PollingSchedule() if schedule is None else schedule
+    deadline = time.monotonic() + schedule.timeout if deadline is None else deadline
+
+    state = PollState(calculation_id, deadline)
+
+    while True :
+
+        print(f"\n[*] Querying calculation results... | id = {calculation_id} | attempt = {state.attempts + 1}")
+
+        try :
+            response = await fetch(calculation_id)
+
+        except Exception as e :
+
+            print(f"\n[!] Error while querying calculation results | id = {calculation_id} : {e}")
+            response = None
+
+        if state.update(response, schedule) :
+            return state.result
+
+        await asyncio.sleep(schedule.delay(state.attempts - 1))
+
+
+async def apoll_calculations (
+
+        fetch : Callable[[Any], Awaitable[Optional[Dict]]],
+        calculation_ids : Iterable[Any],
+        schedule : Optional[PollingSchedule] = None
+
+    ) -> Dict[Any, Optional[Dict]] :
+    """
+    Asyncio version of `poll_calculations` (one task per calculation, one shared deadline).
+    """
+    calculation_ids = list(dict.fromkeys(calculation_ids))
+    results = { calculation_id : result async for calculation_id, result in aiter_poll_calculations(fetch, calculation_ids, schedule) }
+
+    return { calculation_id : results.get(calculation_id) for calculation_id in calculation_ids }
+
+
+async def aiter_poll_calculations (
+
+        fetch : Callable[[Any], Awaitable[Optional[Dict]]],
+        calculation_ids : Iterable[Any],
+        schedule : Optional[PollingSchedule] = None
+
+    ) -> AsyncIterator[Tuple[Any, Optional[Dict]]] :
+    """
+    Asyncio version of `iter_poll_calculations`, yielding (ID, results) in completion order.
+    """
+    schedule = PollingSchedule() if schedule is None else schedule
+    deadline = time.monotonic() + schedule.timeout
+
+    async def poll_one (calculation_id : Any) -> Tuple[Any, Optional[Dict]] :
+        return calculation_id, await apoll_calculation(fetch, calculation_id, schedule, deadline)
+
+    tasks = [asyncio.ensure_future(poll_one(calculation_id)) for calculation_id in dict.fromkeys(calculation_ids)]
+
+    try :
+
+        for task in asyncio.as_completed(tasks) :
+            yield await task
+
+    finally :
+
+        # Consumer stopped early: do not leave pollers running
+        for task in tasks :
+            task.cancel()
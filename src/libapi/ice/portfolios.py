@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+import time
+import bisect
+import hashlib
+import threading
+
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from libapi.config.parameters import ICE_PORTFOLIOS_TTL
+
+# The portfolios list changes a few times a day at most : it is downloaded once per TTL
+# and per host, and the names are kept in a sorted index (case insensitive) so a prefix
+# lookup is a bisection plus the matching names. When the TTL expires the list is
+# downloaded again but the index is only rebuilt if the content changed.
+
+PortfoliosFetcher = Callable[[], Optional[List[Dict]]]
+
+
+def portfolios_fingerprint (portfolios : List[Dict]) -> str :
+    """
+    Hash of the canonical content of a portfolios list.
+    """
+    encoded = json.dumps(portfolios, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def _normalize_name (name : Any) -> str :
+    return str(name).strip().upper()
+
+
+class PortfolioCatalogue :
+    """
+    Cached portfolios list with a prefix index on the portfolio names.
+    """
+
+    def __init__ (self, ttl : Optional[float] = None) -> None :
+        """
+        Args:
+            ttl (float, optional): Seconds before the list is revalidated. Defaults to ICE_PORTFOLIOS_TTL.
+        """
+        self.ttl = ICE_PORTFOLIOS_TTL if ttl is None else ttl
+
+        self.fetches = 0
+        self.rebuilds = 0
+
+        self._lock = threading.Lock()
+        self._portfolios : Optional[List[Dict]] = None
+        self._fingerprint : Optional[str] = None
+        self._expires_at = 0.0
+
+        # (normalized name, name) sorted, and the normalized keys alone for the bisection
+        self._index : List[Tuple[str, Any]] = []
+        self._keys : List[str] = []
+
+
+    def portfolios (self, fetch : PortfoliosFetcher, refresh : bool = False) -> Optional[List[Dict]] :
+        """
+        Raw portfolios, downloaded with `fetch` if the cached list expired.
+
+        Returns:
+            List[Dict] | None: Portfolios, None if they were never downloaded successfully.
+        """
+        with self._lock :
+
+            self._revalidate(fetch, refresh)
+
+            return None if self._portfolios is None else list(self._portfolios)
+
+
+    def names (self, fetch : PortfoliosFetcher, prefix : Optional[str] = None, refresh : bool = False) -> Optional[List[str]] :
+        """
+        Unique names of the portfolios starting with `prefix` (case insensitive), in name order.
+
+        Args:
+            fetch (PortfoliosFetcher): Downloads the raw portfolios (only called once the TTL expired).
+            prefix (str, optional): Prefix filter. None or empty keeps every name.
+            refresh (bool): Revalidate the list now, whatever its TTL.
+
+        Returns:
+            List[str] | None: Names, None if the portfolios were never downloaded successfully.
+        """
+        with self._lock :
+
+            self._revalidate(fetch, refresh)
+
+            if self._portfolios is None :
+                return None
+
+            prefix = _normalize_name(prefix) if prefix else ""
+
+            start = bisect.bisect_left(self._keys, prefix)
+            names = []
+
+            for key, name in self._index[start:] :
+
+                if not key.startswith(prefix) :
+                    break
+
+                names.append(name)
+
+        return list(dict.fromkeys(names))
+
+
+    def invalidate (self) -> None :
+        """
+        Revalidate the list on the next lookup.
+        """
+        with self._lock :
+            self._expires_at = 0.0
+
+
+    def _revalidate (self, fetch : PortfoliosFetcher, refresh : bool) -> None :
+        """
+        Download the list if it expired, and rebuild the index if its content changed.
+        """
+        now = time.monotonic()
+
+        if not refresh and self._portfolios is not None and now < self._expires_at :
+            return
+
+        portfolios = fetch()
+        self.fetches += 1
+
+        if portfolios is None :
+
+            # Keep serving the previous list, tried again at the next lookup
+            if self._portfolios is not None :
+                print("[!] Unable to download the portfolios, using the cached list")
+
+            return
+
+        self._expires_at = now + self.ttl
+        fingerprint = portfolios_fingerprint(portfolios)
+
+        if fingerprint == self._fingerprint :
+            return
+
+        self._portfolios = list(portfolios)
+        self._fingerprint = fingerprint
+
+        self._index = sorted(
+
+            ((_normalize_name(portfolio.get("portfolioName")), portfolio.get("portfolioName")) for portfolio in portfolios),
+            key=lambda entry : entry[0]
+
+        )
+
+        self._keys = [key for key, _ in self._index]
+        self.rebuilds += 1
+
+
+_CATALOGUES : Dict[Hashable, PortfolioCatalogue] = {}
+_CATALOGUES_LOCK = threading.Lock()
+
+
+def get_portfolio_catalogue (host : Optional[str], endpoint : Optional[str]) -> PortfolioCatalogue :
+    """
+    Return the process wide catalogue of the portfolios of an ICE host (created on first use).
+    """
+    with _CATALOGUES_LOCK :
+
+        catalogue = _CATALOGUES.get((host, endpoint))
+
+        if catalogue is None :
+            catalogue = _CATALOGUES[(host, endpoint)] = PortfolioCatalogue()
+
+    return catalogue
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import threading
+
+from typing import Any, Dict, Hashable, Type, TypeVar
+
+# Facades (TradeManager, IceCalculator, IceData) built once per process and per host and
+# credentials : a Pricer asking for a TradeManager gets the existing one, already
+# authenticated, instead of a new login and a cold connection pool.
+
+C = TypeVar("C")
+
+_SHARED_CLIENTS : Dict[Hashable, Any] = {}
+_SHARED_CLIENTS_LOCK = threading.Lock()
+_KEY_LOCKS : Dict[Hashable, threading.Lock] = {}
+
+
+def get_shared_client (cls : Type[C], *args : Any, **kwargs : Any) -> C :
+    """
+    Return the process wide instance of a client class for some constructor arguments
+    (built on first use, once even if several threads ask for it at the same time).
+
+    Args:
+        cls (Type): Client class, e.g. TradeManager.
+        *args, **kwargs: Constructor arguments (host, auth URL, credentials...), hashable.
+
+    Returns:
+        The shared instance.
+    """
+    key = (cls, args, tuple(sorted(kwargs.items())))
+
+    with _SHARED_CLIENTS_LOCK :
+
+        client = _SHARED_CLIENTS.get(key)
+
+        if client is not None :
+            return client
+
+        key_lock = _KEY_LOCKS.setdefault(key, threading.Lock())
+
+    # Built outside the registry lock : building a client logs in
+    with key_lock :
+
+        client = _SHARED_CLIENTS.get(key)
+
+        if client is None :
+
+            client = cls(*args, **kwargs)
+
+            with _SHARED_CLIENTS_LOCK :
+                _SHARED_CLIENTS[key] = client
+
+    return client
+
+
+def clear_shared_clients () -> None :
+    """
+    Forget the shared clients (the next call builds new ones).
+    """
+    with _SHARED_CLIENTS_LOCK :
+
+        _SHARED_CLIENTS.clear()
+        _KEY_LOCKS.clear()
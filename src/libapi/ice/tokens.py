@@ -0,0 +1,478 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+import base64
+import hashlib
+import tempfile
+import threading
+import datetime as dt
+
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from libapi.config.parameters import LIBAPI_TOKEN_TTL, LIBAPI_TOKEN_REFRESH_MARGIN, LIBAPI_TOKEN_LOCK_TIMEOUT, LIBAPI_TOKEN_LOGIN_BACKOFF
+
+# One token per (authentication URL, username), shared by every client of the process
+# and, through the token cache file, by the processes of the machine. The token is kept
+# in memory and refreshed in background shortly before it expires. A login (first token,
+# refresh, or after a 401) is done by one thread of one process at a time : the others
+# wait for it and take its token, instead of each logging in on its own. The manager logs
+# in with the last login function which succeeded, and a login which failed is not tried
+# again for LIBAPI_TOKEN_LOGIN_BACKOFF seconds.
+
+# A login returns the new token, None on failure
+TokenLogin = Callable[[], Optional[str]]
+
+
+def token_expiry (token : str, default_ttl : Optional[float] = None, now : Optional[float] = None) -> float :
+    """
+    Expiry (epoch seconds) of a token : its "exp" claim for a JWT, else now + default_ttl.
+    """
+    now = time.time() if now is None else now
+    default_ttl = LIBAPI_TOKEN_TTL if default_ttl is None else default_ttl
+
+    parts = token.split(".")
+
+    if len(parts) == 3 :
+
+        try :
+
+            claims = json.loads(base64.urlsafe_b64decode(parts[1] + "=" * (-len(parts[1]) % 4)))
+            return float(claims["exp"])
+
+        except (ValueError, KeyError, TypeError) :
+            pass
+
+    return now + default_ttl
+
+
+class FileLock :
+    """
+    Lock between processes : a lock file created with O_EXCL, removed on release.
+
+    A lock file older than `stale_after` seconds is left by a dead process and is taken over.
+    """
+
+    def __init__ (self, path : str, timeout : Optional[float] = None, stale_after : Optional[float] = None, poll_interval : float = 0.05) -> None :
+
+        self.path = path
+        self.timeout = LIBAPI_TOKEN_LOCK_TIMEOUT if timeout is None else timeout
+        self.stale_after = self.timeout if stale_after is None else stale_after
+        self.poll_interval = poll_interval
+        self.acquired = False
+
+
+    def acquire (self) -> bool :
+        """
+        Returns:
+            bool: True if the lock is held, False after `timeout` seconds.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        deadline = time.monotonic() + self.timeout
+
+        while True :
+
+            try :
+
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode("ascii"))
+                os.close(fd)
+
+                self.acquired = True
+                return True
+
+            except FileExistsError :
+
+                try :
+
+                    if time.time() - os.path.getmtime(self.path) > self.stale_after :
+
+                        os.remove(self.path)
+                        continue
+
+                except OSError :
+                    continue # Released meanwhile
+
+            if time.monotonic() >= deadline :
+                return False
+
+            time.sleep(self.poll_interval)
+
+
+    def release (self) -> None :
+        """
+        Remove the lock file, only if this lock holds it (never the one of another process).
+        """
+        if not self.acquired :
+            return
+
+        self.acquired = False
+
+        try :
+            os.remove(self.path)
+
+        except OSError :
+            pass
+
+
+    def __enter__ (self) -> bool :
+        return self.acquire()
+
+
+    def __exit__ (self, *exc_info) -> None :
+        self.release()
+
+
+class TokenManager :
+    """
+    Lifecycle of the token of one user : cache file, background refresh, coalesced logins.
+    """
+
+    def __init__ (
+
+            self,
+            cache_path : Optional[str] = None,
+            login : Optional[TokenLogin] = None,
+            refresh_margin : Optional[float] = None,
+            default_ttl : Optional[float] = None,
+            background : bool = True,
+            auth_url : Optional[str] = None,
+            username : Optional[str] = None,
+            login_backoff : Optional[float] = None
+
+        ) -> None :
+        """
+        Args:
+            cache_path (str, optional): Token cache file shared by the processes (no file if None).
+            login (TokenLogin, optional): Logs in and returns a new token (see `set_login`).
+            refresh_margin (float, optional): Seconds before the expiry the token is refreshed. Defaults to LIBAPI_TOKEN_REFRESH_MARGIN.
+            default_ttl (float, optional): Lifetime of the tokens without expiry claim. Defaults to LIBAPI_TOKEN_TTL.
+            background (bool): Refresh the token in a background thread before it expires.
+            auth_url (str, optional): Authentication URL of the user, written in the cache file.
+            username (str, optional): User of the token, written in the cache file : a token
+                cached for another user (or URL) is never taken.
+            login_backoff (float, optional): Seconds before a failed login function is called again. Defaults to LIBAPI_TOKEN_LOGIN_BACKOFF.
+        """
+        self.cache_path = cache_path
+        self.auth_url = auth_url
+        self.username = username
+        self.refresh_margin = LIBAPI_TOKEN_REFRESH_MARGIN if refresh_margin is None else refresh_margin
+        self.default_ttl = LIBAPI_TOKEN_TTL if default_ttl is None else default_ttl
+        self.background = background
+        self.login_backoff = LIBAPI_TOKEN_LOGIN_BACKOFF if login_backoff is None else login_backoff
+
+        self.logins = 0
+
+        self._login = login
+        self._lock = threading.RLock()
+        self._token : Optional[str] = None
+        self._expires_at = 0.0
+        self._file_mtime : Optional[int] = None
+        self._timer : Optional[threading.Timer] = None
+
+        self._failed_login : Optional[TokenLogin] = None
+        self._failed_at = 0.0
+
+
+    def set_login (self, login : TokenLogin) -> None :
+        """
+        Give the login function if the manager has none yet. It is replaced by the login
+        function of any client whose login succeeds (see `get`).
+        """
+        with self._lock :
+
+            if self._login is None :
+                self._login = login
+
+
+    @property
+    def token (self) -> Optional[str] :
+        """
+        Token in memory, without any check.
+        """
+        return self._token
+
+
+    def get (self, login : Optional[TokenLogin] = None) -> Optional[str] :
+        """
+        A valid token : from memory, else from the cache file, else from a new login.
+
+        Args:
+            login (TokenLogin, optional): Login function of the caller, used instead of the
+                manager one if a login is needed, and kept by the manager if it succeeds.
+        """
+        if self._token is not None and time.time() < self._expires_at :
+            return self._token
+
+        with self._lock :
+
+            if self._token is not None and time.time() < self._expires_at :
+                return self._token
+
+            if self._load_file() :
+                return self._token
+
+            return self._refresh_locked(self._token, login)
+
+
+    def refresh (self, stale : Optional[str] = None) -> Optional[str] :
+        """
+        Log in again because `stale` is rejected (e.g. a 401). Concurrent calls for the same
+        stale token log in once : the later ones get the token of the first.
+
+        Returns:
+            str | None: New token, None if the login failed.
+        """
+        with self._lock :
+            return self._refresh_locked(stale)
+
+
+    def invalidate (self) -> None :
+
+        with self._lock :
+
+            self._token = None
+            self._expires_at = 0.0
+
+
+    def close (self) -> None :
+        """
+        Stop the background refresh.
+        """
+        with self._lock :
+
+            if self._timer is not None :
+
+                self._timer.cancel()
+                self._timer = None
+
+
+    def _refresh_locked (self, stale : Optional[str], login : Optional[TokenLogin] = None) -> Optional[str] :
+
+        # Already replaced by another thread
+        if self._token is not None and self._token != stale and time.time() < self._expires_at :
+            return self._token
+
+        if self._login is None and login is None :
+            raise RuntimeError("[-] No login function given to the token manager")
+
+        if self.cache_path is None :
+            return self._do_login(login)
+
+        with FileLock(self.cache_path + ".lock") as locked :
+
+            if not locked :
+                print("[!] Token lock file still held after the timeout, logging in anyway")
+
+            # Another process may have logged in while we were waiting for the lock
+            if self._load_file(force=True) and self._token != stale :
+                return self._token
+
+            return self._do_login(login)
+
+
+    def _do_login (self, login : Optional[TokenLogin] = None) -> Optional[str] :
+
+        login = self._login if login is None else login
+
+        # The same credentials were rejected a moment ago : do not hammer the endpoint
+        if login is self._failed_login and time.monotonic() < self._failed_at + self.login_backoff :
+
+            print(f"[!] Last login failed less than {self.login_backoff} seconds ago, not logging in again yet")
+            return None
+
+        token = login()
+        self.logins += 1
+
+        if not token :
+
+            self._failed_login = login
+            self._failed_at = time.monotonic()
+
+            return None
+
+        self._login = login
+        self._failed_login = None
+
+        self._set(token, token_expiry(token, self.default_ttl))
+
+        if self.cache_path is not None :
+            self._save_file()
+
+        return token
+
+
+    def _set (self, token : str, expires_at : float) -> None :
+
+        self._token = token
+        self._expires_at = expires_at
+        self._schedule()
+
+
+    def _schedule (self) -> None :
+        """
+        (Re)start the background refresh, `refresh_margin` seconds before the expiry.
+        """
+        if not self.background :
+            return
+
+        if self._timer is not None :
+            self._timer.cancel()
+
+        delay = max(self._expires_at - self.refresh_margin - time.time(), 1.0)
+
+        self._timer = threading.Timer(delay, self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+
+    def _background_refresh (self) -> None :
+
+        try :
+
+            with self._lock :
+
+                # Refreshed meanwhile (on demand or from the file of another process)
+                if self._expires_at - self.refresh_margin > time.time() :
+                    return
+
+                if self._refresh_locked(self._token) is None :
+                    raise RuntimeError("login failed")
+
+        except Exception as e :
+
+            print(f"[!] Background token refresh failed : {e}")
+
+            with self._lock :
+
+                # Tried again later while the current token is still valid
+                if self._token is not None and time.time() < self._expires_at :
+                    self._schedule()
+
+
+    def _load_file (self, force : bool = False) -> bool :
+        """
+        Take the token of the cache file if it is valid. The file is only parsed when it
+        changed since the last read (unless `force`).
+        """
+        if self.cache_path is None :
+            return False
+
+        try :
+            mtime = os.stat(self.cache_path).st_mtime_ns
+
+        except OSError :
+            return False
+
+        if not force and mtime == self._file_mtime :
+            return False
+
+        self._file_mtime = mtime
+
+        try :
+
+            with open(self.cache_path, "r", encoding="utf-8") as file :
+                data = json.load(file)
+
+        except (OSError, ValueError) as e :
+
+            print("[-] Error loading token from cache:", e)
+            return False
+
+        if data.get("auth_url") != self.auth_url or data.get("username") != self.username :
+            return False
+
+        token, expires_at = _token_from_cache(data)
+
+        if not token or time.time() >= expires_at - self.refresh_margin :
+            return False
+
+        self._set(token, expires_at)
+
+        return True
+
+
+    def _save_file (self) -> None :
+        """
+        Atomic write of the token (format of Client._save_token_to_cache, with the expiry and the user).
+        """
+        data = {
+
+            "token" : self._token,
+            "auth_url" : self.auth_url,
+            "username" : self.username,
+            "timestamp" : dt.datetime.now().isoformat(),
+            "expiration" : max(int(self._expires_at - time.time()), 0),
+            "expires_at" : self._expires_at
+
+        }
+
+        try :
+
+            directory = os.path.dirname(os.path.abspath(self.cache_path))
+            os.makedirs(directory, exist_ok=True)
+
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-token-")
+
+            with os.fdopen(fd, "w", encoding="utf-8") as file :
+                json.dump(data, file)
+
+            os.replace(tmp_path, self.cache_path)
+            self._file_mtime = os.stat(self.cache_path).st_mtime_ns
+
+        except OSError as e :
+
+            print("[-] Error saving token to cache: ", e)
+
+
+def _token_from_cache (data : Dict) -> Tuple[Optional[str], float] :
+    """
+    (token, expiry) of a cache file, written by the manager or by older versions.
+    """
+    token = data.get("token")
+
+    if data.get("expires_at") is not None :
+        return token, float(data["expires_at"])
+
+    try :
+        timestamp = dt.datetime.fromisoformat(data.get("timestamp")).timestamp()
+
+    except (TypeError, ValueError) :
+        return None, 0.0
+
+    return token, timestamp + float(data.get("expiration", 0))
+
+
+_TOKEN_MANAGERS : Dict[Hashable, TokenManager] = {}
+_TOKEN_MANAGERS_LOCK = threading.Lock()
+
+
+def user_token_cache_path (cache_path : str, auth_url : str, username : Optional[str]) -> str :
+    """
+    Token cache file of a user : `cache_path` suffixed by a hash of the user and URL.
+    """
+    root, extension = os.path.splitext(cache_path)
+    user_hash = hashlib.sha1(f"{auth_url}|{username}".encode("utf-8")).hexdigest()[:12]
+
+    return f"{root}-{user_hash}{extension}"
+
+
+def get_token_manager (auth_url : str, username : Optional[str], cache_path : Optional[str] = None) -> TokenManager :
+    """
+    Return the process wide token manager of a user (created on first use).
+
+    Each user gets its own cache file (see `user_token_cache_path`).
+    """
+    key = (auth_url, username)
+
+    with _TOKEN_MANAGERS_LOCK :
+
+        manager = _TOKEN_MANAGERS.get(key)
+
+        if manager is None :
+
+            user_cache_path = user_token_cache_path(cache_path, auth_url, username) if cache_path is not None else None
+            manager = _TOKEN_MANAGERS[key] = TokenManager(user_cache_path, auth_url=auth_url, username=username)
+
+    return manager
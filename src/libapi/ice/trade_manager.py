@@ -1,17 +1,26 @@
 from __future__ import annotations
 
+import time
 import polars as pl
 import datetime as dt
 
-from typing import Optional, Dict, List
+from typing import Any, Callable, Iterator, Optional, Dict, List, Sequence, Tuple
 
 from libapi.config.parameters import (
     ICE_HOST, ICE_AUTH, ICE_USERNAME, ICE_PASSWORD, # ICE credentials
     ICE_URL_SEARCH_TRADES, ICE_URL_GET_TRADES, ICE_URL_TRADES_ADD, ICE_URL_GET_PORTFOLIOS, # Endpoints
     ICE_URL_INVOKE_LTAS, ICE_URL_SEARCH_LTAS, ICE_URL_GET_RESULTS_LTAS, ICE_URL_GET_AUDIT_TRAIL,
+    ICE_SEARCH_BOOKS_PER_REQUEST, ICE_SEARCH_VALUES_PER_REQUEST, ICE_TRADE_IDS_PER_REQUEST, ICE_SEARCH_MAX_IN_FLIGHT, # Fan-out
     BANK_COUNTERPARTY_NAME, BOOK_NAMES_HV_LIST_SUBSET_N1, BOOK_NAMES_HV_LIST_ALL # Names (banks, books, etc)
 )
-from libapi.ice.client import Client
+from libapi.ice.client import Client, is_success_status
+from libapi.ice.transport import get_shared_session
+from libapi.ice.audit import AuditTrailSync
+from libapi.ice.portfolios import PortfolioCatalogue, get_portfolio_catalogue
+from libapi.ice.booking import BookingLedger, book_units
+from libapi.ice.fanout import SearchPiece, plan_trade_search, iter_unique_trade_legs, merge_trade_legs_responses, checked_trade_legs_response
+from libapi.utils.concurrency import split_in_chunks, run_batches, iter_batches
+from libapi.utils.jsonstream import project_fields
 from libapi.utils.formatter import date_to_str, datetime_to_str
 
 
@@ -39,7 +48,8 @@ class TradeManager (Client) :
         ice_username = ICE_USERNAME if ice_username is None else ice_username
         ice_password = ICE_PASSWORD if ice_password is None else ice_password
 
-        super().__init__(ice_host, ice_auth)
+        # Clients of the same host and user share the connection pool (and the token)
+        super().__init__(ice_host, ice_auth, session=get_shared_session(ice_host, ice_username))
         self.authenticate(ice_username, ice_password)
 
 
@@ -75,6 +85,8 @@ class TradeManager (Client) :
         """
         Returns all trades from selected books / Portfolios
 
+        Large lists of books are searched by chunks at the same time (see `search_trades`).
+
         Args:
             books (List[str] | str) : Name of books / portfolios
             type (str) : Type of query, it refers to find any value that could match (cf. API doc)
@@ -89,29 +101,7 @@ class TradeManager (Client) :
             print("\n[-] None or void name for the book.")
             return None
 
-        endpoint = ICE_URL_SEARCH_TRADES if endpoint is None else endpoint
-        books = [books] if isinstance(books, str) else books
-
-        payload = {
-
-            "query" : {
-
-                "type" : type,
-                "field" : field,
-                "values" : books  
-
-            }
-            
-        }
-
-        response = self.post(
-
-            endpoint=endpoint,
-            json=payload
-
-        )
-
-        return response
+        return self.search_trades(books, None, None, type=type, field_book=field, endpoint=endpoint)
 
 
     def get_trades_from_books_by_date (
@@ -130,173 +120,243 @@ class TradeManager (Client) :
         
         """
         dates = [date_to_str(date) for date in dates] if isinstance(dates, list) else [date_to_str(dates)]
-        endpoint = ICE_URL_SEARCH_TRADES if endpoint is None else endpoint
-        books = [books] if isinstance(books, str) else (None if not isinstance(books, list) else books)
 
-        trade_date_query = {
+        return self.search_trades(books, dates, field_trade, query_type, type, field_book, endpoint)
 
-            "type" : type,
-            "field" : field_trade,
-            "values" : dates
 
-        }
-
-        book_names_query = {
+    def get_trades_from_books_by_creation_time (
+            
+            self,
+            books : List[str] | str,
+            dates : Optional[List[str | dt.datetime]] = None,
+            query_type : str = "And",
+            type : str = "In",
+            field_trade : str = "CreationTime",
+            field_book : str = "Book",
+            endpoint : Optional[str] = None
+        
+        ) -> Optional[Dict] :
+        """
+        
+        """
+        dates = [date_to_str(date) for date in dates] if isinstance(dates, list) else [date_to_str(dates)]
 
-            "type" : type,
-            "field" : field_book,
-            "values" : books
+        return self.search_trades(books, dates, field_trade, query_type, type, field_book, endpoint)
+    
 
-        }
+    def get_trades_from_books_by_trade_ids (
+            
+            self,
+            books : List[str] | str,
+            trade_ids : Optional[List[str | dt.datetime]] = None,
+            query_type : str = "And",
+            type : str = "In",
+            field_trade : str = "tradeId",
+            field_book : str = "Book",
+            endpoint : Optional[str] = None
+        
+        ) -> Optional[Dict] :
+        """
+        
+        """
+        #dates = [date_to_str(date) for date in dates] if isinstance(dates, list) else [date_to_str(dates)]
+        trade_ids = [str(trade_id) for trade_id in trade_ids]
 
-        payload = {
+        return self.search_trades(books, trade_ids, field_trade, query_type, type, field_book, endpoint)
+    
 
-            "query" : {
+    def search_trades (
 
-                "type" : query_type,
-                "queries" : [
+            self,
+            books : List[str] | str,
+            values : Optional[List] = None,
+            field_trade : Optional[str] = None,
+            query_type : str = "And",
+            type : str = "In",
+            field_book : str = "Book",
+            endpoint : Optional[str] = None,
+            books_per_request : Optional[int] = None,
+            values_per_request : Optional[int] = None,
+            max_in_flight : Optional[int] = None,
 
-                    trade_date_query,
-                    book_names_query
+        ) -> Optional[Dict] :
+        """
+        Search the trades of books, optionally filtered on another field.
 
-                ]
+        The search is split by books and values chunks (see libapi.ice.fanout), the pieces
+        are sent at the same time and their trade legs merged, each `tradeLegId` once.
 
-            }
-            
-        }
+        Args:
+            books (List[str] | str): Name of books / portfolios.
+            values (List, optional): Values matched against `field_trade`, None to search on the books only.
+            field_trade (str, optional): Field of the second filter (e.g. "TradeDate").
+            query_type (str): How both filters are combined.
+            type (str): Type of each sub query (cf. API doc).
+            field_book (str): Field used for the books filter.
+            endpoint (str, optional): Defaults to ICE_URL_SEARCH_TRADES.
+            books_per_request (int, optional): Defaults to ICE_SEARCH_BOOKS_PER_REQUEST.
+            values_per_request (int, optional): Defaults to ICE_SEARCH_VALUES_PER_REQUEST.
+            max_in_flight (int, optional): Defaults to ICE_SEARCH_MAX_IN_FLIGHT.
 
-        response = self.post(
-            
-            endpoint=endpoint,
-            json=payload
+        Returns:
+            Dict | None: Search response (the raw one when there is a single piece), None if a piece failed.
+        """
+        pieces, search = self._trade_search_pieces(books, values, field_trade, query_type, type, field_book, endpoint, books_per_request, values_per_request)
 
-        )
+        return self._fan_out(pieces, search, max_in_flight, "trade searches")
 
-        return response
 
+    def iter_trade_legs_from_books (
 
-    def get_trades_from_books_by_creation_time (
-            
             self,
             books : List[str] | str,
-            dates : Optional[List[str | dt.datetime]] = None,
+            values : Optional[List] = None,
+            field_trade : Optional[str] = None,
             query_type : str = "And",
             type : str = "In",
-            field_trade : str = "CreationTime",
             field_book : str = "Book",
-            endpoint : Optional[str] = None
-        
-        ) -> Optional[Dict] :
+            endpoint : Optional[str] = None,
+            books_per_request : Optional[int] = None,
+            values_per_request : Optional[int] = None,
+            max_in_flight : Optional[int] = None,
+
+        ) -> Iterator[Dict] :
         """
-        
+        Streaming version of `search_trades` : trade legs are yielded as soon as their
+        piece is received (in completion order), each `tradeLegId` once.
+
+        Raises:
+            RuntimeError: If a piece failed.
+        """
+        pieces, search = self._trade_search_pieces(books, values, field_trade, query_type, type, field_book, endpoint, books_per_request, values_per_request)
+
+        yield from self._iter_fan_out(pieces, search, max_in_flight, "trade searches")
+
+
+    def _trade_search_pieces (
+
+            self,
+            books : List[str] | str,
+            values : Optional[List],
+            field_trade : Optional[str],
+            query_type : str,
+            type : str,
+            field_book : str,
+            endpoint : Optional[str],
+            books_per_request : Optional[int],
+            values_per_request : Optional[int]
+
+        ) -> Tuple[List[SearchPiece], Callable[[SearchPiece], Optional[Dict]]] :
+        """
+        Pieces of a trade search, and the function sending one of them.
         """
-        dates = [date_to_str(date) for date in dates] if isinstance(dates, list) else [date_to_str(dates)]
         endpoint = ICE_URL_SEARCH_TRADES if endpoint is None else endpoint
-        books = [books] if isinstance(books, str) else (None if not isinstance(books, list) else books)
+        books_per_request = ICE_SEARCH_BOOKS_PER_REQUEST if books_per_request is None else books_per_request
+        values_per_request = ICE_SEARCH_VALUES_PER_REQUEST if values_per_request is None else values_per_request
 
-        trade_date_query = {
+        pieces = plan_trade_search(books, values, books_per_request, values_per_request)
 
-            "type" : type,
-            "field" : field_trade,
-            "values" : dates
+        def search (piece : SearchPiece) -> Optional[Dict] :
 
-        }
+            books_chunk, values_chunk = piece
 
-        book_names_query = {
+            if values_chunk is None :
+                payload = self.generate_books_query_payload(books_chunk, type, field_book)
 
-            "type" : type,
-            "field" : field_book,
-            "values" : books
+            else :
+                payload = self.generate_books_and_field_query_payload(books_chunk, values_chunk, field_trade, query_type, type, field_book)
 
-        }
+            return checked_trade_legs_response(*self.post_with_status(endpoint=endpoint, json=payload))
 
-        payload = {
+        return pieces, search
 
-            "query" : {
 
-                "type" : query_type,
-                "queries" : [
+    def _info_trades_chunks (
 
-                    trade_date_query,
-                    book_names_query
+            self,
+            trade_ids : List,
+            include_trade_fields : bool,
+            endpoint : Optional[str],
+            ids_per_request : Optional[int]
 
-                ]
+        ) -> Tuple[List[List], Callable[[List], Optional[Dict]]] :
+        """
+        Chunks of trade leg IDs, and the function requesting the info of one of them.
+        """
+        endpoint = ICE_URL_GET_TRADES if endpoint is None else endpoint
+        ids_per_request = ICE_TRADE_IDS_PER_REQUEST if ids_per_request is None else ids_per_request
+
+        # An empty list is still sent once, as before the fan-out
+        chunks = [list(chunk) for chunk in split_in_chunks(list(trade_ids), ids_per_request)] or [[]]
+
+        def fetch (chunk : List) -> Optional[Dict] :
+
+            payload = {
+
+                "includeTradeFields": include_trade_fields,
+                "tradeLegIds": chunk
 
             }
-            
-        }
 
-        response = self.post(
-            
-            endpoint=endpoint,
-            json=payload
+            return checked_trade_legs_response(*self.post_with_status(endpoint=endpoint, json=payload))
 
-        )
+        return chunks, fetch
 
-        return response
-    
 
-    def get_trades_from_books_by_trade_ids (
-            
+    def _fan_out (
+
             self,
-            books : List[str] | str,
-            trade_ids : Optional[List[str | dt.datetime]] = None,
-            query_type : str = "And",
-            type : str = "In",
-            field_trade : str = "tradeId",
-            field_book : str = "Book",
-            endpoint : Optional[str] = None
-        
+            pieces : Sequence[Any],
+            function : Callable[[Any], Optional[Dict]],
+            max_in_flight : Optional[int],
+            label : str
+
         ) -> Optional[Dict] :
         """
-        
+        Send the pieces at the same time and merge their trade legs (None if one failed).
         """
-        #dates = [date_to_str(date) for date in dates] if isinstance(dates, list) else [date_to_str(dates)]
-        trade_ids = [str(trade_id) for trade_id in trade_ids]
-        endpoint = ICE_URL_SEARCH_TRADES if endpoint is None else endpoint
-        books = [books] if isinstance(books, str) else (None if not isinstance(books, list) else books)
+        if not pieces :
+            return merge_trade_legs_responses([])
 
-        trade_date_query = {
+        if len(pieces) == 1 :
+            return function(pieces[0])
 
-            "type" : type,
-            "field" : field_trade,
-            "values" : trade_ids
+        max_in_flight = ICE_SEARCH_MAX_IN_FLIGHT if max_in_flight is None else max_in_flight
 
-        }
+        # The transport already retries the failed HTTP calls
+        responses = run_batches(pieces, function, max_in_flight, max_retries=0)
+        failed = sum(response is None for response in responses)
 
-        book_names_query = {
+        if failed :
 
-            "type" : type,
-            "field" : field_book,
-            "values" : books
+            print(f"[-] {failed} / {len(pieces)} {label} failed")
+            return None
 
-        }
+        return merge_trade_legs_responses(responses)
 
-        payload = {
 
-            "query" : {
+    def _iter_fan_out (
 
-                "type" : query_type,
-                "queries" : [
+            self,
+            pieces : Sequence[Any],
+            function : Callable[[Any], Optional[Dict]],
+            max_in_flight : Optional[int],
+            label : str
 
-                    trade_date_query,
-                    book_names_query
+        ) -> Iterator[Dict] :
+        """
+        Send the pieces at the same time and stream their unique trade legs.
+        """
+        max_in_flight = ICE_SEARCH_MAX_IN_FLIGHT if max_in_flight is None else max_in_flight
+        seen = set()
 
-                ]
+        for i, response in iter_batches(pieces, function, max_in_flight, max_retries=0) :
 
-            }
-            
-        }
-
-        response = self.post(
-            
-            endpoint=endpoint,
-            json=payload
+            if response is None :
+                raise RuntimeError(f"[-] Error during the {label} (piece {i + 1} / {len(pieces)})")
 
-        )
+            yield from iter_unique_trade_legs([response], seen=seen)
 
-        return response
-    
 
     def get_info_trades_from_ids (
         
@@ -304,36 +364,51 @@ class TradeManager (Client) :
             trade_ids : List,
             include_trade_fields : bool = True,
             endpoint : Optional[str] = None,
+            ids_per_request : Optional[int] = None,
+            max_in_flight : Optional[int] = None,
         
         ) -> Optional[Dict] :
         """
         Get information about specific trades.
 
+        The IDs are sent by chunks of `ids_per_request`, at the same time, and the trade
+        legs of the chunks merged into one response.
+
         Parameters:
             trade_ids (list) : List of trade IDs.
+            ids_per_request (int, optional) : IDs per request. Defaults to ICE_TRADE_IDS_PER_REQUEST.
+            max_in_flight (int, optional) : Requests sent at the same time. Defaults to ICE_SEARCH_MAX_IN_FLIGHT.
 
         Returns:
-            dict : Information about the specified trades.
+            dict : Information about the specified trades (None if a chunk failed).
         """
-        endpoint = ICE_URL_GET_TRADES if endpoint is None else endpoint
+        chunks, fetch = self._info_trades_chunks(trade_ids, include_trade_fields, endpoint, ids_per_request)
 
-        payload = {
-
-            "includeTradeFields": include_trade_fields,
-            "tradeLegIds": trade_ids
-
-        }
+        # Format of the response
+        # response : Dict = { "TradeLegs" : List[Dict[str, Any]] , "RequestId" : str , "status" : str }
+        return self._fan_out(chunks, fetch, max_in_flight, "trade info requests")
 
-        response : Dict = self.post(
 
-            endpoint=endpoint,
-            json=payload
+    def iter_info_trades_from_ids (
+        
+            self,
+            trade_ids : List,
+            include_trade_fields : bool = True,
+            endpoint : Optional[str] = None,
+            ids_per_request : Optional[int] = None,
+            max_in_flight : Optional[int] = None,
+        
+        ) -> Iterator[Dict] :
+        """
+        Streaming version of `get_info_trades_from_ids` : trade legs are yielded as soon
+        as their chunk is received (in completion order), each `tradeLegId` once.
 
-        )
+        Raises:
+            RuntimeError: If a chunk failed.
+        """
+        chunks, fetch = self._info_trades_chunks(trade_ids, include_trade_fields, endpoint, ids_per_request)
 
-        # Format of the response
-        # response : Dict = { "TradeLegs" : List[Dict[str, Any]] , "RequestId" : str , "status" : str }
-        return response
+        yield from self._iter_fan_out(chunks, fetch, max_in_flight, "trade info requests")
 
 
     def get_info_trades_from_books (
@@ -397,42 +472,136 @@ class TradeManager (Client) :
         endpoint = ICE_URL_SEARCH_TRADES if endpoint is None else endpoint
         book = BOOK_NAMES_HV_LIST_SUBSET_N1[0] if book is None else book
 
-        # Format of the response
-        # response = List[Dict[str, Any]] where each Dict[str, Any] is a TradeLeg information
-        response = self.get_trades_from_books(book, type, field,  endpoint)
-        
-        import time
         start = time.time()
-        
-        if response is None :
-            raise RuntimeError("[-] Error during the GET request for trades")
 
-        trade_legs = response.get("tradeLegs")
-        trade_ids = [trade['tradeLegId'] for trade in trade_legs]
+        # Only the ticker of each trade leg is kept, legs are dropped as they are parsed
+        ticker_field = "instrument.underlyingAsset.sdTicker"
+        sdtickers = set()
 
-        infos = self.get_info_trades_from_ids(trade_ids)
+        for trade_leg in self.iter_info_trades_from_books(book, [ticker_field], type, field, endpoint) :
 
-        sdtickers = set()
-        list_trades_lists : List[Dict] = infos.get("tradeLegs", [])
+            ticker = trade_leg[ticker_field]
+
+            if ticker and isinstance(ticker, str) :
+                sdtickers.add(ticker)
+
+        print(f"[*] Operation done in {time.time() - start} seconds")
+
+        return list(sdtickers)
+
+
+    def iter_trade_legs_info (
+
+            self,
+            trade_ids : List,
+            fields : Optional[Sequence[str]] = None,
+            include_trade_fields : bool = True,
+            endpoint : Optional[str] = None,
+            page_size : Optional[int] = None,
+
+        ) -> Iterator[Dict] :
+        """
+        Stream the information of trade legs, page by page.
+
+        Each page of `page_size` IDs is one request, its trade legs are decoded while the
+        response is received and only the `fields` requested are kept : neither the full
+        response nor the unused fields are ever held in memory.
+
+        Args:
+            trade_ids (List): Trade leg IDs (duplicates are requested once).
+            fields (Sequence[str], optional): Paths kept, nested ones as "parent.child" (e.g. "instrument.underlyingAsset.sdTicker"). None keeps the whole trade legs.
+            include_trade_fields (bool): Ask the API for the trade fields.
+            endpoint (str, optional): Defaults to ICE_URL_GET_TRADES.
+            page_size (int, optional): IDs per request. Defaults to ICE_TRADE_IDS_PER_REQUEST.
+
+        Returns:
+            Iterator[Dict]: Trade legs (or their projection), page after page.
+
+        Raises:
+            RuntimeError: If a request failed.
+        """
+        endpoint = ICE_URL_GET_TRADES if endpoint is None else endpoint
+        page_size = ICE_TRADE_IDS_PER_REQUEST if page_size is None else page_size
+
+        for page in split_in_chunks(list(dict.fromkeys(trade_ids)), page_size) :
+
+            payload = {
+
+                "includeTradeFields": include_trade_fields,
+                "tradeLegIds": page
+
+            }
+
+            for trade_leg in self.iter_post_items(endpoint, "tradeLegs", json=payload) :
+                yield project_fields(trade_leg, fields)
+
+
+    def iter_info_trades_from_books (
+
+            self,
+            books : List[str] | str,
+            fields : Optional[Sequence[str]] = None,
+            type : str = "In",
+            field : str = "Book",
+            endpoint : Optional[str] = None,
+            page_size : Optional[int] = None,
+
+        ) -> Iterator[Dict] :
+        """
+        Streaming version of `get_info_trades_from_books` (see `iter_trade_legs_info`).
+
+        Args:
+            books (List[str] | str): Name of books / portfolios.
+            fields (Sequence[str], optional): Paths kept from each trade leg, None keeps everything.
+            type (str): Type of query of the search.
+            field (str): Field of the books in the search.
+            endpoint (str, optional): Search endpoint. Defaults to ICE_URL_SEARCH_TRADES.
+            page_size (int, optional): IDs per info request. Defaults to ICE_TRADE_IDS_PER_REQUEST.
+
+        Returns:
+            Iterator[Dict]: Trade legs (or their projection).
+        """
+        trade_ids = [trade_leg["tradeLegId"] for trade_leg in self.iter_trade_legs_from_books(books, type=type, field_book=field, endpoint=endpoint)]
+
+        yield from self.iter_trade_legs_info(trade_ids, fields, page_size=page_size)
+
+
+    def iter_info_trade_batches_from_books (
+
+            self,
+            books : List[str] | str,
+            fields : Optional[Sequence[str]] = None,
+            batch_size : Optional[int] = None,
+            type : str = "In",
+            field : str = "Book",
+            endpoint : Optional[str] = None,
+
+        ) -> Iterator[pl.DataFrame] :
+        """
+        Stream the trade legs of books as DataFrames of at most `batch_size` rows.
+
+        Args:
+            books (List[str] | str): Name of books / portfolios.
+            fields (Sequence[str], optional): Columns (paths kept from each trade leg), None keeps everything.
+            batch_size (int, optional): Rows per DataFrame (and IDs per request). Defaults to ICE_TRADE_IDS_PER_REQUEST.
 
-        for trade in list_trades_lists :
-            
-            instrument = trade.get("instrument", {})
+        Returns:
+            Iterator[pl.DataFrame]: Record batches, one column per field.
+        """
+        batch_size = ICE_TRADE_IDS_PER_REQUEST if batch_size is None else batch_size
+        batch = []
 
-            try :
-                
-                ticker = instrument.get("underlyingAsset", {}).get("sdTicker")
+        for trade_leg in self.iter_info_trades_from_books(books, fields, type, field, endpoint, page_size=batch_size) :
 
-                if ticker :
-                    sdtickers.add(ticker)
+            batch.append(trade_leg)
 
-            except :
+            if len(batch) == batch_size :
 
-                continue # skip malformed or imcomplete entries
-        
-        print(f"[*] Operation done in {time.time() - start} seconds")
+                yield pl.from_dicts(batch, infer_schema_length=None)
+                batch = []
 
-        return list(sdtickers)
+        if batch :
+            yield pl.from_dicts(batch, infer_schema_length=None)
     
 
     def get_all_existing_portfolios_raw (self, endpoint : Optional[str] = None) -> Optional[List[Dict]] :
@@ -444,19 +613,27 @@ class TradeManager (Client) :
 
         Returns:
             Optional[List[Dict]]: A list of portfolio objects as dictionaries, each containing fields such as "portfolioName", "portfolioId", etc. 
+                None if the request failed (non 2xx answer or no "portfolios" list).
         """
         endpoint = ICE_URL_GET_PORTFOLIOS if endpoint is None else endpoint
 
         # Format
         # response := { "portfolios" : List[Dict[str, Any]] , "requestId" : str , "status" : str }
-        response = self.get(
+        status, response = self.get_with_status(
 
             endpoint=endpoint,
             json={}
 
         )
 
-        portfolios : List[Dict] = response.get("portfolios", [])
+        # An error body must not be cached as an empty catalogue for the whole TTL
+        if not is_success_status(status) or not isinstance(response, dict) :
+            return None
+
+        portfolios = response.get("portfolios")
+
+        if not isinstance(portfolios, list) :
+            return None
 
         return portfolios
     
@@ -500,25 +677,51 @@ class TradeManager (Client) :
         return self.get_all_specific_portfolios_names("WR", endpoint=endpoint)
         
 
-    def get_all_specific_portfolios_names (self, prefix : Optional[str] = "HV", endpoint : Optional[str] = None) :
+    def get_all_specific_portfolios_names (self, prefix : Optional[str] = "HV", endpoint : Optional[str] = None, refresh : bool = False) :
         """
         Retrieve all existing portfolios whose names start with a given prefix.
 
+        The portfolios list is shared by the process and downloaded at most once per
+        ICE_PORTFOLIOS_TTL (see libapi.ice.portfolios.PortfolioCatalogue).
+
         Args:
             prefix (Optional[str], default="HV"): String prefix to filter portfolio names. If None or empty string, returns all portfolio names.
             endpoint (Optional[str], default=None): API endpoint to query. If None, uses the default ICE_URL_GET_PORTFOLIOS constant.
+            refresh (bool, default=False): Download the portfolios list again, whatever its TTL.
 
         Returns:
             Optional[List[str]]: A list of portfolio names matching the prefix filter.
         """
         endpoint = ICE_URL_GET_PORTFOLIOS if endpoint is None else endpoint
 
-        response = self.get_all_existing_portfolios_raw(endpoint)
+        return self.portfolio_catalogue(endpoint).names(lambda : self.get_all_existing_portfolios_raw(endpoint), prefix, refresh)
+
+
+    def portfolio_catalogue (self, endpoint : Optional[str] = None) -> PortfolioCatalogue :
+        """
+        Process wide portfolios catalogue of the ICE host of this client.
+        """
+        endpoint = ICE_URL_GET_PORTFOLIOS if endpoint is None else endpoint
+
+        return get_portfolio_catalogue(getattr(self, "api_host", None), endpoint)
+
+
+    def filter_portfolios_names (self, portfolios : List[Dict], prefix : Optional[str] = "HV") -> List[str] :
+        """
+        Keep the unique names of the portfolios starting with a given prefix (case insensitive).
+
+        Args:
+            portfolios (List[Dict]): Raw portfolios, as returned by get_all_existing_portfolios_raw.
+            prefix (Optional[str], default="HV"): Prefix filter. If None or empty string, keeps every name.
+
+        Returns:
+            List[str]: Portfolio names matching the prefix filter.
+        """
         names = set()
 
         formated_prefix = str(prefix).upper().strip() if prefix else None
 
-        for _, portfolio in enumerate(response) :
+        for _, portfolio in enumerate(portfolios) :
             
             name = portfolio.get("portfolioName")
 
@@ -556,45 +759,67 @@ class TradeManager (Client) :
         Returns:
             Optional[Dict]: A dictionary containing the audit trail information for the specified trade, or None if retrieval fails.
         """
-        endpoint = ICE_URL_GET_AUDIT_TRAIL if endpoint is None else endpoint
-        books = BOOK_NAMES_HV_LIST_ALL if books is None else books
-        actions = ["Insert", "Update", "Delete", "LTAs"] if actions is None else actions
+        return self.get_audit_trails_with_status(from_date, to_date, actions, books, show_changes_from_inception, endpoint)[1]
 
-        payload = {
 
-            "actions": actions,
-            "showChangesFromInception": show_changes_from_inception
+    def get_audit_trails_with_status (
+            
+            self,
 
-        }
+            from_date : Optional[str | dt.date | dt.datetime] = None,
+            to_date : Optional[str | dt.date | dt.datetime] = None,
 
-        # Dates
-        if from_date :
-            payload["fromDateTimeUtc"] = datetime_to_str(from_date)
-        
-        if to_date :
-            payload["toDateTimeUtc"] = datetime_to_str(to_date)
-    
+            actions : Optional[List[str]] = None,
+            books : Optional[List[str]] = None,
 
-        if books :
-                
-            # Filter by books
-            books = [books] if isinstance(books, str) else books
-            
-            payload["tradesQuery"] = {
-                "type": "in",
-                "field": "Book",
-                "values": books
-            }
+            show_changes_from_inception : bool = False,
+            endpoint : Optional[str] = None
+        
+        ) -> Tuple[Optional[int], Optional[Dict]] :
+        """
+        `get_audit_trails` keeping the HTTP status of the answer.
 
+        Returns:
+            Tuple[int | None, Dict | None]: HTTP status (None if no answer) and audit trail response
+            (the error body for a 4xx / 5xx answer).
+        """
+        endpoint = ICE_URL_GET_AUDIT_TRAIL if endpoint is None else endpoint
+        payload = self.generate_audit_trail_payload(from_date, to_date, actions, books, show_changes_from_inception)
 
-        response : Dict = self.post(
+        return self.post_with_status(
 
             endpoint=endpoint,
             json=payload
 
         )
 
-        return response
+
+    def sync_audit_trails (
+
+            self,
+            until : Optional[str | dt.date | dt.datetime] = None,
+            actions : Optional[List[str]] = None,
+            books : Optional[List[str]] = None,
+            dir_abs_path : Optional[str] = None,
+            since : Optional[str | dt.date | dt.datetime] = None
+
+        ) -> pl.DataFrame :
+        """
+        Incremental version of `get_audit_trails` : only the events after the last sync of
+        the same books and actions are requested (window by window), and appended to the
+        local audit log (see libapi.ice.audit.AuditTrailSync).
+
+        Args:
+            until (str | date | datetime, optional): End of the sync (UTC). Defaults to now.
+            actions (List[str], optional): Audited actions. Defaults to Insert, Update, Delete and LTAs.
+            books (List[str], optional): Books filter. Defaults to BOOK_NAMES_HV_LIST_ALL.
+            dir_abs_path (str, optional): Root of the audit logs. Defaults to LIBAPI_CACHE_AUDIT_DIR_PATH.
+            since (str | date | datetime, optional): Start of the very first sync.
+
+        Returns:
+            pl.DataFrame: New events only (read the whole log with `AuditTrailSync.scan`).
+        """
+        return AuditTrailSync(self, books, actions, dir_abs_path).sync(until, since)
 
 
     # -------------------------------------------- Booking operations --------------------------------------------  TODO
@@ -620,7 +845,7 @@ class TradeManager (Client) :
         response = self.post(
 
             endpoint=endpoint,
-            data={
+            json={
                 
                 "trades" : [payload]
             
@@ -647,19 +872,14 @@ class TradeManager (Client) :
         """
         
         """
-        date = date_to_str(date)
-        bank = BANK_COUNTERPARTY_NAME if bank is None else bank
         endpoint = ICE_URL_TRADES_ADD if endpoint is None else endpoint
 
-        payload_bn = self.generate_cash_trade_payload(currency, date, bank if direction == "Pay" else counterparty, notional, book, pay_recv="Pay")
-        payload_cp = self.generate_cash_trade_payload(currency, date, counterparty if direction == "Pay" else bank, notional, book)
-
         response = self.post(
 
             endpoint=endpoint,
             json={
 
-                "trades" : [payload_bn, payload_cp]
+                "trades" : self.generate_margin_call_payloads(currency, date, notional, book, counterparty, direction, bank)
 
             }
 
@@ -667,6 +887,99 @@ class TradeManager (Client) :
 
         return response
 
+
+    def book_trades (
+
+            self,
+            trades : Sequence[Dict | Sequence[Dict]],
+            creation_trade_function : Optional[Callable[[Dict], Dict]] = None,
+            batch_size : Optional[int] = None,
+            max_in_flight : Optional[int] = None,
+            ledger : Optional[BookingLedger] = None,
+            endpoint : Optional[str] = None
+
+        ) -> pl.DataFrame :
+        """
+        Bulk booking : trades are posted by batches, several batches at a time, and each
+        trade is booked at most once whatever the retries (see libapi.ice.booking).
+
+        Args:
+            trades (Sequence): Trades, or lists of trades booked together (e.g. both legs of a margin call).
+            creation_trade_function (Callable, optional): Builds the payload of a raw trade (as in `post_trade`).
+                None if the trades are already payloads.
+            batch_size (int, optional): Trades (or lists) per request. Defaults to ICE_BOOKING_BATCH_SIZE.
+            max_in_flight (int, optional): Requests sent at the same time. Defaults to ICE_BOOKING_MAX_IN_FLIGHT.
+            ledger (BookingLedger, optional): Idempotency keys ledger. Defaults to the process wide one.
+            endpoint (str, optional): Defaults to ICE_URL_TRADES_ADD.
+
+        Returns:
+            pl.DataFrame: Status of each trade (or list) : index, key, batch, n_trades, status, message.
+        """
+        endpoint = ICE_URL_TRADES_ADD if endpoint is None else endpoint
+        units = []
+
+        for trade in trades :
+
+            unit = [trade] if isinstance(trade, dict) else list(trade)
+            units.append([creation_trade_function(payload) for payload in unit] if creation_trade_function is not None else unit)
+
+        def post_batch (batch : List[Dict]) -> Tuple[Optional[int], Optional[Dict]] :
+            return self.post_with_status(endpoint=endpoint, json={ "trades" : batch })
+
+        return book_units(units, post_batch, batch_size, max_in_flight, ledger)
+
+
+    def book_cash_legs (
+
+            self,
+            cash_legs : Sequence[Dict] | pl.DataFrame,
+            batch_size : Optional[int] = None,
+            max_in_flight : Optional[int] = None,
+            ledger : Optional[BookingLedger] = None,
+            endpoint : Optional[str] = None
+
+        ) -> pl.DataFrame :
+        """
+        Bulk version of `post_cash_leg`.
+
+        Args:
+            cash_legs (Sequence[Dict] | pl.DataFrame): Arguments of `generate_cash_trade_payload` of each leg
+                (currency, date, counterparty, notional, book, pay_recv...).
+
+        Returns:
+            pl.DataFrame: Status of each cash leg (see `book_trades`).
+        """
+        cash_legs = cash_legs.to_dicts() if isinstance(cash_legs, pl.DataFrame) else cash_legs
+        trades = [self.generate_cash_trade_payload(**cash_leg) for cash_leg in cash_legs]
+
+        return self.book_trades(trades, None, batch_size, max_in_flight, ledger, endpoint)
+
+
+    def book_margin_calls (
+
+            self,
+            margin_calls : Sequence[Dict] | pl.DataFrame,
+            batch_size : Optional[int] = None,
+            max_in_flight : Optional[int] = None,
+            ledger : Optional[BookingLedger] = None,
+            endpoint : Optional[str] = None
+
+        ) -> pl.DataFrame :
+        """
+        Bulk version of `post_margin_call` : both legs of a margin call are always booked together.
+
+        Args:
+            margin_calls (Sequence[Dict] | pl.DataFrame): Arguments of `post_margin_call` of each call
+                (currency, date, notional, book, counterparty, direction, bank).
+
+        Returns:
+            pl.DataFrame: Status of each margin call (see `book_trades`).
+        """
+        margin_calls = margin_calls.to_dicts() if isinstance(margin_calls, pl.DataFrame) else margin_calls
+        trades = [self.generate_margin_call_payloads(**margin_call) for margin_call in margin_calls]
+
+        return self.book_trades(trades, None, batch_size, max_in_flight, ledger, endpoint)
+
     
     def post_trade_exotic_fx (self, trades : List, endpoint : str | None = None) :
         """
@@ -708,6 +1021,151 @@ class TradeManager (Client) :
     # -------------------------------------------- Payload Generators --------------------------------------------  
 
 
+    def generate_books_query_payload (self, books : List[str] | str, type : str = "In", field : str = "Book") -> Dict :
+        """
+        Build a trade search payload matching a list of books / portfolios.
+
+        Args:
+            books (List[str] | str): Name of books / portfolios.
+            type (str): Type of query (cf. API doc).
+            field (str): Field the values are matched against.
+
+        Returns:
+            Dict: Search payload.
+        """
+        books = [books] if isinstance(books, str) else books
+
+        payload = {
+
+            "query" : {
+
+                "type" : type,
+                "field" : field,
+                "values" : books  
+
+            }
+            
+        }
+
+        return payload
+
+
+    def generate_books_and_field_query_payload (
+            
+            self,
+            books : List[str] | str,
+            values : List,
+            field : str,
+            query_type : str = "And",
+            type : str = "In",
+            field_book : str = "Book"
+        
+        ) -> Dict :
+        """
+        Build a trade search payload combining a books filter and a filter on another field.
+
+        Args:
+            books (List[str] | str): Name of books / portfolios.
+            values (List): Values matched against `field` (trade dates, creation times, trade IDs...).
+            field (str): Field of the second filter (e.g. "TradeDate", "CreationTime", "tradeId").
+            query_type (str): How both filters are combined ("And" by default).
+            type (str): Type of each sub query (cf. API doc).
+            field_book (str): Field used for the books filter.
+
+        Returns:
+            Dict: Search payload.
+        """
+        books = [books] if isinstance(books, str) else (None if not isinstance(books, list) else books)
+
+        field_query = {
+
+            "type" : type,
+            "field" : field,
+            "values" : values
+
+        }
+
+        book_names_query = {
+
+            "type" : type,
+            "field" : field_book,
+            "values" : books
+
+        }
+
+        payload = {
+
+            "query" : {
+
+                "type" : query_type,
+                "queries" : [
+
+                    field_query,
+                    book_names_query
+
+                ]
+
+            }
+            
+        }
+
+        return payload
+
+
+    def generate_audit_trail_payload (
+            
+            self,
+            from_date : Optional[str | dt.date | dt.datetime] = None,
+            to_date : Optional[str | dt.date | dt.datetime] = None,
+            actions : Optional[List[str]] = None,
+            books : Optional[List[str]] = None,
+            show_changes_from_inception : bool = False
+        
+        ) -> Dict :
+        """
+        Build the audit trail payload for a time window and a list of books.
+
+        Args:
+            from_date, to_date (str | date | datetime, optional): Window bounds (UTC).
+            actions (List[str], optional): Audited actions. Defaults to Insert, Update, Delete and LTAs.
+            books (List[str], optional): Books filter. Defaults to BOOK_NAMES_HV_LIST_ALL.
+            show_changes_from_inception (bool): Whether ICE returns the full history of each trade.
+
+        Returns:
+            Dict: Audit trail payload.
+        """
+        books = BOOK_NAMES_HV_LIST_ALL if books is None else books
+        actions = ["Insert", "Update", "Delete", "LTAs"] if actions is None else actions
+
+        payload = {
+
+            "actions": actions,
+            "showChangesFromInception": show_changes_from_inception
+
+        }
+
+        # Dates
+        if from_date :
+            payload["fromDateTimeUtc"] = datetime_to_str(from_date)
+        
+        if to_date :
+            payload["toDateTimeUtc"] = datetime_to_str(to_date)
+    
+
+        if books :
+                
+            # Filter by books
+            books = [books] if isinstance(books, str) else books
+            
+            payload["tradesQuery"] = {
+                "type": "in",
+                "field": "Book",
+                "values": books
+            }
+
+        return payload
+
+
     def generate_trade_trigger_fx (self, trade : Dict) :
         """
         
@@ -717,6 +1175,30 @@ class TradeManager (Client) :
         )
 
 
+    def generate_margin_call_payloads (
+
+            self,
+            currency : str,
+            date : Optional[str | dt.datetime | dt.date],
+            notional : float | int,
+            book : str,
+            counterparty : str,
+            direction : str = "Pay",
+            bank : Optional[str] = None
+
+        ) -> List[Dict] :
+        """
+        Both cash legs of a margin call : the bank side and the counterparty side.
+        """
+        date = date_to_str(date)
+        bank = BANK_COUNTERPARTY_NAME if bank is None else bank
+
+        payload_bn = self.generate_cash_trade_payload(currency, date, bank if direction == "Pay" else counterparty, notional, book, pay_recv="Pay")
+        payload_cp = self.generate_cash_trade_payload(currency, date, counterparty if direction == "Pay" else bank, notional, book)
+
+        return [payload_bn, payload_cp]
+
+
     def generate_cash_trade_payload (
             
             self,
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import requests
+import threading
+
+from typing import Dict, Hashable, Optional
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from libapi.config.parameters import (
+    LIBAPI_HTTP_POOL_CONNECTIONS, LIBAPI_HTTP_POOL_MAXSIZE, LIBAPI_HTTP_MAX_RETRIES, LIBAPI_HTTP_BACKOFF_FACTOR
+)
+
+
+# Statuses worth a retry on idempotent requests (rate limit + gateway errors)
+RETRY_STATUS_FORCELIST = (429, 502, 503, 504)
+
+
+class PooledHTTPAdapter (HTTPAdapter) :
+    """
+    HTTPAdapter exposing the connection reuse counters of its urllib3 pools.
+    """
+
+    def connection_stats (self) -> Dict[str, int] :
+        """
+        Aggregate the counters of every host pool of the adapter.
+
+        Returns:
+            dict: `pools`, `requests`, `connections` (TCP/TLS handshakes done) and
+                `reused` (requests sent on an already open connection).
+        """
+        stats = { "pools" : 0, "requests" : 0, "connections" : 0, "reused" : 0 }
+
+        pools = self.poolmanager.pools
+
+        for key in list(pools.keys()) :
+
+            pool = pools.get(key)
+
+            if pool is None :
+                continue
+
+            stats["pools"] += 1
+            stats["requests"] += pool.num_requests
+            stats["connections"] += pool.num_connections
+
+        stats["reused"] = max(0, stats["requests"] - stats["connections"])
+
+        return stats
+
+
+def build_retry (max_retries : Optional[int] = None, backoff_factor : Optional[float] = None) -> Retry :
+    """
+    Retry policy of the HTTP transport.
+
+    Connection errors are retried for every method (nothing has been sent yet),
+    read errors and retryable statuses only for idempotent methods, so a POST
+    booking is never replayed by the transport.
+
+    Args:
+        max_retries (int, optional): Maximum number of retries. Defaults to LIBAPI_HTTP_MAX_RETRIES.
+        backoff_factor (float, optional): Exponential backoff factor. Defaults to LIBAPI_HTTP_BACKOFF_FACTOR.
+
+    Returns:
+        Retry: urllib3 retry policy.
+    """
+    max_retries = LIBAPI_HTTP_MAX_RETRIES if max_retries is None else max_retries
+    backoff_factor = LIBAPI_HTTP_BACKOFF_FACTOR if backoff_factor is None else backoff_factor
+
+    retry = Retry(
+
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_FORCELIST,
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        raise_on_status=False # The final response is checked by raise_for_status
+
+    )
+
+    return retry
+
+
+def build_session (
+
+        pool_connections : Optional[int] = None,
+        pool_maxsize : Optional[int] = None,
+        max_retries : Optional[int] = None,
+        backoff_factor : Optional[float] = None,
+        keep_alive : bool = True,
+        pool_block : bool = False
+
+    ) -> requests.Session :
+    """
+    Build a requests Session with a tuned, persistent connection pool.
+
+    Args:
+        pool_connections (int, optional): Number of host pools kept. Defaults to LIBAPI_HTTP_POOL_CONNECTIONS.
+        pool_maxsize (int, optional): Connections kept per host, should be >= the number of threads
+            sharing the session. Defaults to LIBAPI_HTTP_POOL_MAXSIZE.
+        max_retries (int, optional): Transport retries (see build_retry).
+        backoff_factor (float, optional): Transport retries backoff (see build_retry).
+        keep_alive (bool): Keep connections open between requests (default). If False, every
+            request asks the server to close the connection.
+        pool_block (bool): Block when all connections of a host are busy instead of opening extra ones.
+
+    Returns:
+        requests.Session: Session with a PooledHTTPAdapter mounted for http and https.
+    """
+    pool_connections = LIBAPI_HTTP_POOL_CONNECTIONS if pool_connections is None else pool_connections
+    pool_maxsize = LIBAPI_HTTP_POOL_MAXSIZE if pool_maxsize is None else pool_maxsize
+
+    adapter = PooledHTTPAdapter(
+
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=build_retry(max_retries, backoff_factor),
+        pool_block=pool_block
+
+    )
+
+    session = requests.Session()
+
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    if not keep_alive :
+        session.headers["Connection"] = "close"
+
+    return session
+
+
+_SHARED_SESSIONS : Dict[Hashable, requests.Session] = {}
+_SHARED_SESSIONS_LOCK = threading.Lock()
+
+
+def get_shared_session (
+
+        host : Optional[str],
+        username : Optional[str] = None,
+        pool_connections : Optional[int] = None,
+        pool_maxsize : Optional[int] = None,
+        max_retries : Optional[int] = None,
+        keep_alive : bool = True
+
+    ) -> requests.Session :
+    """
+    Return the process wide session of an ICE host and user (built on first use).
+
+    The clients of the same host and user share its connection pool : a new client
+    starts with warm connections instead of new handshakes.
+
+    Returns:
+        requests.Session: Session built by `build_session`.
+    """
+    key = (host, username, pool_connections, pool_maxsize, max_retries, keep_alive)
+
+    with _SHARED_SESSIONS_LOCK :
+
+        session = _SHARED_SESSIONS.get(key)
+
+        if session is None :
+
+            session = _SHARED_SESSIONS[key] = build_session(
+
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                max_retries=max_retries,
+                keep_alive=keep_alive
+
+            )
+
+    return session
+
+
+def close_shared_sessions () -> None :
+    """
+    Close the shared sessions (and their connections), e.g. at the end of a job.
+    """
+    with _SHARED_SESSIONS_LOCK :
+
+        for session in _SHARED_SESSIONS.values() :
+            session.close()
+
+        _SHARED_SESSIONS.clear()
+
+
+def get_connection_stats (session : requests.Session) -> Dict[str, int] :
+    """
+    Connection reuse counters of a session built by `build_session` (summed over its adapters).
+    """
+    stats = { "pools" : 0, "requests" : 0, "connections" : 0, "reused" : 0 }
+
+    # http and https share the same adapter, count it once
+    adapters = { id(adapter) : adapter for adapter in session.adapters.values() }
+
+    for adapter in adapters.values() :
+
+        if not isinstance(adapter, PooledHTTPAdapter) :
+            continue
+
+        for key, value in adapter.connection_stats().items() :
+            stats[key] += value
+
+    return stats
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+import polars as pl
 import datetime as dt
 
 from itertools import product
 from typing import Optional, List, Dict, Sequence
 
-from libapi.utils.validators import validate_flat_strikes, validate_direction
+from libapi.utils.validators import validate_flat_strikes, validate_strike_pairs, validate_direction
 from libapi.utils.formatter import date_to_str
+from libapi.instruments.grid import build_legs_table, opposite_direction
 
 
 def make_eq_option_leg_payload (
@@ -96,7 +98,7 @@ def make_eq_strangle_payloads (
     here strikes is a list of tuples, each tuple contains two strikes, 
     one for the put and one for the call
     """
-    validate_flat_strikes(strikes)
+    validate_strike_pairs(strikes)
     
     # Validate direction
     validate_direction(direction)
@@ -260,3 +262,175 @@ def make_eq_option_legs_from_strike_pairs (
         )
 
     return instruments
+
+
+# --------------------------------- Columnar legs tables ---------------------------------
+
+
+def _eq_legs_payload_table (
+
+        legs : pl.DataFrame,
+        notional : float = 1_000_000,
+        notional_ccy : str = "EUR"
+
+    ) -> pl.DataFrame :
+    """
+    Give a legs table the columns (and types) of `make_eq_option_leg_payload`.
+    """
+    return legs.select(
+
+        pl.col("direction"),
+        pl.col("underlier").alias("BBGTicker"),
+        pl.col("opt_type"),
+        pl.col("strike"),
+        pl.lit(str(notional)).alias("notional"),
+        pl.lit(notional_ccy).alias("notional_currency"),
+        pl.col("expiry"),
+        pl.col("stratid").cast(pl.String),
+        pl.col("expiry").alias("SettlementDate"),
+
+    )
+
+
+def make_eq_option_legs_table_from_combos (
+
+        underliers : List[str],
+        expiries : List[str | dt.datetime],
+        strikes : List,
+        opt_types : Sequence[str] = ("Put",),
+        direction : str = "Sell",
+        notional : float = 1_000_000,
+        notional_ccy : str = "EUR"
+
+    ) -> pl.DataFrame :
+    """
+    Columnar version of `make_eq_option_legs_from_combos` : same legs, same order,
+    one row per leg (`table.to_dicts()` gives the same payloads).
+
+    Args:
+        underliers (List[str]): Underlier tickers.
+        expiries (List[str | datetime]): Expiry dates; settlement defaults to expiry.
+        strikes (List): Flat list of strikes (no tuples/lists).
+        opt_types (Sequence[str]): Option types created per combo.
+        direction (str): "Sell" (default) or "Buy".
+
+    Returns:
+        pl.DataFrame: One row per (expiry, ticker, strike, opt_type).
+    """
+    validate_flat_strikes(strikes)
+    validate_direction(direction)
+
+    legs = build_legs_table(
+
+        underliers,
+        [date_to_str(d) for d in expiries],
+        [str(strike) for strike in strikes],
+        [(opt, direction, 0) for opt in opt_types],
+        order=("expiry", "underlier", "strike")
+
+    )
+
+    return _eq_legs_payload_table(legs, notional, notional_ccy)
+
+
+def make_eq_option_legs_table_from_strike_pairs (
+
+        bbg_tickers : List[str],
+        expiries : List[str | dt.datetime | dt.date],
+        strikes : List,
+        opt_type : str = "Call",
+        direction : str = "Sell"
+
+    ) -> pl.DataFrame :
+    """
+    Columnar version of `make_eq_option_legs_from_strike_pairs` : the first leg
+    at the first strike in `direction`, the second one at the second strike in the
+    opposite direction.
+    """
+    validate_strike_pairs(strikes)
+    validate_direction(direction)
+
+    legs = build_legs_table(
+
+        bbg_tickers,
+        [date_to_str(d) for d in expiries],
+        [(str(s1), str(s2)) for s1, s2 in strikes],
+        [(opt_type, direction, 0), (opt_type, opposite_direction(direction), 1)],
+        order=("expiry", "underlier", "strike"),
+        strike_width=2
+
+    )
+
+    return _eq_legs_payload_table(legs)
+
+
+def make_eq_strangle_table (
+
+        bbg_tickers : List[str],
+        expiries : List[str | dt.datetime],
+        strikes : List,
+        direction : str = "Sell"
+
+    ) -> pl.DataFrame :
+    """
+    Columnar version of `make_eq_strangle_payloads` : a Put at the first strike
+    and a Call at the second strike of each pair.
+    """
+    validate_strike_pairs(strikes)
+    validate_direction(direction)
+
+    legs = build_legs_table(
+
+        bbg_tickers,
+        [date_to_str(d) for d in expiries],
+        [(str(s1), str(s2)) for s1, s2 in strikes],
+        [("Put", direction, 0), ("Call", direction, 1)],
+        order=("underlier", "strike", "expiry"),
+        strike_width=2
+
+    )
+
+    return _eq_legs_payload_table(legs)
+
+
+def make_eq_straddle_table (
+
+        bbg_tickers : List[str],
+        expiries : List[str | dt.datetime],
+        strikes : List,
+        direction : str = "Sell",
+        options : Sequence[str] = ("Put", "Call")
+
+    ) -> pl.DataFrame :
+    """
+    Columnar version of `make_eq_straddle_payloads`.
+    """
+    return make_eq_option_legs_table_from_combos(bbg_tickers, expiries, strikes, options, direction)
+
+
+def make_eq_put_leg_table (bbg_tickers : List[str], expiries : List[str | dt.datetime], strikes : List, direction : str = "Sell") -> pl.DataFrame :
+    """
+    Columnar version of `make_eq_put_leg_payloads`.
+    """
+    return make_eq_option_legs_table_from_combos(bbg_tickers, expiries, strikes, ("Put",), direction)
+
+
+def make_eq_call_leg_table (bbg_tickers : List[str], expiries : List[str | dt.datetime], strikes : List, direction : str = "Sell") -> pl.DataFrame :
+    """
+    Columnar version of `make_eq_call_leg_payloads`.
+    """
+    return make_eq_option_legs_table_from_combos(bbg_tickers, expiries, strikes, ("Call",), direction)
+
+
+def make_eq_call_spread_table (bbg_tickers : List[str], expiries : List[str | dt.datetime], strikes : List, direction : str = "Sell") -> pl.DataFrame :
+    """
+    Columnar version of `make_eq_call_spread_payloads`.
+    """
+    return make_eq_option_legs_table_from_strike_pairs(bbg_tickers, expiries, strikes, opt_type="Call", direction=direction)
+
+
+def make_eq_put_spread_table (bbg_tickers : List[str], expiries : List[str | dt.datetime], strikes : List, direction : str = "Buy") -> pl.DataFrame :
+    """
+    Columnar version of `make_eq_put_spread_payloads`.
+    """
+    return make_eq_option_legs_table_from_strike_pairs(bbg_tickers, expiries, strikes, opt_type="Put", direction=direction)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import polars as pl
 import datetime as dt
 
 from itertools import product
@@ -7,7 +8,8 @@ from typing import Dict, List, Optional, Sequence
 
 from libapi.config.parameters import CCYS_ORDER
 from libapi.utils.formatter import date_to_str
-from libapi.utils.validators import validate_direction, validate_flat_strikes
+from libapi.utils.validators import validate_direction, validate_flat_strikes, validate_strike_pairs
+from libapi.instruments.grid import build_legs_table, opposite_direction
 
 
 def find_ccy (ccy : str, ccys_order : Optional[List] = None) :
@@ -47,7 +49,7 @@ def make_fx_option_leg_payload (
         'notional' : notional,
         'notional_currency' : find_ccy(ccy_pair),
         'expiry' : date_to_str(expiry),
-        "stratid" : str(strait_id) if strait_id else None
+        "stratid" : str(strait_id) if strait_id is not None else None
 
     }
 
@@ -91,7 +93,7 @@ def make_fx_strangle_payloads (
     ) -> List[Dict] :
     """
     """
-    validate_flat_strikes(strikes)
+    validate_strike_pairs(strikes)
     
     # Validate direction
     validate_direction(direction)
@@ -214,7 +216,7 @@ def make_fx_option_legs_from_combos (
     for strat_id, (expiry, underlier, strike) in enumerate(product(expiries_s, underliers, strikes)) :
 
         for opt in opt_types :
-            instruments.append(make_fx_option_leg_payload(direction, underlier, opt, strike, expiry, expiry, strat_id))
+            instruments.append(make_fx_option_leg_payload(direction, underlier, opt, strike, expiry, strat_id))
     
     return instruments
 
@@ -245,10 +247,173 @@ def make_fx_option_legs_from_strike_pairs (
 
         instruments.extend(
             [
-                make_fx_option_leg_payload(direction, ccy, opt_type, s1, date, date, strat_id),
-                make_fx_option_leg_payload('Buy' if direction == "Sell" else "Sell", ccy, opt_type, s2, date, date, strat_id)
+                make_fx_option_leg_payload(direction, ccy, opt_type, s1, date, strat_id),
+                make_fx_option_leg_payload('Buy' if direction == "Sell" else "Sell", ccy, opt_type, s2, date, strat_id)
             ]
 
         )
 
     return instruments
+
+
+# --------------------------------- Columnar legs tables ---------------------------------
+
+
+def _fx_legs_payload_table (legs : pl.DataFrame, notional : float = 1_000_000) -> pl.DataFrame :
+    """
+    Give a legs table the columns of `make_fx_option_leg_payload`.
+    """
+    pairs = legs.get_column("underlier").unique().to_list()
+
+    return legs.select(
+
+        pl.col("direction"),
+        pl.col("underlier").alias("pair"),
+        pl.col("opt_type"),
+        pl.col("strike"),
+        pl.lit(notional).alias("notional"),
+        pl.col("underlier").replace_strict({pair : find_ccy(pair) for pair in pairs}, return_dtype=pl.String).alias("notional_currency"),
+        pl.col("expiry"),
+        pl.col("stratid").cast(pl.String),
+
+    )
+
+
+def make_fx_option_legs_table_from_combos (
+
+        underliers : List[str],
+        expiries : List[str | dt.datetime],
+        strikes : List,
+        opt_types : Sequence[str] = ("Put",),
+        direction : str = "Sell",
+        notional : float = 1_000_000
+
+    ) -> pl.DataFrame :
+    """
+    Columnar version of `make_fx_option_legs_from_combos` : same legs, same order,
+    one row per leg. Strikes mixing strings and numbers are stored as strings.
+
+    Args:
+        underliers (List[str]): Currency pairs.
+        expiries (List[str | datetime]): Expiry dates.
+        strikes (List): Flat list of strikes (no tuples/lists).
+        opt_types (Sequence[str]): Option types created per combo.
+        direction (str): "Sell" (default) or "Buy".
+
+    Returns:
+        pl.DataFrame: One row per (expiry, pair, strike, opt_type).
+    """
+    validate_flat_strikes(strikes)
+    validate_direction(direction)
+
+    legs = build_legs_table(
+
+        underliers,
+        [date_to_str(d) for d in expiries],
+        strikes,
+        [(opt, direction, 0) for opt in opt_types],
+        order=("expiry", "underlier", "strike")
+
+    )
+
+    return _fx_legs_payload_table(legs, notional)
+
+
+def make_fx_option_legs_table_from_strike_pairs (
+
+        ccys : List[str],
+        expiries : List[str | dt.datetime | dt.date],
+        strikes : List,
+        opt_type : str = "Call",
+        direction : str = "Sell"
+
+    ) -> pl.DataFrame :
+    """
+    Columnar version of `make_fx_option_legs_from_strike_pairs`.
+    """
+    validate_strike_pairs(strikes)
+    validate_direction(direction)
+
+    legs = build_legs_table(
+
+        ccys,
+        [date_to_str(d) for d in expiries],
+        strikes,
+        [(opt_type, direction, 0), (opt_type, opposite_direction(direction), 1)],
+        order=("expiry", "underlier", "strike"),
+        strike_width=2
+
+    )
+
+    return _fx_legs_payload_table(legs)
+
+
+def make_fx_strangle_table (
+
+        ccys : List[str],
+        expiries : List[str | dt.datetime],
+        strikes : List,
+        direction : str = "Sell"
+
+    ) -> pl.DataFrame :
+    """
+    Columnar version of `make_fx_strangle_payloads`.
+    """
+    validate_strike_pairs(strikes)
+    validate_direction(direction)
+
+    legs = build_legs_table(
+
+        ccys,
+        [date_to_str(d) for d in expiries],
+        strikes,
+        [("Put", direction, 0), ("Call", direction, 1)],
+        order=("underlier", "strike", "expiry"),
+        strike_width=2
+
+    )
+
+    return _fx_legs_payload_table(legs)
+
+
+def make_fx_straddle_table (
+
+        ccys : List[str],
+        expiries : List[str | dt.datetime],
+        strikes : List,
+        direction : str = "Sell",
+        options : Sequence[str] = ("Put", "Call")
+
+    ) -> pl.DataFrame :
+    """
+    Columnar version of `make_fx_straddle_payloads`.
+    """
+    return make_fx_option_legs_table_from_combos(ccys, expiries, strikes, options, direction)
+
+
+def make_fx_put_leg_table (ccys : List[str], expiries : List[str | dt.datetime], strikes : List, direction : str = "Sell") -> pl.DataFrame :
+    """
+    Columnar version of `make_fx_put_leg_payloads`.
+    """
+    return make_fx_option_legs_table_from_combos(ccys, expiries, strikes, ("Put",), direction)
+
+
+def make_fx_call_leg_table (ccys : List[str], expiries : List[str | dt.datetime], strikes : List, direction : str = "Sell") -> pl.DataFrame :
+    """
+    Columnar version of `make_fx_call_leg_payloads`.
+    """
+    return make_fx_option_legs_table_from_combos(ccys, expiries, strikes, ("Call",), direction)
+
+
+def make_fx_call_spread_table (ccys : List[str], expiries : List[str | dt.datetime], strikes : List, direction : str = "Sell") -> pl.DataFrame :
+    """
+    Columnar version of `make_fx_call_spread_payloads`.
+    """
+    return make_fx_option_legs_table_from_strike_pairs(ccys, expiries, strikes, opt_type="Call", direction=direction)
+
+
+def make_fx_put_spread_table (ccys : List[str], expiries : List[str | dt.datetime], strikes : List, direction : str = "Buy") -> pl.DataFrame :
+    """
+    Columnar version of `make_fx_put_spread_payloads`.
+    """
+    return make_fx_option_legs_table_from_strike_pairs(ccys, expiries, strikes, opt_type="Put", direction=direction)
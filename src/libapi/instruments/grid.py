@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import polars as pl
+
+from typing import Any, Sequence, Tuple
+
+# Columnar counterpart of the `make_*_legs_from_*` builders : the strategy grid is the
+# cross join of the (already formatted) dimensions, and each strategy is then crossed
+# with its legs. Nothing is built per leg in Python, the legs dicts are only materialised
+# chunk by chunk when a request is sent (see `Pricer.price_in_batches`).
+
+# A leg of a strategy : (opt_type, direction, strike slot). The slot is the position of
+# the leg strike in a strike pair (always 0 for flat strikes).
+LegSpec = Tuple[str, str, int]
+
+GRID_DIMENSIONS = ("expiry", "underlier", "strike")
+
+
+def opposite_direction (direction : str) -> str :
+    """
+    "Buy" <-> "Sell"
+    """
+    return "Buy" if direction == "Sell" else "Sell"
+
+
+def _dimension_frame (name : str, values : Sequence[Any], width : int) -> pl.DataFrame :
+    """
+    One column frame of a grid dimension (strike pairs give one column per slot).
+    """
+    if name != "strike" :
+        return pl.DataFrame([pl.Series(name, list(values), strict=False)])
+
+    if width == 1 :
+        return pl.DataFrame([pl.Series("strike_0", list(values), strict=False)])
+
+    return pl.DataFrame([pl.Series(f"strike_{slot}", [pair[slot] for pair in values], strict=False) for slot in range(width)])
+
+
+def build_legs_table (
+
+        underliers : Sequence[str],
+        expiries : Sequence[str],
+        strikes : Sequence[Any],
+        legs : Sequence[LegSpec],
+        order : Sequence[str] = GRID_DIMENSIONS,
+        strike_width : int = 1
+
+    ) -> pl.DataFrame :
+    """
+    Build the legs of a strategy grid with vectorised cross joins.
+
+    Strategies are numbered in the order of `itertools.product` over the dimensions
+    given in `order`, and each strategy holds its legs in the order of `legs`.
+
+    Args:
+        underliers (Sequence[str]): Tickers or currency pairs.
+        expiries (Sequence[str]): Expiries, already formatted.
+        strikes (Sequence): Flat strikes, or strike tuples of `strike_width` values.
+        legs (Sequence[LegSpec]): (opt_type, direction, strike slot) of each leg of a strategy.
+        order (Sequence[str]): Product order of "expiry", "underlier" and "strike".
+        strike_width (int): Number of strikes per strategy (1 for flat strikes).
+
+    Returns:
+        pl.DataFrame: One row per leg : direction, underlier, opt_type, strike, expiry, stratid (Int64).
+    """
+    if sorted(order) != sorted(GRID_DIMENSIONS) :
+        raise ValueError(f"`order` must be a permutation of {GRID_DIMENSIONS}")
+
+    values = {"expiry" : expiries, "underlier" : underliers, "strike" : strikes}
+
+    strategies = None
+
+    for name in order :
+
+        frame = _dimension_frame(name, values[name], strike_width)
+        strategies = frame if strategies is None else strategies.join(frame, how="cross", maintain_order="left_right")
+
+    strategies = strategies.with_row_index("stratid")
+
+    legs_frame = pl.DataFrame(
+
+        {
+            "leg" : list(range(len(legs))),
+            "opt_type" : [leg[0] for leg in legs],
+            "direction" : [leg[1] for leg in legs],
+            "slot" : [leg[2] for leg in legs],
+        },
+        schema={"leg" : pl.UInt32, "opt_type" : pl.String, "direction" : pl.String, "slot" : pl.UInt32}
+
+    )
+
+    table = strategies.join(legs_frame, how="cross", maintain_order="left_right")
+
+    # Pick the strike of the slot of each leg
+    strike = pl.col("strike_0")
+
+    for slot in range(1, strike_width) :
+        strike = pl.when(pl.col("slot") == slot).then(pl.col(f"strike_{slot}")).otherwise(strike)
+
+    return table.select(
+
+        pl.col("direction"),
+        pl.col("underlier"),
+        pl.col("opt_type"),
+        strike.alias("strike"),
+        pl.col("expiry"),
+        pl.col("stratid").cast(pl.Int64),
+
+    )
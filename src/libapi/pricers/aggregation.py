@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import polars as pl
+
+from typing import Dict, List, Literal, Mapping, Optional
+
+from libapi.config.parameters import COLUMNS_IN_PRICER
+
+
+# How a leg column is aggregated at the strategy level
+Aggregation = Literal["sum", "first", "join"]
+AggregationSpec = Mapping[str, Aggregation]
+
+AGGREGATIONS = ("sum", "first", "join")
+JOIN_SEPARATOR = " "
+
+
+def normalize_aggregation_spec (spec : Optional[Mapping] = None) -> Dict[str, Aggregation] :
+    """
+    Validate an aggregation spec (column -> "sum" | "first" | "join").
+
+    Legacy pandas specs using `" ".join` as aggregator are accepted and mapped to "join".
+
+    Args:
+        spec (Mapping, optional): Aggregation spec. Defaults to COLUMNS_IN_PRICER.
+
+    Returns:
+        dict: Normalized spec.
+
+    Raises:
+        ValueError: If an aggregation is not supported.
+    """
+    spec = COLUMNS_IN_PRICER if spec is None else spec
+    normalized = {}
+
+    for column, aggregation in spec.items() :
+
+        if getattr(aggregation, "__name__", None) == "join" and isinstance(getattr(aggregation, "__self__", None), str) :
+            aggregation = "join"
+
+        if aggregation not in AGGREGATIONS :
+            raise ValueError(f"Unsupported aggregation for the column {column}: {aggregation!r}. Use one of {AGGREGATIONS}")
+
+        normalized[column] = aggregation
+
+    return normalized
+
+
+def aggregation_expressions (spec : AggregationSpec, schema : pl.Schema) -> List[pl.Expr] :
+    """
+    Native polars expressions of an aggregation spec, for the columns present in `schema`.
+    """
+    expressions = []
+
+    for column, aggregation in spec.items() :
+
+        if column not in schema :
+            continue
+
+        col = pl.col(column)
+
+        if aggregation == "sum" :
+
+            # Pricer values may still be strings with thousands separators
+            if schema[column] == pl.String :
+                col = col.str.replace_all(",", "").cast(pl.Float64, strict=False)
+
+            expressions.append(col.sum())
+
+        elif aggregation == "first" :
+            expressions.append(col.first())
+
+        else :
+            expressions.append(col.cast(pl.String).str.join(JOIN_SEPARATOR))
+
+    return expressions
+
+
+def aggregate_legs (
+
+        prices : pl.DataFrame | pl.LazyFrame,
+        spec : Optional[Mapping] = None,
+        by : str = "stratid"
+
+    ) -> pl.DataFrame :
+    """
+    Aggregate legs prices by strategy in a single lazy plan.
+
+    Args:
+        prices (pl.DataFrame | pl.LazyFrame): Legs prices (one row per leg).
+        spec (Mapping, optional): Aggregation spec. Defaults to COLUMNS_IN_PRICER.
+        by (str): Strategy key column.
+
+    Returns:
+        pl.DataFrame: One row per strategy (sorted by key), the key then the spec columns.
+    """
+    lazy = prices.lazy()
+    schema = lazy.collect_schema()
+
+    expressions = aggregation_expressions(normalize_aggregation_spec(spec), schema)
+
+    return lazy.group_by(by).agg(expressions).sort(by).collect()
@@ -1,14 +1,14 @@
 from __future__ import annotations
 
-import os
 import polars as pl
 import datetime as dt
 
 from functools import partial
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional
 
 from libapi.config.parameters import COLUMNS_IN_PRICER, SAVED_REQUESTS_DIRECTORY_PATH, EQ_PRICER_CALC_PATH, RISKS_UNDERLYING_ASSETS
 from libapi.pricers.pricer import Pricer
+from libapi.pricers.curve import CurveStore, build_curve, export_excel, legacy_curve_paths
 from libapi.utils.formatter import date_to_str
 
 
@@ -49,7 +49,10 @@ class PricerBasket (Pricer) :
 
         )
         
-        response_df = self.treat_json_response_pricer(response, [basket])
+        if response is None :
+            return None
+
+        response_df = self.flatten_pricer_response(response, [basket])
 
         return response_df
 
@@ -61,7 +64,8 @@ class PricerBasket (Pricer) :
             start_date : Optional[str | dt.date | dt.datetime] = None,
             end_date : Optional[str | dt.date | dt.datetime] = None,
             frequency : str = "Day",
-            request_abs_dir : Optional[str] = None
+            request_abs_dir : Optional[str] = None,
+            export_path : Optional[str] = None
         
         ) :
         """
@@ -71,71 +75,43 @@ class PricerBasket (Pricer) :
             start_date (str) : Starting date, in format 'YYYY-MM-DD'
             end_date (str) : End date, in format "YYYY-MM-DD"
             frequency (str) : Frequency of the equity curve as "Day", "Week", "Month", "Quarter", "Year".
+            request_abs_dir (str, optional) : Directory of the curve store (see libapi.pricers.curve.CurveStore), also
+                searched with SAVED_REQUESTS_DIRECTORY_PATH for the Excel curve saved by older versions.
+            export_path (str, optional) : Excel file the curve is also exported to (the cache itself is binary).
 
         """
         start_date = date_to_str(start_date)
         end_date = date_to_str(end_date)
 
-        request_abs_dir = SAVED_REQUESTS_DIRECTORY_PATH if request_abs_dir is None else request_abs_dir
-        
         # Get the dates based on start_date and end_date for a given frequency
         valuation_dates = self.generate_dates(start_date, end_date, frequency)
 
-        # Check if this request has been cached
-        exists, filename = self.does_equity_curve_exist(basket, start_date, end_date, frequency)
+        if valuation_dates is None :
+            return None
 
-        full_path = os.path.join(request_abs_dir, filename)
-        
-        if exists :
-            return pl.read_excel(full_path)
+        # The points are stored by basket and date : only the dates never priced are requested
+        # (a copy of the basket each time, the request sets its ID)
+        definition = {"asset_class" : "Basket", **{key : value for key, value in basket.items() if key != "ID"}}
 
-        # Initialize an empty DataFrame to store the results
-        all_prices = pl.DataFrame()
+        # Excel file of the same call saved by older versions, imported into the store once
+        legacy_filename = f"equity_curve_{basket['buySell']}_{basket['payoutCurrency']}_strike-{basket['strike']}_expi-{basket['expiryDate']}_from-{start_date}_to-{end_date}_each-{frequency}.xlsx"
 
-        # Request pricing for each date
-        for date in valuation_dates :
+        all_prices = build_curve(
 
-            prices = self.request_basket_price_api(basket, date=date)
-            prices['ValuationDate'] = date
-            
-            all_prices = pl.concat([all_prices, prices])
+            definition,
+            valuation_dates,
+            lambda date : self.request_basket_price_api(dict(basket), date=date),
+            store=CurveStore(request_abs_dir),
+            legacy_excel_paths=legacy_curve_paths(legacy_filename, request_abs_dir, SAVED_REQUESTS_DIRECTORY_PATH)
 
-        # Save as file in the database
-        all_prices.to_excel(full_path, index=False)
+        )
+
+        if export_path is not None :
+            export_excel(all_prices, export_path)
 
         # Return the equity curve
         return all_prices
-    
 
-    def does_equity_curve_exist (
-            
-            self,
-            basket : Dict,
-            start_date : Optional[str | dt.date | dt.datetime] = None,
-            end_date : Optional[str | dt.date | dt.datetime] = None,
-            frequency : str = "Day",
-            request_abs_dir : Optional[str] = None
-        
-        ) -> Tuple[bool, str] :
-        """
-        
-        Args:
-            basket () : 
-            start_date (str) :  Starting date, in format "YYYY-MM-DD"
-            end_date (str) : Ending date, in format "YYYY-MM-DD"
-            frequency (str) : Frequency for date like "Day", "Month", "Year", "Quarter"
-
-        Returns:
-
-        """
-        start_date = date_to_str(start_date)
-        end_date = date_to_str(end_date)
-
-        request_abs_dir = SAVED_REQUESTS_DIRECTORY_PATH if request_abs_dir is None else request_abs_dir
-
-        filename = f"equity_curve_{basket['buySell']}_{basket['payoutCurrency']}_strike-{basket['strike']}_expi-{basket['expiryDate']}_from-{start_date}_to-{end_date}_each-{frequency}.xlsx"
-        
-        return filename in os.listdir(request_abs_dir), filename
     
 
 
@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import datetime as dt
+
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from libapi.utils.concurrency import SingleFlight
+from libapi.config.parameters import PRICER_CACHE_SIZE, PRICER_CACHE_DB_ABS_PATH, PRICER_CACHE_TTL, PRICER_CACHE_UNDATED_EOD_TTL
+
+# Priced instruments are cached under a hash of their canonical payload (without the
+# request local "ID") and of the valuation and artifacts requested. An EOD valuation
+# without a date is the last EOD : it is keyed with the day of the request and only
+# kept PRICER_CACHE_UNDATED_EOD_TTL seconds, as the last EOD moves during that day.
+
+PRICING_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pricing_cache (
+    key TEXT PRIMARY KEY,
+    expires_at REAL,
+    value TEXT NOT NULL
+);
+"""
+
+
+def pricing_context_key (
+
+        valuation : Mapping[str, Any],
+        endpoint : Optional[str] = None,
+        artifacts : Optional[Mapping[str, Any]] = None
+
+    ) -> str :
+    """
+    Hash of what a request shares between its instruments (valuation, endpoint, artifacts).
+
+    Args:
+        valuation (Mapping): Valuation of the request ("type" and "Date").
+        endpoint (str, optional): Pricer endpoint.
+        artifacts (Mapping, optional): Risks and assets requested.
+
+    Returns:
+        str: Hex sha256 digest.
+    """
+    valuation = dict(valuation)
+
+    if valuation.get("Date") is None :
+        valuation["Date"] = dt.date.today().isoformat()
+
+    return _digest({ "valuation" : valuation, "endpoint" : endpoint, "artifacts" : artifacts })
+
+
+def pricing_cache_key (payload : Mapping[str, Any], context_key : str) -> str :
+    """
+    Canonical hash of an instrument payload ("ID" ignored) priced in a request context.
+    """
+    return _digest({ "instrument" : {key : value for key, value in payload.items() if key != "ID"}, "context" : context_key })
+
+
+def _digest (data : Any) -> str :
+
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class PricingCache :
+    """
+    Two tier cache of priced instruments : an in-memory LRU, backed by an optional
+    SQLite file shared by the processes of the machine.
+
+    The lifetime of an entry depends on the valuation type (PRICER_CACHE_TTL) : EOD
+    prices of a given date never change, the last EOD (no date) is reused for an hour,
+    RealTime and Cut prices are only reused for a few seconds.
+    """
+
+    def __init__ (
+
+            self,
+            max_entries : Optional[int] = None,
+            db_abs_path : Optional[str] = None,
+            ttl : Optional[Mapping[str, Optional[float]]] = None,
+            undated_eod_ttl : Optional[float] = None,
+            timeout : float = 30.0
+
+        ) -> None :
+        """
+        Args:
+            max_entries (int, optional): Entries kept in memory. Defaults to PRICER_CACHE_SIZE.
+            db_abs_path (str, optional): SQLite file of the disk tier. Defaults to PRICER_CACHE_DB_ABS_PATH (no disk tier if unset).
+            ttl (Mapping, optional): Lifetime in seconds by valuation type. Defaults to PRICER_CACHE_TTL.
+            undated_eod_ttl (float, optional): Lifetime in seconds of an EOD valuation without a date. Defaults to PRICER_CACHE_UNDATED_EOD_TTL.
+            timeout (float): Seconds waited for a lock held by another process.
+        """
+        self.max_entries = PRICER_CACHE_SIZE if max_entries is None else max_entries
+        self.ttl = dict(PRICER_CACHE_TTL if ttl is None else ttl)
+        self.undated_eod_ttl = PRICER_CACHE_UNDATED_EOD_TTL if undated_eod_ttl is None else undated_eod_ttl
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.RLock()
+        self._entries : OrderedDict[str, Tuple[Optional[float], Dict]] = OrderedDict()
+
+        db_abs_path = PRICER_CACHE_DB_ABS_PATH if db_abs_path is None else db_abs_path
+        self._connection = None
+
+        if db_abs_path :
+
+            Path(db_abs_path).parent.mkdir(parents=True, exist_ok=True)
+
+            self._connection = sqlite3.connect(db_abs_path, timeout=timeout, isolation_level=None, check_same_thread=False)
+
+            with self._lock :
+
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.execute("PRAGMA synchronous=NORMAL")
+                self._connection.executescript(PRICING_CACHE_SCHEMA)
+
+
+    def is_cacheable (self, valuation_type : Optional[str]) -> bool :
+        """
+        Whether the prices of a valuation type can be cached at all.
+        """
+        if valuation_type not in self.ttl :
+            return False
+
+        ttl = self.ttl[valuation_type]
+
+        return ttl is None or ttl > 0
+
+
+    def lifetime (self, valuation_type : Optional[str], valuation_date : Optional[str] = None) -> Optional[float] :
+        """
+        Lifetime in seconds of the prices of a valuation (None = forever).
+
+        The last EOD (no date) changes once a day, so it never gets more than
+        `undated_eod_ttl` seconds, even if the EOD prices of a date never expire.
+        """
+        ttl = self.ttl[valuation_type]
+
+        if valuation_type == "EOD" and valuation_date is None :
+            return self.undated_eod_ttl if ttl is None else min(ttl, self.undated_eod_ttl)
+
+        return ttl
+
+
+    def get (self, key : str) -> Optional[Dict] :
+        """
+        Cached priced instrument of a key, None if missing or expired.
+        """
+        now = time.time()
+
+        with self._lock :
+
+            entry = self._entries.get(key)
+
+            if entry is not None :
+
+                expires_at, value = entry
+
+                if expires_at is None or expires_at > now :
+
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+
+                    return value
+
+                del self._entries[key]
+
+            if self._connection is not None :
+
+                row = self._connection.execute("SELECT expires_at, value FROM pricing_cache WHERE key = ?", (key,)).fetchone()
+
+                if row is not None and (row[0] is None or row[0] > now) :
+
+                    value = json.loads(row[1])
+                    self._remember(key, row[0], value)
+                    self.hits += 1
+
+                    return value
+
+            self.misses += 1
+
+        return None
+
+
+    def put_many (
+
+            self,
+            items : List[Tuple[str, Dict]],
+            valuation_type : Optional[str],
+            valuation_date : Optional[str] = None
+
+        ) -> int :
+        """
+        Cache priced instruments (key, instrument) of a valuation type.
+
+        Args:
+            items (List): Priced instruments by key.
+            valuation_type (str): Valuation type ("EOD", "RealTime", "Cut").
+            valuation_date (str, optional): Date of the valuation, None for the last one.
+
+        Returns:
+            int: Number of instruments cached (0 if the valuation type is not cacheable).
+        """
+        if not items or not self.is_cacheable(valuation_type) :
+            return 0
+
+        ttl = self.lifetime(valuation_type, valuation_date)
+
+        if ttl is not None and ttl <= 0 :
+            return 0
+
+        expires_at = time.time() + ttl if ttl is not None else None
+
+        with self._lock :
+
+            for key, value in items :
+                self._remember(key, expires_at, value)
+
+            if self._connection is not None :
+
+                self._connection.execute("BEGIN IMMEDIATE")
+
+                try :
+
+                    self._connection.executemany(
+
+                        "INSERT OR REPLACE INTO pricing_cache (key, expires_at, value) VALUES (?, ?, ?)",
+                        [(key, expires_at, json.dumps(value, separators=(",", ":"), default=str)) for key, value in items]
+
+                    )
+
+                    self._connection.execute("COMMIT")
+
+                except Exception :
+
+                    self._connection.execute("ROLLBACK")
+                    raise
+
+        return len(items)
+
+
+    def purge_expired (self) -> int :
+        """
+        Remove the expired entries of both tiers.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        now = time.time()
+
+        with self._lock :
+
+            expired = [key for key, (expires_at, _) in self._entries.items() if expires_at is not None and expires_at <= now]
+
+            for key in expired :
+                del self._entries[key]
+
+            removed = len(expired)
+
+            if self._connection is not None :
+                removed += self._connection.execute("DELETE FROM pricing_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)).rowcount
+
+        return removed
+
+
+    def clear (self) -> None :
+
+        with self._lock :
+
+            self._entries.clear()
+
+            if self._connection is not None :
+                self._connection.execute("DELETE FROM pricing_cache")
+
+
+    def close (self) -> None :
+
+        with self._lock :
+
+            if self._connection is not None :
+
+                self._connection.close()
+                self._connection = None
+
+
+    def __len__ (self) -> int :
+        return len(self._entries)
+
+
+    def _remember (self, key : str, expires_at : Optional[float], value : Dict) -> None :
+
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries :
+            self._entries.popitem(last=False)
+
+
+_PRICING_CACHE : Optional[PricingCache] = None
+_PRICING_CACHE_LOCK = threading.Lock()
+
+
+def get_pricing_cache () -> PricingCache :
+    """
+    Return the process wide pricing cache (created on first use).
+    """
+    global _PRICING_CACHE
+
+    with _PRICING_CACHE_LOCK :
+
+        if _PRICING_CACHE is None :
+            _PRICING_CACHE = PricingCache()
+
+    return _PRICING_CACHE
+
+
+_PRICING_FLIGHT = SingleFlight()
+
+
+def get_pricing_flight () -> SingleFlight :
+    """
+    Return the process wide single flight merging identical instruments being priced.
+    """
+    return _PRICING_FLIGHT
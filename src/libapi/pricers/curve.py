@@ -0,0 +1,476 @@
+from __future__ import annotations
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import polars as pl
+
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from libapi.utils.concurrency import run_batches
+from libapi.config.parameters import (
+    PRICER_CURVE_MAX_IN_FLIGHT, PRICER_MAX_RETRIES, LIBAPI_CACHE_CURVES_DIR_PATH, LIBAPI_CACHE_DIR_ABS_PATH,
+    LIBAPI_CACHE_CURVES_FORMAT
+)
+
+# The pricer valuation holds a single date : every date of a curve is its own request.
+# The dates are priced concurrently, each priced date is checkpointed as soon as it
+# comes back, and the curve is assembled with a single concat at the end.
+#
+# Priced points are kept in a CurveStore, one file per instrument (hash of its definition)
+# with one row per valuation date : any range of the curve reuses the dates already priced.
+# The store is binary (Arrow IPC read through a memory map, or Parquet), Excel files are
+# only written on demand as exports. Curves saved in Excel by older versions (one file per
+# call : equity_curve_..._each-<frequency>.xlsx) are imported into the store when the same
+# call asks for dates not stored yet, the Excel files being left untouched.
+
+CHECKPOINT_SUFFIX = ".partial"
+VALUATION_DATE_COLUMN = "ValuationDate"
+
+# Store formats : file suffix
+CURVE_FORMATS = {
+
+    "ipc" : ".arrow",
+    "parquet" : ".parquet"
+
+}
+
+
+class CurveEngine :
+    """
+    Price a curve (one pricing per valuation date) with a bounded number of dates in flight.
+
+    With a checkpoint directory, the dates already priced by a previous (failed) run
+    are read back instead of being priced again.
+    """
+
+    def __init__ (
+
+            self,
+            price_date : Callable[[str], Optional[pl.DataFrame]],
+            max_in_flight : Optional[int] = None,
+            max_retries : Optional[int] = None,
+            checkpoint_dir : Optional[str] = None
+
+        ) -> None :
+        """
+        Args:
+            price_date (Callable): Prices a valuation date ("YYYY-MM-DD"), None or an empty frame on failure.
+            max_in_flight (int, optional): Dates priced at the same time. Defaults to PRICER_CURVE_MAX_IN_FLIGHT.
+            max_retries (int, optional): Extra attempts for a failed date. Defaults to PRICER_MAX_RETRIES.
+            checkpoint_dir (str, optional): Directory of the dates already priced (no checkpoint if None).
+        """
+        self.price_date = price_date
+        self.max_in_flight = PRICER_CURVE_MAX_IN_FLIGHT if max_in_flight is None else max_in_flight
+        self.max_retries = PRICER_MAX_RETRIES if max_retries is None else max_retries
+        self.checkpoint_dir = checkpoint_dir
+
+
+    def run (self, valuation_dates : Sequence[str]) -> pl.DataFrame :
+        """
+        Price every valuation date and assemble the curve.
+
+        The checkpoint is removed once every date is priced. Otherwise it is kept,
+        and the next run only prices the missing dates.
+
+        Args:
+            valuation_dates (Sequence[str]): Dates of the curve ("YYYY-MM-DD").
+
+        Returns:
+            pl.DataFrame: Prices of every date priced, with a ValuationDate column, in date order.
+        """
+        valuation_dates = list(dict.fromkeys(valuation_dates))
+
+        frames = self.load_checkpoint(valuation_dates)
+        missing = [date for date in valuation_dates if date not in frames]
+
+        if len(frames) > 0 :
+            print(f"[*] {len(frames)} / {len(valuation_dates)} dates read from the checkpoint {self.checkpoint_dir}")
+
+        results = run_batches(missing, self._price_and_checkpoint, max_in_flight=self.max_in_flight, max_retries=self.max_retries)
+
+        for date, frame in zip(missing, results) :
+
+            if frame is not None :
+                frames[date] = frame
+
+        failed = [date for date in valuation_dates if date not in frames]
+
+        if failed :
+            print(f"[!] {len(failed)} / {len(valuation_dates)} dates could not be priced (first one : {failed[0]}). Run again to resume")
+
+        elif self.checkpoint_dir is not None :
+            shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
+
+        ordered = [frames[date] for date in valuation_dates if date in frames]
+
+        if not ordered :
+            return pl.DataFrame()
+
+        return pl.concat(ordered, how="diagonal_relaxed")
+
+
+    def load_checkpoint (self, valuation_dates : Sequence[str]) -> Dict[str, pl.DataFrame] :
+        """
+        Dates of the curve already priced by a previous run.
+        """
+        if self.checkpoint_dir is None or not os.path.isdir(self.checkpoint_dir) :
+            return {}
+
+        frames = {}
+
+        for date in valuation_dates :
+
+            path = self._checkpoint_path(date)
+
+            if not os.path.isfile(path) :
+                continue
+
+            try :
+                frames[date] = pl.read_parquet(path)
+
+            except Exception as e :
+                print(f"[!] Unreadable checkpoint for {date}, priced again : {e}")
+
+        return frames
+
+
+    def _price_and_checkpoint (self, date : str) -> Optional[pl.DataFrame] :
+
+        prices = self.price_date(date)
+
+        # None asks run_batches to retry the date
+        if prices is None or prices.is_empty() :
+            return None
+
+        prices = prices.with_columns(pl.lit(date).alias(VALUATION_DATE_COLUMN))
+
+        if self.checkpoint_dir is not None :
+            self._write_checkpoint(date, prices)
+
+        return prices
+
+
+    def _checkpoint_path (self, date : str) -> str :
+
+        return os.path.join(self.checkpoint_dir, f"{date}.parquet")
+
+
+    def _write_checkpoint (self, date : str, prices : pl.DataFrame) -> None :
+
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.checkpoint_dir, prefix=".tmp-", suffix=".parquet")
+        os.close(fd)
+
+        try :
+
+            prices.write_parquet(tmp_path)
+            os.replace(tmp_path, self._checkpoint_path(date))
+
+        except Exception as e :
+
+            # The date is priced : a missing checkpoint only costs a pricing on resume
+            print(f"[!] Unable to checkpoint {date} : {e}")
+
+            try :
+                os.remove(tmp_path)
+
+            except OSError :
+                pass
+
+
+def checkpoint_dir_for (curve_abs_path : str) -> str :
+    """
+    Checkpoint directory of a curve file (next to it).
+    """
+    return os.path.splitext(curve_abs_path)[0] + CHECKPOINT_SUFFIX
+
+
+# -------------------------------------------------- Curve store --------------------------------------------------
+
+
+class CurveStore :
+    """
+    Priced curve points by instrument and valuation date.
+
+    Each instrument (any JSON-like definition : legs, basket...) has a single file
+    holding every date priced so far, whatever the range or the frequency asked.
+    """
+
+    def __init__ (self, dir_abs_path : Optional[str] = None, format : Optional[str] = None) -> None :
+        """
+        Args:
+            dir_abs_path (str, optional): Directory of the curves. Defaults to LIBAPI_CACHE_CURVES_DIR_PATH,
+                else the "curves" directory of LIBAPI_CACHE_DIR_ABS_PATH.
+            format (str, optional): "ipc" or "parquet". Defaults to LIBAPI_CACHE_CURVES_FORMAT.
+        """
+        if dir_abs_path is None :
+            dir_abs_path = LIBAPI_CACHE_CURVES_DIR_PATH if LIBAPI_CACHE_CURVES_DIR_PATH else os.path.join(LIBAPI_CACHE_DIR_ABS_PATH or "", "curves")
+
+        format = LIBAPI_CACHE_CURVES_FORMAT if format is None else format
+
+        if format not in CURVE_FORMATS :
+            raise ValueError(f"Unsupported curve format: {format!r}. Use one of {tuple(CURVE_FORMATS)}")
+
+        self.dir_abs_path = dir_abs_path
+        self.format = format
+        self.suffix = CURVE_FORMATS[format]
+
+
+    @staticmethod
+    def key (definition : Mapping[str, Any]) -> str :
+        """
+        Key of an instrument : hash of its canonical definition.
+        """
+        encoded = json.dumps(definition, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+        return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+    def path (self, key : str) -> str :
+
+        return os.path.join(self.dir_abs_path, f"curve_{key}{self.suffix}")
+
+
+    def checkpoint_dir (self, key : str) -> str :
+
+        return checkpoint_dir_for(self.path(key))
+
+
+    def load (self, key : str) -> Optional[pl.DataFrame] :
+        """
+        Every point stored for an instrument, None if nothing is stored.
+        """
+        path = self.path(key)
+
+        if not os.path.isfile(path) :
+            return None
+
+        try :
+            return self._read(path)
+
+        except Exception as e :
+
+            print(f"[!] Unreadable curve {path}, priced again : {e}")
+            return None
+
+
+    def get (self, key : str, valuation_dates : Sequence[str]) -> Tuple[pl.DataFrame, List[str]] :
+        """
+        Stored points of some dates, and the dates still to price.
+        """
+        stored = self.load(key)
+
+        if stored is None or VALUATION_DATE_COLUMN not in stored.columns :
+            return pl.DataFrame(), list(valuation_dates)
+
+        stored = stored.filter(pl.col(VALUATION_DATE_COLUMN).is_in(list(valuation_dates)))
+        known = set(stored.get_column(VALUATION_DATE_COLUMN).to_list())
+
+        return stored, [date for date in valuation_dates if date not in known]
+
+
+    def extend (self, key : str, points : pl.DataFrame) -> pl.DataFrame :
+        """
+        Merge new points into the stored curve (new points replace the stored ones of the same date).
+
+        Returns:
+            pl.DataFrame: Every point of the instrument, in date order.
+        """
+        stored = self.load(key)
+        merged = points if stored is None else pl.concat([stored, points], how="diagonal_relaxed")
+
+        merged = merged.unique(subset=VALUATION_DATE_COLUMN, keep="last", maintain_order=True).sort(VALUATION_DATE_COLUMN, maintain_order=True)
+
+        self._save(key, merged)
+
+        return merged
+
+
+    def _save (self, key : str, points : pl.DataFrame) -> None :
+        """
+        Atomic write of the points of an instrument.
+        """
+        os.makedirs(self.dir_abs_path, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.dir_abs_path, prefix=".tmp-", suffix=self.suffix)
+        os.close(fd)
+
+        try :
+
+            self._write(points, tmp_path)
+            os.replace(tmp_path, self.path(key))
+
+        except BaseException :
+
+            try :
+                os.remove(tmp_path)
+
+            except OSError :
+                pass
+
+            raise
+
+
+    def export_excel (self, key : str, excel_abs_path : str, valuation_dates : Optional[Sequence[str]] = None) -> Optional[str] :
+        """
+        Write the stored points of an instrument (all, or some dates) into an Excel file.
+
+        Returns:
+            str | None: Path of the file, None if nothing is stored.
+        """
+        points = self.load(key)
+
+        if points is None :
+            return None
+
+        if valuation_dates is not None :
+            points = points.filter(pl.col(VALUATION_DATE_COLUMN).is_in(list(valuation_dates)))
+
+        export_excel(points, excel_abs_path)
+
+        return excel_abs_path
+
+
+    def import_excel (self, key : str, excel_abs_path : str) -> Optional[pl.DataFrame] :
+        """
+        Add the points of a curve saved in Excel by an older version (needs an Excel reader
+        installed). The stored points of the same dates are kept, the file is left as it is.
+
+        Returns:
+            pl.DataFrame | None: Every point of the instrument, None if the file is missing or unreadable.
+        """
+        if not excel_abs_path or not os.path.isfile(excel_abs_path) :
+            return None
+
+        try :
+            points = pl.read_excel(excel_abs_path)
+
+        except Exception as e :
+
+            print(f"[!] Unable to read the Excel curve {excel_abs_path} : {e}")
+            return None
+
+        if VALUATION_DATE_COLUMN not in points.columns :
+
+            print(f"[!] No {VALUATION_DATE_COLUMN} column in the Excel curve {excel_abs_path}")
+            return None
+
+        # Excel readers may type the dates : the store holds "YYYY-MM-DD" strings
+        if points.schema[VALUATION_DATE_COLUMN] in (pl.Date, pl.Datetime) :
+            points = points.with_columns(pl.col(VALUATION_DATE_COLUMN).dt.strftime("%Y-%m-%d"))
+
+        else :
+            points = points.with_columns(pl.col(VALUATION_DATE_COLUMN).cast(pl.String).str.slice(0, 10))
+
+        stored = self.load(key)
+        merged = points if stored is None else pl.concat([points, stored], how="diagonal_relaxed")
+
+        merged = merged.unique(subset=VALUATION_DATE_COLUMN, keep="last", maintain_order=True).sort(VALUATION_DATE_COLUMN, maintain_order=True)
+        self._save(key, merged)
+
+        print(f"[+] {points.height} points imported from the Excel curve {excel_abs_path}")
+
+        return merged
+
+
+    def _read (self, path : str) -> pl.DataFrame :
+
+        # Local IPC files are memory mapped by polars : nothing is copied or decoded
+        if self.format == "ipc" :
+            return pl.read_ipc(path)
+
+        return pl.read_parquet(path)
+
+
+    def _write (self, points : pl.DataFrame, path : str) -> None :
+
+        # Uncompressed IPC : the file is memory mapped as it is, no decoding on read
+        if self.format == "ipc" :
+            points.write_ipc(path, compression="uncompressed")
+
+        else :
+            points.write_parquet(path, compression="zstd")
+
+
+def legacy_curve_paths (filename : str, *dir_abs_paths : Optional[str]) -> List[str] :
+    """
+    Paths where older versions may have saved a curve in Excel (unset directories skipped).
+    """
+    return [os.path.join(dir_abs_path, filename) for dir_abs_path in dict.fromkeys(dir_abs_paths) if dir_abs_path]
+
+
+def export_excel (points : Any, excel_abs_path : str) -> None :
+    """
+    Explicit Excel export of a curve, polars or pandas frame (needs an Excel writer installed).
+    """
+    directory = os.path.dirname(excel_abs_path)
+
+    if directory :
+        os.makedirs(directory, exist_ok=True)
+
+    if isinstance(points, pl.DataFrame) :
+        points.write_excel(excel_abs_path)
+
+    else :
+        points.to_excel(excel_abs_path, index=False)
+
+    print(f"[+] Curve exported to {excel_abs_path}")
+
+
+def build_curve (
+
+        definition : Mapping[str, Any],
+        valuation_dates : Sequence[str],
+        price_date : Callable[[str], Optional[pl.DataFrame]],
+        store : Optional[CurveStore] = None,
+        max_in_flight : Optional[int] = None,
+        legacy_excel_paths : Sequence[str] = ()
+
+    ) -> pl.DataFrame :
+    """
+    Curve of an instrument over some dates : the stored points are reused, only the
+    missing dates are priced (concurrently, resumable) and added to the store.
+
+    Args:
+        definition (Mapping): Instrument definition, the store key.
+        valuation_dates (Sequence[str]): Dates of the curve ("YYYY-MM-DD").
+        price_date (Callable): Prices a valuation date (see CurveEngine).
+        store (CurveStore, optional): Curve store. Defaults to CurveStore().
+        legacy_excel_paths (Sequence[str]): Excel files where older versions saved this curve,
+            imported into the store if some dates are missing.
+
+    Returns:
+        pl.DataFrame: Points of the dates priced, in date order.
+    """
+    if len(valuation_dates) == 0 :
+        return pl.DataFrame()
+
+    store = CurveStore() if store is None else store
+    key = store.key(definition)
+
+    stored, missing = store.get(key, valuation_dates)
+
+    for excel_abs_path in legacy_excel_paths :
+
+        if missing and store.import_excel(key, excel_abs_path) is not None :
+            stored, missing = store.get(key, valuation_dates)
+
+    if not missing :
+
+        print(f"[+] {len(valuation_dates)} dates of the curve read from {store.path(key)}")
+        return stored.sort(VALUATION_DATE_COLUMN, maintain_order=True)
+
+    print(f"[*] {len(valuation_dates) - len(missing)} dates of the curve stored, {len(missing)} to price")
+
+    priced = CurveEngine(price_date, max_in_flight=max_in_flight, checkpoint_dir=store.checkpoint_dir(key)).run(missing)
+
+    if priced.is_empty() :
+        return stored if stored.is_empty() else stored.sort(VALUATION_DATE_COLUMN, maintain_order=True)
+
+    merged = store.extend(key, priced)
+
+    return merged.filter(pl.col(VALUATION_DATE_COLUMN).is_in(list(valuation_dates)))
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-import os
+import threading
 import polars as pl
 import pandas as pd # type: ignore 
 import datetime as dt
@@ -10,17 +10,21 @@ from typing import Optional, List, Dict
 from datetime import datetime
 
 from libapi.pricers.pricer import Pricer
-from libapi.config.parameters import COLUMNS_IN_PRICER, EQ_PRICER_CALC_PATH, EQ_PRICER_SOLVE_PATH, RISKS_UNDERLYING_ASSETS
+from libapi.pricers.aggregation import aggregate_legs
+from libapi.pricers.curve import build_curve, export_excel, legacy_curve_paths
+from libapi.config.parameters import (
+    COLUMNS_IN_PRICER, EQ_PRICER_CALC_PATH, EQ_PRICER_SOLVE_PATH, RISKS_UNDERLYING_ASSETS, SAVED_REQUESTS_DIRECTORY_PATH
+)
 from libapi.instruments.eq import *
 
 strategies_instruments_creation = {
 
-    'Straddle' : make_eq_straddle_payloads,
-    'Strangle' : make_eq_strangle_payloads,
-    'Call Spread' : make_eq_call_spread_payloads,
-    'Put Spread' : make_eq_put_spread_payloads,
-    'Put' : make_eq_put_leg_payloads,
-    'Call' : make_eq_call_leg_payloads,
+    'Straddle' : make_eq_straddle_table,
+    'Strangle' : make_eq_strangle_table,
+    'Call Spread' : make_eq_call_spread_table,
+    'Put Spread' : make_eq_put_spread_table,
+    'Put' : make_eq_put_leg_table,
+    'Call' : make_eq_call_leg_table,
 
 }
 
@@ -73,15 +77,28 @@ class PricerEQ (Pricer) :
         return response
 
 
-    def get_options_prices (self, instruments : list[dict], date : str | dt.datetime = None) :
-        """
+    def get_options_prices (
+        
+            self,
+            instruments : list[dict] | pl.DataFrame,
+            date : str | dt.datetime = None,
+            chunk_size : Optional[int] = None,
+            max_in_flight : Optional[int] = None,
+            max_retries : Optional[int] = None
         
+        ) -> pl.DataFrame :
+        """
+        Price EQ instruments by chunks, several chunks being sent to the API at the same time.
+
         Args:
-            instruments (list[dict]) : Array of dictionaries for instruments
+            instruments (list[dict] | pl.DataFrame) : Array of dictionaries for instruments, or a legs table (make_eq_*_table)
             date (datetime) : Given date for the price , by default now()
+            chunk_size (int, optional) : Number of instruments per request (PRICER_BATCH_SIZE by default)
+            max_in_flight (int, optional) : Number of requests in flight (PRICER_MAX_IN_FLIGHT by default)
+            max_retries (int, optional) : Extra attempts for a failed chunk (PRICER_MAX_RETRIES by default)
             
         Returns:
-            dt (DataFrame) : Results converted to JSON
+            prices (pl.DataFrame) : Flattened prices, in the order of the instruments
 
         Example:
             instrument = [
@@ -89,28 +106,16 @@ class PricerEQ (Pricer) :
                 {'direction': 'Sell', 'BBGTicker': 'SX5E', 'opt_type': 'Call', 'strike': '100%', 'notional': 1000000, 'expiry': '2024-04-30', 'SettlementDate':'2024-05-02'}
             ]
         """
-        # Split instruments into smaller batches
-        if not instruments :
-            return pl.DataFrame()
-
-        instrument_batches = self.split_list(instruments, 50)
+        all_prices = self.price_in_batches(
 
-        # Initialize an empty DataFrame to store the results
-        all_prices = pl.DataFrame()
-        dfs : list[pl.DataFrame] = []
+            instruments,
+            lambda batch : self.request_prices_eq_api(instruments=batch, date=date),
+            chunk_size=chunk_size,
+            max_in_flight=max_in_flight,
+            max_retries=max_retries
 
-        # Request pricing for each batch of instruments
-        for batch in (instrument_batches) : # For each batch, price the instruments
-            
-            prices_batch = self.request_prices_eq_api(instruments=batch, date=date)
-            all_prices = pd.concat([all_prices, prices_batch])
+        )
 
-        # Convert to numeric
-        for col in COLUMNS_IN_PRICER.keys():
-            
-            if COLUMNS_IN_PRICER[col] == 'sum' and col in all_prices.columns :
-                all_prices[col] = pd.to_numeric(all_prices[col].apply(lambda x: str(x).replace(",", "")), errors='coerce')
-                
         return all_prices
     
 
@@ -126,7 +131,7 @@ class PricerEQ (Pricer) :
             date (str) : Date of the price strategy
         
         Returns :
-            all_prices_grouped (tuple) : sdfsdf
+            pl.DataFrame | tuple : Prices aggregated by strategy (and the legs prices if details)
 
         Note:
             if itm or otm is used, keep in mind that this value will be set for every individual option in the stratergy
@@ -137,21 +142,14 @@ class PricerEQ (Pricer) :
         instruments = strategies_instruments_creation[strategy](assets, expiries, strikes)
                 
         # call the API
-        all_prices = self.get_opts_prices(instruments, date=date)
+        all_prices = self.get_options_prices(instruments, date=date)
 
-        # Filter columns
-        filtered_columns_in_pricer = {k: v for k, v in COLUMNS_IN_PRICER.items() if k in all_prices.columns}
-        
-        # if only two columns, return the dataframes (this means request was unsuccessful)
-        if len(all_prices.columns) == 2 :
-            return all_prices, all_prices
+        # Request unsuccessful (only two columns or no strategy), nothing to group
+        if len(all_prices.columns) <= 2 or "stratid" not in all_prices.columns :
+            return (all_prices, all_prices) if details else all_prices
         
         # Group by strategy
-        all_prices_grouped = all_prices[
-
-            list(filtered_columns_in_pricer.keys()) + ['stratid']
-        
-        ].groupby(['stratid']).agg(filtered_columns_in_pricer).reset_index()
+        all_prices_grouped = aggregate_legs(all_prices, COLUMNS_IN_PRICER, by="stratid")
         
         if details :
             return all_prices_grouped, all_prices
@@ -180,19 +178,19 @@ class PricerEQ (Pricer) :
         instruments = strategies_instruments_creation[opt_type]([BBG_ticker], [expiry], [strike], direction="Buy")
 
         # lets call the API to price the strategy
-        prices = self.get_opts_prices(instruments, date=valuation_date)
+        prices = self.get_options_prices(instruments, date=valuation_date)
         
         # check if calculation was successful
-        if len(prices.columns) == 2 :
+        if len(prices.columns) <= 2 :
             raise ValueError("[-] Pricing was not successful")
 
         ## lets get the price of the instrument
-        MarketValueMid = prices['MarketValuePercent'].iloc[0] * 1000000 / 100
+        MarketValueMid = prices['MarketValuePercent'][0] * 1000000 / 100
         # Get the volume
-        volume = 1_000_000/prices['ReferenceSpot'].str.replace(",", "").astype(float).iloc[0]
+        volume = 1_000_000 / float(str(prices['ReferenceSpot'][0]).replace(",", ""))
         
         # Price currency
-        currency = prices['notional_currency'].iloc[0]
+        currency = prices['notional_currency'][0]
 
         """
         try :
@@ -289,25 +287,7 @@ class PricerEQ (Pricer) :
         return response
     
 
-    def does_equity_curve_exist (self, direction : str, BBGTicker : str, opt_type : str, strike : str, notional : float, expiry : str, start_date : str, end_date : str, frequency='Day') :
-        """
-        Args:
-            direction (str) : 'Buy' or 'Sell'
-            BBGTicker (str): Bloomberg Ticker
-            opt_type (str): 'Call' or 'Put'
-            strike (str): '100%', percentage, or value of the strike (if percentage, it will be calculated based on the spot for the start date)
-            notional (float): notional of the option
-            expiry (str): expiry date in format 'YYYY-MM-DD'
-            start_date (str): start date in format 'YYYY-MM-DD'
-            end_date (str) : end date in format 'YYYY-MM-DD'
-            frequency (str) : 'Day', 'Week', 'Month', 'Quarter', 'Year' represents the frequency of the equity curve
-        """
-        filename = f"equity_curve_{direction}_{BBGTicker}_{opt_type}_{strike}_{notional}_expi-{expiry}_from-{start_date}_to-{end_date}_each-{frequency}.xlsx"
-        
-        return filename in os.listdir(EQ_PRICER_CALC_PATH), filename # SAVED_REQUESTS_DIRECTORY_PATH
-
-
-    def equity_curve (self, direction : str, BBGTicker : str, opt_type : str, strike : str, notional : float, expiry : str, start_date : str, end_date : str, frequency='Day') :
+    def equity_curve (self, direction : str, BBGTicker : str, opt_type : str, strike : str, notional : float, expiry : str, start_date : str, end_date : str, frequency='Day', export_path : Optional[str] = None) :
         """
         Args:
             direction (str) : 'Buy' or 'Sell'
@@ -319,6 +299,7 @@ class PricerEQ (Pricer) :
             start_date (str): start date in format 'YYYY-MM-DD'
             end_date (str) : end date in format 'YYYY-MM-DD'
             frequency (str) : 'Day', 'Week', 'Month', 'Quarter', 'Year' represents the frequency of the equity curve
+            export_path (str, optional) : Excel file the curve is also exported to (the cache itself is binary)
         """
         # Check if dates are in correct format
         if type(expiry) != str :
@@ -331,33 +312,50 @@ class PricerEQ (Pricer) :
             raise KeyError('[-] end_date is not a string')
         
         # Get the dates based on the start and end date and the frequency
-        valuation_dates = self.get_dates(start_date, end_date, frequency)
+        valuation_dates = self.generate_dates(start_date, end_date, frequency)
 
-        # First we need to check if this function call was already called or not
-        exists, filename = self.does_equity_curve_exist(direction, BBGTicker, opt_type, strike, notional, expiry, start_date, end_date, frequency)
-        
-        if exists:
-            return pd.read_excel(EQ_PRICER_CALC_PATH + "/" + filename) # SAVED_REQUESTS_DIRECTORY_PATH
+        if valuation_dates is None :
+            return None
 
-        # First thing to do is to get the strike of our option
-        strike = self.get_strike(BBG_ticker=BBGTicker, opt_type=opt_type, strike=strike, expiry=expiry, valuation_date=start_date)
+        # The points are stored by instrument and date : only the dates never priced are requested.
+        # The strike is fixed on start_date, which is part of the instrument definition
+        definition = {
 
-        # Now that we have the strike, lets create the instruments
-        instruments = strategies_instruments_creation[opt_type]([BBGTicker], [expiry], [strike], direction=direction)
-        
-        # Initialize an empty DataFrame to store the results
-        all_prices = pd.DataFrame()
+            "asset_class" : "EQ",
+            "direction" : direction,
+            "BBGTicker" : BBGTicker,
+            "opt_type" : opt_type,
+            "strike" : strike,
+            "strike_date" : start_date,
+            "notional" : notional,
+            "expiry" : expiry
 
-        # Request pricing for each date
-        for date in valuation_dates :
+        }
 
-            prices = self.get_opts_prices(instruments, date=date)
-            prices['ValuationDate'] = date
-            
-            all_prices = pd.concat([all_prices, prices])         
-    
-        # Save as file in the database
-        all_prices.to_excel(EQ_PRICER_CALC_PATH + "/" + filename, index=False) # SAVED_REQUESTS_DIRECTORY_PATH
+        legs = {}
+        legs_lock = threading.Lock()
+
+        def price_date (date : str) -> pl.DataFrame :
+
+            # The strike (2 requests) is only needed if some dates are priced
+            with legs_lock :
+
+                if "table" not in legs :
+
+                    fixed_strike = self.get_strike(BBG_ticker=BBGTicker, opt_type=opt_type, strike=strike, expiry=expiry, valuation_date=start_date)
+                    legs["table"] = strategies_instruments_creation[opt_type]([BBGTicker], [expiry], [fixed_strike], direction=direction)
+
+            # The chunks of a legs table are turned into fresh payload dicts for each request
+            return self.get_options_prices(legs["table"], date=date)
+
+        # Excel file of the same call saved by older versions, imported into the store once
+        legacy_filename = f"equity_curve_{direction}_{BBGTicker}_{opt_type}_{strike}_{notional}_expi-{expiry}_from-{start_date}_to-{end_date}_each-{frequency}.xlsx"
+        legacy_paths = legacy_curve_paths(legacy_filename, EQ_PRICER_CALC_PATH, SAVED_REQUESTS_DIRECTORY_PATH)
+
+        all_prices = build_curve(definition, valuation_dates, price_date, legacy_excel_paths=legacy_paths).to_pandas()
+
+        if export_path is not None :
+            export_excel(all_prices, export_path)
         
         # return the equity curve
         return all_prices
@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-import tqdm # type: ignore
-import pandas as pd # type: ignore
 import polars as pl
 import datetime as dt
 
@@ -9,6 +7,7 @@ from typing import Optional, Dict, List
 
 from libapi.utils.formatter import *
 from libapi.pricers.pricer import Pricer
+from libapi.pricers.aggregation import aggregate_legs
 from libapi.config.parameters import COLUMNS_IN_PRICER, FX_PRICER_SOLVE_PATH
 
 from libapi.instruments.fx import *
@@ -16,12 +15,12 @@ from libapi.instruments.fx import *
 
 strategies_instruments_creation = {
 
-    'Straddle' : make_fx_straddle_payloads,
-    'Strangle' : make_fx_strangle_payloads,
-    'Call Spread' : make_fx_call_spread_payloads,
-    'Put Spread' : make_fx_put_spread_payloads,
-    'Put' : make_fx_put_leg_payloads,
-    'Call' : make_fx_call_leg_payloads,
+    'Straddle' : make_fx_straddle_table,
+    'Strangle' : make_fx_strangle_table,
+    'Call Spread' : make_fx_call_spread_table,
+    'Put Spread' : make_fx_put_spread_table,
+    'Put' : make_fx_put_leg_table,
+    'Call' : make_fx_call_leg_table,
 
 }
 
@@ -67,29 +66,41 @@ class PricerFX (Pricer) :
         return response#self.treat_json_response_pricer(response, instruments)
 
 
-    def get_opts_prices (self, instruments : List, time :  str | dt.time, date : str | dt.datetime) :
-        """
+    def get_opts_prices (
+        
+            self,
+            instruments : List | pl.DataFrame,
+            time :  str | dt.time,
+            date : str | dt.datetime,
+            chunk_size : Optional[int] = None,
+            max_in_flight : Optional[int] = None,
+            max_retries : Optional[int] = None
         
+        ) -> pl.DataFrame :
         """
-        # Split instruments into smaller batches
-        instrument_batches = self.split_list(instruments, 50)
+        Price FX instruments by chunks, several chunks being sent to the API at the same time.
 
-        # Initialize an empty DataFrame to store the results
-        all_prices = pd.DataFrame()
+        Args:
+            instruments (List[Dict] | pl.DataFrame) : Instruments to price (each one carries its own `pair`), or a legs table
+            time (str | dt.time) : Valuation time
+            date (str | dt.datetime) : Valuation date
+            chunk_size (int, optional) : Number of instruments per request (PRICER_BATCH_SIZE by default)
+            max_in_flight (int, optional) : Number of requests in flight (PRICER_MAX_IN_FLIGHT by default)
+            max_retries (int, optional) : Extra attempts for a failed chunk (PRICER_MAX_RETRIES by default)
 
-        # Request pricing for each batch of instruments
-        for batch in tqdm.tqdm(instrument_batches) : 
-            
-            # For each batch, price the instruments
-            prices_batch = self.post_request_price(batch, time, date=date)
-            all_prices = pd.concat([all_prices, prices_batch])
-        
-        # Convert to numeric
-        for col in COLUMNS_IN_PRICER.keys() :
+        Returns:
+            prices (pl.DataFrame) : Flattened prices, in the order of the instruments
+        """
+        all_prices = self.price_in_batches(
+
+            instruments,
+            lambda batch : self.request_fx_prices_api(batch, time, date=date),
+            chunk_size=chunk_size,
+            max_in_flight=max_in_flight,
+            max_retries=max_retries
+
+        )
 
-            if COLUMNS_IN_PRICER[col] == 'sum' and col in all_prices.columns :
-                all_prices[col] = pd.to_numeric(all_prices[col], errors='coerce')
-                
         return all_prices
     
 
@@ -103,6 +114,9 @@ class PricerFX (Pricer) :
             expiries (list) : List of expiry dates in format 'YYYY-MM-DD', i.e ['2024-05-27']
             strikes (list): list of strikes, i.e. ['ATMF', 'ATM'] or value, or any percentage itm or otm, or delta eg: 15itm, 20itmf, 20otm)
         
+        Returns :
+            pl.DataFrame | tuple : Prices aggregated by strategy (and the legs prices if details)
+
         Note:
             if itm or otm is used, keep in mind that this value will be set for every individual option in the stratergy
         """
@@ -111,7 +125,7 @@ class PricerFX (Pricer) :
         # Create all instruments to price
         instruments = strategies_instruments_creation[strategy](ccys, expiries, strikes)
         """
-        Instruments is an list of dictionnaries, for each instrument, it is in the following format:
+        Instruments is a legs table (see libapi.instruments.grid), each row is a leg in the following format:
         => instrument = {
             'direction': 'Sell',
             'pair': 'EURUSD',
@@ -125,15 +139,14 @@ class PricerFX (Pricer) :
         """
 
         # call the API
-        all_prices = self.get_opts_prices(instruments, time, date=date)  # This is a dataFrame
-        
-        # Filter columns
-        filtered_columns_in_pricer = {k: v for k, v in COLUMNS_IN_PRICER.items() if k in all_prices.columns}
+        all_prices = self.get_opts_prices(instruments, time, date=date)
+
+        # Request unsuccessful, nothing to group
+        if "stratid" not in all_prices.columns :
+            return (all_prices, all_prices) if details else all_prices
         
         # Group by stragegy
-        all_prices_grouped = all_prices[
-            list(filtered_columns_in_pricer.keys()) + ['stratid']
-        ].groupby(['stratid']).agg(filtered_columns_in_pricer).reset_index()
+        all_prices_grouped = aggregate_legs(all_prices, COLUMNS_IN_PRICER, by="stratid")
         
         if details:
             return all_prices_grouped, all_prices
@@ -183,7 +196,7 @@ class PricerFX (Pricer) :
         
     
         # check if calculation was successful
-        if len(opt.columns) == 2 :
+        if len(opt.columns) <= 2 :
             raise ValueError("[-] Pricing was not successful")
             
         if solve == True :
@@ -191,11 +204,11 @@ class PricerFX (Pricer) :
             # Now that we have the price, lets call the solve method
             res = self.solve_for_strike(
 
-                opt['pair'].iloc[0],
-                opt['direction'].iloc[0],
-                opt['opt_type'].iloc[0],
-                opt['expiry'].iloc[0],
-                opt['MarketPriceAskPercentBase'].iloc[0],
+                opt['pair'][0],
+                opt['direction'][0],
+                opt['opt_type'][0],
+                opt['expiry'][0],
+                opt['MarketPriceAskPercentBase'][0],
                 time,
                 valuation_date
 
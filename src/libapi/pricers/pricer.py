@@ -6,25 +6,45 @@ import csv
 import polars as pl
 import datetime as dt
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable, Tuple
 
 from libapi.utils.formatter import *
+from libapi.utils.concurrency import SingleFlight, split_in_chunks, split_in_chunks_by_key, run_batches
 from libapi.ice.trade_manager import TradeManager
+from libapi.ice.shared import get_shared_client
+from libapi.pricers.cache import PricingCache, get_pricing_cache, get_pricing_flight, pricing_context_key, pricing_cache_key
 from libapi.config.parameters import (
     LIBAPI_LOGS_DIR_ABS_PATH, LIBAPI_LOGS_PRICING_BASENAME, LIBAPI_LOGS_PRICER_COLUMNS,
     FREQUENCY_DATE_MAP, EQ_PRICER_CALC_PATH, RISKS_UNDERLYING_ASSETS,
-    COLUMNS_IN_PRICER, 
+    COLUMNS_IN_PRICER, PRICER_BATCH_SIZE, PRICER_MAX_IN_FLIGHT, PRICER_MAX_RETRIES
 
 )
 
+def _struct_fields (dtype : pl.DataType) -> Dict[str, pl.DataType] :
+    """
+    Fields of a struct dtype (empty for any other dtype).
+    """
+    return { field.name : field.dtype for field in dtype.fields } if isinstance(dtype, pl.Struct) else {}
+
+
 class Pricer :
 
 
-    def __init__ (self, trade_manager : Optional[TradeManager] = None) -> None :
+    def __init__ (
+
+            self,
+            trade_manager : Optional[TradeManager] = None,
+            pricing_cache : Optional[PricingCache] = None,
+            pricing_flight : Optional[SingleFlight] = None
+
+        ) -> None :
         """
         
         """
-        self.api = trade_manager if trade_manager is not None else TradeManager()
+        # Every pricer of the process uses the same authenticated TradeManager
+        self.api = trade_manager if trade_manager is not None else get_shared_client(TradeManager)
+        self.pricing_cache = pricing_cache if pricing_cache is not None else get_pricing_cache()
+        self.pricing_flight = pricing_flight if pricing_flight is not None else get_pricing_flight()
 
     # -------- API payload helpers --------
 
@@ -86,12 +106,20 @@ class Pricer :
             underly_asset : Optional[str | Dict] = None,
             payout_ccy : str = "EUR",
             endpoint : Optional[str] = None,
+            use_cache : bool = True,
+            coalesce : bool = True,
 
         ) -> Optional[Dict] :
         """
         Calculatees the price via the ICE API for an EQ
+
+        Instruments already priced for the same valuation are taken from the pricing
+        cache (see libapi.pricers.cache), only the others are sent to the API. Identical
+        instruments (in the request, or in flight in another thread) are priced once.
         
         Args:
+            use_cache (bool): Read and fill the pricing cache.
+            coalesce (bool): Merge identical instruments with the requests in flight.
 
         """
         endpoint = EQ_PRICER_CALC_PATH if endpoint is None else endpoint
@@ -123,8 +151,11 @@ class Pricer :
 
             if asset_class == "FX" :
 
-                base_ccy = underly_asset[:-3]
-                term_ccy = underly_asset[-3:]
+                # Each leg carries its own pair, the argument is only a fallback
+                pair = instrument.get("pair") or underly_asset
+
+                base_ccy = pair[:-3]
+                term_ccy = pair[-3:]
 
                 underlying_asset = {
 
@@ -152,8 +183,6 @@ class Pricer :
             instruments_payload.append(instrument_payload)
             index_len += 1
 
-        self.log_api_call((index_len + 1)) # Log the lenght of the instruments table
-
         valuation = {
 
             "type" : valuation_type,
@@ -168,6 +197,96 @@ class Pricer :
 
         }
 
+        use_cache = use_cache and self.pricing_cache.is_cacheable(valuation_type)
+        flight = self.pricing_flight if coalesce else None
+
+        if not use_cache and flight is None :
+
+            self.log_api_call((len(instruments_payload) + 1)) # Log the lenght of the instruments table
+            return self._post_prices(endpoint, valuation, artifacts, instruments_payload)
+
+        # Identical instruments share a key : priced once, whoever asks for them
+        context_key = pricing_context_key(valuation, endpoint, artifacts)
+        keys = [pricing_cache_key(instrument_payload, context_key) for instrument_payload in instruments_payload]
+
+        payloads = {}
+
+        for key, instrument_payload in zip(keys, instruments_payload) :
+            payloads.setdefault(key, instrument_payload)
+
+        priced = {}
+
+        if use_cache :
+
+            for key in payloads :
+
+                hit = self.pricing_cache.get(key)
+
+                if hit is not None :
+                    priced[key] = hit
+
+            if priced :
+                print(f"[*] {len(priced)} / {len(payloads)} instruments taken from the pricing cache")
+
+        missing = [key for key in keys if key not in priced]
+        owned, waiting = flight.claim(missing) if flight is not None else (list(dict.fromkeys(missing)), {})
+
+        response, unmatched = None, []
+
+        if owned :
+
+            try :
+
+                response, sent, unmatched = self._send_priced_keys(endpoint, valuation, artifacts, payloads, owned, valuation_type, use_cache)
+                priced.update(sent)
+
+            finally :
+
+                # Always release the keys : on failure the waiters price them themselves
+                if flight is not None :
+
+                    for key in owned :
+                        flight.resolve(key, priced.get(key))
+
+            if response is None :
+                return None
+
+        if waiting :
+
+            for key, future in waiting.items() :
+
+                result = future.result()
+
+                if result is not None :
+                    priced[key] = result
+
+            print(f"[*] {len(waiting)} instruments priced by concurrent requests")
+
+            # Their owner failed : price them here
+            fallback = [key for key in waiting if key not in priced]
+
+            if fallback :
+
+                fallback_response, sent, fallback_unmatched = self._send_priced_keys(endpoint, valuation, artifacts, payloads, fallback, valuation_type, use_cache)
+
+                if fallback_response is None :
+                    return None
+
+                priced.update(sent)
+                unmatched.extend(fallback_unmatched)
+                response = response if response is not None else fallback_response
+
+        # Everything was sent by this request once : the response is already the right one
+        if response is not None and len(owned) == len(keys) :
+            return response
+
+        instruments = [{**priced[key], "id" : instrument_payload["ID"]} for key, instrument_payload in zip(keys, instruments_payload) if key in priced]
+
+        return { **(response or {}), "instruments" : instruments + unmatched }
+
+
+    def _post_prices (self, endpoint : str, valuation : Dict, artifacts : Dict, instruments_payload : List[Dict]) -> Optional[Dict] :
+
         response = self.api.post(
 
             endpoint=endpoint,
@@ -183,7 +302,64 @@ class Pricer :
 
         return response
 
-    
+
+    def _send_priced_keys (
+
+            self,
+            endpoint : str,
+            valuation : Dict,
+            artifacts : Dict,
+            payloads : Dict[str, Dict],
+            keys : List[str],
+            valuation_type : str,
+            use_cache : bool
+
+        ) -> Tuple[Optional[Dict], Dict[str, Dict], List[Dict]] :
+        """
+        Price the payloads of some keys and cache the instruments priced.
+
+        Returns:
+            (Dict | None, Dict, List): Raw response, priced instruments by key (matched on
+                the IDs), instruments of the response that could not be matched.
+        """
+        self.log_api_call((len(keys) + 1)) # Log the lenght of the instruments table
+
+        response = self._post_prices(endpoint, valuation, artifacts, [payloads[key] for key in keys])
+
+        if response is None :
+            return None, {}, []
+
+        keys_by_id, duplicated = {}, set()
+
+        for key in keys :
+
+            id = str(payloads[key]["ID"])
+
+            if id in keys_by_id :
+                duplicated.add(id)
+
+            keys_by_id[id] = key
+
+        priced, unmatched = {}, []
+
+        for instrument in response.get("instruments") or [] :
+
+            id = str(instrument.get("id"))
+
+            # Responses are matched on the IDs : ambiguous ones are returned but not shared
+            if id not in keys_by_id or id in duplicated or keys_by_id[id] in priced :
+
+                unmatched.append(instrument)
+                continue
+
+            priced[keys_by_id[id]] = instrument
+
+        if use_cache :
+            self.pricing_cache.put_many([(key, instrument) for key, instrument in priced.items() if instrument.get("results") or instrument.get("assets")], valuation_type, valuation.get("Date"))
+
+        return response, priced, unmatched
+
+
     def log_api_call (
         
             self,
@@ -239,9 +415,23 @@ class Pricer :
 
         ) -> Optional[pl.DataFrame] :
         """
-        Vectorized + Polars-native flattener for pricer JSON (Dict) response.
+        Columnar flattener for the pricer JSON (Dict) response.
+
+        One row per priced instrument, one column per result code (plus `<code>_currency`
+        when the results carry a currency). The results of the first asset override
+        the top level ones, and within a level the last value of a code wins.
+
+        The response is loaded as nested columns, the result lists exploded into flat
+        (row, code, value, currency) cells and reshaped with a single pivot : no Python
+        loop over the instruments or the cells. Values of mixed types (numbers and text)
+        in one response are kept as text.
 
+        Args:
+            response (Dict): Pricer response with an `instruments` list.
+            instruments (List[Dict]): Instruments sent, joined back on `id` = `ID`.
 
+        Returns:
+            pl.DataFrame | None: Flattened prices, None if the response has no instrument.
         """
         instrument_list = response.get('instruments', [])
 
@@ -249,171 +439,122 @@ class Pricer :
 
             print("[-] Empty instrument list...")
             return None
-        
-        base = pl.DataFrame(instrument_list)
 
-        # Keep minimal base identifiers if present
-        keep_cols = [c for c in ("id",) if c in base.columns]
-
-        if not keep_cols :
+        if not any("id" in instrument for instrument in instrument_list) :
             
             print("[!] No ID. Nothing to join on. Returning a safe frame")
             return pl.DataFrame()
 
-        # ---------- Flatten top-level results ----------
+        try :
+            frame = pl.DataFrame(instrument_list, schema=["id", "results", "assets"], infer_schema_length=None)
 
-        base = base.select(keep_cols + [c for c in base.columns if c in ("results", "assets")])
-        
-        # We'll build a list of flattened rows as dicts
-        flattened_rows = []
+        except (TypeError, pl.exceptions.PolarsError) :
 
-        for row in base.iter_rows(named=True) :
+            # Values of mixed types : the slower conversion casts them to a common type
+            frame = pl.DataFrame(instrument_list, schema=["id", "results", "assets"], strict=False, infer_schema_length=None)
 
-            # Start from basic keys (like id)
-            flat_row = {k: row[k] for k in keep_cols if k in row}
+        # Row number as key : the ids of a response are not guaranteed to be unique
+        frame = frame.with_row_index("_row").with_columns(pl.col("_row").cast(pl.Int64))
 
-            # Flatten 'results' list
-            results = row.get('results')
-            
-            if isinstance(results, list) :
+        data = frame.select("_row", "id")
+        result_lists = [pl.col("results")]
 
-                for result_dict in results :
+        first_asset = _struct_fields(frame.schema["assets"].inner) if isinstance(frame.schema["assets"], pl.List) else {}
 
-                    code = result_dict.get('code')
-                    value = result_dict.get('value')
-                    
-                    if code is not None and value is not None :
-                        flat_row[code] = value
+        if "name" in first_asset :
 
-                    if 'currency' in result_dict and code is not None :
-                        flat_row[f"{code}_currency"] = result_dict['currency']
+            names = frame.get_column("assets").list.first().struct.field("name").alias("asset")
 
-            # Flatten 'assets' list (only first asset)
-            assets = row.get('assets')
-            
-            if isinstance(assets, list) and len(assets) > 0 and isinstance(assets[0], dict):
-            
-                first_asset = assets[0]
-                flat_row['asset'] = first_asset.get('name')
-                asset_results = first_asset.get('results', [])
-            
-                for result_dict in asset_results :
-            
-                    code = result_dict.get('code')
-                    value = result_dict.get('value')
+            if names.null_count() < names.len() :
+                data = data.with_columns(names)
+
+        # Top level results then first asset results : later cells override earlier ones
+        if "results" in first_asset :
+            result_lists.append(pl.col("assets").list.first().struct.field("results"))
+
+        cell_frames = []
+
+        for result_list in result_lists :
+
+            cells = frame.select("_row", result_list.alias("_cells"))
+
+            if not isinstance(cells.schema["_cells"], pl.List) or "code" not in _struct_fields(cells.schema["_cells"].inner) :
+                continue
 
-                    if code is not None and value is not None :
-                        flat_row[code] = value
-                    
-                    if 'currency' in result_dict and code is not None :
-                        flat_row[f"{code}_currency"] = result_dict['currency']
+            cells = cells.explode("_cells").unnest("_cells")
+            cell_frames.append(cells.select("_row", *(c for c in ("code", "value", "currency") if c in cells.columns)))
+
+        if cell_frames :
+
+            cells = (
+
+                pl.concat(cell_frames, how="diagonal_relaxed")
+                .filter(pl.col("code").is_not_null())
+                .sort("_row", maintain_order=True)
+
+            )
+
+            for column in ("value", "currency") :
+
+                if column not in cells.columns :
+                    cells = cells.with_columns(pl.lit(None, dtype=pl.String).alias(column))
+
+            codes = cells.get_column("code").unique(maintain_order=True).to_list()
+
+            # Last non null value and currency of each (row, code), named value_<code> / currency_<code>
+            pivoted = cells.pivot(
+
+                on="code",
+                index="_row",
+                values=["value", "currency"],
+                aggregate_function=pl.element().drop_nulls().last(),
+                separator="_"
+
+            )
 
-            flattened_rows.append(flat_row)
+            renamed = { f"value_{code}" : code for code in codes }
+            renamed.update({ f"currency_{code}" : f"{code}_currency" for code in codes })
 
-        # Create Polars DataFrame from flattened dicts
-        data = pl.DataFrame(flattened_rows)
+            pivoted = pivoted.rename({ k : v for k, v in renamed.items() if k in pivoted.columns })
+
+            # Codes (or currencies) never given a value do not make a column
+            empty = [c for c, count in zip(pivoted.columns, pivoted.null_count().row(0)) if c != "_row" and count == pivoted.height]
+            pivoted = pivoted.drop(empty)
+
+            data = data.join(pivoted, on="_row", how="left")
+
+            # Each code followed by its currency, in order of appearance
+            columns = [c for c in data.columns if c not in renamed.values()]
+
+            for code in codes :
+                columns.extend(c for c in (code, f"{code}_currency") if c in data.columns)
+
+            data = data.select(columns)
+
+        data = data.sort("_row").drop("_row")
 
         # Prepare instruments DataFrame
         instruments_df = pl.DataFrame(instruments)
 
         # Columns to join on (only keep existing)
-        join_cols = [col for col in ['ID', 'direction', 'pair', 'opt_type', 'strike',
+        join_cols = [col for col in ['direction', 'pair', 'opt_type', 'strike',
                                     'notional', 'notional_currency', 'expiry',
                                     'BBGTicker', 'stratid'] if col in instruments_df.columns]
 
-        # Join data on id = ID
-        # Polars requires join keys with same names or specify them explicitly:
-        if 'id' in data.columns and 'ID' in instruments_df.columns :
-        
-            instruments_df_renamed = instruments_df.rename({'ID': 'id'})
-            merged = data.join(instruments_df_renamed.select(['id'] + join_cols[1:]), on='id', how='left')
-        
-        else :
+        if 'ID' not in instruments_df.columns :
             
             print("[!] Cannot join on id/ID: columns missing.")
             return data
 
-        return merged
-        """
-        
-        
-        """
-        df  = pl.DataFrame(response.get("instruments", []))
-        lf  = df.select([c for c in ("id", "results", "assets") if c in df.columns]).lazy()
-
-        top = (
-        
-            lf
-            .select("id", pl.col("results").alias("r"))
-            .explode("r").drop_nulls("r")
-            .select(
-
-                "id",
-                pl.col("r").struct.field("code").alias("code"),
-                pl.col("r").struct.field("value").alias("value"),
-                pl.col("r").struct.field("currency").alias("currency"),
-                pl.lit(0).alias('src')
-            
-            )
-        
-        )
-
-        fa = (lf.select("id",
-            pl.when(pl.col("assets").is_not_null() & (pl.col("assets").list.lengths()>0))
-              .then(pl.col("assets").list.get(0)).otherwise(None).alias("a")))
-        
-        asset = fa.select("id", pl.col("a").struct.field("name").alias("asset")).unique()
-        aset = (fa.select("id", pl.col("a").struct.field("results").alias("r"))
-              .explode("r").drop_nulls("r")
-              .select("id",
-                      pl.col("r").struct.field("code").alias("code"),
-                      pl.col("r").struct.field("value").alias("value"),
-                      pl.col("r").struct.field("currency").alias("currency"),
-                      pl.lit(1).alias("src")))
-
-        # pick best per (id,code): asset wins, then last seen
-        comb = pl.concat([top, aset], how="vertical_relaxed").with_row_count("rn")
-        prio = (pl.col("src").cast(pl.Int64())*pl.lit(10**12) + pl.col("rn").cast(pl.Int64()))
-        best = (comb.group_by(["id","code"])
-                    .agg(value=pl.col("value").take(prio.arg_max()),
-                        currency=pl.col("currency").take(prio.arg_max())))
-
-        # wide values + currencies
-        valw = best.pivot(values="value", index="id", columns="code")
-        curw = (best.pivot(values="currency", index="id", columns="code")
-                 .select([pl.col("id"), pl.all().exclude("id").name.suffix("_currency")]))
-
-        out = (lf.select("id").unique().join(asset, on="id", how="left")
-             .join(valw, on="id", how="left")
-             .join(curw, on="id", how="left"))
-
-
-        if instruments :
-
-            instr = pl.DataFrame(instruments)
-            
-            list_columns = list(columns_overrides.keys())
-            keep = [c for c in list_columns if c in instr.columns]
-
-            if keep:
-                
-                out = out.join(
-
-                    instr
-                    .select(keep)
+        instruments_df = instruments_df.select([pl.col('ID').alias('id')] + join_cols)
 
-                    .unique(
-                        subset=["ID"],
-                        keep="last"
-                    ).lazy(),
+        # Same dtype on both sides of the join (ids may come back as strings)
+        if instruments_df.schema['id'] != data.schema['id'] :
+            instruments_df = instruments_df.with_columns(pl.col('id').cast(data.schema['id'], strict=False))
 
-                    left_on="id",
-                    right_on="ID",
-                    how="left"
+        merged = data.join(instruments_df, on='id', how='left', maintain_order='left')
 
-                )
-        
-        return out.collect()
+        return merged
 
 
     def split_list (self, list : List[Any], max_num : int) -> List[List[Any]]:
@@ -435,6 +576,163 @@ class Pricer :
         return chunks
 
 
+    def price_in_batches (
+
+            self,
+            instruments : List[Dict] | pl.DataFrame,
+            request_function : Callable[[List[Dict]], Optional[Dict]],
+            chunk_size : Optional[int] = None,
+            max_in_flight : Optional[int] = None,
+            max_retries : Optional[int] = None
+
+        ) -> pl.DataFrame :
+        """
+        Price instruments by chunks, sending several chunks to the API at the same time.
+
+        A legs table (see libapi.instruments.grid) is sliced without copy and each
+        chunk is turned into payload dicts only when it is sent.
+
+        The legs of a strategy (same `stratid`) are always sent in the same chunk, and a
+        strategy with legs missing from the results (failed chunk, instrument not priced)
+        is dropped : its aggregated price would be wrong.
+
+        Args:
+            instruments (List[Dict] | pl.DataFrame): Instruments to price, as dicts or as a legs table.
+            request_function (Callable): Sends one chunk to the API and returns the raw JSON response.
+            chunk_size (int, optional): Number of instruments per request. Defaults to PRICER_BATCH_SIZE.
+            max_in_flight (int, optional): Number of requests in flight. Defaults to PRICER_MAX_IN_FLIGHT.
+            max_retries (int, optional): Extra attempts for a failed chunk. Defaults to PRICER_MAX_RETRIES.
+
+        Returns:
+            pl.DataFrame: Flattened prices of the complete strategies (or of every instrument
+                priced if there is no `stratid`), in input order.
+        """
+        chunk_size = PRICER_BATCH_SIZE if chunk_size is None else chunk_size
+        max_in_flight = PRICER_MAX_IN_FLIGHT if max_in_flight is None else max_in_flight
+        max_retries = PRICER_MAX_RETRIES if max_retries is None else max_retries
+
+        if len(instruments) == 0 :
+            return pl.DataFrame()
+
+        def price_chunk (chunk : List[Dict] | pl.DataFrame) -> Optional[pl.DataFrame] :
+
+            if isinstance(chunk, pl.DataFrame) :
+                chunk = chunk.to_dicts()
+
+            response = request_function(chunk)
+
+            if response is None :
+                return None
+
+            # A None here means the response had no instrument, retry the chunk
+            return self.flatten_pricer_response(response, chunk)
+
+        start = time.time()
+
+        strat_ids = self._strat_ids(instruments)
+
+        if strat_ids is None :
+            chunks = split_in_chunks(instruments, chunk_size)
+
+        else :
+            chunks = split_in_chunks_by_key(instruments, chunk_size, strat_ids)
+
+        frames = run_batches(chunks, price_chunk, max_in_flight=max_in_flight, max_retries=max_retries)
+
+        frames = [frame for frame in frames if frame is not None and not frame.is_empty()]
+
+        if len(frames) < len(chunks) :
+            print(f"[!] {len(chunks) - len(frames)} / {len(chunks)} chunks could not be priced")
+
+        if not frames :
+            return pl.DataFrame()
+
+        all_prices = pl.concat(frames, how="diagonal_relaxed")
+
+        if strat_ids is not None :
+            all_prices = self.drop_incomplete_strategies(all_prices, strat_ids)
+
+        print(f"[+] {len(instruments)} instruments priced in {len(chunks)} chunks in {time.time() - start} seconds")
+
+        return self.cast_numeric_columns(all_prices)
+
+
+    def drop_incomplete_strategies (self, prices : pl.DataFrame, strat_ids : List[Any], by : str = "stratid") -> pl.DataFrame :
+        """
+        Drop the strategies with fewer priced legs than legs sent.
+
+        Args:
+            prices (pl.DataFrame): Flattened prices, with the `by` column.
+            strat_ids (List): Strategy of each instrument sent.
+            by (str): Strategy column.
+
+        Returns:
+            pl.DataFrame: Prices of the complete strategies only.
+        """
+        if by not in prices.columns :
+            return prices
+
+        expected = pl.DataFrame({ by : [str(strat_id) for strat_id in strat_ids] }).group_by(by).len("_expected")
+        priced = prices.select(pl.col(by).cast(pl.String)).group_by(by).len("_priced")
+
+        incomplete = (
+
+            expected
+            .join(priced, on=by, how="left")
+            .filter(pl.col("_priced").fill_null(0) < pl.col("_expected"))
+            .get_column(by)
+
+        )
+
+        if incomplete.len() == 0 :
+            return prices
+
+        print(f"[!] {incomplete.len()} strategies dropped, legs missing from the results : {incomplete.head(10).to_list()}")
+
+        return prices.filter(~pl.col(by).cast(pl.String).is_in(incomplete.implode()))
+
+
+    @staticmethod
+    def _strat_ids (instruments : List[Dict] | pl.DataFrame, by : str = "stratid") -> Optional[List[Any]] :
+        """
+        Strategy of each instrument, None if the instruments have none.
+        """
+        if isinstance(instruments, pl.DataFrame) :
+            return instruments.get_column(by).to_list() if by in instruments.columns else None
+
+        strat_ids = [instrument.get(by) for instrument in instruments]
+
+        return None if all(strat_id is None for strat_id in strat_ids) else strat_ids
+
+
+    def cast_numeric_columns (self, prices : pl.DataFrame, columns_spec : Optional[Dict] = None) -> pl.DataFrame :
+        """
+        Convert the summed pricer columns to Float64 (thousands separators are removed).
+
+        Args:
+            prices (pl.DataFrame): Flattened pricer results.
+            columns_spec (Dict, optional): Aggregation spec. Defaults to COLUMNS_IN_PRICER.
+
+        Returns:
+            pl.DataFrame: Same frame with numeric columns casted (invalid values become null).
+        """
+        columns_spec = COLUMNS_IN_PRICER if columns_spec is None else columns_spec
+
+        numeric_cols = [col for col, agg in columns_spec.items() if agg == "sum" and col in prices.columns]
+
+        if not numeric_cols :
+            return prices
+
+        return prices.with_columns(
+
+            [
+                pl.col(col).cast(pl.Utf8).str.replace_all(",", "").cast(pl.Float64, strict=False)
+                for col in numeric_cols
+            ]
+
+        )
+
+
     def generate_dates (
             
             self,
@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import time
+import threading
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+def split_in_chunks (items : Sequence[Any], chunk_size : int) -> List[Sequence[Any]] :
+    """
+    Split a sequence into consecutive chunks of at most `chunk_size` elements.
+
+    Args:
+        items (Sequence[Any]): Elements to split (list, tuple or polars DataFrame).
+        chunk_size (int): Maximum number of elements per chunk.
+
+    Returns:
+        List[Sequence[Any]]: Chunks, in input order.
+    """
+    if chunk_size <= 0 :
+        raise ValueError("[-] chunk_size must be a strictly positive integer")
+
+    return [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+
+def split_in_chunks_by_key (items : Sequence[Any], chunk_size : int, keys : Sequence[Hashable]) -> List[Sequence[Any]] :
+    """
+    Split a sequence into chunks of about `chunk_size` elements, never splitting a run of
+    consecutive elements with the same key (e.g. the legs of a strategy).
+
+    A run longer than `chunk_size` makes a chunk of its own.
+
+    Args:
+        items (Sequence[Any]): Elements to split (list, tuple or polars DataFrame).
+        chunk_size (int): Maximum number of elements per chunk (unless a run is longer).
+        keys (Sequence[Hashable]): Key of each element.
+
+    Returns:
+        List[Sequence[Any]]: Chunks, in input order.
+    """
+    if chunk_size <= 0 :
+        raise ValueError("[-] chunk_size must be a strictly positive integer")
+
+    if len(keys) != len(items) :
+        raise ValueError("[-] One key is needed per element")
+
+    bounds, start, run_start = [], 0, 0
+
+    for i in range(1, len(items) + 1) :
+
+        # End of a run of the same key
+        if i < len(items) and keys[i] == keys[i - 1] :
+            continue
+
+        if i - start > chunk_size and run_start > start :
+
+            bounds.append((start, run_start))
+            start = run_start
+
+        if i - start >= chunk_size or i == len(items) :
+
+            bounds.append((start, i))
+            start = i
+
+        run_start = i
+
+    return [items[begin:end] for begin, end in bounds]
+
+
+def run_with_retries (
+
+        function : Callable[[Any], Any],
+        item : Any,
+        max_retries : int = 2,
+        retry_delay : float = 0.5,
+        label : str = "batch"
+
+    ) -> Optional[Any] :
+    """
+    Call `function(item)` and retry it on its own when it raises or returns None.
+
+    The delay between two attempts doubles after each failure.
+
+    Args:
+        function (Callable): Worker applied to the item.
+        item (Any): The work unit (usually a chunk of instruments).
+        max_retries (int): Number of extra attempts after the first one.
+        retry_delay (float): Initial delay in seconds between two attempts.
+        label (str): Name used in the log messages.
+
+    Returns:
+        Any | None: The worker result, or None if every attempt failed.
+    """
+    delay = retry_delay
+
+    for attempt in range(max_retries + 1) :
+
+        try :
+
+            result = function(item)
+
+            if result is not None :
+                return result
+
+            print(f"[!] Empty result for {label} (attempt {attempt + 1}/{max_retries + 1})")
+
+        except Exception as e :
+
+            print(f"[!] Error for {label} (attempt {attempt + 1}/{max_retries + 1}): {e}")
+
+        if attempt < max_retries :
+
+            time.sleep(delay)
+            delay *= 2
+
+    print(f"[-] {label} failed after all retries")
+
+    return None
+
+
+def run_batches (
+
+        batches : Sequence[Any],
+        function : Callable[[Any], Any],
+        max_in_flight : int = 4,
+        max_retries : int = 2,
+        retry_delay : float = 0.5
+
+    ) -> List[Optional[Any]] :
+    """
+    Run `function` over every batch with a bounded number of batches in flight.
+
+    Each batch is retried independently, so one failing chunk never blocks
+    or re-sends the others.
+
+    Args:
+        batches (Sequence[Any]): Work units to process.
+        function (Callable): Worker applied to each batch.
+        max_in_flight (int): Maximum number of batches processed at the same time.
+        max_retries (int): Number of extra attempts per batch.
+        retry_delay (float): Initial delay in seconds between two attempts of a batch.
+
+    Returns:
+        List[Any | None]: One result per batch, in input order (None for failed batches).
+    """
+    if not batches :
+        return []
+
+    n_workers = max(1, min(int(max_in_flight), len(batches)))
+
+    # Nothing to overlap: avoid the pool overhead
+    if n_workers == 1 :
+        return [run_with_retries(function, batch, max_retries, retry_delay, f"batch {i}") for i, batch in enumerate(batches)]
+
+    with ThreadPoolExecutor(max_workers=n_workers) as executor :
+
+        futures = [
+
+            executor.submit(run_with_retries, function, batch, max_retries, retry_delay, f"batch {i}")
+            for i, batch in enumerate(batches)
+
+        ]
+
+        # Futures are kept in submission order, so results follow the input order
+        results = [future.result() for future in futures]
+
+    return results
+
+
+def iter_batches (
+
+        batches : Sequence[Any],
+        function : Callable[[Any], Any],
+        max_in_flight : int = 4,
+        max_retries : int = 2,
+        retry_delay : float = 0.5
+
+    ) -> Iterator[Tuple[int, Optional[Any]]] :
+    """
+    Streaming version of `run_batches` : yield each result as soon as its batch is done.
+
+    Batches are submitted lazily, so at most `max_in_flight` of them are running or
+    waiting for the consumer at any time. Closing the iterator cancels the batches
+    not started yet.
+
+    Args:
+        batches (Sequence[Any]): Work units to process.
+        function (Callable): Worker applied to each batch.
+        max_in_flight (int): Maximum number of batches processed at the same time.
+        max_retries (int): Number of extra attempts per batch.
+        retry_delay (float): Initial delay in seconds between two attempts of a batch.
+
+    Returns:
+        Iterator[(int, Any | None)]: (batch index, result) in completion order (None for failed batches).
+    """
+    if not batches :
+        return
+
+    n_workers = max(1, min(int(max_in_flight), len(batches)))
+
+    if n_workers == 1 :
+
+        for i, batch in enumerate(batches) :
+            yield i, run_with_retries(function, batch, max_retries, retry_delay, f"batch {i}")
+
+        return
+
+    pending : Dict[Future, int] = {}
+    remaining = iter(enumerate(batches))
+
+    def submit_next () -> None :
+
+        for i, batch in remaining :
+
+            pending[executor.submit(run_with_retries, function, batch, max_retries, retry_delay, f"batch {i}")] = i
+            return
+
+    with ThreadPoolExecutor(max_workers=n_workers) as executor :
+
+        try :
+
+            for _ in range(n_workers) :
+                submit_next()
+
+            while pending :
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done :
+
+                    i = pending.pop(future)
+                    submit_next()
+
+                    yield i, future.result()
+
+        finally :
+
+            for future in pending :
+                future.cancel()
+
+
+class SingleFlight :
+    """
+    Coalesce identical work units in flight between threads.
+
+    The first caller claiming a key owns it : it does the work and resolves the key.
+    The callers claiming the same key meanwhile get a Future resolved with the owner
+    result, instead of doing the work again.
+    """
+
+    def __init__ (self) -> None :
+
+        self._lock = threading.Lock()
+        self._in_flight : Dict[Hashable, Future] = {}
+
+        self.requests = 0
+        self.requests_saved = 0
+        self.items = 0
+        self.items_saved = 0
+
+
+    def claim (self, keys : Iterable[Hashable]) -> Tuple[List[Hashable], Dict[Hashable, Future]] :
+        """
+        Claim the keys of a request (duplicated keys are merged).
+
+        Every owned key must be resolved by the caller, even on failure.
+
+        Returns:
+            (List, Dict): Keys owned by the caller (in order), Futures of the keys already in flight.
+        """
+        keys = list(keys)
+        owned, waiting = [], {}
+
+        with self._lock :
+
+            for key in dict.fromkeys(keys) :
+
+                future = self._in_flight.get(key)
+
+                if future is not None :
+
+                    waiting[key] = future
+                    continue
+
+                self._in_flight[key] = Future()
+                owned.append(key)
+
+            if keys :
+
+                self.requests += 1
+                self.requests_saved += not owned
+                self.items += len(keys)
+                self.items_saved += len(keys) - len(owned)
+
+        return owned, waiting
+
+
+    def resolve (self, key : Hashable, value : Any) -> None :
+        """
+        Give the result of an owned key to its waiters (None tells them the work failed).
+        """
+        with self._lock :
+            future = self._in_flight.pop(key, None)
+
+        if future is not None :
+            future.set_result(value)
+
+
+    def stats (self) -> Dict[str, int] :
+        """
+        Requests and items seen, and how many of them were served by another caller.
+        """
+        with self._lock :
+
+            return {
+
+                "requests" : self.requests,
+                "requests_saved" : self.requests_saved,
+                "items" : self.items,
+                "items_saved" : self.items_saved,
+                "in_flight" : len(self._in_flight)
+
+            }
@@ -1,6 +1,87 @@
 import datetime as dt
+import polars as pl
 
-from typing import Optional
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+# Strings are parsed through LRU caches : pricing and registry lookups format the same
+# few dates again and again. ISO strings already in the target format are validated
+# without strptime. Errors are never cached, so invalid inputs behave as before.
+
+DATE_CACHE_SIZE = 4096
+
+ISO_DATE_FORMAT = "%Y-%m-%d"
+ISO_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _is_iso_date (date : str) -> bool :
+    """
+    Whether `date` is a valid, zero padded "YYYY-MM-DD" string (years 1000 to 9999).
+    """
+    if len(date) != 10 or date[4] != "-" or date[7] != "-" or date[0] == "0" :
+        return False
+
+    year, month, day = date[:4], date[5:7], date[8:]
+
+    if not (year.isdigit() and month.isdigit() and day.isdigit() and year.isascii() and month.isascii() and day.isascii()) :
+        return False
+
+    try :
+        dt.date(int(year), int(month), int(day))
+
+    except ValueError :
+        return False
+
+    return True
+
+
+def _is_iso_datetime (date : str) -> bool :
+    """
+    Whether `date` is a valid, zero padded "YYYY-MM-DD HH:MM:SS" string.
+    """
+    if len(date) != 19 or date[10] != " " or date[13] != ":" or date[16] != ":" or not _is_iso_date(date[:10]) :
+        return False
+
+    hour, minute, second = date[11:13], date[14:16], date[17:]
+
+    if not (hour.isdigit() and minute.isdigit() and second.isdigit() and hour.isascii() and minute.isascii() and second.isascii()) :
+        return False
+
+    return int(hour) < 24 and int(minute) < 60 and int(second) < 60
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _format_date_str (date : str, format : str) -> str :
+    """
+    Memoised string branch of `date_to_str`.
+    """
+    # Already in the target format : strptime then strftime would give it back
+    if format == ISO_DATE_FORMAT and _is_iso_date(date) :
+        return date
+
+    try:
+        date_obj = dt.datetime.strptime(date, format)
+
+    except ValueError :
+
+        try :
+            date_obj = dt.datetime.fromisoformat(date)
+
+        except ValueError :
+            raise ValueError(f"Unrecognized date format: '{date}'")
+
+    return date_obj.strftime(format)
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _format_datetime_str (date : str, format : str) -> str :
+    """
+    Memoised string branch of `datetime_to_str` (raises ValueError on invalid strings).
+    """
+    if format == ISO_DATETIME_FORMAT and _is_iso_datetime(date) :
+        return date
+
+    return dt.datetime.strptime(date, format).strftime(format)
 
 
 def date_to_str (date : Optional[str | dt.datetime] = None, format : str = "%Y-%m-%d") -> str :
@@ -23,17 +104,7 @@ def date_to_str (date : Optional[str | dt.datetime] = None, format : str = "%Y-%
         date_obj = dt.datetime.combine(date, dt.time.min) # This will add 00 for the time
 
     elif isinstance(date, str) :
-
-        try:
-            date_obj = dt.datetime.strptime(date, format)
-
-        except ValueError :
-            
-            try :
-                date_obj = dt.datetime.fromisoformat(date)
-            
-            except ValueError :
-                raise ValueError(f"Unrecognized date format: '{date}'")
+        return _format_date_str(date, format)
     
     else :
         raise TypeError("date must be a string, datetime, or None")
@@ -107,7 +178,7 @@ def datetime_to_str (date : Optional[str | dt.datetime | dt.date] = None, format
     elif isinstance(date, str) :
 
         try :
-            date_obj = dt.datetime.strptime(date, format)
+            return _format_datetime_str(date, format)
         
         except ValueError :
             
@@ -146,4 +217,49 @@ def str_to_datetime (date : Optional[str | dt.datetime | dt.date] = None, format
     if date_obj.tzinfo is None :
         date_obj = date_obj.replace(tzinfo=dt.timezone.utc)
 
-    return date_obj
\ No newline at end of file
+    return date_obj
+
+
+def dates_to_str (
+
+        dates : Iterable[Optional[str | dt.datetime | dt.date]] | pl.Series,
+        format : str = "%Y-%m-%d"
+
+    ) -> List[str] | pl.Series :
+    """
+    Vectorised `date_to_str` : each distinct value is converted once.
+
+    Args:
+        dates (Iterable | pl.Series): Dates (strings, dates or datetimes). A polars Series
+            keeps its nulls, a None in a list is converted as "now" like `date_to_str`.
+        format (str): Output format.
+
+    Returns:
+        List[str] | pl.Series: Formatted dates (a String Series for a Series input).
+    """
+    if isinstance(dates, pl.Series) :
+
+        if dates.dtype in (pl.Date, pl.Datetime) or isinstance(dates.dtype, pl.Datetime) :
+            return dates.dt.strftime(format)
+
+        mapping = {value : date_to_str(value, format) for value in dates.drop_nulls().unique().to_list()}
+
+        return dates.replace_strict(mapping, default=None, return_dtype=pl.String)
+
+    converted = {}
+    results = []
+
+    for date in dates :
+
+        # None means "now" : not cached, like every call of date_to_str
+        if date is None :
+
+            results.append(date_to_str(None, format))
+            continue
+
+        if date not in converted :
+            converted[date] = date_to_str(date, format)
+
+        results.append(converted[date])
+
+    return results
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import json
+import codecs
+
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence
+
+# Incremental parsing of the API responses : the items of one list of the top level
+# object (e.g. "tradeLegs") are decoded one by one while the body is received, so only
+# the item being decoded and the bytes not parsed yet are held in memory.
+
+_WHITESPACE = " \t\n\r"
+_DECODER = json.JSONDecoder()
+
+
+class _JsonStream :
+    """
+    Text buffer over a stream of UTF-8 chunks, decoding one JSON value at a time.
+    """
+
+    def __init__ (self, chunks : Iterable[bytes | str]) -> None :
+
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+
+    def fill (self, min_size : int = 1) -> bool :
+        """
+        Read chunks until `min_size` characters are not parsed yet.
+
+        Returns:
+            bool: False if nothing could be read (end of the stream).
+        """
+        parts = [self.text[self.pos:]]
+        size = len(parts[0])
+        read = False
+
+        while not self.eof and size < min_size :
+
+            chunk = next(self._chunks, None)
+
+            if chunk is None :
+
+                text = self._utf8.decode(b"", final=True)
+                self.eof = True
+
+            else :
+                text = self._utf8.decode(chunk) if isinstance(chunk, bytes) else chunk
+
+            if text :
+
+                parts.append(text)
+                size += len(text)
+                read = True
+
+        self.text = "".join(parts)
+        self.pos = 0
+
+        return read
+
+
+    def peek (self) -> str :
+        """
+        Next non whitespace character (not consumed).
+        """
+        while True :
+
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE :
+                self.pos += 1
+
+            if self.pos < len(self.text) :
+                return self.text[self.pos]
+
+            if not self.fill() :
+                raise ValueError("[-] Unexpected end of the JSON stream")
+
+
+    def expect (self, char : str) -> None :
+
+        found = self.peek()
+
+        if found != char :
+            raise ValueError(f"[-] Expected '{char}' in the JSON stream, found '{found}'")
+
+        self.pos += 1
+
+
+    def decode (self) -> Any :
+        """
+        Decode the next JSON value, reading more of the stream while it is incomplete.
+        """
+        self.peek()
+
+        while True :
+
+            try :
+
+                value, end = _DECODER.raw_decode(self.text, self.pos)
+
+                # A number may go on in the next chunk
+                if end < len(self.text) or self.eof :
+
+                    self.pos = end
+                    return value
+
+            except json.JSONDecodeError :
+
+                if self.eof :
+                    raise
+
+            # Double the buffer : a large value is parsed O(log n) times, not once per chunk
+            self.fill(2 * (len(self.text) - self.pos) + 1)
+
+
+def iter_json_items (chunks : Iterable[bytes | str], key : str) -> Iterator[Any] :
+    """
+    Stream the items of the list `key` of a JSON object received in chunks.
+
+    The other fields of the object are decoded and dropped, and the rest of the stream
+    is not read once the list is done.
+
+    Args:
+        chunks (Iterable[bytes | str]): Body of the response (e.g. `response.iter_content()`).
+        key (str): Top level field holding the list.
+
+    Returns:
+        Iterator[Any]: Items of the list, in order (nothing if the field is missing or null).
+    """
+    stream = _JsonStream(chunks)
+    stream.expect("{")
+
+    if stream.peek() == "}" :
+        return
+
+    while True :
+
+        name = stream.decode()
+        stream.expect(":")
+
+        if name == key and stream.peek() == "[" :
+
+            stream.expect("[")
+
+            if stream.peek() == "]" :
+                return
+
+            while True :
+
+                yield stream.decode()
+
+                separator = stream.peek()
+                stream.pos += 1
+
+                if separator == "]" :
+                    return
+
+                if separator != "," :
+                    raise ValueError(f"[-] Expected ',' or ']' in the JSON stream, found '{separator}'")
+
+        stream.decode()
+
+        separator = stream.peek()
+        stream.pos += 1
+
+        if separator == "}" :
+            return
+
+        if separator != "," :
+            raise ValueError(f"[-] Expected ',' or '}}' in the JSON stream, found '{separator}'")
+
+
+def project_fields (record : Dict, fields : Optional[Sequence[str]] = None) -> Dict :
+    """
+    Keep only some fields of a record, nested fields given as "parent.child" paths.
+
+    Args:
+        record (Dict): Decoded JSON object.
+        fields (Sequence[str], optional): Paths kept (missing ones are None). None keeps the whole record.
+
+    Returns:
+        Dict: {path : value}, or the record itself if `fields` is None.
+    """
+    if fields is None :
+        return record
+
+    projected = {}
+
+    for path in fields :
+
+        value = record
+
+        for part in path.split(".") :
+
+            value = value.get(part) if isinstance(value, dict) else None
+
+            if value is None :
+                break
+
+        projected[path] = value
+
+    return projected
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import os
+import queue
+import atexit
+import threading
+import time
+import datetime as dt
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from libapi.config.parameters import (
+    LIBAPI_LOGS_FLUSH_INTERVAL, LIBAPI_LOGS_BATCH_SIZE, LIBAPI_LOGS_MAX_BYTES, LIBAPI_LOGS_ROTATE_DAILY
+)
+
+
+REQUEST_LOG_COLUMNS = ["timestamp", "method", "endpoint", "status", "success", "latency_ms", "response_bytes"]
+
+
+class RequestLogger :
+    """
+    Buffered CSV sink for the API requests logs.
+
+    `log` only stamps the row and puts it in a queue; a daemon thread writes the
+    rows by batches (one `write` per batch, so rows of several processes appending
+    to the same file do not interleave) and rotates the file by size or by day.
+    """
+
+    def __init__ (
+
+            self,
+            log_abs_path : str,
+            flush_interval : Optional[float] = None,
+            batch_size : Optional[int] = None,
+            max_bytes : Optional[int] = None,
+            rotate_daily : Optional[bool] = None,
+            max_queue_size : int = 100_000
+
+        ) -> None :
+        """
+        Args:
+            log_abs_path (str): Absolute path of the CSV log file.
+            flush_interval (float, optional): Max seconds a row waits before being written.
+            batch_size (int, optional): Max number of rows written at once.
+            max_bytes (int, optional): Rotate the file once it reaches this size (0 disables it).
+            rotate_daily (bool, optional): Rotate the file when the day changes.
+            max_queue_size (int): Rows kept in memory before new rows are dropped.
+        """
+        self.path = Path(log_abs_path)
+
+        self.flush_interval = LIBAPI_LOGS_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.batch_size = LIBAPI_LOGS_BATCH_SIZE if batch_size is None else batch_size
+        self.max_bytes = LIBAPI_LOGS_MAX_BYTES if max_bytes is None else max_bytes
+        self.rotate_daily = LIBAPI_LOGS_ROTATE_DAILY if rotate_daily is None else rotate_daily
+
+        self.dropped = 0
+
+        # Wall clock anchor + monotonic offset: timestamps never jump backwards
+        self._wall_anchor = time.time()
+        self._monotonic_anchor = time.monotonic()
+
+        self._queue : queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._closed = threading.Event()
+
+        self._current_day : Optional[dt.date] = None
+        self._header_checked = False
+
+        self._thread = threading.Thread(target=self._run, name=f"libapi-logger-{self.path.name}", daemon=True)
+        self._thread.start()
+
+
+    def now (self) -> dt.datetime :
+        """
+        Current timestamp derived from the monotonic clock.
+        """
+        return dt.datetime.fromtimestamp(self._wall_anchor + (time.monotonic() - self._monotonic_anchor))
+
+
+    def log (
+
+            self,
+            method : str,
+            endpoint : str,
+            status_code : Optional[int] = None,
+            success : bool = False,
+            latency_ms : Optional[float] = None,
+            response_bytes : Optional[int] = None
+
+        ) -> None :
+        """
+        Queue one request row. Never blocks nor raises on the caller side.
+        """
+        row = [
+
+            self.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+            method.upper(),
+            endpoint,
+            status_code or "",
+            bool(success),
+            "" if latency_ms is None else f"{latency_ms:.1f}",
+            "" if response_bytes is None else int(response_bytes)
+
+        ]
+
+        try :
+            self._queue.put_nowait(row)
+
+        except queue.Full :
+            self.dropped += 1
+
+
+    def flush (self, timeout : float = 5.0) -> bool :
+        """
+        Wait until every queued row has been written.
+
+        Returns:
+            bool: True if the queue was drained before the timeout.
+        """
+        deadline = time.monotonic() + timeout
+
+        while self._queue.unfinished_tasks and time.monotonic() < deadline :
+            time.sleep(0.01)
+
+        return self._queue.unfinished_tasks == 0
+
+
+    def close (self, timeout : float = 5.0) -> None :
+        """
+        Flush the pending rows and stop the writer thread.
+        """
+        if self._closed.is_set() :
+            return
+
+        self.flush(timeout)
+        self._closed.set()
+        self._thread.join(timeout)
+
+
+    def _run (self) -> None :
+
+        while not (self._closed.is_set() and self._queue.empty()) :
+
+            try :
+                rows = [self._queue.get(timeout=self.flush_interval)]
+
+            except queue.Empty :
+                continue
+
+            # Drain what is already waiting, up to a batch
+            while len(rows) < self.batch_size :
+
+                try :
+                    rows.append(self._queue.get_nowait())
+
+                except queue.Empty :
+                    break
+
+            try :
+                self._write_rows(rows)
+
+            except Exception as e :
+                print(f"[-] Error while writing logs into {self.path}: {e}")
+
+            finally :
+
+                for _ in rows :
+                    self._queue.task_done()
+
+
+    def _write_rows (self, rows : List[List]) -> None :
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._rotate_if_needed()
+
+        new_file = not self.path.exists()
+
+        lines = [",".join(REQUEST_LOG_COLUMNS)] if new_file else []
+        lines.extend(",".join(self._escape(value) for value in row) for row in rows)
+
+        # One write per batch
+        with self.path.open(mode="a", newline="", encoding="utf-8") as csv_log_file :
+            csv_log_file.write("\n".join(lines) + "\n")
+
+
+    def _rotate_if_needed (self) -> None :
+
+        if not self.path.exists() :
+
+            self._current_day = dt.date.today()
+            self._header_checked = True
+            return
+
+        if not self._header_checked :
+
+            self._header_checked = True
+
+            # Files written with an older schema are moved aside
+            with self.path.open(mode="r", encoding="utf-8") as csv_log_file :
+                header = csv_log_file.readline().strip()
+
+            if header != ",".join(REQUEST_LOG_COLUMNS) :
+
+                self._rotate("legacy")
+                return
+
+        stat = self.path.stat()
+
+        if self._current_day is None :
+            self._current_day = dt.date.fromtimestamp(stat.st_mtime)
+
+        today = dt.date.today()
+
+        if self.rotate_daily and self._current_day != today :
+
+            self._rotate(self._current_day.strftime("%Y%m%d"))
+            self._current_day = today
+
+        elif self.max_bytes and stat.st_size >= self.max_bytes :
+
+            self._rotate(dt.datetime.now().strftime("%Y%m%d-%H%M%S"))
+
+
+    def _rotate (self, suffix : str) -> None :
+
+        target = self.path.with_name(f"{self.path.stem}.{suffix}{self.path.suffix}")
+
+        # Do not overwrite a previous rotation of the same day
+        index = 1
+        while target.exists() :
+
+            target = self.path.with_name(f"{self.path.stem}.{suffix}-{index}{self.path.suffix}")
+            index += 1
+
+        try :
+            os.replace(self.path, target)
+
+        except FileNotFoundError :
+            pass # Already rotated by another process
+
+
+    @staticmethod
+    def _escape (value) -> str :
+
+        value = str(value)
+
+        if any(c in value for c in (",", '"', "\n")) :
+            value = '"' + value.replace('"', '""') + '"'
+
+        return value
+
+
+_LOGGERS : Dict[str, RequestLogger] = {}
+_LOGGERS_LOCK = threading.Lock()
+
+
+def get_request_logger (log_abs_path : str) -> RequestLogger :
+    """
+    Return the process wide logger writing into `log_abs_path` (created on first use).
+    """
+    key = os.path.abspath(log_abs_path)
+
+    with _LOGGERS_LOCK :
+
+        logger = _LOGGERS.get(key)
+
+        if logger is None :
+
+            logger = RequestLogger(key)
+            _LOGGERS[key] = logger
+
+    return logger
+
+
+@atexit.register
+def close_request_loggers () -> None :
+    """
+    Flush and stop every request logger (called at interpreter exit).
+    """
+    with _LOGGERS_LOCK :
+        loggers = list(_LOGGERS.values())
+
+    for logger in loggers :
+        logger.close()
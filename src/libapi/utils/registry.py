@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import os
+import csv
+import sqlite3
+import threading
+import datetime as dt
+
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+# Dates are stored as "%Y-%m-%d %H:%M:%S" strings: lexicographic order == chronological order
+REGISTRY_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+REGISTRY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calculations (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id INTEGER NOT NULL UNIQUE,
+    date TEXT NOT NULL,
+    type TEXT NOT NULL,
+    fund TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS calculations_type_fund_date ON calculations (type, fund, date);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class CalculationRegistry :
+    """
+    SQLite registry of the ICE calculations launched (ID, date, type, fund).
+
+    Replaces the scans of the calculations CSV : every lookup goes through the
+    (type, fund, date) index. The database lives next to the CSV, the legacy CSV
+    is imported on first use (and again if another writer appended to it) and
+    each new calculation is still appended to the CSV for the humans reading it.
+
+    Several processes can share the registry : WAL journal, busy timeout, and
+    duplicates checks done in the same write transaction as the insert.
+    """
+
+    def __init__ (self, csv_abs_path : str, db_abs_path : Optional[str] = None, timeout : float = 30.0) -> None :
+        """
+        Args:
+            csv_abs_path (str): Legacy calculations CSV (Date, ID, Type, Fundation).
+            db_abs_path (str, optional): SQLite file. Defaults to the CSV path with a `.sqlite3` suffix.
+            timeout (float): Seconds waited for a lock held by another process.
+        """
+        self.csv_path = Path(csv_abs_path)
+        self.db_path = self.csv_path.with_suffix(".sqlite3") if db_abs_path is None else Path(db_abs_path)
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(self.db_path, timeout=timeout, isolation_level=None, check_same_thread=False)
+
+        with self._lock :
+
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(REGISTRY_SCHEMA)
+
+        self.sync_legacy_csv()
+
+
+    # -------------------------------------------------- Writes --------------------------------------------------
+
+
+    def add (self, id : str | int, date : dt.datetime, type : str, fund : str) -> bool :
+        """
+        Register a calculation, unless its ID or its (type, fund, date) is already known.
+
+        Returns:
+            bool: True if the calculation has been added.
+        """
+        date = date.strftime(REGISTRY_DATE_FORMAT)
+
+        with self._lock :
+
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE") # Serializes the check and the insert between processes
+
+            try :
+
+                duplicated = cursor.execute(
+
+                    "SELECT 1 FROM calculations WHERE id = ? OR (type = ? AND fund = ? AND date = ?) LIMIT 1",
+                    (int(id), type, fund, date)
+
+                ).fetchone()
+
+                if duplicated is None :
+                    cursor.execute("INSERT INTO calculations (id, date, type, fund) VALUES (?, ?, ?, ?)", (int(id), date, type, fund))
+
+                cursor.execute("COMMIT")
+
+            except Exception :
+
+                cursor.execute("ROLLBACK")
+                raise
+
+        if duplicated is not None :
+            return False
+
+        self._append_to_csv(id, date, type, fund)
+
+        return True
+
+
+    def sync_legacy_csv (self) -> int :
+        """
+        Import the rows of the calculations CSV if it changed since the last import.
+
+        Returns:
+            int: Number of rows imported.
+        """
+        if not self.csv_path.is_file() :
+            return 0
+
+        signature = self._csv_signature()
+
+        if self._get_meta("csv_signature") == signature :
+            return 0
+
+        rows = []
+
+        with self.csv_path.open(mode="r", newline="", encoding="utf-8") as f :
+
+            for row in csv.DictReader(f) :
+
+                try :
+                    date = dt.datetime.fromisoformat(row["Date"].strip()).strftime(REGISTRY_DATE_FORMAT)
+                    rows.append((int(row["ID"]), date, row["Type"], row["Fundation"]))
+
+                except (KeyError, TypeError, ValueError, AttributeError) :
+                    continue # Malformed line
+
+        with self._lock :
+
+            self._connection.execute("BEGIN IMMEDIATE")
+
+            try :
+
+                imported = self._connection.executemany("INSERT OR IGNORE INTO calculations (id, date, type, fund) VALUES (?, ?, ?, ?)", rows).rowcount
+                self._connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('csv_signature', ?)", (signature,))
+
+                self._connection.execute("COMMIT")
+
+            except Exception :
+
+                self._connection.execute("ROLLBACK")
+                raise
+
+        if imported > 0 :
+            print(f"\n[+] {imported} calculations imported from {self.csv_path}")
+
+        return max(imported, 0)
+
+
+    # -------------------------------------------------- Lookups --------------------------------------------------
+
+
+    def find_id (self, type : str, fund : str, date : dt.datetime, time_sensitive : bool = False) -> Optional[int] :
+        """
+        ID of the first calculation registered for a type, a fund and a date
+        (the exact datetime if `time_sensitive`, else any time of that day).
+        """
+        if time_sensitive :
+
+            condition = "date = ?"
+            parameters = (type, fund, date.strftime(REGISTRY_DATE_FORMAT))
+
+        else :
+
+            day = dt.datetime.combine(date.date(), dt.time.min)
+
+            condition = "date >= ? AND date < ?"
+            parameters = (type, fund, day.strftime(REGISTRY_DATE_FORMAT), (day + dt.timedelta(days=1)).strftime(REGISTRY_DATE_FORMAT))
+
+        row = self._fetchone(f"SELECT id FROM calculations WHERE type = ? AND fund = ? AND {condition} ORDER BY seq LIMIT 1", parameters)
+
+        return row[0] if row is not None else None
+
+
+    def has_duplicates (self, id : str | int, type : str, fund : str, date : dt.datetime) -> bool :
+        """
+        Whether the ID, or a calculation of the same type and fund for that date, is already registered.
+        """
+        day = dt.datetime.combine(date.date(), dt.time.min)
+
+        row = self._fetchone(
+
+            "SELECT 1 FROM calculations WHERE id = ? "
+            "UNION ALL SELECT 1 FROM calculations WHERE type = ? AND fund = ? AND date >= ? AND date < ? LIMIT 1",
+            (int(id), type, fund, day.strftime(REGISTRY_DATE_FORMAT), (day + dt.timedelta(days=1)).strftime(REGISTRY_DATE_FORMAT))
+
+        )
+
+        return row is not None
+
+
+    def most_recent (self, type : str, fund : str) -> Tuple[Optional[dt.datetime], Optional[int]] :
+        """
+        Date and ID of the latest calculation of a type and fund (last registered on ties).
+        """
+        row = self._fetchone(
+
+            "SELECT date, id FROM calculations WHERE type = ? AND fund = ? ORDER BY date DESC, seq DESC LIMIT 1",
+            (type, fund)
+
+        )
+
+        if row is None :
+            return None, None
+
+        return dt.datetime.strptime(row[0], REGISTRY_DATE_FORMAT), row[1]
+
+
+    def closest (self, type : str, fund : str, date : dt.datetime) -> Tuple[Optional[dt.datetime], Optional[int]] :
+        """
+        Date and ID of the calculation of a type and fund closest to a date (the earlier one on ties).
+        """
+        target = date.strftime(REGISTRY_DATE_FORMAT)
+
+        # Two index seeks : last calculation before the target and first one after it
+        before = self._fetchone(
+
+            "SELECT date, id FROM calculations WHERE type = ? AND fund = ? AND date <= ? ORDER BY date DESC, seq LIMIT 1",
+            (type, fund, target)
+
+        )
+
+        after = self._fetchone(
+
+            "SELECT date, id FROM calculations WHERE type = ? AND fund = ? AND date >= ? ORDER BY date, seq LIMIT 1",
+            (type, fund, target)
+
+        )
+
+        candidates = [
+
+            (abs(dt.datetime.strptime(row[0], REGISTRY_DATE_FORMAT) - date), row[0], row[1])
+            for row in (before, after) if row is not None
+
+        ]
+
+        if not candidates :
+            return None, None
+
+        _, closest_date, closest_id = min(candidates, key=lambda candidate : (candidate[0], candidate[1]))
+
+        return dt.datetime.strptime(closest_date, REGISTRY_DATE_FORMAT), closest_id
+
+
+    def close (self) -> None :
+
+        with self._lock :
+            self._connection.close()
+
+
+    # -------------------------------------------------- Internals --------------------------------------------------
+
+
+    def _fetchone (self, query : str, parameters : Tuple) -> Optional[Tuple] :
+
+        with self._lock :
+            return self._connection.execute(query, parameters).fetchone()
+
+
+    def _get_meta (self, key : str) -> Optional[str] :
+
+        row = self._fetchone("SELECT value FROM meta WHERE key = ?", (key,))
+
+        return row[0] if row is not None else None
+
+
+    def _csv_signature (self) -> str :
+
+        stat = self.csv_path.stat()
+
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+    def _append_to_csv (self, id : str | int, date : str, type : str, fund : str) -> None :
+
+        file_exists = self.csv_path.is_file()
+
+        with self.csv_path.open(mode="a", newline="", encoding="utf-8") as f :
+
+            writer = csv.writer(f)
+
+            if not file_exists :
+                writer.writerow(["Date", "ID", "Type", "Fundation"])
+
+            writer.writerow([date, int(id), type, fund])
+
+        # Our own append must not trigger a re-import
+        with self._lock :
+            self._connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('csv_signature', ?)", (self._csv_signature(),))
+
+
+_REGISTRIES : Dict[str, CalculationRegistry] = {}
+_REGISTRIES_LOCK = threading.Lock()
+
+
+def get_calculation_registry (csv_abs_path : str) -> CalculationRegistry :
+    """
+    Return the process wide registry of a calculations CSV (opened on first use).
+    """
+    key = os.path.abspath(csv_abs_path)
+
+    with _REGISTRIES_LOCK :
+
+        registry = _REGISTRIES.get(key)
+
+        if registry is None :
+
+            registry = CalculationRegistry(key)
+            _REGISTRIES[key] = registry
+
+    return registry
@@ -1,97 +1,409 @@
 from __future__ import annotations
 
 import os
-import re
+import gzip
 import json
+import time
+import hashlib
+import tempfile
+import threading
+import polars as pl
 
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Iterable
 
-from libapi.config.parameters import LIBAPI_CACHE_RESULTS_DIR_PATH
+from libapi.config.parameters import (
+    LIBAPI_CACHE_RESULTS_DIR_PATH, LIBAPI_CACHE_RESULTS_MAX_BYTES, LIBAPI_CACHE_RESULTS_MAX_AGE_DAYS,
+    LIBAPI_CACHE_RESULTS_EVICT_INTERVAL
+)
+
+# Results are stored as gzip compressed compact JSON, in subdirectories named after
+# the first 2 hex digits of sha1(id) : the path of an ID is computed, never searched.
+# Files written by older versions (<id>_results.json at the root) are still read,
+# and moved into the sharded layout the first time they are loaded.
+
+RESULTS_SUFFIX = "_results.json.gz"
+LEGACY_RESULTS_SUFFIX = "_results.json"
+
+# Tabular parts of the results also stored as Parquet tables (<id>_<key>.parquet, same shard),
+# nested dicts flattened into "parent.child" columns
+CACHE_TABLE_KEYS = ("tradeLegs", "results")
+TABLE_SUFFIX = ".parquet"
+
+_last_eviction = 0.0
+_eviction_lock = threading.Lock()
+
+
+def cache_results_path (calculation_id : int | str, dir_abs_path : Optional[str] = None) -> str :
+    """
+    Path of the cached results of a calculation (whether it exists or not).
+    """
+    dir_abs_path = LIBAPI_CACHE_RESULTS_DIR_PATH if dir_abs_path is None else dir_abs_path
+    shard = hashlib.sha1(str(calculation_id).encode("utf-8")).hexdigest()[:2]
+
+    return os.path.join(dir_abs_path, shard, f"{calculation_id}{RESULTS_SUFFIX}")
 
 
 def find_cache_results_from_id (
-        
+
         calculation_id : Optional[int | str] = None,
         dir_abs_path : Optional[str] = None
-    
+
     ) -> Optional[str] :
     """
-    
+    Path of the cached results of a calculation, None if they are not cached.
     """
     if calculation_id is None :
 
         print(f"\n[-] No Calculation ID. Using the API...")
         return None
-    
-    dir_abs_path = LIBAPI_CACHE_RESULTS_DIR_PATH if dir_abs_path is None else dir_abs_path
-    
-    if not os.path.exists(dir_abs_path) :
 
-        os.makedirs(dir_abs_path, exist_ok=True)
-        return None
-    
-    regex = re.compile(rf"^{re.escape(str(calculation_id))}_results\.json$")
+    dir_abs_path = LIBAPI_CACHE_RESULTS_DIR_PATH if dir_abs_path is None else dir_abs_path
 
-    for entry in os.listdir(dir_abs_path) :
+    filename_abs_path = cache_results_path(calculation_id, dir_abs_path)
 
-        m = regex.match(entry)
+    if os.path.isfile(filename_abs_path) :
+        return filename_abs_path
 
-        if not m :
-            continue
+    legacy_abs_path = os.path.join(dir_abs_path, f"{calculation_id}{LEGACY_RESULTS_SUFFIX}")
 
-        filename_abs_path = os.path.join(dir_abs_path, entry)
+    if os.path.isfile(legacy_abs_path) :
+        return legacy_abs_path
 
-        return filename_abs_path
-        
     return None
 
 
 def load_cache_results_from_id (
-        
+
         calculation_id : Optional[int | str] = None,
         dir_abs_path : Optional[str] = None
-    
+
     ) -> Optional[Dict] :
     """
-    
+    Load the cached results of a calculation, None if they are not cached (or unreadable).
     """
     filename_abs_path = find_cache_results_from_id(calculation_id, dir_abs_path)
 
     if filename_abs_path is None :
 
         return None
-    
-    with open(filename_abs_path, "r", encoding="utf-8") as f :
-        
-        data = json.load(f)
+
+    try :
+
+        if filename_abs_path.endswith(RESULTS_SUFFIX) :
+
+            with gzip.open(filename_abs_path, "rt", encoding="utf-8") as f :
+                data = json.load(f)
+
+            # The modification time is the last access time used by the eviction
+            os.utime(filename_abs_path)
+
+            return data
+
+        with open(filename_abs_path, "r", encoding="utf-8") as f :
+            data = json.load(f)
+
+    except (OSError, ValueError) as e :
+
+        print(f"[-] Unreadable cached results for the ID {calculation_id} : {e}")
+        return None
+
+    # Legacy flat file : move it into the sharded layout
+    if save_cache_results(calculation_id, data, dir_abs_path) :
+
+        try :
+            os.remove(filename_abs_path)
+
+        except OSError :
+            pass
 
     return data
 
-    
+
 def save_cache_results (
-        
+
         calculation_id : Optional[str | int] = None,
         data : Optional[Dict] = None,
         dir_abs_path : Optional[str] = None
-    
+
     ) -> bool :
     """
-    
+    Save the results of a calculation into the cache (atomic write).
+
+    Returns:
+        bool: True if the results have been written, False if they were already cached.
     """
     dir_abs_path = LIBAPI_CACHE_RESULTS_DIR_PATH if dir_abs_path is None else dir_abs_path
 
-    filename_path = find_cache_results_from_id(calculation_id, dir_abs_path)
+    if calculation_id is None or data is None :
+        return False
+
+    full_path = cache_results_path(calculation_id, dir_abs_path)
 
     # In this case, the file already exists
-    if filename_path is not None :
+    if os.path.isfile(full_path) :
 
         print(f"[-] A file already exists for the ID : {calculation_id}")
         return False
-    
-    filename = f"{calculation_id}_results.json"
-    full_path = os.path.join(dir_abs_path, filename)
 
-    with open(full_path, "w", encoding="utf-8") as f :
-        json.dump(data, f, indent=4, ensure_ascii=False)
+    shard_dir = os.path.dirname(full_path)
+    os.makedirs(shard_dir, exist_ok=True)
+
+    # Write in a temporary file of the same directory then rename it : readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=shard_dir, prefix=".tmp-", suffix=RESULTS_SUFFIX)
+
+    try :
+
+        with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=5) as f :
+            f.write(json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+        os.replace(tmp_path, full_path)
+
+    except BaseException :
+
+        try :
+            os.remove(tmp_path)
+
+        except OSError :
+            pass
+
+        raise
+
+    for key in CACHE_TABLE_KEYS :
+
+        if isinstance(data.get(key), list) :
+            save_cache_table(calculation_id, key, data[key], dir_abs_path)
+
+    maybe_evict_cache_results(dir_abs_path)
+
+    return True
+
+
+def evict_cache_results (
+
+        dir_abs_path : Optional[str] = None,
+        max_bytes : Optional[int] = None,
+        max_age_days : Optional[float] = None
+
+    ) -> int :
+    """
+    Remove the cached results not used for `max_age_days`, then the least recently
+    used ones until the cache is smaller than `max_bytes` (0 disables a limit).
+
+    Returns:
+        int: Number of files removed.
+    """
+    dir_abs_path = LIBAPI_CACHE_RESULTS_DIR_PATH if dir_abs_path is None else dir_abs_path
+
+    max_bytes = LIBAPI_CACHE_RESULTS_MAX_BYTES if max_bytes is None else max_bytes
+    max_age_days = LIBAPI_CACHE_RESULTS_MAX_AGE_DAYS if max_age_days is None else max_age_days
+
+    if not os.path.isdir(dir_abs_path) :
+        return 0
+
+    entries = []
+
+    for shard in os.scandir(dir_abs_path) :
+
+        if not shard.is_dir() :
+            continue
+
+        for entry in os.scandir(shard.path) :
+
+            if not entry.name.endswith(RESULTS_SUFFIX) or entry.name.startswith(".tmp-") :
+                continue
+
+            try :
+
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            except FileNotFoundError :
+                continue
+
+    entries.sort() # Least recently used first
+
+    removed = 0
+    total = sum(size for _, size, _ in entries)
+
+    oldest_allowed = time.time() - max_age_days * 86400 if max_age_days else None
+
+    for mtime, size, path in entries :
+
+        too_old = oldest_allowed is not None and mtime < oldest_allowed
+        too_big = bool(max_bytes) and total > max_bytes
+
+        # Entries are sorted by last use : the next ones are neither older nor needed to shrink the cache
+        if not (too_old or too_big) :
+            break
+
+        calculation_id = os.path.basename(path)[:-len(RESULTS_SUFFIX)]
+
+        for table_path in [path] + [cache_table_path(calculation_id, key, dir_abs_path) for key in CACHE_TABLE_KEYS] :
+
+            try :
+                os.remove(table_path)
+
+            except FileNotFoundError :
+                pass
+
+        total -= size
+        removed += 1
+
+    if removed :
+        print(f"[*] {removed} cached results evicted from {dir_abs_path}")
+
+    return removed
+
+
+def maybe_evict_cache_results (dir_abs_path : Optional[str] = None) -> int :
+    """
+    Run `evict_cache_results` at most once every LIBAPI_CACHE_RESULTS_EVICT_INTERVAL seconds.
+    """
+    global _last_eviction
+
+    if not (LIBAPI_CACHE_RESULTS_MAX_BYTES or LIBAPI_CACHE_RESULTS_MAX_AGE_DAYS) :
+        return 0
+
+    with _eviction_lock :
+
+        now = time.monotonic()
+
+        if _last_eviction and now - _last_eviction < LIBAPI_CACHE_RESULTS_EVICT_INTERVAL :
+            return 0
+
+        _last_eviction = now
+
+    return evict_cache_results(dir_abs_path)
+
+
+# -------------------------------------------------- Columnar tables --------------------------------------------------
+
+
+def cache_table_path (calculation_id : int | str, key : str, dir_abs_path : Optional[str] = None) -> str :
+    """
+    Path of the Parquet table of a results key (e.g. "tradeLegs") for a calculation.
+    """
+    results_path = cache_results_path(calculation_id, dir_abs_path)
+
+    return os.path.join(os.path.dirname(results_path), f"{calculation_id}_{key}{TABLE_SUFFIX}")
+
+
+def save_cache_table (
+
+        calculation_id : int | str,
+        key : str,
+        rows : List[Dict],
+        dir_abs_path : Optional[str] = None
+
+    ) -> bool :
+    """
+    Normalise a list of (nested) records into a Parquet table (atomic write).
+
+    Returns:
+        bool: True if the table has been written.
+    """
+    try :
+        table = pl.json_normalize(rows, separator=".", infer_schema_length=None)
+
+    except Exception as e :
+
+        print(f"[-] Unable to normalise the {key} of the ID {calculation_id} : {e}")
+        return False
+
+    full_path = cache_table_path(calculation_id, key, dir_abs_path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(full_path), prefix=".tmp-", suffix=TABLE_SUFFIX)
+    os.close(fd)
+
+    try :
+
+        table.write_parquet(tmp_path, compression="zstd", statistics=True)
+        os.replace(tmp_path, full_path)
+
+    except BaseException as e :
+
+        try :
+            os.remove(tmp_path)
+
+        except OSError :
+            pass
+
+        if not isinstance(e, Exception) :
+            raise
+
+        # The JSON results stay the reference : the table is built again on the next scan
+        print(f"[-] Unable to write the {key} table of the ID {calculation_id} : {e}")
+        return False
+
+    return True
+
+
+def scan_cache_table (
+
+        calculation_id : Optional[int | str],
+        key : str = "tradeLegs",
+        dir_abs_path : Optional[str] = None
+
+    ) -> Optional[pl.LazyFrame] :
+    """
+    Lazily scan the table of a results key, building it from the cached JSON if needed.
+
+    The scan reads only the selected columns and row groups (projection and predicate
+    pushdown), without decoding any JSON.
+
+    Returns:
+        pl.LazyFrame | None: Lazy table, None if the results are not cached.
+    """
+    if calculation_id is None :
+        return None
+
+    full_path = cache_table_path(calculation_id, key, dir_abs_path)
+
+    if not os.path.isfile(full_path) :
+
+        # Results cached before the tables existed
+        data = load_cache_results_from_id(calculation_id, dir_abs_path)
+        rows = data.get(key) if data is not None else None
+
+        if not isinstance(rows, list) or not save_cache_table(calculation_id, key, rows, dir_abs_path) :
+            return None
+
+    return pl.scan_parquet(full_path)
+
+
+def load_cache_table (
+
+        calculation_id : Optional[int | str],
+        key : str = "tradeLegs",
+        columns : Optional[Iterable[str]] = None,
+        predicate : Optional[pl.Expr] = None,
+        dir_abs_path : Optional[str] = None
+
+    ) -> Optional[pl.DataFrame] :
+    """
+    Load some columns (and rows) of the table of a results key.
+
+    Args:
+        calculation_id (int | str): Calculation ID.
+        key (str): Results key ("tradeLegs" or "results").
+        columns (Iterable[str], optional): Columns to load, all by default. Missing ones are ignored.
+        predicate (pl.Expr, optional): Rows filter, pushed down to the Parquet reader.
+
+    Returns:
+        pl.DataFrame | None: Table, None if the results are not cached.
+    """
+    lazy = scan_cache_table(calculation_id, key, dir_abs_path)
+
+    if lazy is None :
+        return None
+
+    if predicate is not None :
+        lazy = lazy.filter(predicate)
+
+    if columns is not None :
+
+        available = lazy.collect_schema().names()
+        lazy = lazy.select([column for column in columns if column in available])
 
-    return True
\ No newline at end of file
+    return lazy.collect()
@@ -10,8 +10,19 @@ def validate_flat_strikes (strikes : List) :
     if not strikes:
         return
     
-    if not isinstance(strikes[0], (tuple, list)) :
+    if isinstance(strikes[0], (tuple, list)) :
         raise ValueError("`strikes` must be a flat list of single values, not tuples/lists.")
+
+
+def validate_strike_pairs (strikes : List) :
+    """
+    
+    """
+    if not strikes:
+        return
+
+    if not isinstance(strikes[0], (tuple, list)) or len(strikes[0]) != 2 :
+        raise ValueError("`strikes` must be a list of (strike_1, strike_2) tuples/lists.")
     
 
 def validate_direction (direction : str) -> None :
@@ -19,4 +30,4 @@ def validate_direction (direction : str) -> None :
     
     """
     if direction not in {"Buy", "Sell"} :
-        raise ValueError('`direction` must be "Buy" or "Sell".')
\ No newline at end of file
+        raise ValueError('`direction` must be "Buy" or "Sell".')
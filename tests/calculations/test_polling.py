@@ -0,0 +1,108 @@
+from libapi.ice.polling import (
+    PollingSchedule, classify_calculation_response, is_calculation_results, poll_calculations, iter_poll_calculations,
+    DONE, RUNNING, FAILED
+)
+from libapi.ice.calculator import IceCalculator
+from libapi.utils.results import find_cache_results_from_id
+
+
+FAST_SCHEDULE = PollingSchedule(initial_delay=0.001, max_delay=0.01, timeout=2, max_failures=3)
+
+
+def test_classify_calculation_response () :
+    """
+    
+    """
+    assert classify_calculation_response({ "status" : "Success" }) == DONE
+    assert classify_calculation_response({ "status" : "Running" }) == RUNNING
+    assert classify_calculation_response({ "status" : "Failure", "message" : "Calculation not completed" }) == RUNNING
+    assert classify_calculation_response({ "status" : "Failure" }) == RUNNING
+    assert classify_calculation_response(None) == FAILED
+
+    # Terminal statuses
+    assert classify_calculation_response({ "status" : "Error", "message" : "internal" }) == FAILED
+    assert classify_calculation_response({ "status" : "Failure", "calculationStatus" : "Cancelled" }) == FAILED
+
+    assert is_calculation_results({ "status" : "Success", "results" : [] })
+    assert is_calculation_results({ "status" : "Success", "tradeLegs" : [{ "tradeLegId" : 1 }] })
+    assert not is_calculation_results({ "status" : "Success" })
+    assert not is_calculation_results({ "status" : "Error", "results" : [] })
+    assert not is_calculation_results(None)
+
+
+def test_poll_calculations_shared_schedule () :
+    """
+    
+    """
+    answers = {
+
+        "running" : [{ "status" : "Running" }, { "status" : "Running" }, { "status" : "Success" }],
+        "failing" : [None, { "status" : "Failure" }, None, None, { "status" : "Success" }],
+        "slow" : [{ "status" : "Failure" }] * 5 + [{ "status" : "Success", "id" : "slow" }]
+
+    }
+
+    results = poll_calculations(lambda calculation_id : answers[calculation_id].pop(0), ["running", "failing", "slow"], FAST_SCHEDULE)
+
+    # Only the missing answers count against max_failures, "Failure" is polled until the deadline
+    assert results == { "running" : { "status" : "Success" }, "failing" : None, "slow" : { "status" : "Success", "id" : "slow" } }
+
+
+def test_terminal_failure_stops_the_polling () :
+    """
+    
+    """
+    answers = { "broken" : [{ "status" : "Error", "message" : "internal" }, { "status" : "Success" }] }
+
+    assert poll_calculations(lambda calculation_id : answers[calculation_id].pop(0), ["broken"], FAST_SCHEDULE) == { "broken" : None }
+    assert answers["broken"] == [{ "status" : "Success" }]
+
+
+def test_error_answers_are_failures_and_never_cached (tmp_path, monkeypatch) :
+    """
+    
+    """
+    monkeypatch.setattr("libapi.utils.results.LIBAPI_CACHE_RESULTS_DIR_PATH", str(tmp_path))
+
+    answers = {
+
+        "500" : [(500, { "status" : "Error", "message" : "internal" })] * 5,
+        "503" : [(503, { "status" : "Success", "results" : [] })] * 5,
+        "empty" : [(200, { "status" : "Success" })],
+        "ok" : [(503, None), (200, { "status" : "Failure" }), (200, { "status" : "Success", "results" : [{ "im" : 1 }] })]
+
+    }
+    sent = []
+
+    def get_with_status (endpoint, json) :
+
+        sent.append(json["calculationId"])
+        return answers[json["calculationId"]].pop(0)
+
+    calculator = IceCalculator.__new__(IceCalculator)
+    calculator.get_with_status = get_with_status
+
+    results = dict(calculator.wait_for_calculations(["500", "503", "empty", "ok"], schedule=FAST_SCHEDULE))
+
+    # Error bodies count against max_failures (3) : never taken as results
+    assert results == { "500" : None, "503" : None, "empty" : { "status" : "Success" }, "ok" : { "status" : "Success", "results" : [{ "im" : 1 }] } }
+    assert (sent.count("500"), sent.count("503")) == (3, 3)
+
+    assert [calculation_id for calculation_id in ["500", "503", "empty", "ok"] if find_cache_results_from_id(calculation_id, str(tmp_path))] == ["ok"]
+
+
+def test_iter_poll_calculations_completion_order () :
+    """
+    
+    """
+    answers = {
+
+        "slow" : [{ "status" : "Running" }] * 3 + [{ "status" : "Success", "id" : "slow" }],
+        "fast" : [{ "status" : "Success", "id" : "fast" }]
+
+    }
+
+    answers = { key : list(value) for key, value in answers.items() }
+    done = [calculation_id for calculation_id, _ in iter_poll_calculations(lambda i : answers[i].pop(0), ["slow", "fast"], FAST_SCHEDULE)]
+
+    assert done == ["fast", "slow"]
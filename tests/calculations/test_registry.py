@@ -0,0 +1,52 @@
+import pytest
+import sqlite3
+import datetime as dt
+
+from libapi.utils.registry import CalculationRegistry
+
+
+def test_registry_imports_legacy_csv_and_appends (tmp_path) :
+    """
+    
+    """
+    csv_path = tmp_path / "calculations.csv"
+    csv_path.write_text("Date,ID,Type,Fundation\n2025-01-02 00:00:00,10,IM,HV\n2025-01-08 00:00:00,13,MV,HV\n")
+
+    registry = CalculationRegistry(str(csv_path))
+
+    assert registry.find_id("IM", "HV", dt.datetime(2025, 1, 2)) == 10
+    assert registry.closest("MV", "HV", dt.datetime(2025, 1, 6)) == (dt.datetime(2025, 1, 8), 13)
+
+    assert registry.add(14, dt.datetime(2025, 1, 9), "MV", "HV")
+    assert not registry.add(14, dt.datetime(2025, 1, 10), "MV", "HV")
+
+    assert registry.most_recent("MV", "HV") == (dt.datetime(2025, 1, 9), 14)
+    assert csv_path.read_text().splitlines()[-1] == "2025-01-09 00:00:00,14,MV,HV"
+
+    # A new instance does not import the rows twice
+    registry.close()
+    assert CalculationRegistry(str(csv_path)).sync_legacy_csv() == 0
+
+
+def test_registry_failed_csv_import_is_rolled_back (tmp_path) :
+    """
+    
+    """
+    csv_path = tmp_path / "calculations.csv"
+    csv_path.write_text("Date,ID,Type,Fundation\n2025-01-02 00:00:00,10,IM,HV\n")
+
+    registry = CalculationRegistry(str(csv_path))
+    registry._connection.execute("CREATE TEMP TRIGGER fail_import BEFORE INSERT ON calculations BEGIN SELECT RAISE(ABORT, 'boom'); END")
+
+    csv_path.write_text("Date,ID,Type,Fundation\n2025-01-02 00:00:00,10,IM,HV\n2025-01-03 00:00:00,11,IM,HV\n")
+
+    with pytest.raises(sqlite3.IntegrityError) :
+        registry.sync_legacy_csv()
+
+    # The connection is not left inside the failed transaction
+    assert not registry._connection.in_transaction
+
+    registry._connection.execute("DROP TRIGGER fail_import")
+
+    assert registry.sync_legacy_csv() == 1
+    assert registry.find_id("IM", "HV", dt.datetime(2025, 1, 3)) == 11
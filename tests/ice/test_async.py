@@ -0,0 +1,157 @@
+import json
+import httpx
+import asyncio
+
+from libapi.ice.polling import PollingSchedule
+from libapi.ice.tokens import TokenManager
+from libapi.ice.async_client import AsyncClient
+from libapi.ice.async_calculator import AsyncIceCalculator
+from libapi.ice.async_trade_manager import AsyncTradeManager
+
+
+FAST_SCHEDULE = PollingSchedule(initial_delay=0.001, max_delay=0.01, timeout=2, max_failures=3)
+
+
+class FakeIce :
+    """
+    ICE API served through an httpx.MockTransport : only the last token issued is accepted.
+    """
+    def __init__ (self, results = None) :
+
+        self.logins = 0
+        self.requests = []
+        self.results = list(results or [])
+
+    def __call__ (self, request) :
+
+        if request.url.path == "/auth" :
+
+            self.logins += 1
+            return httpx.Response(200, json={ "token" : f"token-{self.logins}" })
+
+        token = request.headers.get("AuthenticationToken")
+        body = json.loads(request.content or b"{}")
+
+        self.requests.append((request.method, request.url.path, token, body))
+
+        if token != f"token-{self.logins}" :
+            return httpx.Response(401, json={ "status" : "Unauthorized" })
+
+        if request.url.path == "/results" :
+            return httpx.Response(200, json=self.results.pop(0))
+
+        return httpx.Response(200, json={ "status" : "Success", "tradeLegs" : [{ "tradeLegId" : 1 }] })
+
+
+def make_client (cls, ice, tmp_path) :
+    """
+    
+    """
+    manager = TokenManager(str(tmp_path / "token.json"), background=False)
+    client = cls("https://ice.test", "auth", token_manager=manager, transport=httpx.MockTransport(ice))
+    client.log_request = lambda **kwargs : None
+
+    return client
+
+
+def test_async_client_shares_one_login_and_renews_on_401 (tmp_path) :
+    """
+    
+    """
+    ice = FakeIce()
+
+    async def scenario () :
+
+        first = make_client(AsyncClient, ice, tmp_path)
+        other = make_client(AsyncClient, ice, tmp_path)
+        other.token_manager = first.token_manager
+
+        assert await first.authenticate("user", "password")
+        assert await other.authenticate("user", "password")
+        assert ice.logins == 1
+
+        assert await first.post("/trades", json={ "a" : 1 }) == { "status" : "Success", "tradeLegs" : [{ "tradeLegId" : 1 }] }
+
+        # The token is revoked server side : one login, then both clients use the new token
+        ice.logins += 1
+
+        assert (await first.get("/trades"))["status"] == "Success"
+        assert (await other.get("/trades"))["status"] == "Success"
+
+        await first.aclose()
+        await other.aclose()
+
+    asyncio.run(scenario())
+
+    assert ice.logins == 3
+    assert [(method, token, body) for method, _, token, body in ice.requests] == [
+
+        ("POST", "token-1", { "a" : 1 }),
+        ("GET", "token-1", {}),
+        ("GET", "token-3", {}),
+        ("GET", "token-3", {})
+
+    ]
+
+
+def test_async_trade_manager_request_path (tmp_path) :
+    """
+    
+    """
+    ice = FakeIce()
+
+    async def scenario () :
+
+        async with make_client(AsyncTradeManager, ice, tmp_path) as manager :
+
+            await manager.authenticate("user", "password")
+            return await manager.get_trades_from_books(["HV_EQ"], endpoint="/search")
+
+    response = asyncio.run(scenario())
+
+    assert response["tradeLegs"] == [{ "tradeLegId" : 1 }]
+
+    method, path, token, body = ice.requests[0]
+
+    assert (method, path, token) == ("POST", "/search", "token-1")
+    assert "HV_EQ" in json.dumps(body)
+
+
+def test_async_calculator_polls_results (tmp_path) :
+    """
+    
+    """
+    ice = FakeIce(results=[{ "status" : "Running" }, { "status" : "Running" }, { "status" : "Success", "results" : [1] }])
+
+    async def scenario () :
+
+        async with make_client(AsyncIceCalculator, ice, tmp_path) as calculator :
+
+            await calculator.authenticate("user", "password")
+            return await calculator.get_calculation_results(42, endpoint="/results", schedule=FAST_SCHEDULE)
+
+    assert asyncio.run(scenario()) == { "status" : "Success", "results" : [1] }
+    assert [body["calculationId"] for _, _, _, body in ice.requests] == ["42"] * 3
+
+
+def test_async_post_cash_leg_sends_json (tmp_path) :
+    """
+    
+    """
+    ice = FakeIce()
+
+    async def scenario () :
+
+        async with make_client(AsyncTradeManager, ice, tmp_path) as manager :
+
+            await manager.authenticate("user", "password")
+            return await manager.post_cash_leg("EUR", "2024-01-02", 1_000, "CP", endpoint="/trades/add")
+
+    assert asyncio.run(scenario())["status"] == "Success"
+
+    method, path, token, body = ice.requests[0]
+
+    assert (method, path) == ("POST", "/trades/add")
+    assert isinstance(body["trades"], list) and len(body["trades"]) == 1
+    # A form encoded body would not even parse as JSON
+    assert body["trades"][0] == AsyncTradeManager.__new__(AsyncTradeManager).generate_cash_trade_payload("EUR", "2024-01-02", "CP", 1_000, pay_recv="Pay")
@@ -0,0 +1,146 @@
+import pytest
+import datetime as dt
+
+from libapi.ice.audit import AuditTrailSync, audit_datetime, audit_events, iter_audit_windows
+
+
+UTC = dt.timezone.utc
+
+
+class FakeAuditTrail :
+    """
+    Audit trail API : events every hour, both window bounds included.
+    """
+    def __init__ (self, events) :
+
+        self.events = events
+        self.windows = []
+
+    def get_audit_trails_with_status (self, from_date, to_date, actions, books, show_changes_from_inception) :
+
+        self.windows.append((from_date, to_date))
+        events = [event for event in self.events if from_date <= event["time"] <= to_date]
+
+        return 200, { "status" : "Success", "auditTrail" : [{ **event, "time" : event["time"].isoformat() } for event in events] }
+
+
+def hourly_events (start, hours) :
+    """
+    
+    """
+    return [{ "tradeLegId" : i, "action" : "Update", "time" : start + dt.timedelta(hours=i), "details" : { "book" : "B" } } for i in range(hours)]
+
+
+def test_iter_audit_windows () :
+    """
+    
+    """
+    start = dt.datetime(2024, 1, 1, tzinfo=UTC)
+    windows = list(iter_audit_windows(start, start + dt.timedelta(hours=5), dt.timedelta(hours=2)))
+
+    assert [(a.hour, b.hour) for a, b in windows] == [(0, 2), (2, 4), (4, 5)]
+
+
+def test_audit_events () :
+    """
+    
+    """
+    assert audit_events({ "status" : "Success", "auditTrail" : [{ "a" : 1 }] }) == [{ "a" : 1 }]
+    assert audit_events({ "status" : "Success", "auditTrail" : [] }) == []
+
+    # Another list (e.g. the errors of a failed request) is never taken as the events
+    assert audit_events({ "status" : "Failure", "errors" : ["Timeout"] }) is None
+    assert audit_events(None) is None
+
+
+def test_audit_datetime () :
+    """
+    
+    """
+    assert audit_datetime("2024-01-01") == dt.datetime(2024, 1, 1, tzinfo=UTC)
+    assert audit_datetime("2024-01-01 12:30:00") == dt.datetime(2024, 1, 1, 12, 30, tzinfo=UTC)
+    assert audit_datetime(dt.date(2024, 1, 1)) == dt.datetime(2024, 1, 1, tzinfo=UTC)
+
+    with pytest.raises(ValueError) :
+        audit_datetime("01/01/2024")
+
+
+def test_sync_accepts_dates_only (tmp_path) :
+    """
+    
+    """
+    start = dt.datetime(2024, 1, 1, tzinfo=UTC)
+    api = FakeAuditTrail(hourly_events(start, 30))
+
+    sync = AuditTrailSync(api, books=["B"], dir_abs_path=str(tmp_path), window_hours=24)
+
+    events = sync.sync(until="2024-01-02", since="2024-01-01")
+
+    assert events.get_column("tradeLegId").to_list() == list(range(25))
+    assert api.windows == [(start, start + dt.timedelta(hours=24))]
+
+
+def test_sync_fetches_only_new_events (tmp_path) :
+    """
+    
+    """
+    start = dt.datetime(2024, 1, 1, tzinfo=UTC)
+    api = FakeAuditTrail(hourly_events(start, 10))
+
+    sync = AuditTrailSync(api, books=["B"], dir_abs_path=str(tmp_path), window_hours=2)
+
+    first = sync.sync(until=start + dt.timedelta(hours=4), since=start)
+
+    assert first.get_column("tradeLegId").to_list() == [0, 1, 2, 3, 4]
+    assert "details.book" in first.columns
+    assert len(api.windows) == 2
+
+    # Nothing new : no part written, the mark stays
+    api.windows.clear()
+
+    assert sync.sync(until=start + dt.timedelta(hours=4)).is_empty()
+
+    second = sync.sync(until=start + dt.timedelta(hours=9, minutes=30))
+
+    # The event at the previous mark is not appended twice
+    assert second.get_column("tradeLegId").to_list() == [5, 6, 7, 8, 9]
+    assert api.windows[0][0] == start + dt.timedelta(hours=4)
+
+    log = sync.scan().collect()
+
+    assert sorted(log.get_column("tradeLegId").to_list()) == list(range(10))
+    assert log.get_column("_event_key").n_unique() == 10
+
+    delta = sync.scan(since=start + dt.timedelta(hours=4)).collect()
+
+    assert sorted(delta.get_column("tradeLegId").to_list()) == [5, 6, 7, 8, 9]
+    assert sync.load_state()["to_datetime"] == "2024-01-01 09:30:00"
+
+
+def test_sync_failure_keeps_synced_windows (tmp_path) :
+    """
+    
+    """
+    start = dt.datetime(2024, 1, 1, tzinfo=UTC)
+    api = FakeAuditTrail(hourly_events(start, 6))
+    sync = AuditTrailSync(api, books=["B"], dir_abs_path=str(tmp_path), window_hours=2)
+
+    get_audit_trails = api.get_audit_trails_with_status
+
+    # The second window fails : no answer, error body of a 5xx answer, 2xx answer without the events list
+    for answer in [(None, None), (500, { "status" : "Failure", "errors" : ["Timeout"] }), (200, { "status" : "Success" })] :
+
+        def failing (*args) :
+            return answer if args[0] == start + dt.timedelta(hours=2) else get_audit_trails(*args)
+
+        api.get_audit_trails_with_status = failing
+
+        with pytest.raises(RuntimeError) :
+            sync.sync(until=start + dt.timedelta(hours=6), since=start)
+
+        assert sync.load_state()["to_datetime"] == "2024-01-01 02:00:00"
+
+    api.get_audit_trails_with_status = get_audit_trails
+    resumed = sync.sync(until=start + dt.timedelta(hours=6))
+
+    assert resumed.get_column("tradeLegId").to_list() == [3, 4, 5]
@@ -0,0 +1,130 @@
+import threading
+import polars as pl
+
+from libapi.ice.booking import BookingLedger, book_units, classify_booking_response
+from libapi.ice.trade_manager import TradeManager
+
+
+def make_trade_manager (post) :
+    """
+    TradeManager without authentication, `post` answering the requests (HTTP 200).
+    """
+    trade_manager = TradeManager.__new__(TradeManager)
+    trade_manager.post_with_status = lambda endpoint, json : (200, post(endpoint, json))
+
+    return trade_manager
+
+
+def cash_legs (n) :
+    """
+    
+    """
+    return [{ "currency" : "EUR", "date" : "2024-01-02", "counterparty" : f"CP{i}", "notional" : 1_000 + i, "book" : "HV_BOOK" } for i in range(n)]
+
+
+def test_book_cash_legs_batches_concurrently (tmp_path) :
+    """
+    
+    """
+    batches, lock = [], threading.Lock()
+
+    def post (endpoint, json) :
+
+        with lock :
+            batches.append(len(json["trades"]))
+
+        return { "status" : "Success" }
+
+    trade_manager = make_trade_manager(post)
+    ledger = BookingLedger(str(tmp_path / "ledger.db"))
+
+    status = trade_manager.book_cash_legs(pl.DataFrame(cash_legs(7)), batch_size=3, max_in_flight=3, ledger=ledger, endpoint="add")
+
+    assert sorted(batches) == [1, 3, 3]
+    assert status.get_column("status").to_list() == ["booked"] * 7
+    assert status.get_column("batch").to_list() == [0, 0, 0, 1, 1, 1, 2]
+
+    # Run again (e.g. the job is restarted) : nothing is booked twice
+    batches.clear()
+    again = trade_manager.book_cash_legs(cash_legs(8), batch_size=3, ledger=BookingLedger(str(tmp_path / "ledger.db")), endpoint="add")
+
+    assert batches == [1]
+    assert again.get_column("status").to_list() == ["skipped"] * 7 + ["booked"]
+
+
+def test_book_units_failures () :
+    """
+    
+    """
+    ledger = BookingLedger(":memory:")
+    answers = { "A" : (None, None), "B" : (200, { "status" : "Failure", "message" : "Unknown book" }), "C" : (200, { "status" : "Success" }) }
+
+    def post_batch (batch) :
+        return answers[batch[0]["name"]]
+
+    units = [[{ "name" : "A" }], [{ "name" : "B" }], [{ "name" : "C" }, { "name" : "C2" }], [{ "name" : "C" }, { "name" : "C2" }]]
+    status = book_units(units, post_batch, batch_size=1, ledger=ledger)
+
+    assert status.get_column("status").to_list() == ["unknown", "rejected", "booked", "duplicate"]
+    assert status.get_column("n_trades").to_list() == [1, 1, 2, 2]
+    assert status.get_column("message")[1] == "Unknown book"
+
+    # Unknown outcomes are never sent again, rejected ones can be fixed and booked
+    answers.update(A=(200, { "status" : "Success" }), B=(200, { "status" : "Success" }))
+    status = book_units(units[:2], post_batch, batch_size=1, ledger=ledger)
+
+    assert status.get_column("status").to_list() == ["skipped", "booked"]
+
+    ledger.release(status.get_column("key").to_list()[:1])
+
+    assert book_units(units[:1], post_batch, ledger=ledger).get_column("status").to_list() == ["booked"]
+
+
+def test_margin_calls_legs_stay_together () :
+    """
+    
+    """
+    sent = []
+    trade_manager = make_trade_manager(lambda endpoint, json : sent.append(json["trades"]) or { "status" : "Success" })
+
+    calls = [{ "currency" : "USD", "date" : "2024-01-02", "notional" : 10, "book" : "B", "counterparty" : f"CP{i}", "bank" : "BANK" } for i in range(3)]
+    status = trade_manager.book_margin_calls(calls, batch_size=2, max_in_flight=1, ledger=BookingLedger(":memory:"), endpoint="add")
+
+    assert [len(trades) for trades in sent] == [4, 2]
+    assert status.get_column("n_trades").to_list() == [2, 2, 2]
+
+
+def test_only_explicit_successes_are_booked () :
+    """
+    
+    """
+    assert classify_booking_response(200, { "status" : "Success" }) == ("booked", "Success")
+    assert classify_booking_response(201, { "status" : "success" })[0] == "booked"
+
+    # Refused by the API : the batch can be fixed and sent again
+    assert classify_booking_response(400, { "status" : "Failure", "message" : "Invalid trade" }) == ("rejected", "Invalid trade")
+    assert classify_booking_response(422, None) == ("rejected", "HTTP 422")
+    assert classify_booking_response(200, { "status" : "Error" })[0] == "rejected"
+
+    # The trades may have been booked : never sent again without a check in ICE
+    for http_status, response in [(None, None), (500, { "status" : "Failure" }), (502, None), (200, {}), (200, { "status" : "Partial" }), (200, None)] :
+        assert classify_booking_response(http_status, response)[0] == "unknown"
+
+    ledger = BookingLedger(":memory:")
+    status = book_units([[{ "name" : "A" }], [{ "name" : "B" }]], lambda batch : (503, { "status" : "Unavailable" }) if batch[0]["name"] == "A" else (200, { "requestId" : "1" }), batch_size=1, ledger=ledger)
+
+    assert status.get_column("status").to_list() == ["unknown", "unknown"]
+    assert set(ledger.statuses(status.get_column("key").to_list()).values()) == { "unknown" }
+
+
+def test_unset_ledger_path_warns (monkeypatch, capsys) :
+    """
+    
+    """
+    monkeypatch.setattr("libapi.ice.booking.ICE_BOOKING_LEDGER_DB_ABS_PATH", None)
+
+    assert BookingLedger().in_memory
+    assert "[!] ICE_BOOKING_LEDGER_DB_ABS_PATH is not set" in capsys.readouterr().out
+
+    assert BookingLedger(":memory:").in_memory
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,147 @@
+import pytest
+
+from libapi.ice.fanout import plan_trade_search, iter_unique_trade_legs, merge_trade_legs_responses
+from libapi.ice.trade_manager import TradeManager
+
+
+def make_trade_manager (post, status = 200) :
+    """
+    TradeManager without authentication, `post` answering the requests with the HTTP `status`.
+    """
+    trade_manager = TradeManager.__new__(TradeManager)
+    trade_manager.post = post
+    trade_manager.post_with_status = lambda endpoint, json : (status, post(endpoint, json))
+
+    return trade_manager
+
+
+def search_post (endpoint, json) :
+    """
+    Every book holds two trade legs, the leg "shared" being in all of them.
+    """
+    query = json["query"]
+    books = query["values"] if "values" in query else query["queries"][1]["values"]
+
+    trade_legs = [{ "tradeLegId" : f"{book}-{i}" } for book in books for i in range(2)]
+
+    return { "status" : "Success", "tradeLegs" : trade_legs + [{ "tradeLegId" : "shared" }] }
+
+
+def test_plan_trade_search () :
+    """
+    
+    """
+    assert plan_trade_search("A") == [(["A"], None)]
+    assert plan_trade_search(["A", "B", "C"], books_per_request=2) == [(["A", "B"], None), (["C"], None)]
+
+    pieces = plan_trade_search(["A", "B", "C"], [1, 2, 3], books_per_request=2, values_per_request=2)
+
+    assert pieces == [(["A", "B"], [1, 2]), (["A", "B"], [3]), (["C"], [1, 2]), (["C"], [3])]
+
+
+def test_iter_unique_trade_legs () :
+    """
+    
+    """
+    responses = [{ "tradeLegs" : [{ "tradeLegId" : 1 }, { "tradeLegId" : 2 }] }, None, { "tradeLegs" : [{ "tradeLegId" : 2 }, { "other" : 0 }] }]
+
+    assert list(iter_unique_trade_legs(responses)) == [{ "tradeLegId" : 1 }, { "tradeLegId" : 2 }, { "other" : 0 }]
+
+
+def test_search_trades_fans_out_and_dedupes () :
+    """
+    
+    """
+    payloads = []
+
+    def post (endpoint, json) :
+
+        payloads.append(json)
+        return search_post(endpoint, json)
+
+    trade_manager = make_trade_manager(post)
+    books = [f"B{i}" for i in range(5)]
+
+    response = trade_manager.search_trades(books, books_per_request=2, endpoint="search")
+
+    assert len(payloads) == 3
+    assert response["status"] == "Success"
+    assert [leg["tradeLegId"] for leg in response["tradeLegs"]] == [f"{book}-{i}" for book in books[:2] for i in range(2)] + ["shared"] + [f"{book}-{i}" for book in books[2:] for i in range(2)]
+
+    streamed = [leg["tradeLegId"] for leg in trade_manager.iter_trade_legs_from_books(books, books_per_request=2, endpoint="search")]
+
+    assert sorted(streamed) == sorted(leg["tradeLegId"] for leg in response["tradeLegs"])
+
+
+def test_search_trades_failed_piece () :
+    """
+    
+    """
+    def post (endpoint, json) :
+        return None if "B3" in json["query"]["values"] else search_post(endpoint, json)
+
+    trade_manager = make_trade_manager(post)
+
+    assert trade_manager.search_trades([f"B{i}" for i in range(5)], books_per_request=2, endpoint="search") is None
+
+    with pytest.raises(RuntimeError) :
+        list(trade_manager.iter_trade_legs_from_books([f"B{i}" for i in range(5)], books_per_request=2, endpoint="search"))
+
+
+def test_search_trades_without_pieces () :
+    """
+    
+    """
+    def post (endpoint, json) :
+        raise AssertionError("No request expected")
+
+    trade_manager = make_trade_manager(post)
+
+    assert plan_trade_search([]) == [] and plan_trade_search(["A"], []) == []
+    assert merge_trade_legs_responses([]) == { "tradeLegs" : [] }
+
+    assert trade_manager.search_trades([], endpoint="search") == { "tradeLegs" : [] }
+    assert trade_manager.search_trades(["A"], values=[], field_trade="TradeDate", endpoint="search") == { "tradeLegs" : [] }
+    assert list(trade_manager.iter_trade_legs_from_books(["A"], values=[], field_trade="TradeDate", endpoint="search")) == []
+
+
+def test_search_trades_error_answers_fail_the_piece () :
+    """
+    
+    """
+    books = [f"B{i}" for i in range(5)]
+
+    # Error body of a 4xx / 5xx answer
+    trade_manager = make_trade_manager(lambda endpoint, json : { "status" : "Failure", "message" : "Bad query" }, status=400)
+
+    assert trade_manager.search_trades(books, books_per_request=2, endpoint="search") is None
+    assert trade_manager.search_trades(books[:1], endpoint="search") is None
+
+    # 2xx answer without any trade legs list
+    def post (endpoint, json) :
+        return { "status" : "Success" } if "B3" in json["query"]["values"] else search_post(endpoint, json)
+
+    trade_manager = make_trade_manager(post)
+
+    assert trade_manager.search_trades(books, books_per_request=2, endpoint="search") is None
+
+    with pytest.raises(RuntimeError) :
+        list(trade_manager.iter_trade_legs_from_books(books, books_per_request=2, endpoint="search"))
+
+
+def test_get_info_trades_from_ids_chunks () :
+    """
+    
+    """
+    sent = []
+
+    def post (endpoint, json) :
+
+        sent.append(json["tradeLegIds"])
+        return { "status" : "Success", "tradeLegs" : [{ "tradeLegId" : trade_id } for trade_id in json["tradeLegIds"]] }
+
+    trade_manager = make_trade_manager(post)
+    response = trade_manager.get_info_trades_from_ids(list(range(7)) + [3], endpoint="info", ids_per_request=3)
+
+    assert sorted(sent) == [[0, 1, 2], [3, 4, 5], [6, 3]]
+    assert [leg["tradeLegId"] for leg in response["tradeLegs"]] == list(range(7))
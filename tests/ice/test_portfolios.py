@@ -0,0 +1,84 @@
+from libapi.ice.portfolios import PortfolioCatalogue
+from libapi.ice.trade_manager import TradeManager
+
+
+PORTFOLIOS = [{ "portfolioName" : name } for name in ["HV_EQ", "wr_fx", " hv_fx", "HV_EQ", "WR_EQ", "OTHER", "HVX"]]
+
+
+def test_prefix_lookups_share_one_download () :
+    """
+    
+    """
+    calls = []
+
+    def fetch () :
+
+        calls.append(1)
+        return PORTFOLIOS
+
+    catalogue = PortfolioCatalogue(ttl=60)
+
+    assert catalogue.names(fetch, "hv") == ["HVX", "HV_EQ", " hv_fx"]
+    assert catalogue.names(fetch, "WR") == ["WR_EQ", "wr_fx"]
+    assert catalogue.names(fetch, "hv_") == ["HV_EQ", " hv_fx"]
+    assert catalogue.names(fetch, "ZZ") == []
+    assert len(catalogue.names(fetch)) == 6
+    assert len(calls) == 1
+
+
+def test_revalidation_rebuilds_only_on_change () :
+    """
+    
+    """
+    answers = [PORTFOLIOS, list(PORTFOLIOS), None, PORTFOLIOS + [{ "portfolioName" : "HV_NEW" }]]
+    catalogue = PortfolioCatalogue(ttl=0)
+
+    fetch = lambda : answers.pop(0)
+
+    assert "HV_NEW" not in catalogue.names(fetch, "HV")
+    assert "HV_NEW" not in catalogue.names(fetch, "HV")
+    assert catalogue.rebuilds == 1
+
+    # Failed download : the cached list is kept
+    assert catalogue.names(fetch, "HV") == ["HVX", "HV_EQ", " hv_fx"]
+    assert "HV_NEW" in catalogue.names(fetch, "HV")
+    assert (catalogue.fetches, catalogue.rebuilds) == (4, 2)
+
+
+def test_trade_manager_ltas_books_hit_the_network_once () :
+    """
+    
+    """
+    trade_manager = TradeManager.__new__(TradeManager)
+    trade_manager.api_host = "https://portfolios.test"
+
+    calls = []
+
+    def get (endpoint, json) :
+
+        calls.append(endpoint)
+        return { "portfolios" : PORTFOLIOS, "status" : "Success" }
+
+    trade_manager.get_with_status = lambda endpoint, json : (200, get(endpoint, json))
+
+    books = trade_manager.get_all_existing_hv_portfolios(endpoint="portfolios") + trade_manager.get_all_existing_wr_portfolios(endpoint="portfolios")
+
+    assert books == ["HVX", "HV_EQ", " hv_fx", "WR_EQ", "wr_fx"]
+    assert calls == ["portfolios"]
+
+
+def test_failed_portfolios_download_is_not_cached () :
+    """
+    
+    """
+    trade_manager = TradeManager.__new__(TradeManager)
+    trade_manager.api_host = "https://failed-portfolios.test"
+
+    answers = [(503, { "status" : "Failure", "errors" : ["Unavailable"] }), (200, { "status" : "Success" }), (200, { "portfolios" : PORTFOLIOS, "status" : "Success" })]
+    trade_manager.get_with_status = lambda endpoint, json : answers.pop(0)
+
+    # Error body, then 2xx answer without the list : nothing cached, the next lookup downloads again
+    assert trade_manager.get_all_existing_hv_portfolios(endpoint="portfolios") is None
+    assert trade_manager.get_all_existing_hv_portfolios(endpoint="portfolios") is None
+    assert trade_manager.get_all_existing_hv_portfolios(endpoint="portfolios") == ["HVX", "HV_EQ", " hv_fx"]
+    assert answers == []
@@ -0,0 +1,74 @@
+import threading
+
+from libapi.ice.client import Client
+from libapi.ice.data import IceData
+from libapi.ice.shared import get_shared_client, clear_shared_clients
+from libapi.ice.trade_manager import TradeManager
+from libapi.ice.transport import get_shared_session
+from libapi.pricers.pricer import Pricer
+
+
+class CountingClient :
+    """
+    
+    """
+    built = 0
+    lock = threading.Lock()
+
+    def __init__ (self, host = None, username = None) :
+
+        with CountingClient.lock :
+            CountingClient.built += 1
+
+
+def test_shared_client_built_once () :
+    """
+    
+    """
+    clear_shared_clients()
+    clients = []
+
+    threads = [threading.Thread(target=lambda : clients.append(get_shared_client(CountingClient, "host", username="user"))) for _ in range(8)]
+
+    for thread in threads :
+        thread.start()
+
+    for thread in threads :
+        thread.join()
+
+    assert CountingClient.built == 1
+    assert all(client is clients[0] for client in clients)
+    assert get_shared_client(CountingClient, "host", username="other") is not clients[0]
+
+    clear_shared_clients()
+
+
+def test_facades_share_the_session_of_a_user (monkeypatch) :
+    """
+    
+    """
+    monkeypatch.setattr(Client, "authenticate", lambda self, username, password, endpoint = None : True)
+
+    trade_manager = TradeManager("https://shared.test", "auth", "user", "password")
+    data = IceData("https://shared.test", "auth", "user", "password")
+    other = TradeManager("https://shared.test", "auth", "other", "password")
+
+    assert trade_manager.session is data.session
+    assert trade_manager.session is get_shared_session("https://shared.test", "user")
+    assert other.session is not trade_manager.session
+
+
+def test_pricers_share_one_trade_manager (monkeypatch) :
+    """
+    
+    """
+    clear_shared_clients()
+    monkeypatch.setattr("libapi.pricers.pricer.TradeManager", CountingClient)
+
+    built = CountingClient.built
+    pricers = [Pricer() for _ in range(10)]
+
+    assert CountingClient.built == built + 1
+    assert all(pricer.api is pricers[0].api for pricer in pricers)
+
+    clear_shared_clients()
@@ -0,0 +1,125 @@
+import json
+import pytest
+import requests
+
+from libapi.ice.client import Client
+from libapi.ice.trade_manager import TradeManager
+
+
+class FakeResponse :
+    """
+    Streamed response, the body being given in small chunks.
+    """
+    def __init__ (self, body, status_code = 200) :
+
+        self.body = body
+        self.status_code = status_code
+        self.read = 0
+
+    def __enter__ (self) :
+        return self
+
+    def __exit__ (self, *args) :
+        return False
+
+    def raise_for_status (self) :
+
+        if self.status_code >= 400 :
+            raise requests.exceptions.HTTPError(f"{self.status_code}", response=self)
+
+    def iter_content (self, chunk_size) :
+
+        for i in range(0, len(self.body), 5) :
+
+            self.read = i + 5
+            yield self.body[i:i + 5]
+
+
+class FakeSession :
+    """
+    
+    """
+    def __init__ (self, handler) :
+
+        self.handler = handler
+        self.calls = []
+
+    def request (self, method, url, json = None, stream = False, **kwargs) :
+
+        self.calls.append((method, json, stream))
+        return self.handler(json)
+
+
+def make_client (handler, cls = Client) :
+    """
+    Client without authentication nor request logging.
+    """
+    client = cls.__new__(cls)
+    Client.__init__(client, "https://ice.test", "auth", token="token")
+
+    client.session = FakeSession(handler)
+    client.log_request = lambda **kwargs : None
+
+    return client
+
+
+def info_handler (payload) :
+    """
+    
+    """
+    trade_legs = [
+
+        { "tradeLegId" : trade_id, "instrument" : { "underlyingAsset" : { "sdTicker" : f"T{trade_id % 3}" } }, "fields" : list(range(20)) }
+        for trade_id in payload["tradeLegIds"]
+
+    ]
+
+    return FakeResponse(json.dumps({ "tradeLegs" : trade_legs, "status" : "Success" }).encode("utf-8"))
+
+
+def test_iter_post_items_streams () :
+    """
+    
+    """
+    client = make_client(info_handler)
+    items = client.iter_post_items("trades", "tradeLegs", json={ "tradeLegIds" : [1, 2] })
+
+    first = next(items)
+
+    assert first["tradeLegId"] == 1
+    assert client.session.calls == [("POST", { "tradeLegIds" : [1, 2] }, True)]
+    assert [item["tradeLegId"] for item in items] == [2]
+
+
+def test_iter_post_items_http_error () :
+    """
+    
+    """
+    client = make_client(lambda payload : FakeResponse(b"{}", status_code=500))
+
+    with pytest.raises(RuntimeError) :
+        list(client.iter_post_items("trades", "tradeLegs", json={}))
+
+
+def test_tickers_from_book_are_projected_by_pages (monkeypatch) :
+    """
+    
+    """
+    monkeypatch.setattr("libapi.ice.trade_manager.ICE_URL_GET_TRADES", "info")
+
+    trade_manager = make_client(info_handler, TradeManager)
+    trade_manager.post_with_status = lambda endpoint, json : (200, { "tradeLegs" : [{ "tradeLegId" : i } for i in range(7)] })
+
+    tickers = trade_manager.get_tickers_from_hv_equity_book("BOOK", endpoint="search")
+
+    assert sorted(tickers) == ["T0", "T1", "T2"]
+    assert [len(payload["tradeLegIds"]) for _, payload, _ in trade_manager.session.calls] == [7]
+
+    legs = list(trade_manager.iter_trade_legs_info(list(range(7)) + [0], fields=["tradeLegId"], endpoint="info", page_size=3))
+
+    assert legs == [{ "tradeLegId" : i } for i in range(7)]
+
+    batches = list(trade_manager.iter_info_trade_batches_from_books("BOOK", ["tradeLegId", "instrument.underlyingAsset.sdTicker"], batch_size=3, endpoint="search"))
+
+    assert [batch.height for batch in batches] == [3, 3, 1]
+    assert batches[0].columns == ["tradeLegId", "instrument.underlyingAsset.sdTicker"]
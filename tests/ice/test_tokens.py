@@ -0,0 +1,248 @@
+import json
+import time
+import base64
+import threading
+
+from libapi.ice.client import Client
+from libapi.ice.tokens import FileLock, TokenManager, token_expiry, get_token_manager
+
+
+def make_jwt (exp) :
+    """
+    
+    """
+    claims = base64.urlsafe_b64encode(json.dumps({ "exp" : exp }).encode("utf-8")).decode("ascii").rstrip("=")
+
+    return f"header.{claims}.signature"
+
+
+class Logins :
+    """
+    Login function handing out new tokens.
+    """
+    def __init__ (self, prefix = "token", delay = 0.0) :
+
+        self.prefix = prefix
+        self.count = 0
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def __call__ (self) :
+
+        time.sleep(self.delay)
+
+        with self.lock :
+
+            self.count += 1
+            return f"{self.prefix}-{self.count}"
+
+
+def test_token_expiry () :
+    """
+    
+    """
+    assert token_expiry(make_jwt(2_000_000_000)) == 2_000_000_000
+    assert token_expiry("opaque", default_ttl=60, now=1_000) == 1_060
+
+
+def test_concurrent_401_refresh_logs_in_once () :
+    """
+    
+    """
+    logins = Logins(delay=0.05)
+    manager = TokenManager(login=logins, background=False)
+
+    assert manager.get() == "token-1"
+
+    tokens = []
+    threads = [threading.Thread(target=lambda : tokens.append(manager.refresh(stale="token-1"))) for _ in range(8)]
+
+    for thread in threads :
+        thread.start()
+
+    for thread in threads :
+        thread.join()
+
+    assert tokens == ["token-2"] * 8
+    assert logins.count == 2
+
+
+def test_processes_share_the_cache_file (tmp_path) :
+    """
+    
+    """
+    cache_path = str(tmp_path / "token.json")
+
+    first = TokenManager(cache_path, login=Logins("first"), background=False)
+    other = TokenManager(cache_path, login=Logins("other"), background=False)
+
+    assert first.get() == "first-1"
+    assert other.get() == "first-1"
+    assert (first.logins, other.logins) == (1, 0)
+
+    # The other process got a 401 : the first one takes its new token instead of logging in
+    assert other.refresh(stale="first-1") == "other-1"
+    assert first.refresh(stale="first-1") == "other-1"
+    assert (first.logins, other.logins) == (1, 1)
+
+
+def test_file_lock (tmp_path) :
+    """
+    
+    """
+    path = str(tmp_path / "token.lock")
+    lock = FileLock(path, timeout=0.1, stale_after=60)
+
+    assert lock.acquire()
+    assert not FileLock(path, timeout=0.1, stale_after=60).acquire()
+    assert FileLock(path, timeout=0.1, stale_after=0).acquire() # Stale lock taken over
+
+    lock.release()
+
+
+def test_file_lock_timeout_keeps_the_lock_of_the_holder (tmp_path) :
+    """
+    
+    """
+    path = tmp_path / "token.lock"
+    holder = FileLock(str(path), timeout=0.1, stale_after=60)
+
+    assert holder.acquire()
+
+    with FileLock(str(path), timeout=0.05, stale_after=60) as locked :
+        assert not locked
+
+    assert path.exists()
+
+    holder.release()
+    assert not path.exists()
+
+
+def test_token_managers_never_share_a_user_token (tmp_path) :
+    """
+    
+    """
+    cache_path = str(tmp_path / "token.json")
+
+    alice = get_token_manager("https://ice.test/auth", "alice-test", cache_path)
+    bob = get_token_manager("https://ice.test/auth", "bob-test", cache_path)
+
+    alice.background = bob.background = False
+    alice.set_login(Logins("alice"))
+    bob.set_login(Logins("bob"))
+
+    assert alice.cache_path != bob.cache_path
+    assert (alice.get(), bob.get()) == ("alice-1", "bob-1")
+
+    # A file of another user is never adopted
+    intruder = TokenManager(alice.cache_path, login=Logins("intruder"), background=False, auth_url="https://ice.test/auth", username="bob-test")
+
+    assert intruder.get() == "intruder-1"
+
+
+def test_failed_login_backs_off_and_is_replaced_by_a_good_one () :
+    """
+    
+    """
+    attempts = []
+
+    def wrong_password () :
+
+        attempts.append("wrong")
+        return None
+
+    manager = TokenManager(background=False, login_backoff=0.1)
+    manager.set_login(wrong_password)
+
+    assert manager.get(wrong_password) is None
+    assert manager.refresh() is None
+    assert attempts == ["wrong"]
+
+    time.sleep(0.15)
+
+    assert manager.refresh() is None
+    assert attempts == ["wrong", "wrong"]
+
+    # Another client logs in with the right password : its login replaces the wrong one
+    good = Logins("good")
+    manager.set_login(good)
+
+    assert manager.get(good) == "good-1"
+    assert manager.refresh(stale="good-1") == "good-2"
+    assert attempts == ["wrong", "wrong"]
+
+
+class FakeResponse :
+    """
+    
+    """
+    def __init__ (self, status_code, body) :
+
+        self.status_code = status_code
+        self.body = body
+        self.content = json.dumps(body).encode("utf-8")
+
+    def raise_for_status (self) :
+
+        if self.status_code >= 400 :
+
+            import requests
+            raise requests.exceptions.HTTPError(str(self.status_code), response=self)
+
+    def json (self) :
+        return self.body
+
+    def close (self) :
+        pass
+
+
+class FakeSession :
+    """
+    Only the last token issued is accepted.
+    """
+    def __init__ (self) :
+
+        self.logins = 0
+        self.requests = []
+
+    def post (self, url, json, **kwargs) :
+
+        self.logins += 1
+        return FakeResponse(200, { "token" : f"token-{self.logins}" })
+
+    def request (self, method, url, headers, **kwargs) :
+
+        self.requests.append(headers["AuthenticationToken"])
+
+        if headers["AuthenticationToken"] != f"token-{self.logins}" :
+            return FakeResponse(401, {})
+
+        return FakeResponse(200, { "status" : "Success" })
+
+
+def test_clients_share_one_login_and_renew_on_401 (tmp_path) :
+    """
+    
+    """
+    session = FakeSession()
+    manager = TokenManager(str(tmp_path / "token.json"), background=False)
+    clients = []
+
+    for _ in range(3) :
+
+        client = Client("https://ice.test", "auth", token_cache_path=str(tmp_path / "token.json"), token_manager=manager)
+        client.session = session
+        client.log_request = lambda **kwargs : None
+
+        assert client.authenticate("user", "password")
+        clients.append(client)
+
+    assert session.logins == 1
+
+    # The token is revoked server side : the next request logs in once, for every client
+    session.logins += 1
+
+    assert clients[0].post("trades", json={}) == { "status" : "Success" }
+    assert clients[1].post("trades", json={}) == { "status" : "Success" }
+    assert session.logins == 3
+    assert session.requests == ["token-1", "token-3", "token-3"]
@@ -0,0 +1,91 @@
+import json
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from libapi.ice.transport import RETRY_STATUS_FORCELIST, PooledHTTPAdapter, build_retry, build_session, get_connection_stats
+
+
+class KeepAliveHandler (BaseHTTPRequestHandler) :
+    """
+    HTTP/1.1 server answering every GET with a small JSON body, connections kept open.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET (self) :
+
+        body = json.dumps({ "status" : "Success" }).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message (self, *args) :
+        pass
+
+
+def test_build_retry () :
+    """
+    
+    """
+    retry = build_retry(max_retries=4, backoff_factor=0.25)
+
+    assert (retry.total, retry.connect, retry.read, retry.status) == (4, 4, 4, 4)
+    assert retry.backoff_factor == 0.25
+    assert set(retry.status_forcelist) == set(RETRY_STATUS_FORCELIST) == {429, 502, 503, 504}
+    assert retry.raise_on_status is False
+
+    # Idempotent methods only : a POST (booking) is never replayed on a status or read error
+    assert "GET" in retry.allowed_methods and "PUT" in retry.allowed_methods
+    assert "POST" not in retry.allowed_methods
+
+    assert retry.is_retry("GET", 503) and not retry.is_retry("POST", 503)
+    assert build_retry(max_retries=0).total == 0
+
+
+def test_build_session_mounts_one_pooled_adapter () :
+    """
+    
+    """
+    session = build_session(pool_connections=3, pool_maxsize=7, max_retries=2, keep_alive=False)
+
+    adapter = session.get_adapter("https://ice.test")
+
+    assert isinstance(adapter, PooledHTTPAdapter)
+    assert session.get_adapter("http://ice.test") is adapter
+    assert (adapter._pool_connections, adapter._pool_maxsize) == (3, 7)
+    assert adapter.max_retries.total == 2
+    assert session.headers["Connection"] == "close"
+
+    assert build_session().headers.get("Connection") != "close"
+
+
+def test_connection_reuse_counters () :
+    """
+    
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    url = f"http://127.0.0.1:{server.server_address[1]}/results"
+
+    try :
+
+        session = build_session(max_retries=0)
+
+        assert get_connection_stats(session) == { "pools" : 0, "requests" : 0, "connections" : 0, "reused" : 0 }
+
+        for _ in range(3) :
+            assert session.get(url, timeout=5).json() == { "status" : "Success" }
+
+        assert get_connection_stats(session) == { "pools" : 1, "requests" : 3, "connections" : 1, "reused" : 2 }
+
+        session.close()
+
+    finally :
+
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,82 @@
+import pytest
+import datetime as dt
+
+from libapi.instruments.eq import (
+    make_eq_option_legs_from_combos, make_eq_option_legs_table_from_combos,
+    make_eq_option_legs_from_strike_pairs, make_eq_option_legs_table_from_strike_pairs,
+    make_eq_strangle_payloads, make_eq_strangle_table
+)
+from libapi.instruments.fx import make_fx_option_legs_from_combos, make_fx_option_legs_table_from_combos
+from libapi.pricers.eq import strategies_instruments_creation as eq_strategies
+from libapi.pricers.fx import strategies_instruments_creation as fx_strategies
+from libapi.instruments import eq, fx
+
+
+EXPIRIES = [dt.date(2025, 3, 21), "2025-06-20"]
+
+
+def test_combos_table_matches_dict_builder () :
+    """
+    
+    """
+    tickers = ["SX5E", "SPX"]
+    strikes = ["90%", 100, "ATM"]
+
+    table = make_eq_option_legs_table_from_combos(tickers, EXPIRIES, strikes, ("Put", "Call"))
+
+    assert table.to_dicts() == make_eq_option_legs_from_combos(tickers, EXPIRIES, strikes, ("Put", "Call"))
+    assert table.height == 2 * 2 * 3 * 2
+
+    pairs = ["EURUSD", "USDJPY"]
+
+    assert make_fx_option_legs_table_from_combos(pairs, EXPIRIES, [1.1, 1.2]).to_dicts() == make_fx_option_legs_from_combos(pairs, EXPIRIES, [1.1, 1.2])
+
+
+def test_strike_pairs_tables_match_dict_builders () :
+    """
+    
+    """
+    tickers = ["SX5E", "SPX"]
+    pairs = [(90, 110), ("95%", "105%")]
+
+    assert make_eq_option_legs_table_from_strike_pairs(tickers, EXPIRIES, pairs).to_dicts() == make_eq_option_legs_from_strike_pairs(tickers, EXPIRIES, pairs)
+    assert make_eq_strangle_table(tickers, EXPIRIES, pairs).to_dicts() == make_eq_strangle_payloads(tickers, EXPIRIES, pairs)
+
+    with pytest.raises(ValueError) :
+        make_eq_strangle_table(tickers, EXPIRIES, [90, 110])
+
+
+EQ_PAYLOADS = {
+
+    'Straddle' : eq.make_eq_straddle_payloads,
+    'Strangle' : eq.make_eq_strangle_payloads,
+    'Call Spread' : eq.make_eq_call_spread_payloads,
+    'Put Spread' : eq.make_eq_put_spread_payloads,
+    'Put' : eq.make_eq_put_leg_payloads,
+    'Call' : eq.make_eq_call_leg_payloads,
+
+}
+
+FX_PAYLOADS = {
+
+    'Straddle' : fx.make_fx_straddle_payloads,
+    'Strangle' : fx.make_fx_strangle_payloads,
+    'Call Spread' : fx.make_fx_call_spread_payloads,
+    'Put Spread' : fx.make_fx_put_spread_payloads,
+    'Put' : fx.make_fx_put_leg_payloads,
+    'Call' : fx.make_fx_call_leg_payloads,
+
+}
+
+
+@pytest.mark.parametrize("strategies, payloads, underliers", [(eq_strategies, EQ_PAYLOADS, ["SX5E", "SPX"]), (fx_strategies, FX_PAYLOADS, ["EURUSD", "USDJPY"])])
+def test_strategies_are_built_as_tables (strategies, payloads, underliers) :
+    """
+    
+    """
+    for strategy, make_payloads in payloads.items() :
+
+        strikes = [(90, 110), (95, 105)] if strategy in ("Strangle", "Call Spread", "Put Spread") else [90, 100]
+
+        assert strategies[strategy](underliers, EXPIRIES, strikes).to_dicts() == make_payloads(underliers, EXPIRIES, strikes)
+        assert strategies[strategy](underliers, EXPIRIES, strikes, direction="Buy").to_dicts() == make_payloads(underliers, EXPIRIES, strikes, direction="Buy")
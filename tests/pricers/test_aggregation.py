@@ -0,0 +1,52 @@
+import pytest
+import polars as pl
+
+from libapi.pricers.eq import PricerEQ
+from libapi.pricers.fx import PricerFX
+from libapi.pricers.aggregation import aggregate_legs, normalize_aggregation_spec
+
+
+def test_aggregate_legs () :
+    """
+    
+    """
+    legs = pl.DataFrame({
+
+        "stratid" : [2, 1, 1, 2],
+        "MarketValueMid" : ["1,000.5", "2", "3", None],
+        "pair" : ["EURUSD", "USDJPY", "USDJPY", "EURUSD"],
+        "direction" : ["Buy", "Sell", "Buy", "Sell"]
+
+    })
+
+    spec = { "MarketValueMid" : "sum", "pair" : "first", "direction" : " ".join, "missing" : "sum" }
+
+    grouped = aggregate_legs(legs, spec)
+
+    assert grouped.columns == ["stratid", "MarketValueMid", "pair", "direction"]
+    assert grouped.rows() == [(1, 5.0, "USDJPY", "Sell Buy"), (2, 1000.5, "EURUSD", "Buy Sell")]
+
+
+def test_unsupported_aggregation () :
+    """
+    
+    """
+    with pytest.raises(ValueError) :
+        normalize_aggregation_spec({ "price" : "mean" })
+
+
+@pytest.mark.parametrize("pricer_class, underliers", [(PricerEQ, ["SX5E"]), (PricerFX, ["EURUSD"])])
+def test_price_strategy_shape_on_failure (pricer_class, underliers) :
+    """
+    
+    """
+    pricer = pricer_class.__new__(pricer_class)
+    failed = pl.DataFrame({ "id" : [], "error" : [] })
+
+    pricer.get_options_prices = pricer.get_opts_prices = lambda *args, **kwargs : failed
+
+    assert pricer.price_strategy("Straddle", underliers, ["2025-06-20"], ["ATM"]) is failed
+
+    grouped, legs = pricer.price_strategy("Straddle", underliers, ["2025-06-20"], ["ATM"], details=True)
+
+    assert grouped is failed and legs is failed
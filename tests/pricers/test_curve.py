@@ -0,0 +1,115 @@
+import pytest
+import polars as pl
+import datetime as dt
+
+from libapi.pricers.curve import CurveEngine, CurveStore, build_curve, legacy_curve_paths
+
+
+def test_curve_resumes_from_checkpoint (tmp_path) :
+    """
+    
+    """
+    dates = ["2025-01-02", "2025-01-03", "2025-01-06", "2025-01-07"]
+    calls = []
+
+    def flaky (date) :
+
+        calls.append(date)
+        return None if date == "2025-01-06" else pl.DataFrame({"id" : [0], "MarketValueMid" : [float(date[-2:])]})
+
+    checkpoint = tmp_path / "curve.partial"
+
+    partial = CurveEngine(flaky, max_in_flight=3, max_retries=0, checkpoint_dir=str(checkpoint)).run(dates)
+
+    assert partial.get_column("ValuationDate").to_list() == ["2025-01-02", "2025-01-03", "2025-01-07"]
+    assert checkpoint.is_dir()
+
+    calls.clear()
+
+    def fixed (date) :
+
+        calls.append(date)
+        return pl.DataFrame({"id" : [0], "MarketValueMid" : [float(date[-2:])]})
+
+    curve = CurveEngine(fixed, max_in_flight=3, checkpoint_dir=str(checkpoint)).run(dates)
+
+    assert calls == ["2025-01-06"]
+    assert curve.get_column("ValuationDate").to_list() == dates
+    assert curve.get_column("MarketValueMid").to_list() == [2.0, 3.0, 6.0, 7.0]
+    assert not checkpoint.exists()
+
+
+@pytest.mark.parametrize("format", ["ipc", "parquet"])
+def test_curve_store_prices_only_missing_dates (tmp_path, format) :
+    """
+    
+    """
+    store = CurveStore(str(tmp_path), format=format)
+    definition = {"BBGTicker" : "SX5E", "opt_type" : "Put", "strike" : "100%", "strike_date" : "2025-01-02"}
+    calls = []
+
+    def price (date) :
+
+        calls.append(date)
+        return pl.DataFrame({"id" : [0], "MarketValueMid" : [float(date[-2:])]})
+
+    build_curve(definition, ["2025-01-02", "2025-01-03"], price, store=store)
+    curve = build_curve(definition, ["2025-01-03", "2025-01-06"], price, store=store)
+
+    assert sorted(calls) == ["2025-01-02", "2025-01-03", "2025-01-06"]
+    assert curve.get_column("ValuationDate").to_list() == ["2025-01-03", "2025-01-06"]
+
+    calls.clear()
+    sub_range = build_curve(definition, ["2025-01-02", "2025-01-06"], price, store=store)
+
+    assert calls == []
+    assert sub_range.get_column("MarketValueMid").to_list() == [2.0, 6.0]
+    assert store.load(store.key(definition)).height == 3
+    assert store.path(store.key(definition)).endswith(".arrow" if format == "ipc" else ".parquet")
+
+
+def test_legacy_excel_curve_is_imported_once (tmp_path, monkeypatch) :
+    """
+    
+    """
+    legacy_dir = tmp_path / "saved_requests"
+    legacy_dir.mkdir()
+
+    filename = "equity_curve_Buy_SX5E_Put_100%_1000_expi-2025-06-20_from-2025-01-02_to-2025-01-06_each-Day.xlsx"
+    (legacy_dir / filename).write_bytes(b"xlsx")
+
+    # No Excel reader is installed here : the frame an older version saved (a date missing, its pricing failed)
+    reads = []
+
+    def read_excel (path) :
+
+        reads.append(path)
+        return pl.DataFrame({"id" : [0, 0], "MarketValueMid" : [2.0, 3.0], "ValuationDate" : [dt.date(2025, 1, 2), dt.date(2025, 1, 3)]})
+
+    monkeypatch.setattr(pl, "read_excel", read_excel)
+
+    store = CurveStore(str(tmp_path / "curves"))
+    definition = {"BBGTicker" : "SX5E", "opt_type" : "Put", "strike" : "100%", "strike_date" : "2025-01-02"}
+    legacy_paths = legacy_curve_paths(filename, None, "", str(legacy_dir))
+    dates = ["2025-01-02", "2025-01-03", "2025-01-06"]
+    calls = []
+
+    def price (date) :
+
+        calls.append(date)
+        return pl.DataFrame({"id" : [0], "MarketValueMid" : [float(date[-2:])]})
+
+    curve = build_curve(definition, dates, price, store=store, legacy_excel_paths=legacy_paths)
+
+    assert legacy_paths == [str(legacy_dir / filename)]
+    assert calls == ["2025-01-06"]
+    assert curve.get_column("MarketValueMid").to_list() == [2.0, 3.0, 6.0]
+    assert curve.get_column("ValuationDate").to_list() == dates
+
+    # Every date is stored now : the Excel file is not read again, and left as it is
+    curve = build_curve(definition, dates, price, store=store, legacy_excel_paths=legacy_paths)
+
+    assert calls == ["2025-01-06"]
+    assert len(reads) == 1
+    assert curve.height == 3
+    assert (legacy_dir / filename).exists()
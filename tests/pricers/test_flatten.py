@@ -0,0 +1,79 @@
+import polars as pl
+
+from libapi.pricers.pricer import Pricer
+
+
+def test_flatten_pricer_response () :
+    """
+    
+    """
+    response = {
+
+        "instruments" : [
+
+            {
+                "id" : 1,
+                "results" : [
+
+                    { "code" : "PV", "value" : 10.0, "currency" : "EUR" },
+                    { "code" : "Delta", "value" : 0.5 },
+                    { "code" : "Delta", "value" : None }
+
+                ],
+                "assets" : [{ "name" : "SX5E", "results" : [{ "code" : "Delta", "value" : 0.7 }] }]
+            },
+
+            { "id" : 2, "results" : [] },
+            { "id" : 3, "results" : [{ "code" : "PV", "value" : 4.0, "currency" : "USD" }], "assets" : [] }
+
+        ]
+
+    }
+
+    instruments = [{ "ID" : i, "direction" : "Buy", "strike" : 100 * i } for i in (1, 2, 3)]
+
+    prices = Pricer(trade_manager=object()).flatten_pricer_response(response, instruments)
+
+    expected = pl.DataFrame({
+
+        "id" : [1, 2, 3],
+        "asset" : ["SX5E", None, None],
+        "PV" : [10.0, None, 4.0],
+        "PV_currency" : ["EUR", None, "USD"],
+        "Delta" : [0.7, None, None],
+        "direction" : ["Buy", "Buy", "Buy"],
+        "strike" : [100, 200, 300]
+
+    })
+
+    assert prices.equals(expected)
+
+
+def test_flatten_pricer_response_without_results () :
+    """
+    
+    """
+    prices = Pricer(trade_manager=object()).flatten_pricer_response({ "instruments" : [{ "id" : 1 }] }, [{ "ID" : 1, "pair" : "EURUSD" }])
+
+    assert prices.rows() == [(1, "EURUSD")]
+
+
+def test_flatten_pricer_response_mixed_value_types () :
+    """
+    
+    """
+    response = {
+
+        "instruments" : [
+
+            { "id" : 1, "results" : [{ "code" : "PV", "value" : 1.5 }, { "code" : "Status", "value" : "OK" }] },
+            { "id" : 2, "results" : [{ "code" : "PV", "value" : 2 }] }
+
+        ]
+
+    }
+
+    prices = Pricer(trade_manager=object()).flatten_pricer_response(response, [{ "ID" : 1, "pair" : "EURUSD" }, { "ID" : 2, "pair" : "USDJPY" }])
+
+    assert prices.columns == ["id", "PV", "Status", "pair"]
+    assert prices.rows() == [(1, "1.5", "OK", "EURUSD"), (2, "2", None, "USDJPY")]
@@ -0,0 +1,182 @@
+import time
+import threading
+
+from libapi.pricers.pricer import Pricer
+from libapi.utils.concurrency import SingleFlight
+from libapi.pricers.cache import PricingCache, pricing_context_key, pricing_cache_key
+
+
+class FakeTradeManager :
+
+    def __init__ (self) :
+        self.sent = []
+
+    def post (self, endpoint, data) :
+
+        self.sent.append([instrument["Strike"] for instrument in data["instruments"]])
+
+        return {"instruments" : [{"id" : instrument["ID"], "results" : [{"code" : "MarketValueMid", "value" : instrument["Strike"]}]} for instrument in data["instruments"]]}
+
+
+def make_legs (strikes) :
+
+    return [
+
+        {"direction" : "Sell", "BBGTicker" : "SX5E", "opt_type" : "Put", "strike" : strike, "notional" : "1000000", "expiry" : "2025-06-20", "SettlementDate" : "2025-06-20", "stratid" : "0"}
+        for strike in strikes
+
+    ]
+
+
+def test_only_misses_are_sent (tmp_path) :
+    """
+    
+    """
+    api = FakeTradeManager()
+    pricer = Pricer(trade_manager=api, pricing_cache=PricingCache(db_abs_path=str(tmp_path / "pricing.sqlite3")))
+    pricer.log_api_call = lambda *args, **kwargs : None
+
+    pricer.request_prices_api(make_legs(["90%", "100%"]), "EQ", asset_dict={"EQ" : []}, date="2025-01-02", endpoint="/calc")
+    response = pricer.request_prices_api(make_legs(["110%", "100%", "90%"]), "EQ", asset_dict={"EQ" : []}, date="2025-01-02", endpoint="/calc")
+
+    assert api.sent == [["90%", "100%"], ["110%"]]
+    assert [(instrument["id"], instrument["results"][0]["value"]) for instrument in response["instruments"]] == [(0, "110%"), (1, "100%"), (2, "90%")]
+
+    # Disk tier shared with another cache
+    other = Pricer(trade_manager=api, pricing_cache=PricingCache(db_abs_path=str(tmp_path / "pricing.sqlite3")))
+    other.log_api_call = pricer.log_api_call
+
+    other.request_prices_api(make_legs(["90%"]), "EQ", asset_dict={"EQ" : []}, date="2025-01-02", endpoint="/calc")
+    other.request_prices_api(make_legs(["90%"]), "EQ", asset_dict={"EQ" : []}, date="2025-01-03", endpoint="/calc")
+
+    assert api.sent[2:] == [["90%"]]
+
+
+def test_ttl_by_valuation_type () :
+    """
+    
+    """
+    cache = PricingCache(max_entries=2, db_abs_path="", ttl={"EOD" : None, "RealTime" : 0.05})
+    context = pricing_context_key({"type" : "RealTime", "Date" : None})
+
+    key = pricing_cache_key({"ID" : 0, "Strike" : "ATM"}, context)
+    assert key == pricing_cache_key({"ID" : 7, "Strike" : "ATM"}, context)
+
+    assert cache.put_many([(key, {"id" : 0})], "RealTime") == 1
+    assert cache.get(key) == {"id" : 0}
+
+    time.sleep(0.1)
+
+    assert cache.get(key) is None
+    assert cache.put_many([(key, {"id" : 0})], "Cut") == 0
+
+    cache.put_many([("a", {}), ("b", {}), ("c", {})], "EOD")
+    assert len(cache) == 2 and cache.get("a") is None
+
+
+def test_last_eod_expires_in_both_tiers (tmp_path) :
+    """
+    
+    """
+    db_abs_path = str(tmp_path / "pricing.sqlite3")
+    cache = PricingCache(db_abs_path=db_abs_path, ttl={"EOD" : None}, undated_eod_ttl=0.05)
+
+    assert cache.lifetime("EOD", "2025-01-02") is None
+    assert cache.lifetime("EOD") == 0.05
+
+    cache.put_many([("dated", {"id" : 0})], "EOD", "2025-01-02")
+    cache.put_many([("undated", {"id" : 1})], "EOD")
+
+    time.sleep(0.1)
+
+    assert cache.get("dated") == {"id" : 0}
+    assert cache.get("undated") is None
+
+    other = PricingCache(db_abs_path=db_abs_path, ttl={"EOD" : None}, undated_eod_ttl=0.05)
+
+    assert other.get("dated") == {"id" : 0}
+    assert other.get("undated") is None
+
+
+def test_undated_eod_request_is_priced_again_once_expired () :
+    """
+    
+    """
+    api = FakeTradeManager()
+    pricer = Pricer(trade_manager=api, pricing_cache=PricingCache(db_abs_path="", ttl={"EOD" : None}, undated_eod_ttl=0.05))
+    pricer.log_api_call = lambda *args, **kwargs : None
+
+    pricer.request_prices_api(make_legs(["90%"]), "EQ", asset_dict={"EQ" : []}, endpoint="/calc")
+    pricer.request_prices_api(make_legs(["90%"]), "EQ", asset_dict={"EQ" : []}, endpoint="/calc")
+
+    time.sleep(0.1)
+
+    pricer.request_prices_api(make_legs(["90%"]), "EQ", asset_dict={"EQ" : []}, endpoint="/calc")
+
+    assert api.sent == [["90%"], ["90%"]]
+
+
+def test_identical_instruments_in_flight_are_coalesced () :
+    """
+    
+    """
+    class SlowTradeManager (FakeTradeManager) :
+
+        def post (self, endpoint, data) :
+
+            time.sleep(0.2)
+            return super().post(endpoint, data)
+
+    api, flight, responses = SlowTradeManager(), SingleFlight(), {}
+
+    def price (name, strikes, delay) :
+
+        time.sleep(delay)
+
+        pricer = Pricer(trade_manager=api, pricing_cache=PricingCache(db_abs_path=""), pricing_flight=flight)
+        pricer.log_api_call = lambda *args, **kwargs : None
+
+        responses[name] = pricer.request_prices_api(make_legs(strikes), "EQ", asset_dict={"EQ" : []}, date="2025-01-02", endpoint="/calc", use_cache=False)
+
+    threads = [threading.Thread(target=price, args=("straddle", ["100%", "100%"], 0)), threading.Thread(target=price, args=("strangle", ["100%", "110%"], 0.05))]
+
+    for thread in threads :
+        thread.start()
+
+    for thread in threads :
+        thread.join()
+
+    assert api.sent == [["100%"], ["110%"]]
+    assert [instrument["results"][0]["value"] for instrument in responses["strangle"]["instruments"]] == ["100%", "110%"]
+    assert [instrument["id"] for instrument in responses["straddle"]["instruments"]] == [0, 1]
+
+    stats = flight.stats()
+
+    assert (stats["requests"], stats["requests_saved"], stats["items"], stats["items_saved"], stats["in_flight"]) == (2, 0, 4, 2, 0)
+
+
+def test_price_in_batches_drops_incomplete_strategies () :
+    """
+    
+    """
+    pricer = Pricer(trade_manager=FakeTradeManager(), pricing_cache=PricingCache(db_abs_path=""))
+    sent = []
+
+    legs = [{ "ID" : i, "strike" : str(i), "stratid" : str(i // 2) } for i in range(6)]
+    legs[1]["stratid"] = "0"
+
+    def request (chunk) :
+
+        sent.append([leg["stratid"] for leg in chunk])
+
+        # The last leg of the strategy 2 is never priced, the chunk of strategy 1 fails
+        if chunk[0]["stratid"] == "1" :
+            return None
+
+        return {"instruments" : [{"id" : leg["ID"], "results" : [{"code" : "MarketValueMid", "value" : leg["strike"]}]} for leg in chunk if leg["ID"] != 5]}
+
+    prices = pricer.price_in_batches(legs, request, chunk_size=3, max_in_flight=1, max_retries=0)
+
+    assert sent == [["0", "0"], ["1", "1"], ["2", "2"]]
+    assert prices.get_column("stratid").to_list() == ["0", "0"]
+    assert prices.get_column("MarketValueMid").to_list() == [0.0, 1.0]
@@ -0,0 +1,89 @@
+import time
+import pytest
+
+from libapi.utils.concurrency import split_in_chunks, split_in_chunks_by_key, run_batches, iter_batches
+
+
+def test_split_in_chunks () :
+    """
+    
+    """
+    assert split_in_chunks(list(range(5)), 2) == [[0, 1], [2, 3], [4]]
+    assert split_in_chunks([], 3) == []
+
+    with pytest.raises(ValueError) :
+        split_in_chunks([1, 2], 0)
+
+
+def test_split_in_chunks_by_key () :
+    """
+    
+    """
+    legs = ["a1", "a2", "b1", "b2", "b3", "c1"]
+    keys = [leg[0] for leg in legs]
+
+    assert split_in_chunks_by_key(legs, 3, keys) == [["a1", "a2"], ["b1", "b2", "b3"], ["c1"]]
+    assert split_in_chunks_by_key(legs, 4, keys) == [["a1", "a2"], ["b1", "b2", "b3", "c1"]]
+
+    # A strategy longer than a chunk is never split
+    assert split_in_chunks_by_key(legs, 1, keys) == [["a1", "a2"], ["b1", "b2", "b3"], ["c1"]]
+    assert split_in_chunks_by_key(list(range(5)), 2, list(range(5))) == split_in_chunks(list(range(5)), 2)
+
+
+def test_run_batches_keeps_input_order () :
+    """
+    
+    """
+    def worker (batch) :
+        
+        # Later batches finish first
+        time.sleep(0.01 * (5 - batch[0]))
+        return sum(batch)
+
+    results = run_batches([[i] for i in range(5)], worker, max_in_flight=5)
+
+    assert results == [0, 1, 2, 3, 4]
+
+
+def test_run_batches_retries_failed_batch_only () :
+    """
+    
+    """
+    calls = {}
+
+    def worker (batch) :
+
+        calls[batch] = calls.get(batch, 0) + 1
+
+        if batch == "flaky" and calls[batch] == 1 :
+            raise RuntimeError("first attempt fails")
+        
+        return batch.upper()
+
+    results = run_batches(["ok", "flaky", "none"], worker, max_in_flight=3, max_retries=1, retry_delay=0)
+
+    assert results == ["OK", "FLAKY", "NONE"]
+    assert calls == {"ok" : 1, "flaky" : 2, "none" : 1}
+
+
+def test_run_batches_gives_up_after_retries () :
+    """
+    
+    """
+    results = run_batches([1, 2], lambda batch : None if batch == 2 else batch, max_in_flight=2, max_retries=1, retry_delay=0)
+
+    assert results == [1, None]
+
+
+def test_iter_batches_completion_order () :
+    """
+    
+    """
+    def worker (batch) :
+        
+        time.sleep(0.05 * (3 - batch))
+        return batch
+
+    done = list(iter_batches([0, 1, 2], worker, max_in_flight=3, max_retries=0))
+
+    assert done == [(2, 2), (1, 1), (0, 0)]
@@ -0,0 +1,44 @@
+import pytest
+import polars as pl
+import datetime as dt
+
+from libapi.utils.formatter import date_to_str, datetime_to_str, dates_to_str
+
+
+@pytest.mark.parametrize("date, expected", [
+
+    ("2024-01-05", "2024-01-05"),
+    ("2024-1-5", "2024-01-05"),
+    ("2024-01-05T10:30:00", "2024-01-05"),
+    (dt.date(2024, 1, 5), "2024-01-05"),
+
+])
+def test_date_to_str (date, expected) :
+    """
+    
+    """
+    assert date_to_str(date) == expected
+    assert date_to_str(date) == expected # Cached
+
+
+def test_invalid_dates () :
+    """
+    
+    """
+    for _ in range(2) :
+
+        with pytest.raises(ValueError) :
+            date_to_str("2024-02-30")
+
+        assert datetime_to_str("2024-01-05 24:00:00") is None
+
+    assert datetime_to_str("2024-01-05 23:59:59") == "2024-01-05 23:59:59"
+
+
+def test_dates_to_str () :
+    """
+    
+    """
+    assert dates_to_str(["2024-1-5", dt.datetime(2024, 1, 6, 12), "2024-1-5"]) == ["2024-01-05", "2024-01-06", "2024-01-05"]
+    assert dates_to_str(pl.Series(["2024-1-5", None])).to_list() == ["2024-01-05", None]
+    assert dates_to_str(pl.Series([dt.date(2024, 1, 5)]), "%d/%m/%Y").to_list() == ["05/01/2024"]
@@ -0,0 +1,53 @@
+import json
+import pytest
+
+from libapi.utils.jsonstream import iter_json_items, project_fields
+
+
+def split_bytes (data, size) :
+    """
+    
+    """
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_iter_json_items_any_chunking () :
+    """
+    
+    """
+    legs = [{ "tradeLegId" : i, "price" : 1.5e3 * i, "name" : "é \"]}", "nested" : { "tradeLegs" : [] } } for i in range(50)]
+    body = json.dumps({ "RequestId" : "r", "tradeLegs" : legs, "status" : "Success" }, ensure_ascii=False).encode("utf-8")
+
+    for size in (1, 3, 7, 64, len(body)) :
+        assert list(iter_json_items(split_bytes(body, size), "tradeLegs")) == legs
+
+
+def test_iter_json_items_edge_cases () :
+    """
+    
+    """
+    # A number cut between two chunks
+    assert list(iter_json_items([b'{"tradeLegs" : [1', b'2, 3]}'], "tradeLegs")) == [12, 3]
+
+    assert list(iter_json_items([b'{"status" : "Success", "tradeLegs" : null}'], "tradeLegs")) == []
+    assert list(iter_json_items([b'{"tradeLegs" : []}'], "tradeLegs")) == []
+    assert list(iter_json_items([b'{}'], "tradeLegs")) == []
+
+    with pytest.raises(ValueError) :
+        list(iter_json_items([b'{"tradeLegs" : [1, 2'], "tradeLegs"))
+
+
+def test_project_fields () :
+    """
+    
+    """
+    record = { "tradeLegId" : 1, "instrument" : { "underlyingAsset" : { "sdTicker" : "SX5E" } } }
+
+    assert project_fields(record) is record
+    assert project_fields(record, ["tradeLegId", "instrument.underlyingAsset.sdTicker", "instrument.strike"]) == {
+
+        "tradeLegId" : 1,
+        "instrument.underlyingAsset.sdTicker" : "SX5E",
+        "instrument.strike" : None
+
+    }
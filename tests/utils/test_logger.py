@@ -0,0 +1,36 @@
+from libapi.utils.logger import RequestLogger, REQUEST_LOG_COLUMNS
+
+
+def test_request_logger_writes_batches (tmp_path) :
+    """
+    
+    """
+    log_file = tmp_path / "requests.csv"
+    logger = RequestLogger(str(log_file), flush_interval=0.05, rotate_daily=False, max_bytes=0)
+
+    for i in range(3) :
+        logger.log("get", f"https://host/endpoint/{i}", 200, True, latency_ms=12.5, response_bytes=10)
+
+    assert logger.flush()
+    logger.close()
+
+    lines = log_file.read_text(encoding="utf-8").splitlines()
+
+    assert lines[0] == ",".join(REQUEST_LOG_COLUMNS)
+    assert len(lines) == 4
+    assert lines[1].endswith(",GET,https://host/endpoint/0,200,True,12.5,10")
+
+
+def test_request_logger_moves_legacy_file_aside (tmp_path) :
+    """
+    
+    """
+    log_file = tmp_path / "requests.csv"
+    log_file.write_text("timestamp,method,endpoint,status,success\n", encoding="utf-8")
+
+    logger = RequestLogger(str(log_file), flush_interval=0.05, rotate_daily=False, max_bytes=0)
+    logger.log("post", "https://host/auth", 401, False)
+    logger.close()
+
+    assert (tmp_path / "requests.legacy.csv").exists()
+    assert log_file.read_text(encoding="utf-8").splitlines()[0] == ",".join(REQUEST_LOG_COLUMNS)
@@ -0,0 +1,77 @@
+import os
+import json
+import polars as pl
+
+from libapi.utils.results import (
+    cache_results_path, find_cache_results_from_id, load_cache_results_from_id, save_cache_results, evict_cache_results,
+    cache_table_path, load_cache_table
+)
+
+
+def test_save_and_load_sharded_results (tmp_path) :
+    """
+    
+    """
+    assert save_cache_results(42, { "results" : [1, 2] }, str(tmp_path))
+    assert not save_cache_results(42, { "results" : [] }, str(tmp_path))
+
+    assert find_cache_results_from_id(42, str(tmp_path)) == cache_results_path(42, str(tmp_path))
+    assert load_cache_results_from_id(42, str(tmp_path)) == { "results" : [1, 2] }
+
+
+def test_legacy_results_are_migrated (tmp_path) :
+    """
+    
+    """
+    legacy = tmp_path / "7_results.json"
+    legacy.write_text(json.dumps({ "status" : "Success" }, indent=4))
+
+    assert load_cache_results_from_id(7, str(tmp_path)) == { "status" : "Success" }
+    assert not legacy.exists()
+    assert os.path.isfile(cache_results_path(7, str(tmp_path)))
+
+
+def test_evict_by_size (tmp_path) :
+    """
+    
+    """
+    for calculation_id in range(10) :
+        save_cache_results(calculation_id, { "value" : calculation_id }, str(tmp_path))
+
+    assert evict_cache_results(str(tmp_path), max_bytes=1, max_age_days=0) == 10
+
+
+def test_results_tables_projection (tmp_path) :
+    """
+    
+    """
+    trade_legs = [
+
+        { "book" : "B1", "mv" : 10.0, "greeks" : { "delta" : 0.5, "vega" : 1.0 } },
+        { "book" : "B2", "mv" : -3.0, "greeks" : { "delta" : -0.1, "vega" : 2.0 } }
+
+    ]
+
+    save_cache_results(9, { "tradeLegs" : trade_legs }, str(tmp_path))
+    assert os.path.isfile(cache_table_path(9, "tradeLegs", str(tmp_path)))
+
+    table = load_cache_table(9, "tradeLegs", ["book", "mv", "greeks.delta"], pl.col("book") == "B2", str(tmp_path))
+
+    assert table.columns == ["book", "mv", "greeks.delta"]
+    assert table.rows() == [("B2", -3.0, -0.1)]
+
+
+def test_table_write_error_keeps_the_saved_results (tmp_path, monkeypatch) :
+    """
+    
+    """
+    def fail (*args, **kwargs) :
+        raise OSError("disk full")
+
+    monkeypatch.setattr(pl.DataFrame, "write_parquet", fail)
+
+    assert save_cache_results(11, { "tradeLegs" : [{ "book" : "B1" }] }, str(tmp_path))
+    assert load_cache_results_from_id(11, str(tmp_path)) == { "tradeLegs" : [{ "book" : "B1" }] }
+
+    assert not os.path.isfile(cache_table_path(11, "tradeLegs", str(tmp_path)))
+    assert not [name for shard in tmp_path.iterdir() for name in os.listdir(shard) if name.startswith(".tmp-")]